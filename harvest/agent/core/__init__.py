@@ -17,13 +17,15 @@ from .provider import GroqProvider
 # Use Convex if CONVEX_URL is set, otherwise fall back to SQLite
 if os.getenv("CONVEX_URL"):
     from .convex_db import ConvexDB as Database
+    AsyncDatabase = Database  # Already async
 else:
-    from .database import Database
+    from .database import AsyncDatabase, Database
 
 __all__ = [
     'load_config',
     'check_startup_requirements',
     'Database',
+    'AsyncDatabase',
     'WalletManager',
     'GroqProvider',
 ]
@@ -91,6 +91,28 @@ class APIUsageMonitor:
         if alert:
             self._emit_alert(alert)
     
+    def remaining_today(self, key_index: int) -> int:
+        """
+        Get the number of requests a key has left today.
+        
+        Resets the daily counters first if the UTC date has changed since
+        the last reset, so budgets free up at midnight UTC.
+        
+        Args:
+            key_index: Index of the API key
+            
+        Returns:
+            Remaining requests (0 for unknown keys)
+        """
+        if key_index not in self.usage:
+            return 0
+        
+        usage = self.usage[key_index]
+        if usage.last_reset.date() != datetime.now(timezone.utc).date():
+            self.reset_daily_counters()
+        
+        return max(usage.daily_limit - usage.requests_today, 0)
+    
     def check_thresholds(self, key_index: int) -> Optional[Alert]:
         """
         Check if usage has crossed alert thresholds.
@@ -0,0 +1,445 @@
+"""
+WebSocket balance feed for user wallets.
+
+Polling getBalance for every user each scan cycle spends most of its RPC
+budget confirming that nothing changed. BalanceSubscriptionManager instead
+keeps a small number of Solana WebSocket connections open and multiplexes
+an accountSubscribe per wallet across them. Balance changes are pushed into
+MultiUserWalletManager's balance cache as they happen, and an optional
+callback (AgentLoop.check_balance_and_notify) fires on every change.
+
+Dropped connections reconnect with exponential backoff and resubscribe.
+After each (re)connect the connection's balances are resynced with
+getMultipleAccounts, since changes made while disconnected are never pushed.
+While a wallet's subscription is live its cached balance is treated as
+fresh; when the connection drops it falls back to normal TTL polling.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+LAMPORTS_PER_SOL = 1_000_000_000
+
+
+@dataclass
+class BalanceFeedStats:
+    """Statistics for the balance feed."""
+    notifications: int = 0
+    balance_changes: int = 0
+    reconnects: int = 0
+    resyncs: int = 0
+    subscribe_errors: int = 0
+
+
+class _FeedConnection:
+    """One WebSocket connection and the subscriptions multiplexed over it."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.users: Dict[str, str] = {}  # user_id -> public key
+        self.ws: Optional[Any] = None
+        self.task: Optional[asyncio.Task] = None
+        self.pending: Dict[int, str] = {}  # request id -> user_id
+        self.subscriptions: Dict[int, str] = {}  # subscription id -> user_id
+        self.subscription_by_user: Dict[str, int] = {}
+        self.synced = False  # Resync started since the last (re)connect
+
+    def reset(self):
+        """Forget per-connection subscription state after a disconnect."""
+        self.ws = None
+        self.pending.clear()
+        self.subscriptions.clear()
+        self.subscription_by_user.clear()
+        self.synced = False
+
+
+class BalanceSubscriptionManager:
+    """
+    Push-based wallet balances over multiplexed accountSubscribe streams.
+    """
+
+    def __init__(
+        self,
+        ws_url: str,
+        wallet_manager: Any,
+        on_change: Optional[Callable[[str, float], Awaitable[None]]] = None,
+        max_connections: int = 4,
+        max_subscriptions_per_connection: int = 1000,
+        commitment: str = "confirmed",
+        heartbeat: float = 30.0,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 60.0
+    ):
+        """
+        Initialize balance subscription manager.
+
+        Args:
+            ws_url: Solana WebSocket endpoint (wss://...)
+            wallet_manager: MultiUserWalletManager whose balance cache is fed
+            on_change: Awaited with (user_id, balance) whenever a balance changes
+            max_connections: Maximum number of WebSocket connections (default 4)
+            max_subscriptions_per_connection: Wallets per connection (default 1000)
+            commitment: Commitment level for notifications (default "confirmed")
+            heartbeat: Seconds between WebSocket pings (default 30)
+            reconnect_delay: Initial delay before reconnecting (default 1s)
+            max_reconnect_delay: Cap for exponential reconnect backoff (default 60s)
+        """
+        self.ws_url = ws_url
+        self.wallet_manager = wallet_manager
+        self.on_change = on_change
+        self.max_subscriptions_per_connection = max_subscriptions_per_connection
+        self.commitment = commitment
+        self.heartbeat = heartbeat
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self.connections = [_FeedConnection(i) for i in range(max_connections)]
+        self.connection_by_user: Dict[str, _FeedConnection] = {}
+        self.balances: Dict[str, float] = {}  # Last balance seen per user
+        self.last_push: Dict[str, float] = {}  # Monotonic time of last pushed update
+        self._live: Set[str] = set()  # Users whose cached balance the feed keeps current
+        self.stats = BalanceFeedStats()
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._running = False
+        self._next_request_id = 1
+        self._background_tasks: Set[asyncio.Task] = set()
+
+        logger.info(
+            f"BalanceSubscriptionManager initialized with up to {max_connections} connections "
+            f"x {max_subscriptions_per_connection} subscriptions"
+        )
+
+    # Subscription management
+
+    def subscribe(self, user_id: str, public_key: str) -> bool:
+        """
+        Start streaming a wallet's balance.
+
+        Args:
+            user_id: User identifier
+            public_key: Wallet public key
+
+        Returns:
+            True if the wallet is (or already was) subscribed, False if every
+            connection is full
+        """
+        current = self.connection_by_user.get(user_id)
+        if current is not None:
+            if current.users[user_id] == public_key:
+                return True
+            self.unsubscribe(user_id)
+
+        open_connections = [
+            conn for conn in self.connections
+            if len(conn.users) < self.max_subscriptions_per_connection
+        ]
+        if not open_connections:
+            logger.warning(f"Balance feed at capacity, user {user_id} stays on polling")
+            return False
+
+        conn = min(open_connections, key=lambda c: len(c.users))
+        conn.users[user_id] = public_key
+        self.connection_by_user[user_id] = conn
+
+        if self._running:
+            if conn.task is None or conn.task.done():
+                self._start_connection(conn)
+            elif conn.ws is not None:
+                self._spawn(self._send_subscribe(conn, user_id))
+
+        return True
+
+    def subscribe_many(self, public_keys_by_user: Dict[str, str]) -> int:
+        """
+        Subscribe several wallets at once.
+
+        Args:
+            public_keys_by_user: Mapping of user_id to wallet public key
+
+        Returns:
+            Number of wallets subscribed
+        """
+        return sum(
+            1 for user_id, public_key in public_keys_by_user.items()
+            if self.subscribe(user_id, public_key)
+        )
+
+    def unsubscribe(self, user_id: str) -> None:
+        """
+        Stop streaming a wallet's balance.
+
+        Args:
+            user_id: User identifier
+        """
+        conn = self.connection_by_user.pop(user_id, None)
+        if conn is None:
+            return
+
+        conn.users.pop(user_id, None)
+        self._set_live([user_id], False)
+
+        subscription_id = conn.subscription_by_user.pop(user_id, None)
+        if subscription_id is not None:
+            conn.subscriptions.pop(subscription_id, None)
+            if conn.ws is not None:
+                self._spawn(self._send(conn, "accountUnsubscribe", [subscription_id]))
+
+    def is_live(self, user_id: str) -> bool:
+        """Check whether a user's balance is currently being streamed."""
+        return user_id in self._live
+
+    def _set_live(self, user_ids: List[str], live: bool) -> None:
+        if live:
+            self._live.update(user_ids)
+        else:
+            self._live.difference_update(user_ids)
+        self.wallet_manager.set_balances_live(user_ids, live)
+
+    # Lifecycle
+
+    def start(self) -> None:
+        """Open connections for all subscribed wallets."""
+        if self._running:
+            return
+
+        self._running = True
+        for conn in self.connections:
+            if conn.users:
+                self._start_connection(conn)
+
+        logger.info(
+            f"Balance feed started for {len(self.connection_by_user)} wallets "
+            f"over {sum(1 for c in self.connections if c.users)} connection(s)"
+        )
+
+    async def stop(self) -> None:
+        """Close all connections and fall back to polling."""
+        self._running = False
+
+        tasks = [conn.task for conn in self.connections if conn.task is not None]
+        tasks.extend(self._background_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        for conn in self.connections:
+            conn.task = None
+            self._set_live(list(conn.users), False)
+            conn.reset()
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+        logger.info("Balance feed stopped")
+
+    def _start_connection(self, conn: _FeedConnection) -> None:
+        conn.task = asyncio.ensure_future(self._run_connection(conn))
+
+    def _spawn(self, coro: Awaitable[Any]) -> None:
+        """Run a coroutine in the background, keeping a reference until done."""
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def _run_connection(self, conn: _FeedConnection) -> None:
+        """Keep one connection open, reconnecting with backoff until stopped."""
+        delay = self.reconnect_delay
+
+        while self._running and conn.users:
+            try:
+                async with self._get_session().ws_connect(self.ws_url, heartbeat=self.heartbeat) as ws:
+                    conn.ws = ws
+                    delay = self.reconnect_delay
+                    logger.info(f"Balance feed connection {conn.index} open ({len(conn.users)} wallets)")
+
+                    for user_id in list(conn.users):
+                        await self._send_subscribe(conn, user_id)
+
+                    async for msg in ws:
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            await self._handle_message(conn, msg.data)
+                        elif msg.type in (aiohttp.WSMsgType.ERROR, aiohttp.WSMsgType.CLOSED):
+                            break
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Balance feed connection {conn.index} error: {e}")
+            finally:
+                # Changes made while disconnected are never pushed, so these
+                # balances go back to TTL polling until the next resync
+                self._set_live(list(conn.users), False)
+                conn.reset()
+
+            if not self._running or not conn.users:
+                break
+
+            self.stats.reconnects += 1
+            logger.info(f"Balance feed connection {conn.index} closed, reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    # Protocol
+
+    async def _send(self, conn: _FeedConnection, method: str, params: List[Any]) -> int:
+        """Send a JSON-RPC request over a connection and return its id."""
+        request_id = self._next_request_id
+        self._next_request_id += 1
+        await conn.ws.send_str(json.dumps({
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": method,
+            "params": params
+        }))
+        return request_id
+
+    async def _send_subscribe(self, conn: _FeedConnection, user_id: str) -> None:
+        public_key = conn.users.get(user_id)
+        if public_key is None or conn.ws is None:
+            return
+
+        request_id = await self._send(
+            conn,
+            "accountSubscribe",
+            [public_key, {"encoding": "base64", "commitment": self.commitment}]
+        )
+        conn.pending[request_id] = user_id
+
+    async def _handle_message(self, conn: _FeedConnection, raw: str) -> None:
+        """Dispatch a subscription confirmation or account notification."""
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            logger.warning(f"Balance feed connection {conn.index} sent invalid JSON")
+            return
+
+        if data.get("method") == "accountNotification":
+            params = data.get("params", {})
+            user_id = conn.subscriptions.get(params.get("subscription"))
+            if user_id is None:
+                return
+
+            self.stats.notifications += 1
+            account = (params.get("result") or {}).get("value") or {}
+            # A closed account is delivered as a null value and holds nothing
+            balance = account.get("lamports", 0) / LAMPORTS_PER_SOL
+            self.last_push[user_id] = time.monotonic()
+            await self._apply_balance(user_id, balance)
+            return
+
+        user_id = conn.pending.pop(data.get("id"), None)
+        if user_id is None:
+            return
+
+        if "error" in data:
+            self.stats.subscribe_errors += 1
+            logger.error(
+                f"accountSubscribe failed for user {user_id}: "
+                f"{data['error'].get('message', 'Unknown error')}"
+            )
+        elif user_id not in conn.users:
+            # Unsubscribed while the request was in flight
+            self._spawn(self._send(conn, "accountUnsubscribe", [data.get("result")]))
+        else:
+            conn.subscriptions[data.get("result")] = user_id
+            conn.subscription_by_user[user_id] = data.get("result")
+            if conn.synced:
+                # Subscribed after the connection's resync; catch up on this wallet
+                self._spawn(self._resync(conn, [user_id]))
+
+        if not conn.pending and not conn.synced:
+            # Every subscription is active, so nothing can change unseen
+            # between this snapshot and the notifications that follow
+            conn.synced = True
+            self._spawn(self._resync(conn, list(conn.subscription_by_user)))
+
+    async def _resync(self, conn: _FeedConnection, user_ids: List[str]) -> None:
+        """
+        Fetch current balances once, then treat the stream as authoritative.
+
+        Args:
+            conn: Connection the users are subscribed on
+            user_ids: Users to resync
+        """
+        started = time.monotonic()
+        ws = conn.ws
+
+        try:
+            balances = await self.wallet_manager.batch_get_balances(user_ids, force=True)
+        except Exception as e:
+            logger.error(f"Balance feed resync failed on connection {conn.index}: {e}")
+            return
+
+        if conn.ws is not ws:
+            return  # Disconnected meanwhile; the next connection resyncs again
+
+        self.stats.resyncs += 1
+        for user_id, balance in balances.items():
+            if user_id not in conn.users:
+                continue
+            if self.last_push.get(user_id, 0.0) > started:
+                # A pushed update is newer than the fetched balance
+                self.wallet_manager.apply_balance_update(user_id, self.balances[user_id])
+                continue
+            await self._apply_balance(user_id, balance)
+
+        self._set_live(
+            [user_id for user_id in user_ids if user_id in conn.subscription_by_user],
+            True
+        )
+
+    async def _apply_balance(self, user_id: str, balance: float) -> None:
+        """Store a balance and fire the change callback if it moved."""
+        previous = self.balances.get(user_id)
+        self.balances[user_id] = balance
+        self.wallet_manager.apply_balance_update(user_id, balance)
+
+        if previous is None or previous == balance:
+            # A first observation is not a change
+            return
+
+        self.stats.balance_changes += 1
+        logger.debug(f"Balance feed: user {user_id} balance {previous} -> {balance} SOL")
+
+        if self.on_change is not None:
+            self._spawn(self._notify_change(user_id, balance))
+
+    async def _notify_change(self, user_id: str, balance: float) -> None:
+        try:
+            await self.on_change(user_id, balance)
+        except Exception as e:
+            logger.error(f"Balance change callback failed for user {user_id}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get balance feed statistics.
+
+        Returns:
+            Dictionary with subscription counts and notification metrics
+        """
+        return {
+            "running": self._running,
+            "subscribed_wallets": len(self.connection_by_user),
+            "live_wallets": len(self._live),
+            "open_connections": sum(1 for c in self.connections if c.ws is not None),
+            "notifications": self.stats.notifications,
+            "balance_changes": self.stats.balance_changes,
+            "reconnects": self.stats.reconnects,
+            "resyncs": self.stats.resyncs,
+            "subscribe_errors": self.stats.subscribe_errors,
+        }
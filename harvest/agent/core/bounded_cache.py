@@ -0,0 +1,282 @@
+"""
+Memory-bounded caching primitive.
+
+Long-running caches keyed by user, context hash or wallet grow without
+bound unless something evicts them. BoundedCache is a dict-like store with
+a maximum entry count and/or byte budget (least recently used entries are
+evicted first), optional per-entry TTLs, and hit/miss/eviction stats.
+CacheSweeper periodically drops expired entries from registered caches.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BoundedCacheStats:
+    """Statistics for a bounded cache."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # Entries dropped to stay within capacity
+    expirations: int = 0  # Entries dropped because their TTL passed
+
+    def hit_rate(self) -> float:
+        """Calculate cache hit rate as percentage."""
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.0
+        return (self.hits / total) * 100
+
+
+class BoundedCache(MutableMapping):
+    """
+    Dict-like cache with LRU eviction, optional TTL and size accounting.
+
+    Reads refresh an entry's recency. When a write takes the cache past
+    max_entries or max_bytes, least recently used entries are evicted until
+    it fits again. Expired entries behave as missing and are removed when
+    read or swept.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = 10000,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        name: str = "cache",
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+        sizeof: Callable[[Any], int] = sys.getsizeof
+    ):
+        """
+        Initialize bounded cache.
+
+        Args:
+            max_entries: Maximum number of entries (None for no count limit)
+            max_bytes: Maximum total size of values in bytes (None for no limit)
+            ttl: Default time-to-live in seconds (None for no expiry)
+            name: Name used in logs and stats
+            on_evict: Called with (key, value) when an entry is evicted or expires
+            sizeof: Function estimating a value's size in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.name = name
+        self.on_evict = on_evict
+        self.sizeof = sizeof
+        self.stats = BoundedCacheStats()
+        self.total_bytes = 0
+        # key -> (value, expires_at or None, size)
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float], int]]" = OrderedDict()
+
+    def _is_expired(self, expires_at: Optional[float], now: float) -> bool:
+        return expires_at is not None and now >= expires_at
+
+    def _remove(self, key: Hashable, notify: bool) -> Any:
+        value, _, size = self._data.pop(key)
+        self.total_bytes -= size
+        if notify and self.on_evict is not None:
+            try:
+                self.on_evict(key, value)
+            except Exception as e:
+                logger.error(f"Error in {self.name} eviction callback for {key}: {e}")
+        return value
+
+    def _enforce_limits(self):
+        """Evict least recently used entries until within capacity."""
+        while self._data and (
+            (self.max_entries is not None and len(self._data) > self.max_entries)
+            or (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        ):
+            key = next(iter(self._data))
+            self._remove(key, notify=True)
+            self.stats.evictions += 1
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, overriding the default TTL if ttl is given.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time-to-live in seconds for this entry
+        """
+        if key in self._data:
+            self._remove(key, notify=False)
+
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        size = self.sizeof(value)
+        self._data[key] = (value, expires_at, size)
+        self.total_bytes += size
+        self._enforce_limits()
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.set(key, value)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            raise KeyError(key)
+
+        value, expires_at, _ = entry
+        if self._is_expired(expires_at, time.time()):
+            self._remove(key, notify=True)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            raise KeyError(key)
+
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def __delitem__(self, key: Hashable) -> None:
+        if key not in self._data:
+            raise KeyError(key)
+        self._remove(key, notify=False)
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and not self._is_expired(entry[1], time.time())
+
+    def __iter__(self) -> Iterator[Hashable]:
+        now = time.time()
+        return iter([key for key, (_, expires_at, _) in self._data.items()
+                     if not self._is_expired(expires_at, now)])
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Live (key, value) pairs, without touching recency or stats."""
+        now = time.time()
+        return [(key, value) for key, (value, expires_at, _) in self._data.items()
+                if not self._is_expired(expires_at, now)]
+
+    def values(self) -> List[Any]:
+        """Live values, without touching recency or stats."""
+        return [value for _, value in self.items()]
+
+    def clear(self) -> None:
+        """Remove all entries without eviction callbacks."""
+        self._data.clear()
+        self.total_bytes = 0
+
+    def evict_expired(self) -> int:
+        """
+        Remove expired entries from cache.
+
+        Returns:
+            Number of entries evicted
+        """
+        now = time.time()
+        expired_keys = [
+            key for key, (_, expires_at, _) in self._data.items()
+            if self._is_expired(expires_at, now)
+        ]
+
+        for key in expired_keys:
+            self._remove(key, notify=True)
+        self.stats.expirations += len(expired_keys)
+
+        if expired_keys:
+            logger.debug(f"Evicted {len(expired_keys)} expired entries from {self.name}")
+
+        return len(expired_keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary containing size and performance metrics
+        """
+        return {
+            "name": self.name,
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "hit_rate_percent": self.stats.hit_rate(),
+            "evictions": self.stats.evictions,
+            "expirations": self.stats.expirations,
+        }
+
+
+class CacheSweeper:
+    """
+    Periodically calls evict_expired() on registered caches.
+
+    Works with BoundedCache and with any other cache exposing
+    evict_expired(), such as SharedPriceCache and StrategyCache.
+    """
+
+    def __init__(self, interval: float = 60.0):
+        """
+        Initialize cache sweeper.
+
+        Args:
+            interval: Seconds between sweeps (default 60)
+        """
+        self.interval = interval
+        self.caches: List[Any] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, cache: Any) -> None:
+        """
+        Add a cache to the sweep.
+
+        Args:
+            cache: Object with an evict_expired() method
+        """
+        self.caches.append(cache)
+
+    def sweep(self) -> int:
+        """
+        Sweep every registered cache once.
+
+        Returns:
+            Total number of entries evicted
+        """
+        total = 0
+        for cache in self.caches:
+            try:
+                total += cache.evict_expired()
+            except Exception as e:
+                logger.error(f"Error sweeping {getattr(cache, 'name', type(cache).__name__)}: {e}")
+
+        if total:
+            logger.debug(f"Cache sweep evicted {total} expired entries")
+        return total
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self.sweep()
+
+    def start(self) -> None:
+        """Start periodic sweeping."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+            logger.info(f"Cache sweeper started for {len(self.caches)} caches (every {self.interval:.0f}s)")
+
+    async def stop(self) -> None:
+        """Stop periodic sweeping."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
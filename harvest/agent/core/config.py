@@ -85,6 +85,15 @@ class EnvironmentConfig:
         "STRATEGY_CACHE_TTL": "30",
         "RPC_BATCH_SIZE": "10",
         "SCAN_STAGGER_WINDOW": "60",
+        "SCAN_CONCURRENCY": "50",
+        "USER_SCAN_TIMEOUT": "30",
+        "SCAN_RATE_PER_KEY": "10",
+        "RPC_HEDGE_REQUESTS": "false",
+        "HELIUS_REQUESTS_PER_SECOND": "10",
+        "BALANCE_FEED_ENABLED": "true",
+        "TRADE_CONCURRENCY": "8",
+        "DB_WRITE_BEHIND_MS": "50",
+        "DB_WRITE_BATCH_SIZE": "500",
     }
     
     # All known variables
@@ -95,6 +104,7 @@ class EnvironmentConfig:
         list(OPTIMIZATION_DEFAULTS.keys()) +
         [
             "HELIUS_API_KEY",
+            "SOLANA_WS_URL",
             "WALLET_ADDRESS",
             "WALLET_PRIVATE_KEY",
             "DISCORD_WEBHOOK_URL",
@@ -292,6 +302,37 @@ class EnvironmentConfig:
             logger.error(f"Invalid PRICE_CACHE_TTL value: {e}, using default 60s")
             return 60
     
+    def get_price_cache_soft_ttl(self) -> Optional[float]:
+        """
+        Get price cache soft TTL in seconds.
+        
+        Past the soft TTL cached prices are still served but refreshed in
+        the background. Unset means 75% of the price cache TTL; 0 disables
+        background refresh.
+        
+        Returns:
+            Soft TTL in seconds, or None if disabled
+        """
+        ttl = self.get_price_cache_ttl()
+        value = self.get("PRICE_CACHE_SOFT_TTL")
+        if value is None or value == "":
+            return ttl * 0.75
+        
+        try:
+            soft_ttl = float(value)
+            if soft_ttl <= 0:
+                return None
+            if soft_ttl >= ttl:
+                logger.warning(
+                    f"Price cache soft TTL {soft_ttl}s is not below TTL {ttl}s, "
+                    f"using {ttl * 0.75}s"
+                )
+                return ttl * 0.75
+            return soft_ttl
+        except (ValueError, TypeError) as e:
+            logger.error(f"Invalid PRICE_CACHE_SOFT_TTL value: {e}, using {ttl * 0.75}s")
+            return ttl * 0.75
+    
     def get_strategy_cache_ttl(self) -> int:
         """
         Get strategy cache TTL in seconds.        
@@ -349,6 +390,180 @@ class EnvironmentConfig:
             logger.error(f"Invalid SCAN_STAGGER_WINDOW value: {e}, using default 60s")
             return 60
     
+    def get_scan_concurrency(self) -> int:
+        """
+        Get maximum number of user scans running at once.        
+        Returns:
+            Concurrent scan limit (default 50)
+        """
+        try:
+            concurrency = int(self.get("SCAN_CONCURRENCY", "50"))
+            if concurrency < 1:
+                logger.warning(f"Scan concurrency {concurrency} is too low, using minimum 1")
+                return 1
+            if concurrency > 500:
+                logger.warning(f"Scan concurrency {concurrency} is too high, using maximum 500")
+                return 500
+            return concurrency
+        except (ValueError, TypeError) as e:
+            logger.error(f"Invalid SCAN_CONCURRENCY value: {e}, using default 50")
+            return 50
+    
+    def get_user_scan_timeout(self) -> float:
+        """
+        Get per-user scan timeout in seconds.        
+        Returns:
+            Timeout in seconds (default 30)
+        """
+        try:
+            timeout = float(self.get("USER_SCAN_TIMEOUT", "30"))
+            if timeout < 1:
+                logger.warning(f"User scan timeout {timeout}s is too low, using minimum 1s")
+                return 1.0
+            if timeout > 300:
+                logger.warning(f"User scan timeout {timeout}s is too high, using maximum 300s")
+                return 300.0
+            return timeout
+        except (ValueError, TypeError) as e:
+            logger.error(f"Invalid USER_SCAN_TIMEOUT value: {e}, using default 30s")
+            return 30.0
+    
+    def get_scan_rate_per_key(self) -> float:
+        """
+        Get maximum user scans started per second on each RPC key.        
+        Returns:
+            Scans per second per key (default 10)
+        """
+        try:
+            rate = float(self.get("SCAN_RATE_PER_KEY", "10"))
+            if rate <= 0:
+                logger.warning(f"Scan rate per key {rate} is too low, using minimum 1")
+                return 1.0
+            return rate
+        except (ValueError, TypeError) as e:
+            logger.error(f"Invalid SCAN_RATE_PER_KEY value: {e}, using default 10")
+            return 10.0
+    
+    def get_rpc_hedge_requests(self) -> bool:
+        """
+        Check if read-only RPC calls may be hedged to a second provider.
+        
+        Returns:
+            True if enabled (default False)
+        """
+        value = self.get("RPC_HEDGE_REQUESTS", "false").lower()
+        return value in ("true", "1", "yes", "on")
+    
+    def get_helius_requests_per_second(self) -> float:
+        """
+        Get the sustained request rate allowed on each Helius API key.        
+        Returns:
+            Requests per second per key (default 10, the free-tier limit)
+        """
+        try:
+            rate = float(self.get("HELIUS_REQUESTS_PER_SECOND", "10"))
+            if rate <= 0:
+                logger.warning(f"Helius request rate {rate} is too low, using minimum 1")
+                return 1.0
+            return rate
+        except (ValueError, TypeError) as e:
+            logger.error(f"Invalid HELIUS_REQUESTS_PER_SECOND value: {e}, using default 10")
+            return 10.0
+    
+    def get_trade_concurrency(self) -> int:
+        """
+        Get maximum number of wallets executing trades at once.
+        
+        Returns:
+            Concurrent trade limit (default 8)
+        """
+        try:
+            concurrency = int(self.get("TRADE_CONCURRENCY", "8"))
+            if concurrency < 1:
+                logger.warning(f"Trade concurrency {concurrency} is too low, using minimum 1")
+                return 1
+            if concurrency > 100:
+                logger.warning(f"Trade concurrency {concurrency} is too high, using maximum 100")
+                return 100
+            return concurrency
+        except (ValueError, TypeError) as e:
+            logger.error(f"Invalid TRADE_CONCURRENCY value: {e}, using default 8")
+            return 8
+    
+    def get_db_write_behind_ms(self) -> float:
+        """
+        Get how long trade, conversation and last-active writes may be
+        buffered before they are committed as a batch.
+        
+        Returns:
+            Maximum buffering latency in milliseconds (default 50, 0 disables)
+        """
+        try:
+            latency = float(self.get("DB_WRITE_BEHIND_MS", "50"))
+            if latency < 0:
+                logger.warning(f"DB write-behind latency {latency}ms is negative, disabling write-behind")
+                return 0.0
+            if latency > 5000:
+                logger.warning(f"DB write-behind latency {latency}ms is too high, using maximum 5000ms")
+                return 5000.0
+            return latency
+        except (ValueError, TypeError) as e:
+            logger.error(f"Invalid DB_WRITE_BEHIND_MS value: {e}, using default 50")
+            return 50.0
+    
+    def get_db_write_batch_size(self) -> int:
+        """
+        Get the number of buffered database writes that forces a flush.
+        
+        Returns:
+            Write batch size (default 500)
+        """
+        try:
+            batch_size = int(self.get("DB_WRITE_BATCH_SIZE", "500"))
+            if batch_size < 1:
+                logger.warning(f"DB write batch size {batch_size} is too low, using minimum 1")
+                return 1
+            if batch_size > 10000:
+                logger.warning(f"DB write batch size {batch_size} is too high, using maximum 10000")
+                return 10000
+            return batch_size
+        except (ValueError, TypeError) as e:
+            logger.error(f"Invalid DB_WRITE_BATCH_SIZE value: {e}, using default 500")
+            return 500
+    
+    def get_balance_feed_enabled(self) -> bool:
+        """
+        Check if wallet balances are streamed over WebSocket instead of polled.
+        
+        Returns:
+            True if enabled (default True)
+        """
+        value = self.get("BALANCE_FEED_ENABLED", "true").lower()
+        return value in ("true", "1", "yes", "on")
+    
+    def get_solana_ws_url(self) -> str:
+        """
+        Get the Solana WebSocket endpoint for account subscriptions.
+        
+        Uses SOLANA_WS_URL if set, otherwise the first Helius key's endpoint,
+        otherwise the public endpoint for the configured network.
+        
+        Returns:
+            WebSocket URL (wss://...)
+        """
+        ws_url = self.get("SOLANA_WS_URL")
+        if ws_url:
+            return ws_url
+        
+        helius_keys = self.get_helius_api_keys()
+        if helius_keys:
+            host = "mainnet.helius-rpc.com" if self.is_production() else "devnet.helius-rpc.com"
+            return f"wss://{host}/?api-key={helius_keys[0]}"
+        
+        if self.is_production():
+            return "wss://api.mainnet-beta.solana.com"
+        return "wss://api.devnet.solana.com"
+    
     # Risk Management Configuration (Requirement 4.1-4.7)
     
     def get_max_position_pct(self) -> float:
@@ -743,9 +958,14 @@ def check_startup_requirements() -> None:
         if helius_keys:
             logger.info(f"Multi-API scaling: {len(helius_keys)} Helius API key(s) configured")
             logger.info(f"Price cache TTL: {config.get_price_cache_ttl()}s")
+            logger.info(f"Price cache soft TTL: {config.get_price_cache_soft_ttl()}s")
             logger.info(f"Strategy cache TTL: {config.get_strategy_cache_ttl()}s")
             logger.info(f"RPC batch size: {config.get_rpc_batch_size()} users")
             logger.info(f"Scan stagger window: {config.get_scan_stagger_window()}s")
+            logger.info(f"Scan concurrency: {config.get_scan_concurrency()} users")
+            logger.info(f"Helius rate limit: {config.get_helius_requests_per_second():g} req/s per key")
+            logger.info(f"Balance feed: {'enabled' if config.get_balance_feed_enabled() else 'disabled'}")
+            logger.info(f"Trade concurrency: {config.get_trade_concurrency()} wallets")
         
         if not config.get("DISCORD_WEBHOOK_URL"):
             logger.warning("⚠️  DISCORD_WEBHOOK_URL not set - Discord notifications disabled")
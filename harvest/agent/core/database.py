@@ -22,19 +22,29 @@ Stores:
 Location: config/harvest.db (local to deployment)
 """
 
+import asyncio
+import functools
 import sqlite3
 import logging
 import json
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 from contextlib import contextmanager
 
+from agent.core.write_behind import WriteBehindBuffer
 from agent.security.security import SecurityValidator
 
 logger = logging.getLogger(__name__)
 
 
+def _utc_timestamp() -> str:
+    """Current time in SQLite CURRENT_TIMESTAMP format."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
 class Database:
     """
     SQLite database manager for Harvest bot.
@@ -48,51 +58,185 @@ class Database:
     - Conversation history
     """
     
-    def __init__(self, db_path: str = "harvest.db"):
+    def __init__(
+        self,
+        db_path: str = "harvest.db",
+        mmap_size: int = 64 * 1024 * 1024,
+        cache_size_kib: int = 8192,
+        statement_cache_size: int = 256,
+        busy_timeout: float = 10.0,
+        write_behind_ms: float = 0,
+        write_batch_size: int = 500
+    ):
         """
         Initialize database connection.
         
+        Connections are pooled: one writer connection shared by every thread
+        (writes are serialized on a lock) and one read-only connection per
+        thread. With WAL journaling, reads never wait behind the writer.
+        
         Args:
             db_path: Path to SQLite database file
+            mmap_size: Bytes of the database file to memory-map (default 64 MiB)
+            cache_size_kib: Page cache per connection in KiB (default 8 MiB)
+            statement_cache_size: Prepared statements kept per connection (default 256)
+            busy_timeout: Seconds to wait for a lock before failing (default 10)
+            write_behind_ms: Buffer record_trade, add_conversation and
+                update_last_active writes for up to this many ms and commit
+                them in batches (default 0, write immediately)
+            write_batch_size: Buffered rows that force a flush (default 500)
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.mmap_size = mmap_size
+        self.cache_size_kib = cache_size_kib
+        self.statement_cache_size = statement_cache_size
+        self.busy_timeout = busy_timeout
+        
+        # Each connection to :memory: is a separate database, so reads share the writer
+        self._in_memory = str(db_path) == ":memory:"
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
+        self._readers: Dict[int, sqlite3.Connection] = {}  # thread ident -> connection
+        self._readers_lock = threading.Lock()
+        
+        # High-volume single-row writes are group committed when enabled
+        self.write_behind: Optional[WriteBehindBuffer] = None
+        if write_behind_ms > 0:
+            self.write_behind = WriteBehindBuffer(
+                self.get_connection,
+                max_latency=write_behind_ms / 1000.0,
+                max_batch=write_batch_size
+            )
         
         # Initialize database schema
         self._init_schema()
         
         logger.info(f"Database initialized: {self.db_path}")
     
+    def _connect(self, readonly: bool = False) -> sqlite3.Connection:
+        """Open a connection with the pool's pragmas applied."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout,
+            check_same_thread=False,  # Access is serialized by the pool
+            cached_statements=self.statement_cache_size
+        )
+        conn.row_factory = sqlite3.Row  # Return rows as dicts
+        if not self._in_memory:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kib)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        if readonly:
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+    
+    def _reader(self) -> sqlite3.Connection:
+        """Get the calling thread's read connection, opening it on first use."""
+        ident = threading.get_ident()
+        conn = self._readers.get(ident)
+        if conn is None:
+            conn = self._connect(readonly=True)
+            with self._readers_lock:
+                # A dead thread's ident may be reused; its connection is idle
+                previous = self._readers.pop(ident, None)
+                self._readers[ident] = conn
+            if previous is not None:
+                previous.close()
+        return conn
+    
     @contextmanager
-    def get_connection(self):
-        """Get database connection with automatic commit/rollback."""
-        conn = None
-        try:
-            conn = sqlite3.connect(self.db_path, timeout=10.0)
-            conn.row_factory = sqlite3.Row  # Return rows as dicts
-            yield conn
-            conn.commit()
-        except sqlite3.OperationalError as e:
-            if conn:
-                conn.rollback()
-            logger.error(f"Database operational error (locked/timeout): {e}")
-            raise
-        except sqlite3.DatabaseError as e:
-            if conn:
-                conn.rollback()
-            logger.error(f"Database error: {e}")
-            raise
-        except Exception as e:
-            if conn:
-                conn.rollback()
-            logger.error(f"Unexpected database error: {e}")
-            raise
-        finally:
-            if conn:
-                try:
-                    conn.close()
-                except Exception as e:
-                    logger.warning(f"Error closing database connection: {e}")
+    def get_connection(self, readonly: bool = False):
+        """
+        Get a pooled database connection with automatic commit/rollback.
+        
+        Writes go through the single writer connection, held exclusively for
+        the duration of the block; nested blocks on the same thread join the
+        outer transaction. Read-only blocks use the calling thread's reader.
+        
+        Args:
+            readonly: Use the thread's read-only connection (no writes allowed)
+        
+        Yields:
+            sqlite3.Connection
+        """
+        if readonly and not self._in_memory:
+            conn = self._reader()
+            try:
+                yield conn
+            except sqlite3.OperationalError as e:
+                logger.error(f"Database operational error (locked/timeout): {e}")
+                raise
+            except sqlite3.DatabaseError as e:
+                logger.error(f"Database error: {e}")
+                raise
+            except Exception as e:
+                logger.error(f"Unexpected database error: {e}")
+                raise
+            return
+        
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._connect()
+            conn = self._writer
+            self._write_depth += 1
+            try:
+                yield conn
+                if self._write_depth == 1:
+                    conn.commit()
+            except sqlite3.OperationalError as e:
+                if self._write_depth == 1:
+                    conn.rollback()
+                logger.error(f"Database operational error (locked/timeout): {e}")
+                raise
+            except sqlite3.DatabaseError as e:
+                if self._write_depth == 1:
+                    conn.rollback()
+                logger.error(f"Database error: {e}")
+                raise
+            except Exception as e:
+                if self._write_depth == 1:
+                    conn.rollback()
+                logger.error(f"Unexpected database error: {e}")
+                raise
+            finally:
+                self._write_depth -= 1
+    
+    def flush(self):
+        """Commit any buffered writes now."""
+        if self.write_behind is not None:
+            self.write_behind.flush()
+    
+    def _read_own_writes(self):
+        """Flush buffered writes so the following read sees them."""
+        if self.write_behind is not None and self.write_behind.pending:
+            self.write_behind.flush()
+    
+    def close(self):
+        """
+        Stop write buffering and close every pooled connection.
+        
+        Buffered writes are committed first and the flush thread exits;
+        connections reopen on next use, and later writes commit directly.
+        """
+        if self.write_behind is not None:
+            self.write_behind.close()
+        with self._readers_lock:
+            readers = list(self._readers.values())
+            self._readers.clear()
+        with self._write_lock:
+            if self._writer is not None:
+                readers.append(self._writer)
+                self._writer = None
+        
+        for conn in readers:
+            try:
+                conn.close()
+            except Exception as e:
+                logger.warning(f"Error closing database connection: {e}")
     
     def _init_schema(self):
         """Initialize database schema."""
@@ -305,7 +449,7 @@ class Database:
         user_id = SecurityValidator.validate_user_id(user_id)
         
         try:
-            with self.get_connection() as conn:
+            with self.get_connection(readonly=True) as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT * FROM secure_wallets WHERE user_id = ?
@@ -336,7 +480,7 @@ class Database:
     def get_all_wallets(self) -> List[Dict]:
         """Get all registered wallets."""
         try:
-            with self.get_connection() as conn:
+            with self.get_connection(readonly=True) as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM secure_wallets ORDER BY created_at DESC")
                 return [dict(row) for row in cursor.fetchall()]
@@ -372,8 +516,10 @@ class Database:
         # SECURITY: Validate user_id to prevent SQL injection
         user_id = SecurityValidator.validate_user_id(user_id)
         
+        self._read_own_writes()
+        
         try:
-            with self.get_connection() as conn:
+            with self.get_connection(readonly=True) as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
                 row = cursor.fetchone()
@@ -413,8 +559,10 @@ class Database:
     
     def get_all_users(self) -> List[Dict]:
         """Get all users."""
+        self._read_own_writes()
+        
         try:
-            with self.get_connection() as conn:
+            with self.get_connection(readonly=True) as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM users WHERE is_active = 1")
                 return [dict(row) for row in cursor.fetchall()]
@@ -427,6 +575,15 @@ class Database:
         # SECURITY: Validate user_id to prevent SQL injection
         user_id = SecurityValidator.validate_user_id(user_id)
         
+        if self.write_behind is not None:
+            # Only the latest update per user matters
+            self.write_behind.add(
+                "UPDATE users SET last_active = ? WHERE user_id = ?",
+                (_utc_timestamp(), user_id),
+                key=user_id
+            )
+            return
+        
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
@@ -483,7 +640,7 @@ class Database:
                                Returns empty list if no users exist.
         """
         try:
-            with self.get_connection() as conn:
+            with self.get_connection(readonly=True) as conn:
                 cursor = conn.cursor()
 
                 if user_id is not None:
@@ -513,8 +670,13 @@ class Database:
     
     def record_trade(self, user_id: str, strategy_name: str, action: str,
                     amount: float, profit: float, transaction_hash: str = None,
-                    details: Dict = None) -> int:
-        """Record a trade with VALIDATION."""
+                    details: Dict = None) -> Optional[int]:
+        """
+        Record a trade with VALIDATION.
+        
+        Returns:
+            trade_id, or None when the write is buffered (write-behind enabled)
+        """
         # SECURITY: Validate all inputs
         user_id = SecurityValidator.validate_user_id(user_id)
         strategy_name = SecurityValidator.validate_strategy_name(strategy_name)
@@ -528,6 +690,15 @@ class Database:
         if details:
             details = SecurityValidator.validate_json_data(details)
         
+        if self.write_behind is not None:
+            self.write_behind.add("""
+                INSERT INTO trades (user_id, strategy_name, action, amount, profit,
+                                  transaction_hash, details, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (user_id, strategy_name, action, amount, profit, transaction_hash,
+                  json.dumps(details or {}), _utc_timestamp()))
+            return None
+        
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
@@ -546,7 +717,9 @@ class Database:
         # SECURITY: Validate user_id to prevent SQL injection
         user_id = SecurityValidator.validate_user_id(user_id)
         
-        with self.get_connection() as conn:
+        self._read_own_writes()
+        
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM trades 
@@ -561,7 +734,9 @@ class Database:
         # SECURITY: Validate user_id to prevent SQL injection
         user_id = SecurityValidator.validate_user_id(user_id)
         
-        with self.get_connection() as conn:
+        self._read_own_writes()
+        
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM trades 
@@ -582,6 +757,8 @@ class Database:
         if date is None:
             date = datetime.now().strftime("%Y-%m-%d")
         
+        self._read_own_writes()
+        
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
@@ -635,7 +812,7 @@ class Database:
         # SECURITY: Validate user_id to prevent SQL injection
         user_id = SecurityValidator.validate_user_id(user_id)
         
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM performance
@@ -692,7 +869,7 @@ class Database:
         # SECURITY: Validate user_id to prevent SQL injection
         user_id = SecurityValidator.validate_user_id(user_id)
         
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM fees WHERE user_id = ? ORDER BY month DESC
@@ -704,7 +881,7 @@ class Database:
         # SECURITY: Validate user_id to prevent SQL injection
         user_id = SecurityValidator.validate_user_id(user_id)
         
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM fees WHERE user_id = ? AND status = 'pending'
@@ -727,6 +904,13 @@ class Database:
         if role not in ['user', 'assistant', 'system']:
             raise ValueError("Invalid role")
         
+        if self.write_behind is not None:
+            self.write_behind.add("""
+                INSERT INTO conversations (user_id, role, message, timestamp)
+                VALUES (?, ?, ?, ?)
+            """, (user_id, role, message, _utc_timestamp()))
+            return
+        
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
@@ -739,7 +923,9 @@ class Database:
         # SECURITY: Validate user_id to prevent SQL injection
         user_id = SecurityValidator.validate_user_id(user_id)
         
-        with self.get_connection() as conn:
+        self._read_own_writes()
+        
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM conversations
@@ -781,7 +967,7 @@ class Database:
         # SECURITY: Validate user_id to prevent SQL injection
         user_id = SecurityValidator.validate_user_id(user_id)
         
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM strategy_states WHERE user_id = ?
@@ -792,7 +978,9 @@ class Database:
     
     def get_platform_stats(self) -> Dict:
         """Get platform-wide statistics."""
-        with self.get_connection() as conn:
+        self._read_own_writes()
+        
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.cursor()
             
             # Total users (all users regardless of active status)
@@ -821,6 +1009,89 @@ class Database:
             }
 
 
+class AsyncDatabase:
+    """
+    Awaitable facade over Database.
+    
+    Exposes every public Database method under the same name as a coroutine
+    that runs the query off the event loop, so a slow commit or fsync never
+    stalls Telegram handling or scans:
+    
+        adb = AsyncDatabase(db)
+        await adb.add_conversation(user_id, "user", text)
+        history = await adb.get_conversation_history(user_id)
+    
+    Writes run in order on one dedicated thread (they are serialized by the
+    writer connection anyway); get_* reads run on a small pool of their own
+    so they never queue behind writes. A write whose caller is cancelled
+    still completes.
+    """
+    
+    # Database members that are not plain queries
+    _NOT_PROXIED = frozenset({"get_connection", "close"})
+    
+    def __init__(self, database: Database, read_workers: int = 2):
+        """
+        Initialize async database facade.
+        
+        Args:
+            database: Database to run queries against
+            read_workers: Threads serving read queries (default 2)
+        """
+        self.database = database
+        self.pending_writes = 0
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="harvest-db-write")
+        self._read_executor = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix="harvest-db-read")
+    
+    async def run(self, func: Callable, *args, write: bool = True, **kwargs) -> Any:
+        """
+        Run a blocking database callable off the event loop.
+        
+        Args:
+            func: Callable to run
+            *args: Positional arguments for func
+            write: Run on the writer thread (default); False uses the read pool
+            **kwargs: Keyword arguments for func
+        
+        Returns:
+            Whatever func returns
+        """
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        if not write:
+            return await loop.run_in_executor(self._read_executor, call)
+        
+        self.pending_writes += 1
+        try:
+            return await loop.run_in_executor(self._write_executor, call)
+        finally:
+            self.pending_writes -= 1
+    
+    def __getattr__(self, name: str):
+        if name.startswith("_") or name in self._NOT_PROXIED:
+            raise AttributeError(name)
+        method = getattr(self.database, name)
+        if not callable(method):
+            raise AttributeError(name)
+        write = not name.startswith("get_")
+        
+        async def proxy(*args, **kwargs):
+            # Looked up per call so a replaced Database method is honoured
+            return await self.run(getattr(self.database, name), *args, write=write, **kwargs)
+        
+        proxy.__name__ = name
+        proxy.__doc__ = method.__doc__
+        # Cache so later lookups skip __getattr__
+        self.__dict__[name] = proxy
+        return proxy
+    
+    async def close(self):
+        """Finish queued writes and stop the worker threads."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, functools.partial(self._write_executor.shutdown, wait=True))
+        self._read_executor.shutdown(wait=False)
+
+
 # Example usage
 if __name__ == "__main__":
     # Initialize database
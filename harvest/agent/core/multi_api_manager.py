@@ -15,8 +15,10 @@ from typing import Dict, List, Optional, Tuple, Any
 
 try:
     from .api_usage_monitor import APIUsageMonitor
+    from .rate_limiter import KeyRateLimiter
 except ImportError:
     from api_usage_monitor import APIUsageMonitor
+    from rate_limiter import KeyRateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -66,7 +68,8 @@ class APIKeyManager:
         keys: List[str],
         usage_monitor: Optional[APIUsageMonitor] = None,
         base_url: str = "https://mainnet.helius-rpc.com",
-        rpc_fallback_manager: Optional[Any] = None
+        rpc_fallback_manager: Optional[Any] = None,
+        rate_limiter: Optional[KeyRateLimiter] = None
     ):
         """
         Initialize API Key Manager.        
@@ -75,9 +78,12 @@ class APIKeyManager:
             usage_monitor: Optional APIUsageMonitor instance
             base_url: Base URL for Helius RPC endpoints
             rpc_fallback_manager: Optional RPCFallbackManager for failover routing
+            rate_limiter: Optional KeyRateLimiter (default: 10 req/s per key,
+                          sharing usage_monitor's daily budgets)
         """
         self.base_url = base_url
         self.usage_monitor = usage_monitor or APIUsageMonitor()
+        self.rate_limiter = rate_limiter or KeyRateLimiter(usage_monitor=self.usage_monitor)
         self.rpc_fallback_manager = rpc_fallback_manager
         self.keys: Dict[int, APIKeyConfig] = {}
         self.user_assignments: Dict[str, UserAssignment] = {}
@@ -279,6 +285,49 @@ class APIKeyManager:
         
         return key_config.url
     
+    async def acquire_rpc_url_for_user(self, user_id: str) -> str:
+        """
+        Wait for rate-limit capacity and get the RPC URL to send with.
+        
+        Unlike get_rpc_url_for_user, this waits for a token from the key's
+        bucket before returning, so requests stay under the per-second and
+        daily limits instead of triggering 429s. If the user's key is
+        saturated or unavailable, the request spills over to the
+        least-loaded available key.
+        
+        Args:
+            user_id: User identifier
+            
+        Returns:
+            Full RPC URL with API key
+            
+        Raises:
+            RateLimitExceeded: If no available key has budget left
+        """
+        if user_id not in self.user_assignments:
+            self.assign_user(user_id)
+        
+        key_index = self.user_assignments[user_id].key_index
+        available = [index for index, key in self.keys.items() if key.is_available]
+        
+        chosen = await self.rate_limiter.acquire(key_index, candidates=available)
+        return self.keys[chosen].url
+    
+    def get_key_index_for_url(self, rpc_url: str) -> Optional[int]:
+        """
+        Find which key an RPC URL belongs to.
+        
+        Args:
+            rpc_url: Full RPC URL with API key
+            
+        Returns:
+            Key index, or None if the URL is not one of ours
+        """
+        for index, key_config in self.keys.items():
+            if key_config.url == rpc_url:
+                return index
+        return None
+    
     def mark_key_unavailable(self, key_index: int, reason: str = "unknown") -> None:
         """
         Mark an API key as temporarily unavailable.        
@@ -530,7 +579,8 @@ class APIKeyManager:
             "keys": key_statuses,
             "users_by_key": {
                 str(k): len(v) for k, v in users_by_key.items()
-            }
+            },
+            "rate_limiter": self.rate_limiter.get_stats()
         }
     
     def get_assignment(self, user_id: str) -> Optional[Dict[str, Any]]:
@@ -1,9 +1,11 @@
 """Multi-user wallet management for Harvest - manage multiple user wallets."""
 
+import asyncio
 import logging
 import hashlib
 import time
-from typing import Optional, Dict, List, Tuple, Any
+from collections import deque
+from typing import Optional, Dict, List, Tuple, Any, Set
 from datetime import datetime
 from pathlib import Path
 
@@ -12,7 +14,9 @@ from solders.pubkey import Pubkey
 from mnemonic import Mnemonic
 
 from agent.core.wallet import WalletManager
-from agent.core.database import Database
+from agent.core.database import AsyncDatabase, Database
+from agent.core.bounded_cache import BoundedCache
+from agent.core.rate_limiter import TokenBucket
 from agent.security.security import SecurityValidator
 
 logger = logging.getLogger(__name__)
@@ -164,12 +168,16 @@ class MultiUserWalletManager:
         security: SimpleWalletSecurity - For wallet encryption/decryption
     """
     
+    MAX_ACCOUNTS_PER_REQUEST = 100  # getMultipleAccounts key limit
+    
     def __init__(
         self,
         database: Database,
         network: str = "devnet",
         storage_dir: str = "config/secure_wallets",
-        password: str = "default"
+        password: str = "default",
+        max_cached_wallets: int = 5000,
+        max_cached_balances: int = 50000
     ):
         """
         Initialize multi-user wallet manager.
@@ -179,21 +187,45 @@ class MultiUserWalletManager:
             network: Solana network (devnet/mainnet-beta)
             storage_dir: Directory for encrypted wallet files
             password: Default password for wallet decryption
+            max_cached_wallets: Maximum unlocked wallets kept in memory; the
+                least recently used are closed (once no lease holds them)
+                and reloaded on demand
+            max_cached_balances: Maximum cached balances
         """
         self.database = database
+        # Wallet lookups from async paths run off the event loop
+        self.async_database = AsyncDatabase(database)
         self.network = network
-        self.wallets: Dict[str, WalletManager] = {}
+        self.wallets = BoundedCache(
+            max_entries=max_cached_wallets,
+            name="wallets",
+            on_evict=self._on_wallet_evicted
+        )
+        # A trade or balance batch leases its wallet (acquire_wallet), so
+        # eviction defers closing the client until the last lease ends
+        self._wallet_leases: Dict[int, int] = {}  # id(wallet) -> active leases
+        self._retired_wallets: Dict[int, WalletManager] = {}  # Evicted, still leased
+        self._close_tasks: Set[asyncio.Task] = set()
         self.security = SimpleWalletSecurity(storage_dir=storage_dir)
-        self._balance_cache: Dict[str, Tuple[float, datetime]] = {}
+        # Stale balances are kept as a fallback for RPC failures, so this
+        # cache is bounded by size rather than expired
+        self._balance_cache = BoundedCache(max_entries=max_cached_balances, name="balance_cache")
         self._balance_cache_ttl = 30  # seconds
+        # Users whose cached balance is kept current by the balance feed
+        self._live_balances: set = set()
+        self.balance_feed = None
         self._default_password = password
         
         # Rate limiting for RPC calls
-        self._rpc_requests: List[float] = []  # Timestamps of recent requests
         self._rate_limit_per_second = 10  # Max requests per second
         self._rate_limit_per_minute = 100  # Max requests per minute
-        self._rate_limit_window_second = 1.0  # 1 second window
-        self._rate_limit_window_minute = 60.0  # 60 second window
+        self._second_bucket = TokenBucket(rate=self._rate_limit_per_second)
+        self._minute_bucket = TokenBucket(
+            rate=self._rate_limit_per_minute / 60.0,
+            capacity=self._rate_limit_per_minute
+        )
+        # Send times of the last minute's requests, for get_rate_limit_stats
+        self._rpc_requests: deque = deque()
         
         # Load all wallets from database on startup
         self._load_all_wallets()
@@ -217,6 +249,13 @@ class MultiUserWalletManager:
             for wallet_metadata in all_wallets:
                 user_id = wallet_metadata["user_id"]
                 
+                if len(self.wallets) >= self.wallets.max_entries:
+                    logger.info(
+                        f"Wallet cache full ({self.wallets.max_entries}), "
+                        f"remaining wallets will load on demand"
+                    )
+                    break
+                
                 try:
                     # Load encrypted mnemonic
                     mnemonic = self.security.load_encrypted_mnemonic(user_id, self._default_password)
@@ -271,7 +310,7 @@ class MultiUserWalletManager:
             user_id = SecurityValidator.validate_user_id(user_id)
             
             # Check if user already has a wallet
-            existing_wallet = self.database.get_user_wallet(user_id)
+            existing_wallet = await self.async_database.get_user_wallet(user_id)
             if existing_wallet:
                 logger.warning(f"Wallet creation rejected: user {user_id} already has a wallet")
                 raise ValueError(f"You already have a wallet registered. Use /exportkey to access it.")
@@ -299,7 +338,7 @@ class MultiUserWalletManager:
             
             # Store wallet metadata in database
             try:
-                success = self.database.register_secure_wallet(
+                success = await self.async_database.register_secure_wallet(
                     user_id=user_id,
                     public_key=public_key,
                     derivation_path="m/44'/501'/0'/0'/0'",
@@ -326,6 +365,9 @@ class MultiUserWalletManager:
             
             logger.info(f"Successfully created wallet for user {user_id}: {public_key}")
             
+            if self.balance_feed is not None:
+                self.balance_feed.subscribe(user_id, public_key)
+            
             return public_key, mnemonic
             
         except ValueError as e:
@@ -361,7 +403,7 @@ class MultiUserWalletManager:
             mnemonic = SecurityValidator.sanitize_string(mnemonic, max_length=500, check_injections=False)
             
             # Check if user already has a wallet
-            existing_wallet = self.database.get_user_wallet(user_id)
+            existing_wallet = await self.async_database.get_user_wallet(user_id)
             if existing_wallet:
                 logger.warning(f"Wallet import rejected: user {user_id} already has a wallet")
                 raise ValueError(f"You already have a wallet registered. Use /exportkey to access it.")
@@ -401,7 +443,7 @@ class MultiUserWalletManager:
             
             # Store wallet metadata in database
             try:
-                success = self.database.register_secure_wallet(
+                success = await self.async_database.register_secure_wallet(
                     user_id=user_id,
                     public_key=public_key,
                     derivation_path="m/44'/501'/0'/0'/0'",
@@ -428,6 +470,9 @@ class MultiUserWalletManager:
             
             logger.info(f"Successfully imported wallet for user {user_id}: {public_key}")
             
+            if self.balance_feed is not None:
+                self.balance_feed.subscribe(user_id, public_key)
+            
             return public_key
             
         except ValueError as e:
@@ -468,7 +513,7 @@ class MultiUserWalletManager:
             return self.wallets[user_id]
         
         # Get wallet metadata from database
-        wallet_metadata = self.database.get_user_wallet(user_id)
+        wallet_metadata = await self.async_database.get_user_wallet(user_id)
         if not wallet_metadata:
             return None
         
@@ -491,7 +536,7 @@ class MultiUserWalletManager:
             self.wallets[user_id] = wallet
             
             # Update last unlocked timestamp
-            self.database.update_wallet_last_unlocked(user_id)
+            await self.async_database.update_wallet_last_unlocked(user_id)
             
             logger.info(f"Loaded wallet for user {user_id}: {public_key}")
             
@@ -536,9 +581,8 @@ class MultiUserWalletManager:
             # Check cache first
             if user_id in self._balance_cache:
                 balance, timestamp = self._balance_cache[user_id]
-                age = (datetime.now() - timestamp).total_seconds()
-                if age < self._balance_cache_ttl:
-                    logger.debug(f"Using cached balance for user {user_id}: {balance} SOL (age: {age:.1f}s)")
+                if self._is_balance_fresh(user_id, timestamp):
+                    logger.debug(f"Using cached balance for user {user_id}: {balance} SOL")
                     return balance
             
             # Check rate limit before making RPC call
@@ -648,7 +692,7 @@ class MultiUserWalletManager:
                     raise
             
             # Get wallet metadata from database
-            wallet_metadata = self.database.get_user_wallet(user_id)
+            wallet_metadata = await self.async_database.get_user_wallet(user_id)
             if not wallet_metadata:
                 logger.warning(f"Export key failed: no wallet found for user {user_id}")
                 raise ValueError(f"You don't have a wallet registered. Use /createwallet to create one.")
@@ -720,185 +764,296 @@ class MultiUserWalletManager:
         return True
 
     
+    def acquire_wallet(self, wallet: WalletManager):
+        """
+        Keep a wallet from get_wallet() open until release_wallet().
+        
+        Holders that use a wallet across awaits (a trade, a balance batch)
+        lease it, so a cache eviction meanwhile defers closing its client.
+        
+        Args:
+            wallet: Wallet to keep open
+        """
+        self._wallet_leases[id(wallet)] = self._wallet_leases.get(id(wallet), 0) + 1
+    
+    def release_wallet(self, wallet: WalletManager):
+        """
+        End a lease, closing the wallet if it was evicted meanwhile.
+        
+        Args:
+            wallet: Wallet passed to acquire_wallet()
+        """
+        key = id(wallet)
+        self._wallet_leases[key] -= 1
+        if self._wallet_leases[key] == 0:
+            del self._wallet_leases[key]
+            if self._retired_wallets.pop(key, None) is not None:
+                self._schedule_close(wallet)
+    
+    def _on_wallet_evicted(self, user_id: str, wallet: WalletManager):
+        """
+        Close an evicted wallet's RPC client, or defer it while leased.
+        
+        Args:
+            user_id: User whose wallet was evicted
+            wallet: Evicted wallet
+        """
+        if self._wallet_leases.get(id(wallet)):
+            self._retired_wallets[id(wallet)] = wallet
+        else:
+            self._schedule_close(wallet)
+        logger.debug(f"Evicted wallet for user {user_id} from cache")
+    
+    def _schedule_close(self, wallet: WalletManager):
+        """Close a wallet's client in the background, keeping the task referenced."""
+        try:
+            task = asyncio.get_running_loop().create_task(wallet.close())
+        except RuntimeError:
+            # No running loop (e.g. during startup) - nothing to close yet
+            return
+        self._close_tasks.add(task)
+        task.add_done_callback(self._close_tasks.discard)
+    
     async def close_all(self):
-        """Close all wallet RPC connections."""
-        for user_id, wallet in self.wallets.items():
+        """Close all wallet RPC connections and the async database threads."""
+        wallets = self.wallets.items() + [(None, wallet) for wallet in self._retired_wallets.values()]
+        for user_id, wallet in wallets:
             try:
                 await wallet.close()
             except Exception as e:
                 logger.error(f"Error closing wallet for user {user_id}: {e}")
         
         self.wallets.clear()
+        self._retired_wallets.clear()
+        if self._close_tasks:
+            await asyncio.gather(*self._close_tasks, return_exceptions=True)
+        await self.async_database.close()
         logger.info("Closed all wallet connections")
-    async def batch_get_balances(self, user_ids: List[str], password: str = "default") -> Dict[str, float]:
+    async def batch_get_balances(
+        self,
+        user_ids: List[str],
+        password: str = "default",
+        force: bool = False
+    ) -> Dict[str, float]:
         """
-        Get balances for multiple users using batch RPC requests.
+        Get balances for multiple users using getMultipleAccounts.
 
-        Processes users in batches of 10-20 to optimize RPC calls while
-        avoiding rate limits. Uses Solana RPC batch requests where possible.
+        Looks up every user's public key with a single database query, skips
+        users whose cached balance is still fresh, and fetches the rest in
+        chunks of up to MAX_ACCOUNTS_PER_REQUEST keys per RPC call. Fetched
+        balances are written to the balance cache, so subsequent get_balance()
+        calls within the cache TTL are served without RPC traffic.
 
         Args:
             user_ids: List of user IDs to check balances for
             password: Password for wallet decryption (default: "default")
+            force: Fetch every balance, ignoring cached ones
 
         Returns:
             Dictionary mapping user_id to balance in SOL
         """
         balances = {}
-        batch_size = 15  # Process 15 users per batch
+        public_keys_by_user = self._public_keys_by_user(await self.async_database.get_all_wallets())
+        to_fetch: List[Tuple[str, str]] = []  # (user_id, public_key)
 
-        # Process users in batches
-        for i in range(0, len(user_ids), batch_size):
-            batch = user_ids[i:i + batch_size]
+        for user_id in user_ids:
+            try:
+                # SECURITY: Validate user_id
+                validated_user_id = SecurityValidator.validate_user_id(user_id)
+            except Exception as e:
+                logger.error(f"Error preparing batch request for user {user_id}: {e}")
+                balances[user_id] = 0.0
+                continue
 
-            # Get public keys for this batch
-            public_keys = []
-            user_key_map = {}  # Map public key to user_id
+            # Check cache first
+            if not force and validated_user_id in self._balance_cache:
+                balance, timestamp = self._balance_cache[validated_user_id]
+                if self._is_balance_fresh(validated_user_id, timestamp):
+                    balances[validated_user_id] = balance
+                    continue
 
-            for user_id in batch:
-                try:
-                    # SECURITY: Validate user_id
-                    validated_user_id = SecurityValidator.validate_user_id(user_id)
-
-                    # Check cache first
-                    if validated_user_id in self._balance_cache:
-                        balance, timestamp = self._balance_cache[validated_user_id]
-                        age = (datetime.now() - timestamp).total_seconds()
-                        if age < self._balance_cache_ttl:
-                            balances[validated_user_id] = balance
-                            logger.debug(f"Using cached balance for user {validated_user_id}: {balance} SOL")
-                            continue
-
-                    # Get wallet metadata
-                    wallet_metadata = self.database.get_user_wallet(validated_user_id)
-                    if wallet_metadata:
-                        public_key = wallet_metadata["public_key"]
-                        public_keys.append(public_key)
-                        user_key_map[public_key] = validated_user_id
-                    else:
-                        logger.warning(f"No wallet found for user {validated_user_id}")
-                        balances[validated_user_id] = 0.0
+            public_key = public_keys_by_user.get(validated_user_id)
+            if public_key:
+                to_fetch.append((validated_user_id, public_key))
+            else:
+                logger.warning(f"No wallet found for user {validated_user_id}")
+                balances[validated_user_id] = 0.0
 
-                except Exception as e:
-                    logger.error(f"Error preparing batch request for user {user_id}: {e}")
-                    balances[user_id] = 0.0
+        if not to_fetch:
+            return balances
 
-            # If no public keys to fetch, continue to next batch
-            if not public_keys:
-                continue
+        # Leased so a cache eviction mid-batch cannot close the client
+        shared_wallet = await self._get_shared_wallet(to_fetch[0][0], password)
+        client = getattr(shared_wallet, 'client', None)
+        if shared_wallet is not None:
+            self.acquire_wallet(shared_wallet)
+        try:
+            await self._fetch_balance_chunks(to_fetch, client, balances, password)
+        finally:
+            if shared_wallet is not None:
+                self.release_wallet(shared_wallet)
+
+        rpc_calls = (len(to_fetch) + self.MAX_ACCOUNTS_PER_REQUEST - 1) // self.MAX_ACCOUNTS_PER_REQUEST
+        logger.info(
+            f"Batch balance check complete: {len(balances)} users processed, "
+            f"{len(to_fetch)} fetched in {rpc_calls} RPC call(s)"
+        )
+        return balances
+
+    async def _fetch_balance_chunks(
+        self,
+        to_fetch: List[Tuple[str, str]],
+        client,
+        balances: Dict[str, float],
+        password: str
+    ):
+        """
+        Fetch balances with one getMultipleAccounts call per chunk.
+
+        Args:
+            to_fetch: (user_id, public_key) pairs to fetch
+            client: AsyncClient to send the requests with (None to fall back)
+            balances: Dictionary the balances are written into
+            password: Password for wallet decryption in the per-user fallback
+        """
+        for i in range(0, len(to_fetch), self.MAX_ACCOUNTS_PER_REQUEST):
+            chunk = to_fetch[i:i + self.MAX_ACCOUNTS_PER_REQUEST]
 
-            # Fetch balances using batch RPC request
             try:
+                if client is None:
+                    raise Exception("No wallet client available for batch request")
+
                 # Check rate limit before batch request
                 await self._check_rate_limit()
-                
-                # Get a wallet instance to access RPC client
-                sample_wallet = None
-                for user_id in batch:
-                    if user_id in self.wallets:
-                        sample_wallet = self.wallets[user_id]
-                        break
-
-                if not sample_wallet and public_keys:
-                    # Create a temporary wallet to access RPC
-                    first_user = user_key_map[public_keys[0]]
-                    sample_wallet = await self.get_wallet(first_user, password)
-
-                if sample_wallet and hasattr(sample_wallet, 'client'):
-                    # Use batch request if available
-                    from solders.pubkey import Pubkey
-
-                    batch_results = []
-                    for pub_key_str in public_keys:
-                        try:
-                            pubkey = Pubkey.from_string(pub_key_str)
-                            balance_response = await sample_wallet.client.get_balance(pubkey)
-
-                            if balance_response.value is not None:
-                                balance_lamports = balance_response.value
-                                balance_sol = balance_lamports / 1_000_000_000
-                                batch_results.append((pub_key_str, balance_sol))
-                            else:
-                                batch_results.append((pub_key_str, 0.0))
-
-                        except Exception as e:
-                            logger.error(f"Error fetching balance for {pub_key_str}: {e}")
-                            batch_results.append((pub_key_str, 0.0))
-
-                    # Map results back to user IDs and cache
-                    for pub_key, balance in batch_results:
-                        user_id = user_key_map[pub_key]
-                        balances[user_id] = balance
-                        self._balance_cache[user_id] = (balance, datetime.now())
-                        logger.debug(f"Batch fetched balance for user {user_id}: {balance} SOL")
-                else:
-                    # Fallback to individual requests
-                    logger.warning("No wallet client available for batch request, falling back to individual requests")
-                    for pub_key in public_keys:
-                        user_id = user_key_map[pub_key]
-                        try:
-                            balance = await self.get_balance(user_id, password)
-                            balances[user_id] = balance
-                        except Exception as e:
-                            logger.error(f"Error fetching balance for user {user_id}: {e}")
-                            balances[user_id] = 0.0
+
+                response = await client.get_multiple_accounts(
+                    [Pubkey.from_string(public_key) for _, public_key in chunk]
+                )
+                fetched_at = datetime.now()
+
+                for (user_id, _), account in zip(chunk, response.value):
+                    # Accounts that don't exist yet hold no lamports
+                    balance = account.lamports / 1_000_000_000 if account is not None else 0.0
+                    balances[user_id] = balance
+                    self._balance_cache[user_id] = (balance, fetched_at)
+
+                logger.debug(f"Fetched {len(chunk)} balances in one getMultipleAccounts call")
 
             except Exception as e:
                 logger.error(f"Error in batch balance request: {e}")
-                # Fallback to individual requests for this batch
-                for pub_key in public_keys:
-                    user_id = user_key_map[pub_key]
+                # Fallback to individual requests for this chunk
+                for user_id, _ in chunk:
                     try:
-                        balance = await self.get_balance(user_id, password)
-                        balances[user_id] = balance
+                        balances[user_id] = await self.get_balance(user_id, password)
                     except Exception as e:
                         logger.error(f"Error fetching balance for user {user_id}: {e}")
                         balances[user_id] = 0.0
 
-        logger.info(f"Batch balance check complete: {len(balances)} users processed")
-        return balances
-    async def _check_rate_limit(self):
+    def _is_balance_fresh(self, user_id: str, timestamp: datetime) -> bool:
+        """Check whether a cached balance can be served without an RPC call."""
+        if user_id in self._live_balances:
+            return True
+        return (datetime.now() - timestamp).total_seconds() < self._balance_cache_ttl
+
+    def apply_balance_update(self, user_id: str, balance: float):
         """
-        Check and enforce rate limits for RPC calls.
+        Store a balance pushed by the balance feed.
 
-        Tracks requests per second and per minute. Adds delays when
-        approaching rate limits to avoid exceeding RPC provider limits.
+        Args:
+            user_id: User whose balance changed
+            balance: New balance in SOL
         """
-        import asyncio
+        self._balance_cache[user_id] = (balance, datetime.now())
 
-        current_time = time.time()
+    def set_balances_live(self, user_ids: List[str], live: bool):
+        """
+        Mark users' cached balances as kept current by the balance feed.
 
-        # Remove old requests outside the minute window
-        self._rpc_requests = [
-            ts for ts in self._rpc_requests
-            if current_time - ts < self._rate_limit_window_minute
-        ]
+        Live balances are served from cache regardless of age. Users that
+        stop being live fall back to the normal cache TTL.
 
-        # Check per-second rate limit
-        recent_second = [
-            ts for ts in self._rpc_requests
-            if current_time - ts < self._rate_limit_window_second
-        ]
+        Args:
+            user_ids: Users to update
+            live: Whether the feed is streaming their balances
+        """
+        if live:
+            self._live_balances.update(user_ids)
+        else:
+            self._live_balances.difference_update(user_ids)
 
-        if len(recent_second) >= self._rate_limit_per_second:
-            # Wait until we can make another request
-            delay = self._rate_limit_window_second - (current_time - recent_second[0])
-            if delay > 0:
-                logger.debug(f"Rate limit: waiting {delay:.2f}s (per-second limit)")
-                await asyncio.sleep(delay)
-                current_time = time.time()
-
-        # Check per-minute rate limit
-        if len(self._rpc_requests) >= self._rate_limit_per_minute:
-            # Wait until oldest request falls outside the window
-            delay = self._rate_limit_window_minute - (current_time - self._rpc_requests[0])
-            if delay > 0:
+    def attach_balance_feed(self, balance_feed) -> int:
+        """
+        Stream all registered wallets' balances through a balance feed.
+
+        Wallets created or imported later are subscribed automatically.
+
+        Args:
+            balance_feed: BalanceSubscriptionManager to feed the balance cache
+
+        Returns:
+            Number of wallets subscribed
+        """
+        self.balance_feed = balance_feed
+        return balance_feed.subscribe_many(self._public_keys_by_user(self.database.get_all_wallets()))
+
+    @staticmethod
+    def _public_keys_by_user(wallets: List[Dict]) -> Dict[str, str]:
+        """
+        Map every registered user to their wallet public key.
+
+        Args:
+            wallets: Wallet rows from get_all_wallets()
+
+        Returns:
+            Dictionary mapping user_id to public key
+        """
+        return {wallet["user_id"]: wallet["public_key"] for wallet in wallets}
+
+    async def _get_shared_wallet(self, fallback_user_id: str, password: str = "default") -> Optional[WalletManager]:
+        """
+        Get a wallet whose RPC client can serve read-only requests that aren't tied to a wallet.
+
+        Args:
+            fallback_user_id: User whose wallet is loaded if none is cached yet
+            password: Password for wallet decryption (default: "default")
+
+        Returns:
+            WalletManager with a client, or None if no wallet could be loaded
+        """
+        for wallet in self.wallets.values():
+            if hasattr(wallet, 'client'):
+                return wallet
+
+        wallet = await self.get_wallet(fallback_user_id, password)
+        return wallet if wallet and hasattr(wallet, 'client') else None
+
+    async def _check_rate_limit(self):
+        """
+        Check and enforce rate limits for RPC calls.
+
+        Takes a token from both the per-second and per-minute buckets,
+        waiting until both have one available so RPC provider limits are
+        never exceeded.
+        """
+        _, second_wait = self._second_bucket.reserve()
+        _, minute_wait = self._minute_bucket.reserve()
+        delay = max(second_wait, minute_wait)
+
+        if delay > 0:
+            if minute_wait > second_wait:
                 logger.warning(f"Rate limit: waiting {delay:.2f}s (per-minute limit)")
-                await asyncio.sleep(delay)
-                current_time = time.time()
+            else:
+                logger.debug(f"Rate limit: waiting {delay:.2f}s (per-second limit)")
+            await asyncio.sleep(delay)
+
+        now = time.monotonic()
+        self._prune_rpc_requests(now)
+        self._rpc_requests.append(now)
 
-        # Record this request
-        self._rpc_requests.append(current_time)
+    def _prune_rpc_requests(self, now: float):
+        """Drop request times older than a minute."""
+        while self._rpc_requests and now - self._rpc_requests[0] >= 60:
+            self._rpc_requests.popleft()
 
     def get_rate_limit_stats(self) -> Dict[str, Any]:
         """
@@ -907,27 +1062,26 @@ class MultiUserWalletManager:
         Returns:
             Dictionary with rate limit metrics
         """
-        current_time = time.time()
+        # Refill both buckets before reading their levels
+        self._second_bucket.wait_time()
+        self._minute_bucket.wait_time()
 
-        # Count requests in last second
-        recent_second = [
-            ts for ts in self._rpc_requests
-            if current_time - ts < self._rate_limit_window_second
-        ]
+        used_second = self._second_bucket.capacity - self._second_bucket.tokens
+        used_minute = self._minute_bucket.capacity - self._minute_bucket.tokens
 
-        # Count requests in last minute
-        recent_minute = [
-            ts for ts in self._rpc_requests
-            if current_time - ts < self._rate_limit_window_minute
-        ]
+        now = time.monotonic()
+        self._prune_rpc_requests(now)
+        requests_last_second = sum(1 for sent_at in self._rpc_requests if now - sent_at < 1)
 
         return {
-            "requests_last_second": len(recent_second),
-            "requests_last_minute": len(recent_minute),
+            "requests_last_second": requests_last_second,
+            "requests_last_minute": len(self._rpc_requests),
+            "tokens_available_second": max(self._second_bucket.tokens, 0.0),
+            "tokens_available_minute": max(self._minute_bucket.tokens, 0.0),
             "limit_per_second": self._rate_limit_per_second,
             "limit_per_minute": self._rate_limit_per_minute,
-            "utilization_second_percent": (len(recent_second) / self._rate_limit_per_second) * 100,
-            "utilization_minute_percent": (len(recent_minute) / self._rate_limit_per_minute) * 100
+            "utilization_second_percent": (used_second / self._second_bucket.capacity) * 100,
+            "utilization_minute_percent": (used_minute / self._minute_bucket.capacity) * 100
         }
 
 
@@ -12,12 +12,16 @@ AFTER: 50 RPC calls/user/day = 100+ users on free tier
 """
 
 import asyncio
+import heapq
 import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 import time
 
+from agent.core.bounded_cache import BoundedCache
+from agent.core.rate_limiter import RateLimitExceeded
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,6 +44,19 @@ class UserScanState:
     scan_interval: int = 60  # seconds
     active_strategies: List[str] = field(default_factory=list)
     scan_offset: int = 0  # Stagger offset in seconds (0-60)
+    scheduler: Optional['ScanScheduler'] = field(default=None, repr=False, compare=False)
+    
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+        # Keep the scheduler's due time in step with the timing fields
+        if name in ("last_scan", "scan_interval"):
+            scheduler = getattr(self, "scheduler", None)
+            if scheduler is not None:
+                scheduler.schedule(self.user_id, self.next_due())
+    
+    def next_due(self) -> float:
+        """Time at which this user is next due for a scan."""
+        return self.last_scan + self.scan_interval
     
     def should_scan(self) -> bool:
         return time.time() - self.last_scan >= self.scan_interval
@@ -53,6 +70,10 @@ class ScanStats:
     total_scan_cycles: int = 0
     last_scan_time: float = 0
     scan_start_time: float = 0
+    # Scheduling lag: how late users were scanned past their due time
+    total_scan_lag: float = 0
+    max_scan_lag: float = 0
+    last_cycle_max_lag: float = 0
     
     def scan_rate_per_second(self) -> float:
         """Calculate current scan rate."""
@@ -62,6 +83,95 @@ class ScanStats:
         if elapsed == 0:
             return 0.0
         return self.users_scanned / elapsed
+    
+    def record_lag(self, lag: float):
+        """Record how late one user's scan started."""
+        lag = max(lag, 0.0)
+        self.total_scan_lag += lag
+        self.max_scan_lag = max(self.max_scan_lag, lag)
+        self.last_cycle_max_lag = max(self.last_cycle_max_lag, lag)
+    
+    def average_scan_lag(self) -> float:
+        """Calculate average lag per scanned user."""
+        if self.users_scanned == 0:
+            return 0.0
+        return self.total_scan_lag / self.users_scanned
+
+
+class ScanScheduler:
+    """
+    Min-heap of users keyed on their next due time.
+    
+    Each tick pops only the users that are due, O(k log n) for k due users,
+    instead of checking every user. Rescheduling pushes a new entry and the
+    old one is dropped lazily when it reaches the top of the heap.
+    """
+    
+    def __init__(self):
+        """Initialize an empty scheduler."""
+        self._heap: List[tuple] = []
+        self._due: Dict[str, float] = {}
+    
+    def __len__(self) -> int:
+        return len(self._due)
+    
+    def schedule(self, user_id: str, due: float):
+        """
+        Set (or move) a user's next due time.
+        
+        Args:
+            user_id: User identifier
+            due: Unix time at which the user should next be scanned
+        """
+        self._due[user_id] = due
+        heapq.heappush(self._heap, (due, user_id))
+        
+        # Stale entries pile up when users are rescheduled; rebuild once
+        # they outnumber live ones
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._heap = [(d, uid) for uid, d in self._due.items()]
+            heapq.heapify(self._heap)
+    
+    def unschedule(self, user_id: str):
+        """
+        Remove a user from the schedule.
+        
+        Args:
+            user_id: User identifier
+        """
+        self._due.pop(user_id, None)
+    
+    def pop_due(self, now: float) -> List[tuple]:
+        """
+        Pop every user due at or before now.
+        
+        Popped users leave the schedule until they are scheduled again.
+        
+        Args:
+            now: Current unix time
+            
+        Returns:
+            List of (user_id, due_time) in due order
+        """
+        due_users = []
+        while self._heap and self._heap[0][0] <= now:
+            due, user_id = heapq.heappop(self._heap)
+            if self._due.get(user_id) != due:
+                continue  # Stale entry from an earlier reschedule
+            del self._due[user_id]
+            due_users.append((user_id, due))
+        return due_users
+    
+    def next_due_time(self) -> Optional[float]:
+        """
+        Get the earliest due time, if any user is scheduled.
+        
+        Returns:
+            Unix time of the next due scan, or None
+        """
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
 
 
 class OptimizedScanner:
@@ -75,12 +185,16 @@ class OptimizedScanner:
     - Strategy-level caching (reuse opportunity data)
     """
     
+    # Tokens whose prices every scan needs
+    PRICE_TOKENS = ["SOL", "USDC", "BONK"]
+    
     def __init__(
         self,
         rpc_manager,
         api_key_manager=None,
         price_cache=None,
-        strategy_cache=None
+        strategy_cache=None,
+        cache_max_entries: int = 10000
     ):
         """
         Initialize optimized scanner with all optimization components.        
@@ -89,9 +203,11 @@ class OptimizedScanner:
             api_key_manager: Optional APIKeyManager for multi-key routing
             price_cache: Optional SharedPriceCache for global price caching
             strategy_cache: Optional StrategyCache for strategy result caching
+            cache_max_entries: Maximum entries in the local price/balance cache
         """
         self.rpc_manager = rpc_manager
         self.users: Dict[str, UserScanState] = {}
+        self.scheduler = ScanScheduler()
         
         # Integrated optimization components (Requirements 1.3, 4.1, 7.1)
         self.api_key_manager = api_key_manager
@@ -105,7 +221,8 @@ class OptimizedScanner:
         )
         
         # Legacy caches (for backward compatibility)
-        self.price_cache: Dict[str, CachedData] = {}
+        # price_cache holds one balance entry per user, so it is bounded
+        self.price_cache = BoundedCache(max_entries=cache_max_entries, name="scanner_price_cache")
         self.market_cache: Dict[str, CachedData] = {}
         self.opportunity_cache: Dict[str, CachedData] = {}
         
@@ -186,14 +303,28 @@ class OptimizedScanner:
             last_scan=initial_last_scan,
             scan_interval=scan_interval,
             active_strategies=strategies or [],
-            scan_offset=scan_offset
+            scan_offset=scan_offset,
+            scheduler=self.scheduler
         )
+        self.scheduler.schedule(user_id, self.users[user_id].next_due())
         
         logger.info(
             f"Added user {user_id} with {scan_interval}s interval "
             f"and {scan_offset}s offset"
         )
     
+    def remove_user(self, user_id: str):
+        """
+        Remove a user from the scanner and its schedule.
+        
+        Args:
+            user_id: User identifier
+        """
+        state = self.users.pop(user_id, None)
+        if state:
+            state.scheduler = None
+        self.scheduler.unschedule(user_id)
+    
     async def scan_all_users(self) -> Dict[str, List[Any]]:
         """
         Scan all users efficiently with staggered timing.        
@@ -207,14 +338,16 @@ class OptimizedScanner:
         self.scan_stats.total_scan_cycles += 1
         cycle_start = time.time()
         
-        # Find users that need scanning (respecting offsets)
-        users_to_scan = [
-            user for user in self.users.values()
-            if user.should_scan()
-        ]
+        # Pop only the users that are due (respecting offsets)
+        users_to_scan = []
+        for user_id, due in self.scheduler.pop_due(cycle_start):
+            user = self.users.get(user_id)
+            if user is not None:
+                users_to_scan.append((user, due))
         
         # Update pending scans count (Requirement 6.5)
         self.scan_stats.pending_scans = len(users_to_scan)
+        self.scan_stats.last_cycle_max_lag = 0
         
         if not users_to_scan:
             return {}
@@ -226,13 +359,18 @@ class OptimizedScanner:
         
         # Scan each user (using cached data)
         results = {}
-        for user in users_to_scan:
-            opportunities = await self._scan_user(user)
-            results[user.user_id] = opportunities
+        for user, due in users_to_scan:
+            self.scan_stats.record_lag(time.time() - due)
+            
+            try:
+                opportunities = await self._scan_user(user)
+                results[user.user_id] = opportunities
+            except Exception as e:
+                logger.error(f"Error scanning user {user.user_id}: {e}")
             
-            # Update last_scan time (Requirement 6.4)
-            # Next scan will be at: current_time + scan_interval
-            # The offset is already baked into should_scan() logic
+            # Update last_scan time (Requirement 6.4), which reschedules
+            # the user for current_time + scan_interval. The offset is
+            # baked into the initial last_scan set by add_user
             user.last_scan = time.time()
             
             # Update scan statistics (Requirement 6.5)
@@ -250,7 +388,8 @@ class OptimizedScanner:
             f"Scan complete. API calls: {self.total_api_calls}, "
             f"Cache hit rate: {hit_rate:.1f}%, "
             f"Duration: {scan_duration:.2f}s, "
-            f"Scan rate: {self.scan_stats.scan_rate_per_second():.2f} users/s"
+            f"Scan rate: {self.scan_stats.scan_rate_per_second():.2f} users/s, "
+            f"Max lag: {self.scan_stats.last_cycle_max_lag:.2f}s"
         )
         
         return results
@@ -262,10 +401,11 @@ class OptimizedScanner:
         This is the KEY optimization - fetch once, use for all users.        """
         # Use integrated SharedPriceCache if available (Requirement 4.1)
         if self.shared_price_cache:
-            # The SharedPriceCache handles TTL and fetching automatically
-            # We just need to ensure prices are available
-            # The cache will fetch if expired, otherwise return cached data
-            pass
+            # Stale prices are served and refreshed in the background by the
+            # cache; only fetch inline when some are missing or hard-expired
+            prices = await self.shared_price_cache.get_prices(self.PRICE_TOKENS)
+            if len(prices) < len(self.PRICE_TOKENS):
+                await self._fetch_prices()
         else:
             # Fallback to legacy cache behavior
             # Refresh price cache (1 API call instead of N)
@@ -321,25 +461,22 @@ class OptimizedScanner:
                 # Use fallback RPC
                 balance = await self.rpc_manager.get_balance(user_id)
             else:
-                # Get user-specific RPC URL from APIKeyManager
-                rpc_url = self.api_key_manager.get_rpc_url_for_user(user_id)
-                if rpc_url:
-                    # Make RPC call with user-specific key
-                    # For now, we'll use the rpc_manager but in a real implementation
-                    # we would pass the user_id to enable key-specific routing
-                    balance = await self.rpc_manager.get_balance(user_id)
-                else:
-                    # Fallback if no key available
-                    balance = await self.rpc_manager.get_balance(user_id)
+                # Take a token from the user's key bucket before the read, so
+                # balance reads count against the key's rate limit
+                try:
+                    await self.api_key_manager.acquire_rpc_url_for_user(user_id)
+                except RateLimitExceeded as e:
+                    logger.warning(f"No API key budget for user {user_id}, using fallback RPC: {e}")
+                balance = await self.rpc_manager.get_balance(user_id)
         else:
             # No APIKeyManager - use standard RPC
             balance = await self.rpc_manager.get_balance(user_id)
         
-        self.price_cache[cache_key] = CachedData(
+        self.price_cache.set(cache_key, CachedData(
             data=balance,
             timestamp=time.time(),
             ttl=30
-        )
+        ), ttl=30)
         
         return balance
     
@@ -358,8 +495,7 @@ class OptimizedScanner:
                 }
             
             # Use SharedPriceCache to fetch/cache prices
-            tokens = ["SOL", "USDC", "BONK"]
-            prices = await self.shared_price_cache.refresh_prices(tokens, fetch_func)
+            prices = await self.shared_price_cache.refresh_prices(self.PRICE_TOKENS, fetch_func)
             self.total_api_calls += 1
             logger.debug("Refreshed price cache via SharedPriceCache")
         else:
@@ -497,7 +633,11 @@ class OptimizedScanner:
             "pending_scans": self.scan_stats.pending_scans,
             "total_scan_cycles": self.scan_stats.total_scan_cycles,
             "scan_rate_per_second": self.scan_stats.scan_rate_per_second(),
-            "last_scan_time": self.scan_stats.last_scan_time
+            "last_scan_time": self.scan_stats.last_scan_time,
+            "average_scan_lag": self.scan_stats.average_scan_lag(),
+            "max_scan_lag": self.scan_stats.max_scan_lag,
+            "last_cycle_max_lag": self.scan_stats.last_cycle_max_lag,
+            "next_scan_due": self.scheduler.next_due_time()
         }
 
 
@@ -507,6 +647,7 @@ class BatchRequest:
     pubkey: str
     user_id: Optional[str] = None
     timestamp: float = field(default_factory=time.time)
+    future: Optional[asyncio.Future] = None
 
 
 @dataclass
@@ -517,6 +658,9 @@ class BatchStats:
     total_api_calls: int = 0
     failed_batches: int = 0
     individual_retries: int = 0
+    size_flushes: int = 0
+    deadline_flushes: int = 0
+    duplicate_requests: int = 0
     
     def average_batch_size(self) -> float:
         """Calculate average batch size."""
@@ -545,9 +689,16 @@ class BatchRPCManager:
     
     67% reduction in API calls!
     
+    Works as a request coalescer: every caller gets a future, requests
+    queue per API key, and a queue is flushed when it reaches batch_size
+    or when the oldest request has waited batch_delay seconds. The flush
+    runs as its own task, so callers never wait behind another batch's
+    network call, and every waiter is resolved from the one response.
+    
     Enhanced features:
     - API key awareness: Groups requests by assigned API key
-    - Batch size limit: Max 10 users per batch (Solana RPC limit)
+    - Batch size limit: Max 100 users per batch (getMultipleAccounts limit)
+    - Duplicate pubkeys in one batch share a single slot
     - Failure recovery: Retries individual requests on batch failure
     - Statistics tracking: Monitors batch performance
     
@@ -557,7 +708,7 @@ class BatchRPCManager:
         self,
         rpc_manager,
         api_key_manager: Optional[Any] = None,
-        batch_size: int = 10,
+        batch_size: int = 100,
         batch_delay: float = 0.1
     ):
         """
@@ -566,8 +717,8 @@ class BatchRPCManager:
         Args:
             rpc_manager: RPC manager for making calls
             api_key_manager: Optional API key manager for key-aware batching
-            batch_size: Maximum users per batch (default 10)
-            batch_delay: Batching window in seconds (default 0.1)
+            batch_size: Maximum users per batch (default 100)
+            batch_delay: Maximum seconds a request waits for a batch to fill (default 0.1)
         """
         self.rpc_manager = rpc_manager
         self.api_key_manager = api_key_manager
@@ -576,13 +727,13 @@ class BatchRPCManager:
         
         # Separate pending requests by API key
         # Key: key_index (0, 1, 2, or -1 for no key)
+        # Queues are only touched between awaits, so no lock is needed
         self.pending_requests: Dict[int, List[BatchRequest]] = {}
+        self._flush_timers: Dict[int, asyncio.TimerHandle] = {}
+        self._flush_tasks: set = set()
         
         # Statistics tracking (Requirement 5.5)
         self.stats = BatchStats()
-        
-        # Lock for thread-safe operations
-        self._lock = asyncio.Lock()
     
     def _get_key_index(self, user_id: Optional[str]) -> int:
         """
@@ -611,6 +762,10 @@ class BatchRPCManager:
         """
         Get balance with automatic batching and API key awareness.
         
+        The request joins the pending batch for the user's API key and the
+        caller awaits its own future, which is resolved when that batch is
+        flushed.
+        
         Args:
             pubkey: Public key to get balance for
             user_id: Optional user ID for API key routing
@@ -620,58 +775,105 @@ class BatchRPCManager:
         """
         # Determine key index for grouping
         key_index = self._get_key_index(user_id)
+        loop = asyncio.get_running_loop()
         
-        # Add to pending requests for this key
-        async with self._lock:
-            if key_index not in self.pending_requests:
-                self.pending_requests[key_index] = []
-            
-            request = BatchRequest(pubkey=pubkey, user_id=user_id)
-            self.pending_requests[key_index].append(request)
+        request = BatchRequest(pubkey=pubkey, user_id=user_id, future=loop.create_future())
+        pending = self.pending_requests.setdefault(key_index, [])
+        pending.append(request)
+        self.stats.total_requests += 1
         
-        # Wait for batch window to collect more requests
-        await asyncio.sleep(self.batch_delay)
+        if len(pending) >= self.batch_size:
+            # Full batch - flush now (Requirement 5.2)
+            self.stats.size_flushes += 1
+            self._flush(key_index)
+        elif key_index not in self._flush_timers:
+            # First request of a new batch - start the deadline
+            self._flush_timers[key_index] = loop.call_later(
+                self.batch_delay, self._flush_on_deadline, key_index
+            )
         
-        # Check if we should execute a batch
-        async with self._lock:
-            requests = self.pending_requests.get(key_index, [])
-            
-            # If we have multiple requests, batch them
-            if len(requests) > 1:
-                # Take up to batch_size requests (Requirement 5.2)
-                batch = requests[:self.batch_size]
-                self.pending_requests[key_index] = requests[self.batch_size:]
-                
-                # Execute batch
+        return await request.future
+    
+    def _flush_on_deadline(self, key_index: int):
+        """Flush a batch whose oldest request has waited batch_delay."""
+        self._flush_timers.pop(key_index, None)
+        if self.pending_requests.get(key_index):
+            self.stats.deadline_flushes += 1
+            self._flush(key_index)
+    
+    def _flush(self, key_index: int):
+        """
+        Hand the pending batch for a key to its own task.
+        
+        Args:
+            key_index: API key whose batch should be sent
+        """
+        timer = self._flush_timers.pop(key_index, None)
+        if timer is not None:
+            timer.cancel()
+        
+        batch = self.pending_requests.pop(key_index, [])
+        if not batch:
+            return
+        
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+    
+    async def _run_batch(self, batch: List[BatchRequest]):
+        """
+        Send one batch and resolve every waiter from the response.
+        
+        Falls back to individual fetches if the batched call fails, so one
+        bad batch never fails all its callers.
+        
+        Args:
+            batch: Requests flushed together (all routed through the same key)
+        """
+        # Duplicate pubkeys share one slot in the RPC call
+        pubkeys = list(dict.fromkeys(req.pubkey for req in batch))
+        self.stats.duplicate_requests += len(batch) - len(pubkeys)
+        user_id = batch[0].user_id
+        
+        try:
+            if len(pubkeys) == 1:
+                balances = {pubkeys[0]: await self._fetch_single_balance(pubkeys[0], user_id)}
+                self.stats.total_batches += 1
+            else:
+                balances = await self._execute_batch(pubkeys, user_id)
+        except Exception as e:
+            logger.warning(f"Batch execution failed: {e}, retrying individually")
+            balances = {}
+            for pubkey in pubkeys:
                 try:
-                    balances = await self._execute_batch(batch, user_id)
-                    return balances.get(pubkey, 0.0)
-                except Exception as e:
-                    logger.warning(f"Batch execution failed: {e}, retrying individually")
-                    return await self._retry_individual(pubkey, user_id)
-            
-            # Single request or no batch - fetch normally
-            if requests and requests[0].pubkey == pubkey:
-                self.pending_requests[key_index] = requests[1:]
-            
-            return await self._fetch_single_balance(pubkey, user_id)
+                    balances[pubkey] = await self._retry_individual(pubkey, user_id)
+                except Exception as retry_error:
+                    balances[pubkey] = retry_error
+        
+        for req in batch:
+            if req.future.done():
+                # Caller was cancelled while waiting
+                continue
+            result = balances.get(req.pubkey, 0.0)
+            if isinstance(result, Exception):
+                req.future.set_exception(result)
+            else:
+                req.future.set_result(result)
     
     async def _execute_batch(
         self,
-        batch: List[BatchRequest],
+        pubkeys: List[str],
         user_id: Optional[str] = None
     ) -> Dict[str, float]:
         """
         Execute a batch of balance requests.        
         Args:
-            batch: List of batch requests
+            pubkeys: Unique public keys to fetch
             user_id: Optional user ID for routing
             
         Returns:
             Dictionary mapping pubkey to balance
         """
-        pubkeys = [req.pubkey for req in batch]
-        
         logger.debug(
             f"Executing batch of {len(pubkeys)} requests "
             f"(user_id: {user_id})"
@@ -679,12 +881,11 @@ class BatchRPCManager:
         
         try:
             # Fetch all balances in one call
+            self.stats.total_api_calls += 1
             balances = await self._get_multiple_balances(pubkeys, user_id)
             
             # Update statistics (Requirement 5.5)
             self.stats.total_batches += 1
-            self.stats.total_requests += len(pubkeys)
-            self.stats.total_api_calls += 1
             
             logger.debug(
                 f"Batch completed: {len(pubkeys)} requests in 1 API call "
@@ -732,11 +933,10 @@ class BatchRPCManager:
             Balance in SOL
         """
         # Update statistics
-        self.stats.total_requests += 1
         self.stats.total_api_calls += 1
         
         # Use RPC manager with user_id if available
-        if hasattr(self.rpc_manager, 'get_balance') and user_id:
+        if user_id:
             return await self.rpc_manager.get_balance(pubkey, user_id=user_id)
         else:
             return await self.rpc_manager.get_balance(pubkey)
@@ -805,6 +1005,9 @@ class BatchRPCManager:
             "api_calls_saved": self.stats.api_calls_saved(),
             "failed_batches": self.stats.failed_batches,
             "individual_retries": self.stats.individual_retries,
+            "size_flushes": self.stats.size_flushes,
+            "deadline_flushes": self.stats.deadline_flushes,
+            "duplicate_requests": self.stats.duplicate_requests,
             "efficiency_percent": (
                 (self.stats.api_calls_saved() / self.stats.total_requests * 100)
                 if self.stats.total_requests > 0 else 0.0
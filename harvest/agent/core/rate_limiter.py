@@ -0,0 +1,305 @@
+"""
+Token-bucket rate limiting for Helius API keys.
+
+Each key gets a bucket refilling at its per-second limit, plus the daily
+budget tracked by APIUsageMonitor. Callers await capacity before sending a
+request instead of reacting to HTTP 429s after the fact. When the preferred
+key would make the caller wait, or has used up its daily budget, the
+request spills over to the least-loaded key. Given a RedisCache, bucket
+state lives in Redis so every worker draws from the same budget.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .api_usage_monitor import APIUsageMonitor
+except ImportError:
+    from api_usage_monitor import APIUsageMonitor
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when no API key has budget left for a request."""
+
+
+@dataclass
+class RateLimiterStats:
+    """Statistics for a key rate limiter."""
+    acquired: int = 0
+    waits: int = 0  # Acquisitions that had to wait for a token
+    total_wait_time: float = 0.0
+    spillovers: int = 0  # Requests moved off their preferred key
+    rejections: int = 0  # Requests refused because every key was exhausted
+    shared_state_errors: int = 0  # Redis failures that fell back to local buckets
+
+
+class TokenBucket:
+    """
+    Token bucket with reservations.
+
+    A reservation always takes its tokens, letting the balance go negative,
+    and tells the caller how long to wait before sending. Concurrent callers
+    therefore queue up in order behind one another instead of all waking at
+    once to race for the next token.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size (default: one second's worth, at least 1)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, tokens: float = 1.0, now: Optional[float] = None) -> float:
+        """
+        Seconds until the given number of tokens would be available.
+
+        Args:
+            tokens: Tokens needed
+            now: Current monotonic time (default: time.monotonic())
+
+        Returns:
+            0.0 if available immediately, otherwise the wait in seconds
+        """
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= tokens:
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (tokens - self.tokens) / self.rate
+
+    def reserve(
+        self,
+        tokens: float = 1.0,
+        max_wait: Optional[float] = None,
+        now: Optional[float] = None
+    ) -> Tuple[bool, float]:
+        """
+        Reserve tokens if the wait is acceptable.
+
+        Args:
+            tokens: Tokens to take
+            max_wait: Longest acceptable wait in seconds (None for no limit)
+            now: Current monotonic time (default: time.monotonic())
+
+        Returns:
+            Tuple of (reserved, wait). When reserved is False nothing was
+            taken and wait is how long the reservation would have waited.
+        """
+        wait = self.wait_time(tokens, now)
+        if max_wait is not None and wait > max_wait:
+            return False, wait
+        self.tokens -= tokens
+        return True, wait
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Wait until tokens are available and take them.
+
+        Args:
+            tokens: Tokens to take
+
+        Returns:
+            Seconds spent waiting
+        """
+        _, wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class KeyRateLimiter:
+    """
+    Per-key token buckets with daily budgets and spillover.
+
+    Daily usage is read from and recorded in the shared APIUsageMonitor, so
+    threshold alerts and usage reports see exactly the requests the limiter
+    let through.
+    """
+
+    def __init__(
+        self,
+        usage_monitor: Optional[APIUsageMonitor] = None,
+        requests_per_second: float = 10.0,
+        burst: Optional[float] = None,
+        redis_cache: Optional[Any] = None,
+        redis_prefix: str = "helius_key"
+    ):
+        """
+        Initialize key rate limiter.
+
+        Args:
+            usage_monitor: APIUsageMonitor holding the daily budgets (a new one if omitted)
+            requests_per_second: Sustained request rate allowed per key (default 10)
+            burst: Maximum burst per key (default: one second's worth)
+            redis_cache: Optional connected RedisCache for sharing state across workers
+            redis_prefix: Prefix for the Redis keys of each API key's state
+        """
+        self.usage_monitor = usage_monitor or APIUsageMonitor()
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.redis_cache = redis_cache
+        self.redis_prefix = redis_prefix
+        self.buckets: Dict[int, TokenBucket] = {}
+        self.stats = RateLimiterStats()
+        # Keys whose shared (Redis) daily count has reached the limit, by UTC date
+        self._shared_exhausted: Dict[int, str] = {}
+
+        logger.info(
+            f"KeyRateLimiter initialized at {requests_per_second:g} req/s per key"
+            f"{' with shared Redis state' if redis_cache else ''}"
+        )
+
+    def _bucket(self, key_index: int) -> TokenBucket:
+        bucket = self.buckets.get(key_index)
+        if bucket is None:
+            bucket = TokenBucket(self.requests_per_second, self.burst)
+            self.buckets[key_index] = bucket
+        return bucket
+
+    def _today(self) -> str:
+        return time.strftime("%Y-%m-%d", time.gmtime())
+
+    def has_daily_budget(self, key_index: int) -> bool:
+        """
+        Check whether a key has requests left today.
+
+        Args:
+            key_index: Index of the API key
+
+        Returns:
+            True if the key may still be used today
+        """
+        if self._shared_exhausted.get(key_index) == self._today():
+            return False
+        return self.usage_monitor.remaining_today(key_index) > 0
+
+    def utilization(self, key_index: int) -> float:
+        """Fraction of the key's daily budget used so far (0.0 to 1.0)."""
+        usage = self.usage_monitor.usage.get(key_index)
+        if usage is None or usage.daily_limit == 0:
+            return 1.0
+        return usage.requests_today / usage.daily_limit
+
+    async def _reserve(self, key_index: int, max_wait: Optional[float]) -> Tuple[bool, float]:
+        """Reserve a token on a key, in Redis when shared state is configured."""
+        if self.redis_cache is not None:
+            result = await self.redis_cache.reserve_token(
+                f"{self.redis_prefix}_{key_index}",
+                rate=self.requests_per_second,
+                capacity=self._bucket(key_index).capacity,
+                max_wait=max_wait
+            )
+            if result is not None:
+                return result
+            self.stats.shared_state_errors += 1
+
+        return self._bucket(key_index).reserve(max_wait=max_wait)
+
+    async def _record_usage(self, key_index: int) -> None:
+        """Count a request against the key's daily budget."""
+        self.usage_monitor.record_request(key_index)
+
+        if self.redis_cache is not None:
+            count = await self.redis_cache.increment_api_usage(f"{self.redis_prefix}_{key_index}")
+            usage = self.usage_monitor.usage.get(key_index)
+            if usage is not None and count >= usage.daily_limit:
+                self._shared_exhausted[key_index] = self._today()
+
+    async def acquire(self, key_index: int, candidates: Optional[List[int]] = None) -> int:
+        """
+        Wait for capacity, preferring the given key.
+
+        The preferred key is used if it has a token ready. Otherwise any
+        candidate with a token ready is used, least-used first; if none is
+        ready, the request queues on whichever key frees up soonest.
+
+        Args:
+            key_index: Preferred API key
+            candidates: Keys the request may spill over to (default: only the preferred key)
+
+        Returns:
+            Index of the key the request must be sent with
+
+        Raises:
+            RateLimitExceeded: If no candidate has daily budget left
+        """
+        others = [k for k in (candidates or []) if k != key_index]
+        others.sort(key=self.utilization)
+        order = [k for k in [key_index] + others if self.has_daily_budget(k)]
+        if candidates is not None:
+            order = [k for k in order if k in candidates]
+
+        if not order:
+            self.stats.rejections += 1
+            raise RateLimitExceeded(f"No API key has daily budget left (preferred key {key_index})")
+
+        chosen = None
+        waits: Dict[int, float] = {}
+        for candidate in order:
+            reserved, wait = await self._reserve(candidate, max_wait=0.0)
+            if reserved:
+                chosen = candidate
+                break
+            waits[candidate] = wait
+
+        if chosen is None:
+            chosen = min(order, key=lambda k: waits[k])
+            _, wait = await self._reserve(chosen, max_wait=None)
+
+        if chosen != key_index:
+            self.stats.spillovers += 1
+            logger.debug(f"Rate limiter spilled request from key {key_index} to key {chosen}")
+
+        await self._record_usage(chosen)
+        self.stats.acquired += 1
+
+        if wait > 0:
+            self.stats.waits += 1
+            self.stats.total_wait_time += wait
+            await asyncio.sleep(wait)
+
+        return chosen
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get rate limiter statistics.
+
+        Returns:
+            Dictionary with acquisition counts, waits and per-key token levels
+        """
+        tokens = {}
+        for key_index, bucket in self.buckets.items():
+            bucket.wait_time()  # Refill before reporting
+            tokens[key_index] = round(max(bucket.tokens, 0.0), 2)
+        
+        return {
+            "requests_per_second": self.requests_per_second,
+            "shared_state": self.redis_cache is not None,
+            "acquired": self.stats.acquired,
+            "waits": self.stats.waits,
+            "average_wait_ms": (
+                self.stats.total_wait_time / self.stats.waits * 1000
+                if self.stats.waits else 0.0
+            ),
+            "spillovers": self.stats.spillovers,
+            "rejections": self.stats.rejections,
+            "shared_state_errors": self.stats.shared_state_errors,
+            "tokens": tokens,
+        }
@@ -11,14 +11,80 @@ Supports: Helius (primary), Public Solana RPC (fallback), QuickNode (optional)
 
 import os
 import logging
-from typing import Optional, Dict, Any, List
-from dataclasses import dataclass
+import random
+import time
+from collections import deque
+from typing import Optional, Dict, Any, List, Tuple
+from dataclasses import dataclass, field
 import asyncio
+import json
 import aiohttp
 
+from agent.core.bounded_cache import BoundedCache
+from agent.core.shared_cache import CacheStats, SingleFlight
+
 logger = logging.getLogger(__name__)
 
 
+class RPCError(Exception):
+    """Error returned by the RPC server for one request of a batch."""
+    
+    def __init__(self, message: str, code: Optional[int] = None, method: Optional[str] = None):
+        super().__init__(message)
+        self.code = code
+        self.method = method
+
+
+# Methods that do not change chain state and are safe to send twice
+READ_ONLY_METHODS = frozenset({
+    "getAccountInfo",
+    "getBalance",
+    "getBlockHeight",
+    "getLatestBlockhash",
+    "getMultipleAccounts",
+    "getProgramAccounts",
+    "getRecentPrioritizationFees",
+    "getSignatureStatuses",
+    "getSignaturesForAddress",
+    "getSlot",
+    "getTokenAccountBalance",
+    "getTokenAccountsByOwner",
+    "getTransaction",
+})
+
+
+# How long (seconds) a cached response stays fresh, per cacheable method.
+# Account state moves every slot (~400ms), so these only collapse reads
+# made within the same moment, such as duplicates within one scan cycle.
+RPC_CACHE_POLICIES: Dict[str, float] = {
+    "getAccountInfo": 1.0,
+    "getBalance": 1.0,
+    "getMultipleAccounts": 1.0,
+    "getTokenAccountBalance": 1.0,
+    "getTokenAccountsByOwner": 2.0,
+    "getProgramAccounts": 5.0,
+}
+
+# Methods that change chain state; a successful call empties the response cache
+STATE_CHANGING_METHODS = frozenset({"sendTransaction", "requestAirdrop"})
+
+
+@dataclass
+class CachedRPCResponse:
+    """A cached RPC result and the slot it was observed at."""
+    result: Any
+    slot: Optional[int]  # Context slot, None for methods without one
+    fetched_at: float  # time.monotonic() when received
+    
+    def is_fresh(self, max_age: float, min_slot: Optional[int] = None) -> bool:
+        """Check whether the entry satisfies an age limit and a minimum slot."""
+        if time.monotonic() - self.fetched_at > max_age:
+            return False
+        if min_slot is not None and (self.slot is None or self.slot < min_slot):
+            return False
+        return True
+
+
 @dataclass
 class RPCProvider:
     """RPC provider configuration."""
@@ -29,6 +95,44 @@ class RPCProvider:
     timeout: int = 10
     is_available: bool = True
     failure_count: int = 0
+    # Health tracking (exponentially weighted moving averages)
+    ewma_latency: float = 0.0  # seconds, 0 until the first call completes
+    ewma_error_rate: float = 0.0
+    latency_samples: deque = field(default_factory=lambda: deque(maxlen=100), repr=False)
+    
+    def record_success(self, latency: float, alpha: float = 0.2):
+        """Fold a successful call's latency into the moving averages."""
+        if self.ewma_latency == 0.0:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = alpha * latency + (1 - alpha) * self.ewma_latency
+        self.ewma_error_rate = (1 - alpha) * self.ewma_error_rate
+        self.latency_samples.append(latency)
+    
+    def record_failure(self, alpha: float = 0.2):
+        """Fold a failed call into the error-rate average."""
+        if self.ewma_latency == 0.0:
+            # An unmeasured provider that fails is charged its timeout, so
+            # it no longer scores 0 ahead of providers that work
+            self.ewma_latency = float(self.timeout)
+        self.ewma_error_rate = alpha + (1 - alpha) * self.ewma_error_rate
+    
+    def p95_latency(self) -> Optional[float]:
+        """95th percentile of recent latencies, or None without samples."""
+        if not self.latency_samples:
+            return None
+        ordered = sorted(self.latency_samples)
+        return ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+    
+    def score(self) -> float:
+        """
+        Expected cost of a call: latency inflated by the error rate.
+        
+        Lower is better. Providers never called score 0 so they are
+        measured before the others; one whose calls have only failed
+        scores as if each call took its timeout.
+        """
+        return self.ewma_latency / max(1.0 - self.ewma_error_rate, 0.05)
 
 
 class RPCFallbackManager:
@@ -40,9 +144,21 @@ class RPCFallbackManager:
     - Health checking and circuit breaker pattern
     - Load balancing across providers
     - Optional integration with API Key Manager for user-specific routing
+    - Persistent keep-alive HTTP sessions per provider and per API key
     """
     
-    def __init__(self, api_key_manager=None):
+    def __init__(
+        self,
+        api_key_manager=None,
+        connections_per_host: int = 20,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        hedge_requests: bool = False,
+        explore_rate: float = 0.05,
+        response_cache_size: int = 5000,
+        cache_policies: Optional[Dict[str, float]] = None,
+        rng: Optional[random.Random] = None
+    ):
         """
         Initialize RPC fallback manager with multiple providers.
         
@@ -51,6 +167,19 @@ class RPCFallbackManager:
                            If provided, enables user-specific routing when user_id
                            is passed to rpc_call(). Maintains backward compatibility
                            when None.
+            connections_per_host: Connection pool size of each session (default 20)
+            keepalive_timeout: Seconds idle connections are kept open (default 30)
+            dns_cache_ttl: Seconds resolved hostnames are cached (default 300)
+            hedge_requests: Send read-only calls to a second provider when the
+                first is slower than its p95 latency (default False)
+            explore_rate: Share of calls sent to a provider other than the
+                fastest, to keep its latency estimate fresh (default 0.05)
+            response_cache_size: Maximum cached read-only responses (0 disables
+                the response cache, default 5000)
+            cache_policies: Per-method freshness in seconds, overriding
+                RPC_CACHE_POLICIES
+            rng: Random number generator for exploration (pass a seeded
+                one for reproducible provider choice)
         """
         self.providers: List[RPCProvider] = []
         self._setup_providers()
@@ -58,6 +187,35 @@ class RPCFallbackManager:
         self.max_failures_before_fallback = 3
         self.api_key_manager = api_key_manager
         
+        # One long-lived session per endpoint URL, so each provider and each
+        # API key reuses its TCP+TLS connections across calls
+        self.connections_per_host = connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        
+        # Latency-aware selection and hedging
+        self.hedge_requests = hedge_requests
+        self.explore_rate = explore_rate
+        self._rng = rng or random.Random()
+        self.latency_alpha = 0.2
+        self.min_samples_for_hedge = 20
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        
+        # Read-only responses shared by every caller, keyed by method,
+        # commitment and params
+        self.cache_policies = dict(RPC_CACHE_POLICIES)
+        if cache_policies:
+            self.cache_policies.update(cache_policies)
+        self.response_cache: Optional[BoundedCache] = BoundedCache(
+            max_entries=response_cache_size,
+            ttl=60,  # Retained for callers that accept older data via max_age
+            name="rpc_response_cache"
+        ) if response_cache_size > 0 else None
+        self.response_cache_stats = CacheStats()
+        self._inflight_reads = SingleFlight()
+        
         logger.info(
             f"Initialized RPC fallback with {len(self.providers)} providers"
             f"{' (with API Key Manager)' if api_key_manager else ''}"
@@ -109,26 +267,121 @@ class RPCFallbackManager:
         if not self.providers:
             raise ValueError("No RPC providers configured!")
     
+    def _get_session(self, url: str) -> aiohttp.ClientSession:
+        """
+        Get the pooled session for an endpoint, creating it if needed.
+        
+        Args:
+            url: Endpoint URL (one session per provider or API key)
+            
+        Returns:
+            Open ClientSession with a keep-alive connector
+        """
+        session = self._sessions.get(url)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.connections_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                enable_cleanup_closed=True
+            )
+            session = aiohttp.ClientSession(connector=connector)
+            self._sessions[url] = session
+        return session
+    
+    def _endpoint_urls(self) -> List[str]:
+        """All provider and API key URLs this manager may call."""
+        urls = [provider.url for provider in self.providers]
+        if self.api_key_manager:
+            urls.extend(key.url for key in self.api_key_manager.keys.values())
+        return urls
+    
+    async def start(self):
+        """Open pooled sessions for every provider and API key."""
+        for url in self._endpoint_urls():
+            self._get_session(url)
+        logger.info(f"Opened {len(self._sessions)} pooled RPC sessions")
+    
+    async def close(self):
+        """Close all pooled sessions."""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            try:
+                await session.close()
+            except Exception as e:
+                logger.error(f"Error closing RPC session: {e}")
+        logger.info("Closed pooled RPC sessions")
+    
+    async def _post_json(
+        self,
+        url: str,
+        payload: Any,
+        timeout: float
+    ) -> Tuple[int, Any]:
+        """
+        POST a JSON-RPC payload over the endpoint's pooled session.
+        
+        Args:
+            url: Endpoint URL
+            payload: JSON-serializable request body
+            timeout: Total request timeout in seconds
+        
+        Returns:
+            Tuple of (HTTP status, decoded body or None if status != 200)
+        """
+        session = self._get_session(url)
+        async with session.post(
+            url,
+            json=payload,
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            if response.status != 200:
+                return response.status, None
+            return response.status, await response.json()
+    
     def get_current_provider(self) -> RPCProvider:
-        """Get the current active provider."""
-        # Find first available provider
-        for provider in self.providers:
-            if provider.is_available:
-                return provider
+        """
+        Get the provider to use for the next call.
         
-        # If all failed, reset and try again
-        logger.warning("All providers failed, resetting availability")
-        for provider in self.providers:
-            provider.is_available = True
-            provider.failure_count = 0
+        Picks the available provider with the lowest latency/error score,
+        with priority breaking ties. A small share of calls goes to another
+        available provider so slower endpoints keep being measured.
+        """
+        available = [provider for provider in self.providers if provider.is_available]
         
-        return self.providers[0]
+        if not available:
+            # If all failed, reset and try again
+            logger.warning("All providers failed, resetting availability")
+            for provider in self.providers:
+                provider.is_available = True
+                provider.failure_count = 0
+            return self.providers[0]
+        
+        best = self._best_provider(available)
+        if len(available) > 1 and self._rng.random() < self.explore_rate:
+            return self._rng.choice([p for p in available if p is not best])
+        return best
+    
+    @staticmethod
+    def _best_provider(providers: List[RPCProvider]) -> RPCProvider:
+        """Provider with the lowest latency/error score, priority breaking ties."""
+        return min(providers, key=lambda p: (p.score(), p.priority))
+    
+    def _get_hedge_provider(self, primary: RPCProvider) -> Optional[RPCProvider]:
+        """Best available provider other than primary, if any."""
+        others = [p for p in self.providers if p.is_available and p is not primary]
+        if not others:
+            return None
+        return self._best_provider(others)
     
     async def rpc_call(
         self,
         method: str,
         params: Optional[List[Any]] = None,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        min_context_slot: Optional[int] = None,
+        max_age: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Make RPC call with automatic fallback.
@@ -138,11 +391,18 @@ class RPCFallbackManager:
         provider chain. This enables user-specific key routing while maintaining
         backward compatibility.
         
+        Methods listed in cache_policies are served from the response cache
+        while fresh, and identical concurrent reads share one network call.
+        Cached results are shared between callers and must not be mutated.
+        
         Args:
             method: RPC method name
             params: Method parameters
             user_id: Optional user identifier for user-specific key routing.
                     Only used when api_key_manager is configured.
+            min_context_slot: Only accept data observed at this slot or later
+            max_age: Accept cached data up to this many seconds old, instead
+                    of the method's default freshness (0 forces a fetch)
         
         Returns:
             RPC response
@@ -153,6 +413,113 @@ class RPCFallbackManager:
         if params is None:
             params = []
         
+        policy = self.cache_policies.get(method)
+        if self.response_cache is None or policy is None:
+            result = await self._rpc_call_uncached(method, params, user_id)
+            if method in STATE_CHANGING_METHODS:
+                self.invalidate_response_cache()
+            return result
+        
+        key = self._response_cache_key(method, params)
+        stats = self.response_cache_stats
+        stats.total_requests += 1
+        
+        entry = self.response_cache.get(key)
+        if entry is not None and entry.is_fresh(policy if max_age is None else max_age, min_context_slot):
+            stats.cache_hits += 1
+            stats.api_calls_saved += 1
+            return entry.result
+        
+        stats.cache_misses += 1
+        
+        if min_context_slot is not None:
+            # Have the node enforce the slot, so a lagging node can't answer
+            request_params = self._with_min_context_slot(params, min_context_slot)
+            flight_key = key + (min_context_slot,)
+        else:
+            request_params = params
+            flight_key = key
+        
+        result, shared = await self._inflight_reads.do(
+            flight_key,
+            lambda: self._fetch_and_cache(key, method, request_params, user_id)
+        )
+        if shared:
+            stats.coalesced += 1
+            stats.api_calls_saved += 1
+        return result
+    
+    @staticmethod
+    def _response_cache_key(method: str, params: List[Any]) -> Tuple[str, str, str]:
+        """Cache key of a read: (method, commitment, canonical params)."""
+        commitment = "finalized"  # The server default when none is given
+        if params and isinstance(params[-1], dict):
+            config = dict(params[-1])
+            commitment = config.pop("commitment", commitment)
+            params = list(params[:-1]) + ([config] if config else [])
+        return method, commitment, json.dumps(params, sort_keys=True, default=str)
+    
+    @staticmethod
+    def _with_min_context_slot(params: List[Any], min_context_slot: int) -> List[Any]:
+        """Copy params with minContextSlot added to the config object."""
+        if params and isinstance(params[-1], dict):
+            return list(params[:-1]) + [{**params[-1], "minContextSlot": min_context_slot}]
+        return list(params) + [{"minContextSlot": min_context_slot}]
+    
+    async def _fetch_and_cache(
+        self,
+        key: Tuple[str, str, str],
+        method: str,
+        params: List[Any],
+        user_id: Optional[str]
+    ) -> Any:
+        """Fetch a read and store it unless a newer slot is already cached."""
+        result = await self._rpc_call_uncached(method, params, user_id)
+        
+        slot = None
+        if isinstance(result, dict):
+            slot = (result.get("context") or {}).get("slot")
+        
+        existing = self.response_cache.get(key)
+        if existing is None or existing.slot is None or slot is None or slot >= existing.slot:
+            self.response_cache[key] = CachedRPCResponse(result, slot, time.monotonic())
+        return result
+    
+    def invalidate_response_cache(self, method: Optional[str] = None):
+        """
+        Drop cached responses.
+        
+        Args:
+            method: Only drop this method's responses (default: all)
+        """
+        if self.response_cache is None:
+            return
+        if method is None:
+            self.response_cache.clear()
+            return
+        for key in [key for key in self.response_cache if key[0] == method]:
+            del self.response_cache[key]
+    
+    async def _rpc_call_uncached(
+        self,
+        method: str,
+        params: List[Any],
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Send an RPC call over user-key routing and the provider chain.
+        
+        Args:
+            method: RPC method name
+            params: Method parameters
+            user_id: Optional user identifier for user-specific key routing
+        
+        Returns:
+            RPC response
+        
+        Raises:
+            Exception: If all providers fail
+        """
         # Try user-specific key routing if both api_key_manager and user_id provided
         if self.api_key_manager and user_id:
             try:
@@ -168,30 +535,19 @@ class RPCFallbackManager:
         # Standard fallback logic (existing behavior)
         last_error = None
         
+        hedge = self.hedge_requests and method in READ_ONLY_METHODS
+        
         # Try each provider
         for attempt in range(len(self.providers)):
             provider = self.get_current_provider()
             
             try:
-                result = await self._call_provider(provider, method, params)
-                
-                # Success - reset failure count
-                provider.failure_count = 0
-                return result
+                if hedge:
+                    return await self._hedged_call(provider, method, params)
+                return await self._timed_call(provider, method, params)
             
             except Exception as e:
                 last_error = e
-                provider.failure_count += 1
-                
-                logger.warning(
-                    f"RPC call failed on {provider.name} "
-                    f"(attempt {provider.failure_count}/{provider.max_retries}): {e}"
-                )
-                
-                # Mark as unavailable if too many failures
-                if provider.failure_count >= provider.max_retries:
-                    provider.is_available = False
-                    logger.error(f"Marking {provider.name} as unavailable")
                 
                 # Try next provider
                 continue
@@ -201,6 +557,293 @@ class RPCFallbackManager:
         logger.error(error_msg)
         raise Exception(error_msg)
     
+    async def rpc_batch(
+        self,
+        calls: List[Tuple[str, Optional[List[Any]]]],
+        user_id: Optional[str] = None
+    ) -> List[Any]:
+        """
+        Send several RPC requests in one HTTP round trip (JSON-RPC batch).
+        
+        Requests may use different methods. Routing and fallback match
+        rpc_call: the user's assigned key is tried first, then each provider
+        in turn. A transport failure retries the whole batch elsewhere,
+        while an error for a single entry is returned in that entry's slot.
+        
+        Args:
+            calls: List of (method, params) tuples
+            user_id: Optional user identifier for user-specific key routing
+        
+        Returns:
+            Results in the same order as calls; failed entries hold an
+            RPCError instead of a result
+        
+        Raises:
+            Exception: If all providers fail
+        """
+        if not calls:
+            return []
+        
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "id": index,
+                "method": method,
+                "params": params or []
+            }
+            for index, (method, params) in enumerate(calls)
+        ]
+        
+        # Try user-specific key routing if both api_key_manager and user_id provided
+        if self.api_key_manager and user_id:
+            try:
+                rpc_url = await self._acquire_user_rpc_url(user_id)
+                data = await self._post_batch(rpc_url, payload, 10, f"user {user_id}'s assigned key", user_key=True)
+                return self._map_batch_responses(calls, data)
+            except Exception as e:
+                logger.warning(
+                    f"User-specific key routing failed for {user_id}: {e}. "
+                    f"Falling back to standard provider chain."
+                )
+        
+        last_error = None
+        
+        for attempt in range(len(self.providers)):
+            provider = self.get_current_provider()
+            
+            try:
+                started = time.monotonic()
+                data = await self._post_batch(provider.url, payload, provider.timeout, provider.name)
+                provider.record_success(time.monotonic() - started, self.latency_alpha)
+                provider.failure_count = 0
+                return self._map_batch_responses(calls, data)
+            
+            except Exception as e:
+                last_error = e
+                self._record_provider_failure(provider, e)
+                continue
+        
+        error_msg = f"All RPC providers failed for batch of {len(calls)}. Last error: {last_error}"
+        logger.error(error_msg)
+        raise Exception(error_msg)
+    
+    async def _post_batch(
+        self,
+        url: str,
+        payload: List[Dict[str, Any]],
+        timeout: float,
+        label: str,
+        user_key: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        POST a batch payload and validate the transport-level response.
+        
+        Args:
+            url: Endpoint URL
+            payload: List of JSON-RPC request objects
+            timeout: Total request timeout in seconds
+            label: Endpoint description for error messages
+            user_key: Whether url is one of our API keys, for rate-limit handling
+        
+        Returns:
+            List of JSON-RPC response objects
+        
+        Raises:
+            Exception: On network errors, non-200 status or a non-batch reply
+        """
+        try:
+            status, data = await self._post_json(url, payload, timeout=timeout)
+        except aiohttp.ClientError as e:
+            raise Exception(f"Network error calling {label}: {e}")
+        
+        if status == 429:
+            if user_key:
+                self._handle_user_key_rate_limit(url)
+            raise Exception(f"Rate limited on {label}")
+        
+        if status != 200:
+            raise Exception(f"HTTP {status} from {label}")
+        
+        if not isinstance(data, list):
+            # Servers answer a rejected batch with a single error object
+            error = data.get("error", {}) if isinstance(data, dict) else {}
+            raise Exception(f"Batch rejected by {label}: {error.get('message', 'Unexpected response')}")
+        
+        return data
+    
+    def _map_batch_responses(
+        self,
+        calls: List[Tuple[str, Optional[List[Any]]]],
+        data: List[Dict[str, Any]]
+    ) -> List[Any]:
+        """
+        Order batch responses by request id, turning entry errors into RPCError.
+        
+        Args:
+            calls: The (method, params) tuples that were sent
+            data: Response objects, in any order
+        
+        Returns:
+            Results in call order
+        """
+        by_id = {entry.get("id"): entry for entry in data if isinstance(entry, dict)}
+        results = []
+        
+        for index, (method, _) in enumerate(calls):
+            entry = by_id.get(index)
+            if entry is None:
+                results.append(RPCError(f"No response for {method}", method=method))
+            elif "error" in entry:
+                error = entry["error"] or {}
+                results.append(RPCError(
+                    error.get("message", "Unknown error"),
+                    code=error.get("code"),
+                    method=method
+                ))
+            else:
+                results.append(entry.get("result", {}))
+        
+        return results
+    
+    async def _timed_call(
+        self,
+        provider: RPCProvider,
+        method: str,
+        params: List[Any]
+    ) -> Dict[str, Any]:
+        """
+        Call a provider and record its latency or failure.
+        
+        Args:
+            provider: Provider to call
+            method: RPC method
+            params: Method parameters
+        
+        Returns:
+            RPC response
+        
+        Raises:
+            Exception: If call fails
+        """
+        started = time.monotonic()
+        try:
+            result = await self._call_provider(provider, method, params)
+        except asyncio.CancelledError:
+            # Lost a hedge race - neither a success nor a failure
+            raise
+        except Exception as e:
+            self._record_provider_failure(provider, e)
+            raise
+        
+        provider.record_success(time.monotonic() - started, self.latency_alpha)
+        
+        # Success - reset failure count
+        provider.failure_count = 0
+        return result
+    
+    async def _hedged_call(
+        self,
+        primary: RPCProvider,
+        method: str,
+        params: List[Any]
+    ) -> Dict[str, Any]:
+        """
+        Call primary, adding a second provider if primary is unusually slow.
+        
+        If primary has not answered within its p95 latency, the same
+        read-only request goes to the next best provider and whichever
+        succeeds first wins; the other request is cancelled.
+        
+        Args:
+            primary: Provider to try first
+            method: Read-only RPC method
+            params: Method parameters
+        
+        Returns:
+            RPC response
+        
+        Raises:
+            Exception: If every attempted provider fails
+        """
+        secondary = self._get_hedge_provider(primary)
+        if secondary is None or len(primary.latency_samples) < self.min_samples_for_hedge:
+            return await self._timed_call(primary, method, params)
+        
+        primary_task = asyncio.ensure_future(self._timed_call(primary, method, params))
+        tasks = [primary_task]
+        
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=primary.p95_latency())
+            if done:
+                return primary_task.result()
+            
+            self.hedges_sent += 1
+            logger.debug(f"Hedging {method} to {secondary.name} ({primary.name} slower than p95)")
+            secondary_task = asyncio.ensure_future(self._timed_call(secondary, method, params))
+            tasks.append(secondary_task)
+            pending = set(tasks)
+            
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is secondary_task:
+                            self.hedges_won += 1
+                        return task.result()
+            
+            # Both failed - report the primary's error
+            raise primary_task.exception()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def _record_provider_failure(self, provider: RPCProvider, error: Exception):
+        """
+        Count a failed call and take the provider out of rotation if needed.
+        
+        Args:
+            provider: Provider that failed
+            error: The failure
+        """
+        provider.record_failure(self.latency_alpha)
+        provider.failure_count += 1
+        
+        logger.warning(
+            f"RPC call failed on {provider.name} "
+            f"(attempt {provider.failure_count}/{provider.max_retries}): {error}"
+        )
+        
+        # Mark as unavailable if too many failures
+        if provider.failure_count >= provider.max_retries:
+            provider.is_available = False
+            logger.error(f"Marking {provider.name} as unavailable")
+    
+    async def _acquire_user_rpc_url(self, user_id: str) -> str:
+        """
+        Wait for rate-limit capacity on the user's API key and get its URL.
+        
+        The API key manager's token buckets keep requests under each key's
+        limits; a saturated or unavailable key spills over to the
+        least-loaded available key.
+        
+        Args:
+            user_id: User identifier
+        
+        Returns:
+            RPC URL to send the request to
+        
+        Raises:
+            Exception: If no key is available or has budget left
+        """
+        return await self.api_key_manager.acquire_rpc_url_for_user(user_id)
+    
+    def _handle_user_key_rate_limit(self, rpc_url: str):
+        """Mark the key behind a rate-limited URL as unavailable."""
+        key_index = self.api_key_manager.get_key_index_for_url(rpc_url)
+        if key_index is not None:
+            self.api_key_manager.handle_rate_limit_error(key_index)
+    
     async def _call_with_user_key(
         self,
         method: str,
@@ -225,15 +868,7 @@ class RPCFallbackManager:
         Raises:
             Exception: If the call fails or key is unavailable
         """
-        # Check if user should use fallback (key unavailable or all keys down)
-        if self.api_key_manager.should_use_fallback(user_id):
-            raise Exception(f"User {user_id}'s assigned key unavailable, using fallback")
-        
-        # Get user's RPC URL
-        rpc_url = self.api_key_manager.get_rpc_url_for_user(user_id)
-        
-        if not rpc_url:
-            raise Exception(f"No RPC URL available for user {user_id}")
+        rpc_url = await self._acquire_user_rpc_url(user_id)
         
         # Make the call
         payload = {
@@ -244,33 +879,24 @@ class RPCFallbackManager:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    rpc_url,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    # Check for rate limiting
-                    if response.status == 429:
-                        # Get user's key index to mark it unavailable
-                        assignment = self.api_key_manager.user_assignments.get(user_id)
-                        if assignment:
-                            self.api_key_manager.handle_rate_limit_error(assignment.key_index)
-                        raise Exception(f"Rate limited on user {user_id}'s assigned key")
-                    
-                    if response.status != 200:
-                        raise Exception(f"HTTP {response.status} from user key")
-                    
-                    data = await response.json()
-                    
-                    if "error" in data:
-                        error_msg = data["error"].get("message", "Unknown error")
-                        raise Exception(f"RPC error from user key: {error_msg}")
-                    
-                    return data.get("result", {})
-        
+            status, data = await self._post_json(rpc_url, payload, timeout=10)
         except aiohttp.ClientError as e:
             raise Exception(f"Network error calling user key: {e}")
+        
+        # Check for rate limiting
+        if status == 429:
+            # Mark the user's key unavailable
+            self._handle_user_key_rate_limit(rpc_url)
+            raise Exception(f"Rate limited on user {user_id}'s assigned key")
+        
+        if status != 200:
+            raise Exception(f"HTTP {status} from user key")
+        
+        if "error" in data:
+            error_msg = data["error"].get("message", "Unknown error")
+            raise Exception(f"RPC error from user key: {error_msg}")
+        
+        return data.get("result", {})
     
     async def _call_provider(
         self,
@@ -299,29 +925,23 @@ class RPCFallbackManager:
             "params": params
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                provider.url,
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=provider.timeout)
-            ) as response:
-                if response.status == 429:
-                    raise Exception(f"Rate limited on {provider.name}")
-                
-                if response.status != 200:
-                    raise Exception(f"HTTP {response.status} from {provider.name}")
-                
-                data = await response.json()
-                
-                if "error" in data:
-                    error_msg = data["error"].get("message", "Unknown error")
-                    raise Exception(f"RPC error from {provider.name}: {error_msg}")
-                
-                return data.get("result", {})
+        status, data = await self._post_json(provider.url, payload, timeout=provider.timeout)
+        
+        if status == 429:
+            raise Exception(f"Rate limited on {provider.name}")
+        
+        if status != 200:
+            raise Exception(f"HTTP {status} from {provider.name}")
+        
+        if "error" in data:
+            error_msg = data["error"].get("message", "Unknown error")
+            raise Exception(f"RPC error from {provider.name}: {error_msg}")
+        
+        return data.get("result", {})
     
-    async def get_balance(self, pubkey: str) -> float:
-        """Get SOL balance with fallback."""
-        result = await self.rpc_call("getBalance", [pubkey])
+    async def get_balance(self, pubkey: str, user_id: Optional[str] = None) -> float:
+        """Get SOL balance with fallback, routed through the user's key if given."""
+        result = await self.rpc_call("getBalance", [pubkey], user_id=user_id)
         lamports = result.get("value", 0)
         return lamports / 1e9
     
@@ -330,6 +950,24 @@ class RPCFallbackManager:
         result = await self.rpc_call("getLatestBlockhash")
         return result.get("value", {})
     
+    async def get_recent_prioritization_fees(
+        self,
+        accounts: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get per-slot prioritization fees for recent slots with fallback."""
+        return await self.rpc_call("getRecentPrioritizationFees", [accounts] if accounts else [])
+    
+    async def get_signature_statuses(
+        self,
+        signatures: List[str],
+        search_transaction_history: bool = False
+    ) -> Dict[str, Any]:
+        """Get statuses for up to 256 signatures with fallback."""
+        return await self.rpc_call(
+            "getSignatureStatuses",
+            [signatures, {"searchTransactionHistory": search_transaction_history}]
+        )
+    
     async def send_transaction(self, signed_transaction: str) -> str:
         """Send transaction with fallback."""
         return await self.rpc_call("sendTransaction", [signed_transaction])
@@ -342,9 +980,24 @@ class RPCFallbackManager:
                     "name": p.name,
                     "available": p.is_available,
                     "failures": p.failure_count,
-                    "priority": p.priority
+                    "priority": p.priority,
+                    "ewma_latency_ms": p.ewma_latency * 1000,
+                    "p95_latency_ms": (p.p95_latency() or 0.0) * 1000,
+                    "error_rate": p.ewma_error_rate
                 }
                 for p in self.providers
             ],
-            "current": self.get_current_provider().name
+            # Best-scored provider, without exploration or availability resets
+            "current": self._best_provider(
+                [p for p in self.providers if p.is_available] or self.providers
+            ).name,
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+            "response_cache": {
+                "entries": len(self.response_cache) if self.response_cache is not None else 0,
+                "hits": self.response_cache_stats.cache_hits,
+                "misses": self.response_cache_stats.cache_misses,
+                "coalesced": self.response_cache_stats.coalesced,
+                "hit_rate_percent": self.response_cache_stats.hit_rate()
+            }
         }
@@ -8,9 +8,11 @@ to reduce API calls across multiple users.
 import time
 import logging
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional, List, Callable
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, List, Tuple
 import asyncio
 
+from agent.core.bounded_cache import BoundedCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,6 +26,10 @@ class CachedData:
     def is_expired(self) -> bool:
         """Check if cached data has expired."""
         return time.time() - self.timestamp > self.ttl
+    
+    def age(self) -> float:
+        """Seconds since the data was cached."""
+        return time.time() - self.timestamp
 
 
 @dataclass
@@ -33,6 +39,9 @@ class CacheStats:
     cache_hits: int = 0
     cache_misses: int = 0
     api_calls_saved: int = 0
+    coalesced: int = 0  # Misses that joined an in-flight computation
+    stale_hits: int = 0  # Hits served past the soft TTL
+    background_refreshes: int = 0
     
     def hit_rate(self) -> float:
         """Calculate cache hit rate as percentage."""
@@ -41,6 +50,58 @@ class CacheStats:
         return (self.cache_hits / self.total_requests) * 100
 
 
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time.
+    
+    The first caller for a key starts the computation as its own task;
+    callers arriving while it runs await the same task instead of starting
+    another. The result, or the exception, is delivered to every waiter.
+    A waiter that is cancelled does not cancel the shared computation.
+    """
+    
+    def __init__(self):
+        """Initialize with no computations in flight."""
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+    
+    def in_flight(self, key: Hashable) -> bool:
+        """Check whether a computation for key is running."""
+        return key in self._inflight
+    
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run func for key, or join the computation already running for it.
+        
+        Args:
+            key: Identifies the computation
+            func: Zero-argument async callable producing the value
+            
+        Returns:
+            Tuple of (result, shared) where shared is True if this caller
+            joined a computation started by another caller
+            
+        Raises:
+            Exception: Whatever func raised, re-raised in every waiter
+        """
+        task = self._inflight.get(key)
+        shared = task is not None
+        
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        
+        return await asyncio.shield(task), shared
+    
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        """Forget a finished computation."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter was cancelled
+            task.exception()
+
+
 class SharedPriceCache:
     """
     Global price cache shared across all users.
@@ -48,27 +109,92 @@ class SharedPriceCache:
     Caches cryptocurrency prices with configurable TTL to reduce
     redundant API calls. Expected to reduce price API calls by 99%+
     for 500 concurrent users.
+    
+    With a soft TTL set, prices older than soft_ttl but younger than ttl
+    are still served immediately while one background task refreshes
+    them (stale-while-revalidate); only past ttl does a read miss. The
+    optional refresher task also refreshes recently read tokens before
+    they go stale, so steady-state reads are a dictionary lookup.
     """
     
-    def __init__(self, ttl: int = 60):
+    def __init__(
+        self,
+        ttl: int = 60,
+        soft_ttl: Optional[float] = None,
+        fetch_func: Optional[Callable] = None,
+        refresh_interval: Optional[float] = None
+    ):
         """
         Initialize shared price cache.
         
         Args:
             ttl: Time-to-live for cached prices in seconds (default 60)
+            soft_ttl: Age in seconds after which cached prices are refreshed
+                in the background (default None, disabled)
+            fetch_func: Async function used for background refreshes, taking a
+                token list and returning Dict[str, float]. Defaults to the
+                last fetch_func passed to refresh_prices
+            refresh_interval: Seconds between proactive refresh sweeps
+                (default soft_ttl / 2)
         """
         self.cache: Dict[str, CachedData] = {}
         self.ttl = ttl
+        self.soft_ttl = soft_ttl if soft_ttl and soft_ttl < ttl else None
+        self.fetch_func = fetch_func
+        self.refresh_interval = refresh_interval or (self.soft_ttl / 2 if self.soft_ttl else None)
+        # Tokens read within this window are refreshed proactively
+        self.active_window = ttl * 5
         self.stats = CacheStats()
         self._lock = asyncio.Lock()
-        logger.info(f"SharedPriceCache initialized with TTL={ttl}s")
+        self._flights = SingleFlight()
+        self._last_read: Dict[str, float] = {}
+        self._revalidating: set = set()
+        self._background_tasks: set = set()
+        self._refresher_task: Optional[asyncio.Task] = None
+        logger.info(
+            f"SharedPriceCache initialized with TTL={ttl}s"
+            + (f", soft TTL={self.soft_ttl}s" if self.soft_ttl else "")
+        )
+    
+    def _lookup(self, token: str) -> Tuple[Optional[float], bool]:
+        """
+        Look up a token and update statistics. Caller must hold the lock.
+        
+        Args:
+            token: Token symbol
+            
+        Returns:
+            Tuple of (price or None, whether the price is past the soft TTL)
+        """
+        self.stats.total_requests += 1
+        self._last_read[token] = time.time()
+        
+        if token in self.cache:
+            cached = self.cache[token]
+            if not cached.is_expired():
+                self.stats.cache_hits += 1
+                self.stats.api_calls_saved += 1
+                stale = self.soft_ttl is not None and cached.age() > self.soft_ttl
+                if stale:
+                    self.stats.stale_hits += 1
+                logger.debug(f"Cache {'STALE' if stale else 'HIT'} for {token}: {cached.data}")
+                return cached.data, stale
+            else:
+                # Expired entry
+                logger.debug(f"Cache EXPIRED for {token}")
+                del self.cache[token]
+        
+        self.stats.cache_misses += 1
+        logger.debug(f"Cache MISS for {token}")
+        return None, False
     
     async def get_price(self, token: str) -> Optional[float]:
         """
         Get price for a single token.
         
         Returns cached price if available and not expired, otherwise
-        returns None (caller should fetch and cache).
+        returns None (caller should fetch and cache). A price past the
+        soft TTL is returned as-is and refreshed in the background.
         
         Args:
             token: Token symbol (e.g., "SOL", "USDC")
@@ -77,23 +203,11 @@ class SharedPriceCache:
             Cached price if available, None otherwise
         """
         async with self._lock:
-            self.stats.total_requests += 1
-            
-            if token in self.cache:
-                cached = self.cache[token]
-                if not cached.is_expired():
-                    self.stats.cache_hits += 1
-                    self.stats.api_calls_saved += 1
-                    logger.debug(f"Cache HIT for {token}: {cached.data}")
-                    return cached.data
-                else:
-                    # Expired entry
-                    logger.debug(f"Cache EXPIRED for {token}")
-                    del self.cache[token]
-            
-            self.stats.cache_misses += 1
-            logger.debug(f"Cache MISS for {token}")
-            return None
+            price, stale = self._lookup(token)
+        
+        if stale:
+            self._revalidate([token])
+        return price
     
     async def get_prices(self, tokens: List[str]) -> Dict[str, float]:
         """
@@ -101,6 +215,7 @@ class SharedPriceCache:
         
         Returns cached prices for tokens that are available and not expired.
         Tokens not in cache or expired will not be included in result.
+        Stale tokens are refreshed together in one background fetch.
         
         Args:
             tokens: List of token symbols
@@ -109,13 +224,107 @@ class SharedPriceCache:
             Dictionary mapping token symbols to prices (only cached tokens)
         """
         result = {}
+        stale_tokens = []
         
-        for token in tokens:
-            price = await self.get_price(token)
-            if price is not None:
-                result[token] = price
-        
+        async with self._lock:
+            for token in tokens:
+                price, stale = self._lookup(token)
+                if price is not None:
+                    result[token] = price
+                if stale:
+                    stale_tokens.append(token)
+        
+        if stale_tokens:
+            self._revalidate(stale_tokens)
         return result
+    
+    def _revalidate(self, tokens: List[str]) -> None:
+        """
+        Start a background refresh for tokens not already being refreshed.
+        
+        Args:
+            tokens: Token symbols to refresh
+        """
+        if self.fetch_func is None:
+            return
+        
+        tokens = [token for token in tokens if token not in self._revalidating]
+        if not tokens:
+            return
+        
+        self._revalidating.update(tokens)
+        task = asyncio.ensure_future(self._background_refresh(tokens))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _background_refresh(self, tokens: List[str]) -> None:
+        """
+        Refresh tokens off the read path, keeping stale prices on failure.
+        
+        Args:
+            tokens: Token symbols to refresh
+        """
+        try:
+            await self.refresh_prices(tokens, self.fetch_func)
+            self.stats.background_refreshes += 1
+        except Exception as e:
+            logger.warning(f"Background price refresh failed: {e}")
+        finally:
+            self._revalidating.difference_update(tokens)
+    
+    def _tokens_due_for_refresh(self) -> List[str]:
+        """
+        Find recently read tokens that will be stale before the next sweep.
+        
+        Returns:
+            Token symbols to refresh proactively
+        """
+        now = time.time()
+        
+        # Forget tokens nobody has read for a while
+        for token in [t for t, read_at in self._last_read.items() if now - read_at > self.active_window]:
+            del self._last_read[token]
+        
+        refresh_age = self.soft_ttl - self.refresh_interval
+        due = []
+        for token in self._last_read:
+            cached = self.cache.get(token)
+            if cached is None or cached.age() >= refresh_age:
+                due.append(token)
+        return due
+    
+    async def _refresh_loop(self) -> None:
+        """Periodically refresh recently read tokens before they go stale."""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                due = self._tokens_due_for_refresh()
+                if due:
+                    self._revalidate(due)
+            except Exception as e:
+                logger.error(f"Error in price refresh loop: {e}")
+    
+    def start_refresher(self) -> None:
+        """Start proactive background refreshing (requires soft_ttl)."""
+        if self.soft_ttl is None:
+            logger.debug("Price refresher not started: soft TTL disabled")
+            return
+        if self._refresher_task is None or self._refresher_task.done():
+            self._refresher_task = asyncio.ensure_future(self._refresh_loop())
+            logger.info(f"Price refresher started (every {self.refresh_interval:.1f}s)")
+    
+    async def stop_refresher(self) -> None:
+        """Stop proactive refreshing and wait for in-flight refreshes."""
+        if self._refresher_task is not None:
+            self._refresher_task.cancel()
+            try:
+                await self._refresher_task
+            except asyncio.CancelledError:
+                pass
+            self._refresher_task = None
+        
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
 
     
     async def set_price(self, token: str, price: float) -> None:
@@ -149,6 +358,7 @@ class SharedPriceCache:
         Refresh prices for tokens by fetching from API.
         
         This is a convenience method that fetches prices and caches them.
+        Concurrent refreshes of the same tokens share a single fetch.
         
         Args:
             tokens: List of token symbols to refresh
@@ -157,14 +367,26 @@ class SharedPriceCache:
         Returns:
             Dictionary mapping token symbols to fresh prices
         """
-        try:
+        if self.fetch_func is None:
+            # Reuse this fetcher for background refreshes
+            self.fetch_func = fetch_func
+        
+        async def fetch_and_cache():
             prices = await fetch_func(tokens)
             await self.set_prices(prices)
             logger.info(f"Refreshed prices for {len(prices)} tokens")
             return prices
+        
+        try:
+            prices, shared = await self._flights.do(tuple(sorted(tokens)), fetch_and_cache)
         except Exception as e:
             logger.error(f"Failed to refresh prices: {e}")
             raise
+        
+        if shared:
+            self.stats.coalesced += 1
+            self.stats.api_calls_saved += 1
+        return prices
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -179,13 +401,18 @@ class SharedPriceCache:
             "cache_misses": self.stats.cache_misses,
             "hit_rate_percent": self.stats.hit_rate(),
             "api_calls_saved": self.stats.api_calls_saved,
+            "coalesced": self.stats.coalesced,
+            "stale_hits": self.stats.stale_hits,
+            "background_refreshes": self.stats.background_refreshes,
             "cached_tokens": len(self.cache),
-            "ttl_seconds": self.ttl
+            "ttl_seconds": self.ttl,
+            "soft_ttl_seconds": self.soft_ttl
         }
     
     def clear(self) -> None:
         """Clear all cached data."""
         self.cache.clear()
+        self._last_read.clear()
         logger.info("Cache cleared")
     
     def evict_expired(self) -> int:
@@ -218,17 +445,20 @@ class StrategyCache:
     can share results within the TTL window.
     """
     
-    def __init__(self, ttl: int = 30):
+    def __init__(self, ttl: int = 30, max_entries: int = 1000):
         """
         Initialize strategy cache.
         
         Args:
             ttl: Time-to-live for cached results in seconds (default 30)
+            max_entries: Maximum cached results; keys include a hash of market
+                context, so a new key appears whenever prices move (default 1000)
         """
-        self.cache: Dict[str, CachedData] = {}
+        self.cache = BoundedCache(max_entries=max_entries, name="strategy_cache")
         self.ttl = ttl
         self.stats: Dict[str, CacheStats] = {}
         self._lock = asyncio.Lock()
+        self._flights = SingleFlight()
         logger.info(f"StrategyCache initialized with TTL={ttl}s")
     
     def _generate_cache_key(self, strategy_name: str, context: Dict[str, Any]) -> str:
@@ -348,6 +578,8 @@ class StrategyCache:
         
         This is a convenience method that checks cache first, and if
         not found, executes the strategy function and caches the result.
+        On a miss only one execution runs per cache key; concurrent callers
+        with the same key await that execution instead of repeating it.
         
         Args:
             strategy_name: Name of the strategy
@@ -362,15 +594,24 @@ class StrategyCache:
         if cached_result is not None:
             return cached_result
         
-        # Execute strategy
-        try:
+        async def execute():
             result = await strategy_func(context)
             await self.set_strategy_result(strategy_name, context, result)
             logger.info(f"Executed and cached strategy {strategy_name}")
             return result
+        
+        # Execute strategy
+        cache_key = self._generate_cache_key(strategy_name, context)
+        try:
+            result, shared = await self._flights.do(cache_key, execute)
         except Exception as e:
             logger.error(f"Failed to execute strategy {strategy_name}: {e}")
             raise
+        
+        if shared:
+            self.stats[strategy_name].coalesced += 1
+            self.stats[strategy_name].api_calls_saved += 1
+        return result
     
     def get_stats(self, strategy_name: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -392,7 +633,8 @@ class StrategyCache:
                     "cache_hits": 0,
                     "cache_misses": 0,
                     "hit_rate_percent": 0.0,
-                    "api_calls_saved": 0
+                    "api_calls_saved": 0,
+                    "coalesced": 0
                 }
             
             stats = self.stats[strategy_name]
@@ -402,7 +644,8 @@ class StrategyCache:
                 "cache_hits": stats.cache_hits,
                 "cache_misses": stats.cache_misses,
                 "hit_rate_percent": stats.hit_rate(),
-                "api_calls_saved": stats.api_calls_saved
+                "api_calls_saved": stats.api_calls_saved,
+                "coalesced": stats.coalesced
             }
         else:
             # Return aggregated stats for all strategies
@@ -411,6 +654,7 @@ class StrategyCache:
                 "cache_hits": 0,
                 "cache_misses": 0,
                 "api_calls_saved": 0,
+                "coalesced": 0,
                 "strategies": {}
             }
             
@@ -419,13 +663,15 @@ class StrategyCache:
                 total_stats["cache_hits"] += stats.cache_hits
                 total_stats["cache_misses"] += stats.cache_misses
                 total_stats["api_calls_saved"] += stats.api_calls_saved
+                total_stats["coalesced"] += stats.coalesced
                 
                 total_stats["strategies"][name] = {
                     "total_requests": stats.total_requests,
                     "cache_hits": stats.cache_hits,
                     "cache_misses": stats.cache_misses,
                     "hit_rate_percent": stats.hit_rate(),
-                    "api_calls_saved": stats.api_calls_saved
+                    "api_calls_saved": stats.api_calls_saved,
+                    "coalesced": stats.coalesced
                 }
             
             # Calculate overall hit rate
@@ -0,0 +1,233 @@
+"""
+Write-behind buffer for high-volume single-row writes.
+
+Trade records, conversation messages and last-active updates used to cost
+one statement and one commit each. WriteBehindBuffer queues them instead,
+and a background thread writes everything queued with executemany in a
+single transaction, every max_latency seconds or as soon as max_batch rows
+are waiting. Rows given a coalescing key replace the queued row with the
+same key, so a burst of last_active updates for one user is one UPDATE.
+"""
+
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, ContextManager, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WriteBehindStats:
+    """Statistics for a write-behind buffer."""
+    rows_queued: int = 0
+    rows_coalesced: int = 0  # Replaced a queued row with the same key
+    rows_written: int = 0
+    rows_failed: int = 0
+    flushes: int = 0
+
+
+class WriteBehindBuffer:
+    """
+    Queue of pending writes flushed in batches by a background thread.
+    
+    A row waits at most max_latency seconds (plus the time of the flush
+    itself) before it is committed. Queued rows are lost only if the
+    process dies without running its exit handlers; with flush_on_exit
+    they are written on normal interpreter shutdown. If a batch fails, its
+    rows are retried one at a time so a single bad row only loses itself.
+    """
+    
+    def __init__(
+        self,
+        connection_factory: Callable[[], ContextManager[sqlite3.Connection]],
+        max_latency: float = 0.05,
+        max_batch: int = 500,
+        flush_on_exit: bool = True
+    ):
+        """
+        Initialize write-behind buffer.
+        
+        Args:
+            connection_factory: Returns a context manager yielding a
+                connection that commits on exit (Database.get_connection)
+            max_latency: Longest time a row stays queued, in seconds (default 0.05)
+            max_batch: Queued rows that trigger an immediate flush (default 500)
+            flush_on_exit: Flush remaining rows when the interpreter exits (default True)
+        """
+        self._connection_factory = connection_factory
+        self.max_latency = max_latency
+        self.max_batch = max_batch
+        self.stats = WriteBehindStats()
+        # sql -> key -> params; dicts keep insertion order, so rows are written as queued
+        self._pending: Dict[str, Dict[Hashable, Tuple]] = {}
+        self._size = 0
+        self._in_flight = 0  # Rows taken by a flush that has not finished
+        self._lock = threading.Lock()
+        self._has_rows = threading.Event()
+        self._full = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        
+        if flush_on_exit:
+            atexit.register(_close_at_exit, weakref.ref(self))
+    
+    @property
+    def pending(self) -> int:
+        """Number of rows not yet committed."""
+        return self._size + self._in_flight
+    
+    def add(self, sql: str, params: Tuple, key: Optional[Hashable] = None):
+        """
+        Queue one row.
+        
+        Args:
+            sql: Statement to run for the row
+            params: Statement parameters
+            key: Coalescing key; a queued row for the same statement and key
+                is replaced instead of written twice
+        """
+        if self._closed:
+            self._write_rows([(sql, [params])])
+            return
+        
+        with self._lock:
+            rows = self._pending.setdefault(sql, {})
+            if key is None:
+                key = object()  # Never coalesced
+            if key in rows:
+                self.stats.rows_coalesced += 1
+            else:
+                self._size += 1
+            rows[key] = params
+            self.stats.rows_queued += 1
+            
+            self._has_rows.set()
+            if self._size >= self.max_batch:
+                self._full.set()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="harvest-db-write-behind",
+                    daemon=True
+                )
+                self._thread.start()
+    
+    def _run(self):
+        """Flush whenever rows have waited max_latency or a batch is full."""
+        while True:
+            self._has_rows.wait()
+            if self._closed:
+                return
+            self._full.wait(self.max_latency)
+            try:
+                self.flush()
+            except Exception as e:
+                # Rows stay queued; try again after the next wait
+                logger.error(f"Write-behind flush failed: {e}")
+                time.sleep(self.max_latency)
+    
+    def flush(self) -> int:
+        """
+        Write every queued row now, in one transaction.
+        
+        Rows are taken from the queue only once the writer connection is
+        held, so when flush() returns every row queued before the call is
+        committed, including rows the flush thread was writing.
+        
+        Returns:
+            Number of rows written
+        """
+        if not self.pending:
+            return 0
+        
+        batches: List[Tuple[str, List[Tuple]]] = []
+        try:
+            with self._connection_factory() as conn:
+                batches = self._take()
+                for sql, rows in batches:
+                    conn.executemany(sql, rows)
+            written = sum(len(rows) for _, rows in batches)
+            self.stats.rows_written += written
+        except Exception as e:
+            if not batches:
+                raise
+            logger.warning(f"Batched write of {self._in_flight} rows failed ({e}), retrying row by row")
+            written = self._write_rows(batches)
+        finally:
+            self._in_flight = 0
+        
+        if batches:
+            self.stats.flushes += 1
+            logger.debug(f"Write-behind flush: {written} rows")
+        return written
+    
+    def _take(self) -> List[Tuple[str, List[Tuple]]]:
+        """Empty the queue, returning its rows grouped by statement."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._in_flight, self._size = self._size, 0
+            if not self._closed:
+                # Left set after close() so the flush thread can exit
+                self._has_rows.clear()
+                self._full.clear()
+        return [(sql, list(rows.values())) for sql, rows in pending.items()]
+    
+    def _write_rows(self, batches: List[Tuple[str, List[Tuple]]]) -> int:
+        """Write rows one transaction each, dropping the ones that fail."""
+        written = 0
+        for sql, rows in batches:
+            for params in rows:
+                try:
+                    with self._connection_factory() as conn:
+                        conn.execute(sql, params)
+                    written += 1
+                except Exception as e:
+                    self.stats.rows_failed += 1
+                    logger.error(f"Dropped buffered write ({e}): {sql.split()[0]} {params[:2]}")
+        
+        self.stats.rows_written += written
+        return written
+    
+    def close(self):
+        """Stop the flush thread and write whatever is still queued."""
+        with self._lock:
+            self._closed = True
+        self._has_rows.set()
+        self._full.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get write-behind statistics.
+        
+        Returns:
+            Dictionary with queue size and row counts
+        """
+        return {
+            "pending": self._size,
+            "rows_queued": self.stats.rows_queued,
+            "rows_coalesced": self.stats.rows_coalesced,
+            "rows_written": self.stats.rows_written,
+            "rows_failed": self.stats.rows_failed,
+            "flushes": self.stats.flushes,
+            "rows_per_flush": (
+                self.stats.rows_written / self.stats.flushes if self.stats.flushes else 0.0
+            ),
+        }
+
+
+def _close_at_exit(ref: "weakref.ref[WriteBehindBuffer]"):
+    buffer = ref()
+    if buffer is not None:
+        try:
+            buffer.close()
+        except Exception as e:
+            logger.error(f"Failed to flush {buffer.pending} buffered writes at exit: {e}")
@@ -6,12 +6,40 @@ Replaces in-memory caches with Redis for multi-worker support.
 
 import json
 import logging
-from typing import Optional, Any, Dict
+import time
+from typing import Optional, Any, Dict, Tuple
 from datetime import datetime, timedelta
 import redis.asyncio as redis
 
 logger = logging.getLogger(__name__)
 
+# Token bucket shared by all workers. Mirrors TokenBucket.reserve():
+# a reservation takes its token even if that leaves the balance negative,
+# and returns how long the caller must wait before sending.
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local max_wait = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+if now > updated then
+    tokens = math.min(capacity, tokens + (now - updated) * rate)
+    updated = now
+end
+local wait = 0
+if tokens < 1 then
+    wait = (1 - tokens) / rate
+end
+if max_wait >= 0 and wait > max_wait then
+    return {0, tostring(wait)}
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens - 1, 'updated', updated)
+redis.call('EXPIRE', KEYS[1], 3600)
+return {1, tostring(wait)}
+"""
+
 
 class RedisCache:
     """
@@ -189,6 +217,40 @@ class RedisCache:
             logger.error(f"Error getting API usage: {e}")
             return 0
     
+    async def reserve_token(
+        self,
+        bucket_id: str,
+        rate: float,
+        capacity: float,
+        max_wait: Optional[float] = None
+    ) -> Optional[Tuple[bool, float]]:
+        """
+        Reserve one token from a shared token bucket.
+        
+        Args:
+            bucket_id: Bucket identifier (e.g. API key identifier)
+            rate: Tokens added per second
+            capacity: Maximum burst size
+            max_wait: Longest acceptable wait in seconds (None for no limit)
+        
+        Returns:
+            Tuple of (reserved, wait), or None if Redis is unreachable
+        """
+        try:
+            reserved, wait = await self.client.eval(
+                _TOKEN_BUCKET_SCRIPT,
+                1,
+                f"token_bucket:{bucket_id}",
+                rate,
+                capacity,
+                time.time(),
+                -1 if max_wait is None else max_wait
+            )
+            return bool(int(reserved)), float(wait)
+        except Exception as e:
+            logger.error(f"Error reserving token for {bucket_id}: {e}")
+            return None
+    
     # Distributed lock methods
     async def acquire_lock(
         self,
@@ -17,7 +17,7 @@ import shutil
 import logging
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional
 from logging.handlers import TimedRotatingFileHandler
 
 
@@ -328,20 +328,32 @@ class ActivityLogger:
         self.log_dir.mkdir(parents=True, exist_ok=True)
         self.logger = logging.getLogger('harvest.activity')
     
-    def log_scan_cycle(self, opportunities_found: int, duration: float):
+    def log_scan_cycle(
+        self,
+        opportunities_found: int,
+        duration: float,
+        phase_durations: Optional[Dict[str, float]] = None
+    ):
         """
         Log a scan cycle completion.
         
         Args:
             opportunities_found: Number of opportunities found
             duration: Scan duration in seconds
+            phase_durations: Optional mapping of phase name to duration in seconds
         """
+        phases = {
+            f"{phase}_seconds": f"{phase_duration:.2f}"
+            for phase, phase_duration in (phase_durations or {}).items()
+        }
+        
         log_with_context(
             self.logger,
             logging.INFO,
             f"Scan cycle completed",
             opportunities_found=opportunities_found,
             duration_seconds=f"{duration:.2f}",
+            **phases,
         )
     
     def log_opportunity_evaluation(
@@ -22,13 +22,18 @@ from agent.monitoring.user_control import UserControl
 from agent.trading.risk_manager import RiskManager
 from agent.trading.performance import PerformanceTracker
 from agent.trading.transaction_executor import TransactionExecutor
+from agent.trading.confirmation_tracker import ConfirmationTracker
+from agent.trading.network_oracle import NetworkOracle
 from agent.logging_config import setup_logging, get_logger
 from agent.core.config import check_startup_requirements, load_config
 from agent.services.user_manager import UserManager
 from agent.monitoring.monthly_fees import MonthlyFeeCollector
 from agent.core.api_usage_monitor import APIUsageMonitor
 from agent.core.multi_api_manager import APIKeyManager
+from agent.core.rate_limiter import KeyRateLimiter
 from agent.core.shared_cache import SharedPriceCache, StrategyCache
+from agent.core.bounded_cache import CacheSweeper
+from agent.core.balance_feed import BalanceSubscriptionManager
 from agent.core.rpc_fallback import RPCFallbackManager
 from agent.core.optimized_scanner import OptimizedScanner
 
@@ -90,18 +95,26 @@ class HarvestAgent:
         self.api_usage_monitor = APIUsageMonitor(daily_limit=3300)
         logger.info(f"API Usage Monitor initialized with daily limit: 3300 requests/key")
         
+        # Token buckets per key, drawing on the usage monitor's daily budgets
+        self.key_rate_limiter = KeyRateLimiter(
+            usage_monitor=self.api_usage_monitor,
+            requests_per_second=self.config.get_helius_requests_per_second()
+        )
+        
         # Create API Key Manager with Helius keys (Requirement 1.1)
         if len(helius_keys) >= 3:
             self.api_key_manager = APIKeyManager(
                 keys=helius_keys[:3],  # Use first 3 keys
-                usage_monitor=self.api_usage_monitor
+                usage_monitor=self.api_usage_monitor,
+                rate_limiter=self.key_rate_limiter
             )
             logger.info(f"API Key Manager initialized with {len(helius_keys[:3])} Helius keys")
         elif helius_keys:
             # Fallback: use available keys (even if less than 3)
             self.api_key_manager = APIKeyManager(
                 keys=helius_keys,
-                usage_monitor=self.api_usage_monitor
+                usage_monitor=self.api_usage_monitor,
+                rate_limiter=self.key_rate_limiter
             )
             logger.warning(f"API Key Manager initialized with only {len(helius_keys)} key(s) - recommend 3 for optimal scaling")
         else:
@@ -110,7 +123,10 @@ class HarvestAgent:
         
         # Create Shared Price Cache (Requirement 4.1)
         price_cache_ttl = self.config.get_price_cache_ttl()
-        self.shared_price_cache = SharedPriceCache(ttl=price_cache_ttl)
+        self.shared_price_cache = SharedPriceCache(
+            ttl=price_cache_ttl,
+            soft_ttl=self.config.get_price_cache_soft_ttl()
+        )
         logger.info(f"Shared Price Cache initialized with TTL: {price_cache_ttl}s")
         
         # Create Strategy Cache (Requirement 7.1)
@@ -120,7 +136,8 @@ class HarvestAgent:
         
         # Initialize RPC Fallback Manager with API Key Manager integration
         self.rpc_fallback_manager = RPCFallbackManager(
-            api_key_manager=self.api_key_manager
+            api_key_manager=self.api_key_manager,
+            hedge_requests=self.config.get_rpc_hedge_requests()
         )
         logger.info("RPC Fallback Manager initialized with API Key Manager integration")
         
@@ -133,35 +150,47 @@ class HarvestAgent:
         )
         logger.info("Optimized Scanner initialized with all optimization components")
         
+        # Periodically drop expired entries so long-lived caches stay flat
+        self.cache_sweeper = CacheSweeper(interval=60)
+        self.cache_sweeper.register(self.shared_price_cache)
+        self.cache_sweeper.register(self.strategy_cache)
+        self.cache_sweeper.register(self.optimized_scanner.price_cache)
+        
         # Initialize Transaction Executor
         # Note: TransactionExecutor will receive per-user wallet instances from AgentLoop
+        # One confirmation poller shared by every in-flight transaction
+        self.confirmation_tracker = ConfirmationTracker(self.rpc_fallback_manager)
+        # Blockhash and priority fees, refreshed in the background while trading
+        self.network_oracle = NetworkOracle(self.rpc_fallback_manager)
         self.transaction_executor = TransactionExecutor(
             rpc_client=self.rpc_fallback_manager,
             wallet_manager=None,  # Will be set per-user in AgentLoop
             rpc_fallback_manager=self.rpc_fallback_manager,
             max_retries=self.config.get_max_retries(),
-            confirmation_timeout=self.config.get_confirmation_timeout()
+            confirmation_timeout=self.config.get_confirmation_timeout(),
+            confirmation_tracker=self.confirmation_tracker,
+            network_oracle=self.network_oracle
         )
         logger.info("Transaction Executor initialized")
         
         # Initialize strategies
-        # Note: Strategies will receive per-user wallet instances from AgentLoop
+        # Note: Strategies receive each user's wallet per call through an ExecutionContext
         strategies = [
             JupiterSwapStrategy(
                 rpc_client=self.rpc_fallback_manager,
-                wallet_manager=None,  # Will be set per-user in AgentLoop
+                wallet_manager=None,  # Per-user wallets come from the ExecutionContext
                 executor=self.transaction_executor,
                 min_profit_threshold=0.01
             ),
             MarinadeStakeStrategy(
                 rpc_client=self.rpc_fallback_manager,
-                wallet_manager=None,  # Will be set per-user in AgentLoop
+                wallet_manager=None,  # Per-user wallets come from the ExecutionContext
                 executor=self.transaction_executor,
                 min_stake_amount=0.1
             ),
             AirdropHunterStrategy(
                 rpc_client=self.rpc_fallback_manager,
-                wallet_manager=None,  # Will be set per-user in AgentLoop
+                wallet_manager=None,  # Per-user wallets come from the ExecutionContext
                 executor=self.transaction_executor
             ),
         ]
@@ -180,7 +209,10 @@ class HarvestAgent:
         self.performance_tracker = PerformanceTracker()
         
         # Initialize user manager and fee collector
-        self.user_manager = UserManager()
+        self.user_manager = UserManager(
+            write_behind_ms=self.config.get_db_write_behind_ms(),
+            write_batch_size=self.config.get_db_write_batch_size()
+        )
         
         # PLATFORM WALLET: Real address for fee collection
         platform_wallet = "BnepSp5cyDkpszTMfrq3iVEH6cMpiappY2hLxTjjLYyc"
@@ -202,9 +234,23 @@ class HarvestAgent:
             risk_manager=self.risk_manager,
             performance_tracker=self.performance_tracker,
             fee_collector=self.fee_collector,
-            scan_interval=self.scan_interval
+            scan_interval=self.scan_interval,
+            stagger_window=self.config.get_scan_stagger_window(),
+            max_concurrent_scans=self.config.get_scan_concurrency(),
+            user_scan_timeout=self.config.get_user_scan_timeout(),
+            scan_rate_per_key=self.config.get_scan_rate_per_key(),
+            api_key_manager=self.api_key_manager,
+            max_concurrent_trades=self.config.get_trade_concurrency(),
+            user_manager=self.user_manager
         ) if self.provider else None
         
+        # Stream wallet balances over WebSocket instead of polling them
+        self.balance_feed = BalanceSubscriptionManager(
+            ws_url=self.config.get_solana_ws_url(),
+            wallet_manager=self.multi_user_wallet,
+            on_change=self.agent.check_balance_and_notify
+        ) if self.agent and self.config.get_balance_feed_enabled() else None
+        
         # Initialize Telegram bot with commands
         web_url = self.config.get("WEB_URL", "http://localhost:5000")
         self.telegram_bot = TelegramBot(
@@ -256,6 +302,19 @@ class HarvestAgent:
         # Initialize notifier
         await self.notifier.initialize()
         
+        # Open pooled RPC connections before the first scan
+        await self.rpc_fallback_manager.start()
+        
+        # Keep hot prices fresh off the scan path
+        self.shared_price_cache.start_refresher()
+        self.cache_sweeper.start()
+        self.network_oracle.start()
+        
+        if self.balance_feed:
+            subscribed = self.multi_user_wallet.attach_balance_feed(self.balance_feed)
+            self.balance_feed.start()
+            logger.info(f"Balance feed streaming {subscribed} wallet(s)")
+        
         # Initialize Telegram bot with commands
         if self.telegram_bot:
             await self.telegram_bot.initialize()
@@ -303,7 +362,16 @@ class HarvestAgent:
         if self.telegram_bot:
             await self.telegram_bot.shutdown()
         await self.notifier.shutdown()
+        await self.shared_price_cache.stop_refresher()
+        await self.cache_sweeper.stop()
+        if self.balance_feed:
+            await self.balance_feed.stop()
+        await self.confirmation_tracker.stop()
+        await self.network_oracle.stop()
+        await self.rpc_fallback_manager.close()
         await self.multi_user_wallet.close_all()
+        self.performance_tracker.close()
+        await self.user_manager.close()
         logger.info("Cleanup complete")
 
 
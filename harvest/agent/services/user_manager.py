@@ -14,7 +14,7 @@ import logging
 from pathlib import Path
 from typing import Dict, Optional, List
 from datetime import datetime
-from agent.core.database import Database
+from agent.core.database import AsyncDatabase, Database
 
 logger = logging.getLogger(__name__)
 
@@ -138,13 +138,23 @@ class UserProfile:
 class UserManager:
     """Manage multiple users with individual profiles and memory using SQLite database."""
     
-    def __init__(self, storage_dir: str = "config/users", db_path: str = "config/harvest.db"):
+    def __init__(
+        self,
+        storage_dir: str = "config/users",
+        db_path: str = "config/harvest.db",
+        write_behind_ms: float = 0,
+        write_batch_size: int = 500
+    ):
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(parents=True, exist_ok=True)
         self.users: Dict[str, UserProfile] = {}
         
-        # Initialize database
-        self.db = Database(db_path)
+        # Initialize database; with write_behind_ms > 0 (main.py sets it
+        # from DB_WRITE_BEHIND_MS) chat traffic writes (messages,
+        # last_active) are group committed. Async handlers go through
+        # self.adb so queries run off the event loop
+        self.db = Database(db_path, write_behind_ms=write_behind_ms, write_batch_size=write_batch_size)
+        self.adb = AsyncDatabase(self.db)
         
         # Load users from database
         self._load_all_users()
@@ -210,9 +220,14 @@ class UserManager:
             logger.warning(f"Cannot save unknown user: {user_id}")
             return
         
-        profile = self.users[user_id]
+        self.db.update_user(
+            user_id,
+            preferences=self._preferences_json(self.users[user_id])
+        )
         
-        # Save ONLY preferences to database (no names, no wallet addresses)
+    @staticmethod
+    def _preferences_json(profile: UserProfile) -> str:
+        """Serialize ONLY preferences (no names, no wallet addresses)."""
         # Start with custom preferences, then override with specific fields
         preferences = {
             **profile.preferences,
@@ -220,11 +235,7 @@ class UserManager:
             'risk_tolerance': profile.risk_tolerance,
             'auto_execute': profile.auto_execute,
         }
-        
-        self.db.update_user(
-            user_id,
-            preferences=json.dumps(preferences)
-        )
+        return json.dumps(preferences)
     
     def add_conversation(self, user_id: str, role: str, content: str):
         """Add message to user's conversation history."""
@@ -239,7 +250,11 @@ class UserManager:
         """Get formatted conversation context for AI from database."""
         # Get from database
         history = self.db.get_conversation_history(user_id, limit)
+        return self._format_context(history)
         
+    @staticmethod
+    def _format_context(history: List[Dict]) -> str:
+        """Format conversation history rows for the AI prompt."""
         if not history:
             return "No previous conversation."
         
@@ -249,6 +264,60 @@ class UserManager:
         
         return context
     
+    # ==================== ASYNC (event loop) API ====================
+    
+    async def get_or_create_user_async(
+        self,
+        user_id: str,
+        username: str = None,
+        first_name: str = None
+    ) -> UserProfile:
+        """get_or_create_user without blocking the event loop."""
+        if user_id not in self.users:
+            await self.adb.create_user(user_id)
+            profile = UserProfile(user_id, username, first_name)
+            self.users[user_id] = profile
+            logger.info(f"Created new user profile: {user_id}")
+        else:
+            profile = self.users[user_id]
+            if username:
+                profile.username = username
+            if first_name:
+                profile.first_name = first_name
+        
+        await self.adb.update_last_active(user_id)
+        
+        return self.users[user_id]
+    
+    async def save_user_async(self, user_id: str):
+        """save_user without blocking the event loop."""
+        if user_id not in self.users:
+            logger.warning(f"Cannot save unknown user: {user_id}")
+            return
+        
+        await self.adb.update_user(
+            user_id,
+            preferences=self._preferences_json(self.users[user_id])
+        )
+    
+    async def add_conversation_async(self, user_id: str, role: str, content: str):
+        """add_conversation without blocking the event loop."""
+        profile = await self.get_or_create_user_async(user_id)
+        
+        await self.adb.add_conversation(user_id, role, content)
+        profile.add_message(role, content)
+        await self.save_user_async(user_id)
+    
+    async def get_user_context_async(self, user_id: str, limit: int = 10) -> str:
+        """get_user_context without blocking the event loop."""
+        history = await self.adb.get_conversation_history(user_id, limit)
+        return self._format_context(history)
+    
+    async def close(self):
+        """Finish queued async writes, flush buffered writes and close the database."""
+        await self.adb.close()
+        self.db.close()
+    
     def get_user_name(self, user_id: str) -> str:
         """Get user's preferred name."""
         if user_id in self.users:
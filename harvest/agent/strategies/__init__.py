@@ -3,7 +3,7 @@ Trading strategies for Harvest agent.
 
 Each strategy implements the Strategy interface:
 - scan(): Find opportunities
-- execute(): Execute trades
+- execute(opportunity, context): Execute trades for the user in the ExecutionContext
 """
 
 from agent.strategies.jupiter_swap import JupiterSwapStrategy
@@ -4,7 +4,7 @@ import logging
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
-from agent.trading.scanner import Strategy, Opportunity
+from agent.trading.scanner import Strategy, Opportunity, ExecutionContext
 from agent.services.notifier import ExecutionResult
 
 logger = logging.getLogger(__name__)
@@ -215,7 +215,11 @@ class AirdropHunterStrategy(Strategy):
             logger.error(f"Error getting token value: {e}")
             return 0.0
     
-    async def execute(self, opportunity: Opportunity) -> ExecutionResult:
+    async def execute(
+        self,
+        opportunity: Opportunity,
+        context: Optional[ExecutionContext] = None
+    ) -> ExecutionResult:
         """
         Execute an airdrop claim.
         
@@ -227,11 +231,14 @@ class AirdropHunterStrategy(Strategy):
         
         Args:
             opportunity: Opportunity to execute
+            context: Wallet, RPC client and risk limits for this execution
+                (the strategy's own wallet if omitted)
         
         Returns:
             ExecutionResult with transaction details
         
         """
+        context = context or self.default_context()
         try:
             protocol = opportunity.details.get("protocol_name", "Unknown")
             program_address = opportunity.details.get("program_address")
@@ -241,10 +248,10 @@ class AirdropHunterStrategy(Strategy):
             logger.info(f"Claiming airdrop from {protocol}: {claimable_amount} tokens")
             
             # Get initial token balance
-            initial_balance = await self._get_token_balance(token_mint)
+            initial_balance = await self._get_token_balance(token_mint, context.wallet)
             
             # Step 1: Fetch merkle proof for wallet
-            merkle_proof = await self._fetch_merkle_proof(program_address)
+            merkle_proof = await self._fetch_merkle_proof(program_address, context.wallet)
             
             if not merkle_proof:
                 logger.error(f"Failed to fetch merkle proof for {program_address}")
@@ -263,7 +270,8 @@ class AirdropHunterStrategy(Strategy):
                 program_address,
                 token_mint,
                 claimable_amount,
-                merkle_proof
+                merkle_proof,
+                context.wallet
             )
             
             if not claim_tx:
@@ -282,7 +290,9 @@ class AirdropHunterStrategy(Strategy):
             result = await self.executor.execute_transaction(
                 claim_tx,
                 self.get_name(),
-                expected_profit=opportunity.expected_profit
+                expected_profit=opportunity.expected_profit,
+                user_id=context.user_id,
+                wallet_manager=context.wallet
             )
             
             if not result.success:
@@ -292,7 +302,7 @@ class AirdropHunterStrategy(Strategy):
             logger.info(f"Claim transaction successful: {result.transaction_hash}")
             
             # Step 4: Verify tokens received
-            final_balance = await self._get_token_balance(token_mint)
+            final_balance = await self._get_token_balance(token_mint, context.wallet)
             tokens_received = final_balance - initial_balance
             
             if tokens_received > 0:
@@ -318,7 +328,7 @@ class AirdropHunterStrategy(Strategy):
                 timestamp=datetime.now()
             )
     
-    async def _fetch_merkle_proof(self, program_address: str) -> Optional[List[bytes]]:
+    async def _fetch_merkle_proof(self, program_address: str, wallet=None) -> Optional[List[bytes]]:
         """
         Fetch merkle proof for wallet from airdrop program.
         
@@ -329,13 +339,14 @@ class AirdropHunterStrategy(Strategy):
         
         Args:
             program_address: Airdrop program address
+            wallet: Wallet to fetch the proof for (the strategy's own wallet if omitted)
         
         Returns:
             Merkle proof as list of bytes, or None if not found
         
         """
         try:
-            wallet_pubkey = str(self.wallet_manager.get_public_key())
+            wallet_pubkey = str((wallet or self.wallet_manager).get_public_key())
             
             # In production, query actual merkle proof
             # This would typically involve:
@@ -363,7 +374,8 @@ class AirdropHunterStrategy(Strategy):
         program_address: str,
         token_mint: str,
         amount: float,
-        merkle_proof: List[bytes]
+        merkle_proof: List[bytes],
+        wallet=None
     ):
         """
         Create claim transaction for airdrop.
@@ -378,13 +390,14 @@ class AirdropHunterStrategy(Strategy):
             token_mint: Token mint address
             amount: Amount to claim
             merkle_proof: Merkle proof for claim
+            wallet: Wallet that claims (the strategy's own wallet if omitted)
         
         Returns:
             Unsigned transaction, or None if creation fails
         
         """
         try:
-            wallet_pubkey = self.wallet_manager.get_public_key()
+            wallet_pubkey = (wallet or self.wallet_manager).get_public_key()
             
             # In production, build actual claim transaction
             # This would typically involve:
@@ -418,19 +431,20 @@ class AirdropHunterStrategy(Strategy):
             logger.error(f"Error creating claim transaction: {e}")
             return None
     
-    async def _get_token_balance(self, token_mint: str) -> float:
+    async def _get_token_balance(self, token_mint: str, wallet=None) -> float:
         """
         Get current token balance for wallet.
         
         Args:
             token_mint: Token mint address
+            wallet: Wallet to query (the strategy's own wallet if omitted)
         
         Returns:
             Token balance
         
         """
         try:
-            wallet_pubkey = str(self.wallet_manager.get_public_key())
+            wallet_pubkey = str((wallet or self.wallet_manager).get_public_key())
             
             # In production, query actual token balance
             # This would typically involve:
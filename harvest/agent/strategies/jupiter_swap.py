@@ -1,16 +1,20 @@
 """Jupiter Swap Strategy - Finds profitable token swap opportunities."""
 
 import logging
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 
-from agent.trading.scanner import Strategy, Opportunity
+from agent.trading.scanner import Strategy, Opportunity, ExecutionContext
 from agent.services.notifier import ExecutionResult
+from agent.core.bounded_cache import BoundedCache
 from integrations.solana.jupiter import JupiterIntegration
 from integrations.solana.orca import OrcaIntegration
 
 logger = logging.getLogger(__name__)
 
+# Users whose Jupiter/Orca integrations are kept between executions
+MAX_CACHED_USER_DEXES = 5000
+
 
 class JupiterSwapStrategy(Strategy):
     """
@@ -57,6 +61,8 @@ class JupiterSwapStrategy(Strategy):
             rpc_client,
             wallet_manager.get_public_key()
         )
+        # Per-user integrations by wallet pubkey; they share the sessions above
+        self._user_dexes = BoundedCache(max_entries=MAX_CACHED_USER_DEXES, name="jupiter_user_dexes")
         
         # Token mint addresses
         self.SOL_MINT = "So11111111111111111111111111111111111111112"
@@ -389,7 +395,40 @@ class JupiterSwapStrategy(Strategy):
         """
         return self.slippage_failures
     
-    async def execute(self, opportunity: Opportunity) -> ExecutionResult:
+    def _dexes_for(self, context: ExecutionContext) -> Tuple[JupiterIntegration, OrcaIntegration]:
+        """
+        Jupiter and Orca integrations that build transactions for the context's wallet.
+        
+        Args:
+            context: Execution context
+        
+        Returns:
+            Tuple of (jupiter, orca)
+        """
+        if context.wallet is self.wallet_manager:
+            return self.jupiter, self.orca
+        
+        rpc_client = context.rpc_client or self.rpc_client
+        wallet_pubkey = context.wallet.get_public_key()
+        dexes = self._user_dexes.get(str(wallet_pubkey))
+        if dexes is None or dexes[0].rpc_client is not rpc_client:
+            dexes = (
+                JupiterIntegration(
+                    rpc_client,
+                    wallet_pubkey,
+                    api_key=self.jupiter.api_key,
+                    session=self.jupiter.session
+                ),
+                OrcaIntegration(rpc_client, wallet_pubkey, session=self.orca.session)
+            )
+            self._user_dexes[str(wallet_pubkey)] = dexes
+        return dexes
+    
+    async def execute(
+        self,
+        opportunity: Opportunity,
+        context: Optional[ExecutionContext] = None
+    ) -> ExecutionResult:
         """
         Execute a swap opportunity.
         
@@ -402,11 +441,14 @@ class JupiterSwapStrategy(Strategy):
         
         Args:
             opportunity: Opportunity to execute
+            context: Wallet, RPC client and risk limits for this execution
+                (the strategy's own wallet if omitted)
         
         Returns:
             ExecutionResult with transaction details
         
         """
+        context = context or self.default_context()
         try:
             route_type = opportunity.details.get("type", "")
             path = opportunity.details.get("path", "")
@@ -418,7 +460,21 @@ class JupiterSwapStrategy(Strategy):
             logger.debug("Revalidating quote before execution...")
             
             # Get initial balance
-            initial_balance = await self.wallet_manager.get_balance()
+            initial_balance = await context.wallet.get_balance()
+            
+            max_position_pct = context.risk_limits.get("max_position_pct")
+            if max_position_pct is not None and input_amount > initial_balance * max_position_pct:
+                logger.warning(
+                    f"Swap of {input_amount:.4f} SOL exceeds {max_position_pct:.0%} "
+                    f"of balance {initial_balance:.4f} SOL, aborting execution"
+                )
+                return ExecutionResult(
+                    success=False,
+                    transaction_hash=None,
+                    profit=0.0,
+                    error="Swap amount exceeds max position size",
+                    timestamp=datetime.now()
+                )
             
             # Revalidate the opportunity to ensure prices haven't changed
             fresh_opportunity = self._revalidate_opportunity(opportunity)
@@ -452,10 +508,10 @@ class JupiterSwapStrategy(Strategy):
             # Step 2 & 3: Create and execute swap transaction
             if "cross_arb" in route_type:
                 # Cross-DEX arbitrage requires sequential execution
-                result = await self._execute_cross_dex_arbitrage(fresh_opportunity)
+                result = await self._execute_cross_dex_arbitrage(fresh_opportunity, context)
             else:
                 # Single-DEX arbitrage
-                result = await self._execute_single_dex_swap(fresh_opportunity)
+                result = await self._execute_single_dex_swap(fresh_opportunity, context)
             
             # Record slippage failures
             if not result.success and "slippage" in result.error.lower():
@@ -463,7 +519,7 @@ class JupiterSwapStrategy(Strategy):
             
             # Step 4 & 5: Verify output tokens and calculate actual profit
             if result.success:
-                final_balance = await self.wallet_manager.get_balance()
+                final_balance = await context.wallet.get_balance()
                 actual_profit = final_balance - initial_balance
                 
                 logger.info(
@@ -595,7 +651,11 @@ class JupiterSwapStrategy(Strategy):
             logger.error(f"Failed to revalidate opportunity: {e}")
             return None
     
-    async def _execute_single_dex_swap(self, opportunity: Opportunity) -> ExecutionResult:
+    async def _execute_single_dex_swap(
+        self,
+        opportunity: Opportunity,
+        context: ExecutionContext
+    ) -> ExecutionResult:
         """
         Execute a single-DEX arbitrage (two swaps on same DEX).
         
@@ -603,6 +663,7 @@ class JupiterSwapStrategy(Strategy):
         
         Args:
             opportunity: Opportunity to execute
+            context: Execution context
         
         Returns:
             ExecutionResult with transaction details
@@ -611,17 +672,18 @@ class JupiterSwapStrategy(Strategy):
         try:
             route_type = opportunity.details.get("type", "")
             input_amount = opportunity.details.get("input_amount", 0.0)
+            jupiter, orca = self._dexes_for(context)
             
             # Determine which DEX to use
             if route_type == "jupiter_arb":
-                primary_dex = self.jupiter
+                primary_dex = jupiter
                 primary_name = "Jupiter"
-                fallback_dex = self.orca
+                fallback_dex = orca
                 fallback_name = "Orca"
             elif route_type == "orca_arb":
-                primary_dex = self.orca
+                primary_dex = orca
                 primary_name = "Orca"
-                fallback_dex = self.jupiter
+                fallback_dex = jupiter
                 fallback_name = "Jupiter"
             else:
                 raise Exception(f"Invalid single-DEX route type: {route_type}")
@@ -633,7 +695,8 @@ class JupiterSwapStrategy(Strategy):
                 primary_dex,
                 primary_name,
                 input_amount,
-                opportunity.expected_profit
+                opportunity.expected_profit,
+                context
             )
             
             # If primary DEX failed, try fallback
@@ -647,7 +710,8 @@ class JupiterSwapStrategy(Strategy):
                     fallback_dex,
                     fallback_name,
                     input_amount,
-                    opportunity.expected_profit
+                    opportunity.expected_profit,
+                    context
                 )
                 
                 if result.success:
@@ -672,7 +736,8 @@ class JupiterSwapStrategy(Strategy):
         dex,
         dex_name: str,
         input_amount: float,
-        expected_profit: float
+        expected_profit: float,
+        context: ExecutionContext
     ) -> ExecutionResult:
         """
         Execute a two-leg swap on a single DEX.
@@ -682,6 +747,7 @@ class JupiterSwapStrategy(Strategy):
             dex_name: Name of the DEX for logging
             input_amount: Amount of SOL to swap
             expected_profit: Expected profit from the swap
+            context: Execution context
         
         Returns:
             ExecutionResult with transaction details
@@ -717,7 +783,9 @@ class JupiterSwapStrategy(Strategy):
             result1 = await self.executor.execute_transaction(
                 tx1,
                 self.get_name(),
-                expected_profit=0.0  # Intermediate step, no profit yet
+                expected_profit=0.0,  # Intermediate step, no profit yet
+                user_id=context.user_id,
+                wallet_manager=context.wallet
             )
             
             if not result1.success:
@@ -757,7 +825,9 @@ class JupiterSwapStrategy(Strategy):
             result2 = await self.executor.execute_transaction(
                 tx2,
                 self.get_name(),
-                expected_profit=expected_profit
+                expected_profit=expected_profit,
+                user_id=context.user_id,
+                wallet_manager=context.wallet
             )
             
             if not result2.success:
@@ -785,7 +855,11 @@ class JupiterSwapStrategy(Strategy):
                 timestamp=datetime.now()
             )
     
-    async def _execute_cross_dex_arbitrage(self, opportunity: Opportunity) -> ExecutionResult:
+    async def _execute_cross_dex_arbitrage(
+        self,
+        opportunity: Opportunity,
+        context: ExecutionContext
+    ) -> ExecutionResult:
         """
         Execute cross-DEX arbitrage with sequential legs.
         
@@ -797,6 +871,7 @@ class JupiterSwapStrategy(Strategy):
         
         Args:
             opportunity: Opportunity to execute
+            context: Execution context
         
         Returns:
             ExecutionResult with transaction details
@@ -805,19 +880,20 @@ class JupiterSwapStrategy(Strategy):
         try:
             route_type = opportunity.details.get("type", "")
             input_amount = opportunity.details.get("input_amount", 0.0)
+            jupiter, orca = self._dexes_for(context)
             
             logger.info(f"Executing cross-DEX arbitrage: {route_type}")
             
             # Determine DEX routing
             if route_type == "cross_arb_jupiter_orca":
-                first_dex = self.jupiter
+                first_dex = jupiter
                 first_dex_name = "Jupiter"
-                second_dex = self.orca
+                second_dex = orca
                 second_dex_name = "Orca"
             elif route_type == "cross_arb_orca_jupiter":
-                first_dex = self.orca
+                first_dex = orca
                 first_dex_name = "Orca"
-                second_dex = self.jupiter
+                second_dex = jupiter
                 second_dex_name = "Jupiter"
             else:
                 raise Exception(f"Invalid cross-DEX route type: {route_type}")
@@ -841,7 +917,9 @@ class JupiterSwapStrategy(Strategy):
             result1 = await self.executor.execute_transaction(
                 tx1,
                 self.get_name(),
-                expected_profit=0.0  # Intermediate step, no profit yet
+                expected_profit=0.0,  # Intermediate step, no profit yet
+                user_id=context.user_id,
+                wallet_manager=context.wallet
             )
             
             # Step 2: Verify first leg success before proceeding
@@ -883,7 +961,9 @@ class JupiterSwapStrategy(Strategy):
             result2 = await self.executor.execute_transaction(
                 tx2,
                 self.get_name(),
-                expected_profit=opportunity.expected_profit
+                expected_profit=opportunity.expected_profit,
+                user_id=context.user_id,
+                wallet_manager=context.wallet
             )
             
             if not result2.success:
@@ -4,12 +4,16 @@ import logging
 from typing import List, Dict, Optional
 from datetime import datetime
 
-from agent.trading.scanner import Strategy, Opportunity
+from agent.trading.scanner import Strategy, Opportunity, ExecutionContext
 from agent.trading.transaction_executor import TransactionExecutor, ExecutionResult
+from agent.core.bounded_cache import BoundedCache
 from integrations.solana.marinade import MarinadeIntegration
 
 logger = logging.getLogger(__name__)
 
+# Users whose Marinade integrations are kept between executions
+MAX_CACHED_USER_INTEGRATIONS = 5000
+
 
 class MarinadeStakeStrategy(Strategy):
     """
@@ -45,6 +49,11 @@ class MarinadeStakeStrategy(Strategy):
             rpc_client,
             wallet_manager.get_public_key()
         )
+        # Per-user integrations by wallet pubkey
+        self._user_marinade = BoundedCache(
+            max_entries=MAX_CACHED_USER_INTEGRATIONS,
+            name="marinade_user_integrations"
+        )
         
         # Track staking positions for yield calculation
         self.staking_positions: List[Dict] = []
@@ -157,7 +166,23 @@ class MarinadeStakeStrategy(Strategy):
         
         return opportunities
     
-    async def execute(self, opportunity: Opportunity) -> ExecutionResult:
+    def _marinade_for(self, context: ExecutionContext) -> MarinadeIntegration:
+        """Marinade integration that builds transactions for the context's wallet."""
+        if context.wallet is self.wallet_manager:
+            return self.marinade
+        rpc_client = context.rpc_client or self.rpc_client
+        wallet_pubkey = context.wallet.get_public_key()
+        marinade = self._user_marinade.get(str(wallet_pubkey))
+        if marinade is None or marinade.rpc_client is not rpc_client:
+            marinade = MarinadeIntegration(rpc_client, wallet_pubkey)
+            self._user_marinade[str(wallet_pubkey)] = marinade
+        return marinade
+    
+    async def execute(
+        self,
+        opportunity: Opportunity,
+        context: Optional[ExecutionContext] = None
+    ) -> ExecutionResult:
         """
         Execute a staking opportunity.
         
@@ -169,12 +194,16 @@ class MarinadeStakeStrategy(Strategy):
         
         Args:
             opportunity: Opportunity to execute
+            context: Wallet, RPC client and risk limits for this execution
+                (the strategy's own wallet if omitted)
         
         Returns:
             ExecutionResult with transaction details
         
         """
+        context = context or self.default_context()
         try:
+            marinade = self._marinade_for(context)
             stake_amount = opportunity.details.get("stake_amount")
             expected_msol = opportunity.details.get("expected_msol")
             
@@ -182,19 +211,21 @@ class MarinadeStakeStrategy(Strategy):
             
             # Get initial mSOL balance
             try:
-                initial_msol_balance = self.marinade.get_msol_balance()
+                initial_msol_balance = marinade.get_msol_balance()
             except Exception as e:
                 logger.warning(f"Could not get initial mSOL balance: {e}")
                 initial_msol_balance = 0.0
             
             # Create stake transaction via Marinade integration (Requirement 3.3)
-            transaction = self.marinade.create_stake_transaction(stake_amount)
+            transaction = marinade.create_stake_transaction(stake_amount)
             
             # Execute transaction via TransactionExecutor (Requirement 3.3)
             result = await self.executor.execute_transaction(
                 transaction=transaction,
                 strategy_name=self.get_name(),
-                expected_profit=opportunity.expected_profit
+                expected_profit=opportunity.expected_profit,
+                user_id=context.user_id,
+                wallet_manager=context.wallet
             )
             
             if not result.success:
@@ -203,7 +234,7 @@ class MarinadeStakeStrategy(Strategy):
             
             # Verify mSOL tokens received (Requirement 3.4)
             try:
-                final_msol_balance = self.marinade.get_msol_balance()
+                final_msol_balance = marinade.get_msol_balance()
                 msol_received = final_msol_balance - initial_msol_balance
                 
                 logger.info(
@@ -225,6 +256,7 @@ class MarinadeStakeStrategy(Strategy):
             
             # Record staking position (Requirement 3.4)
             position = {
+                "user_id": context.user_id,
                 "timestamp": datetime.now(),
                 "stake_amount": stake_amount,
                 "msol_received": msol_received,
@@ -309,7 +341,11 @@ class MarinadeStakeStrategy(Strategy):
             logger.error(f"Error creating unstake opportunity: {e}", exc_info=True)
             return None
     
-    async def execute_unstake(self, opportunity: Opportunity) -> ExecutionResult:
+    async def execute_unstake(
+        self,
+        opportunity: Opportunity,
+        context: Optional[ExecutionContext] = None
+    ) -> ExecutionResult:
         """
         Execute an unstaking opportunity.
         
@@ -320,11 +356,14 @@ class MarinadeStakeStrategy(Strategy):
         
         Args:
             opportunity: Unstake opportunity to execute
+            context: Wallet, RPC client and risk limits for this execution
+                (the strategy's own wallet if omitted)
         
         Returns:
             ExecutionResult with transaction details
         
         """
+        context = context or self.default_context()
         try:
             msol_amount = opportunity.details.get("msol_amount")
             expected_sol = opportunity.details.get("expected_sol")
@@ -332,16 +371,18 @@ class MarinadeStakeStrategy(Strategy):
             logger.info(f"Executing Marinade unstake: {msol_amount:.4f} mSOL")
             
             # Get initial SOL balance
-            initial_sol_balance = self.wallet_manager.get_balance()
+            initial_sol_balance = context.wallet.get_balance()
             
             # Create unstake transaction via Marinade integration (Requirement 3.5)
-            transaction = self.marinade.create_unstake_transaction(msol_amount)
+            transaction = self._marinade_for(context).create_unstake_transaction(msol_amount)
             
             # Execute transaction via TransactionExecutor (Requirement 3.5)
             result = await self.executor.execute_transaction(
                 transaction=transaction,
                 strategy_name=self.get_name(),
-                expected_profit=0.0  # Unstaking doesn't generate profit
+                expected_profit=0.0,  # Unstaking doesn't generate profit
+                user_id=context.user_id,
+                wallet_manager=context.wallet
             )
             
             if not result.success:
@@ -350,7 +391,7 @@ class MarinadeStakeStrategy(Strategy):
             
             # Verify SOL received (Requirement 3.5)
             try:
-                final_sol_balance = self.wallet_manager.get_balance()
+                final_sol_balance = context.wallet.get_balance()
                 sol_received = final_sol_balance - initial_sol_balance
                 
                 logger.info(
@@ -9,13 +9,14 @@ Core trading functionality:
 """
 
 from .loop import AgentLoop
-from .scanner import Scanner
+from .scanner import Scanner, ExecutionContext
 from .risk_manager import RiskManager
 from .performance import PerformanceTracker
 
 __all__ = [
     'AgentLoop',
     'Scanner',
+    'ExecutionContext',
     'RiskManager',
     'PerformanceTracker',
     'PerformanceRecord',
@@ -0,0 +1,289 @@
+"""
+Shared confirmation tracking for submitted transactions.
+
+Executors register a signature and await its future. One background loop
+polls getSignatureStatuses for every in-flight signature at once, up to
+256 per request, and resolves each future as soon as its transaction
+reaches the target commitment or fails. N concurrent trades therefore cost
+one RPC per poll instead of N.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# getSignatureStatuses accepts at most this many signatures per request
+MAX_SIGNATURES_PER_REQUEST = 256
+
+
+class TransactionFailedError(Exception):
+    """Raised to waiters when a transaction landed with an error."""
+    
+    def __init__(self, signature: str, err: Any):
+        super().__init__(f"Transaction failed: {err}")
+        self.signature = signature
+        self.err = err
+
+
+@dataclass
+class ConfirmationStats:
+    """Statistics for the confirmation tracker."""
+    polls: int = 0  # getSignatureStatuses requests sent
+    signatures_polled: int = 0
+    confirmed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    rpc_errors: int = 0
+
+
+class ConfirmationTracker:
+    """
+    Batched confirmation polling for all in-flight signatures.
+    
+    The poll loop starts with the first registered signature and stops when
+    none are left. Polling starts at min_poll_interval and backs off towards
+    max_poll_interval while nothing changes, dropping back whenever a
+    signature is registered or resolved.
+    """
+    
+    def __init__(
+        self,
+        rpc_client: Any,
+        commitment: str = "confirmed",
+        min_poll_interval: float = 0.4,
+        max_poll_interval: float = 2.0,
+        backoff: float = 1.5
+    ):
+        """
+        Initialize confirmation tracker.
+        
+        Args:
+            rpc_client: Client with get_signature_statuses (solana AsyncClient
+                or RPCFallbackManager)
+            commitment: Commitment a transaction must reach, "confirmed" or
+                "finalized" (default "confirmed")
+            min_poll_interval: Seconds between polls while things change (default 0.4, about one slot)
+            max_poll_interval: Longest gap between polls (default 2.0)
+            backoff: Interval growth factor per idle poll (default 1.5)
+        """
+        self.rpc_client = rpc_client
+        self.commitment = commitment
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff = backoff
+        self.stats = ConfirmationStats()
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._waiters: Dict[str, int] = {}
+        self._registered_at: Dict[str, float] = {}
+        self._interval = min_poll_interval
+        self._registered_since_poll = False
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        
+        logger.info(f"ConfirmationTracker initialized (commitment={commitment})")
+    
+    def _reached_commitment(self, confirmation_status: Optional[str]) -> bool:
+        if self.commitment == "finalized":
+            return confirmation_status == "finalized"
+        return confirmation_status in ("confirmed", "finalized")
+    
+    def track(self, signature: str) -> asyncio.Future:
+        """
+        Register a signature for confirmation polling.
+        
+        Args:
+            signature: Transaction signature
+        
+        Returns:
+            Future resolving to True once confirmed, or raising
+            TransactionFailedError if the transaction failed
+        """
+        future = self._futures.get(signature)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._futures[signature] = future
+            self._registered_at[signature] = time.monotonic()
+            # Poll soon for the new signature
+            self._registered_since_poll = True
+            self._wakeup.set()
+        
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll_loop())
+        
+        return future
+    
+    def untrack(self, signature: str):
+        """Stop polling a signature; pending waiters are cancelled."""
+        future = self._futures.pop(signature, None)
+        self._waiters.pop(signature, None)
+        self._registered_at.pop(signature, None)
+        if future is not None and not future.done():
+            future.cancel()
+    
+    async def wait(self, signature: str, timeout: float) -> bool:
+        """
+        Wait for a signature to reach the tracker's commitment.
+        
+        Args:
+            signature: Transaction signature
+            timeout: Seconds to wait
+        
+        Returns:
+            True if confirmed, False on timeout
+        
+        Raises:
+            TransactionFailedError: If the transaction landed with an error
+        """
+        future = self.track(signature)
+        self._waiters[signature] = self._waiters.get(signature, 0) + 1
+        
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self.stats.timed_out += 1
+            logger.warning(f"Transaction confirmation timeout: {signature}")
+            return False
+        finally:
+            remaining = self._waiters.get(signature, 1) - 1
+            if remaining > 0:
+                self._waiters[signature] = remaining
+            elif not future.done():
+                # Nobody is waiting any more
+                self.untrack(signature)
+            else:
+                self._waiters.pop(signature, None)
+    
+    async def stop(self):
+        """Stop polling and cancel every pending waiter."""
+        for signature in list(self._futures):
+            self.untrack(signature)
+        
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _poll_loop(self):
+        """Poll in-flight signatures until none are left."""
+        while self._futures:
+            self._registered_since_poll = False
+            changed = await self._poll_once()
+            
+            if changed or self._registered_since_poll:
+                self._interval = self.min_poll_interval
+            else:
+                self._interval = min(self._interval * self.backoff, self.max_poll_interval)
+            
+            if not self._futures:
+                break
+            
+            deadline = time.monotonic() + self._interval
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._interval)
+            except asyncio.TimeoutError:
+                continue
+            
+            # A signature arrived during a backed-off wait; poll within one slot
+            await asyncio.sleep(max(0.0, min(deadline - time.monotonic(), self.min_poll_interval)))
+    
+    async def _poll_once(self) -> bool:
+        """
+        Fetch statuses for all in-flight signatures and resolve finished ones.
+        
+        Returns:
+            True if any signature was resolved
+        """
+        signatures = list(self._futures)
+        chunks = [
+            signatures[i:i + MAX_SIGNATURES_PER_REQUEST]
+            for i in range(0, len(signatures), MAX_SIGNATURES_PER_REQUEST)
+        ]
+        responses = await asyncio.gather(
+            *(self.rpc_client.get_signature_statuses(chunk) for chunk in chunks),
+            return_exceptions=True
+        )
+        
+        changed = False
+        for chunk, response in zip(chunks, responses):
+            self.stats.polls += 1
+            self.stats.signatures_polled += len(chunk)
+            
+            if isinstance(response, Exception):
+                self.stats.rpc_errors += 1
+                logger.debug(f"Error checking confirmations: {response}")
+                continue
+            
+            for signature, status in zip(chunk, self._status_values(response)):
+                if status is not None and self._resolve(signature, status):
+                    changed = True
+        
+        return changed
+    
+    @staticmethod
+    def _status_values(response: Any) -> List[Any]:
+        """Status list from a solana-py response or a raw JSON-RPC result."""
+        if isinstance(response, dict):
+            return response.get("value") or []
+        return getattr(response, "value", None) or []
+    
+    def _resolve(self, signature: str, status: Any) -> bool:
+        """Resolve a signature's future if its status is final; returns True if resolved."""
+        if isinstance(status, dict):
+            err = status.get("err")
+            confirmation_status = status.get("confirmationStatus")
+        else:
+            err = getattr(status, "err", None)
+            confirmation_status = getattr(status, "confirmation_status", None)
+            # solders reports an enum (TransactionConfirmationStatus.Confirmed)
+            if confirmation_status is not None and not isinstance(confirmation_status, str):
+                confirmation_status = str(confirmation_status).rsplit(".", 1)[-1].lower()
+        
+        future = self._futures.get(signature)
+        if future is None:
+            return False
+        
+        if err:
+            self.stats.failed += 1
+            future.set_exception(TransactionFailedError(signature, err))
+            # Retrieved here in case every waiter already gave up
+            future.exception()
+        elif self._reached_commitment(confirmation_status):
+            self.stats.confirmed += 1
+            elapsed = time.monotonic() - self._registered_at.get(signature, time.monotonic())
+            logger.debug(f"Transaction confirmed: {signature} ({elapsed:.1f}s)")
+            future.set_result(True)
+        else:
+            return False
+        
+        del self._futures[signature]
+        self._registered_at.pop(signature, None)
+        return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get confirmation tracker statistics.
+        
+        Returns:
+            Dictionary with in-flight count, poll counts and outcomes
+        """
+        return {
+            "in_flight": len(self._futures),
+            "poll_interval": self._interval,
+            "polls": self.stats.polls,
+            "signatures_per_poll": (
+                self.stats.signatures_polled / self.stats.polls if self.stats.polls else 0.0
+            ),
+            "confirmed": self.stats.confirmed,
+            "failed": self.stats.failed,
+            "timed_out": self.stats.timed_out,
+            "rpc_errors": self.stats.rpc_errors,
+        }
@@ -1,16 +1,20 @@
 """Core agent loop for Harvest - scan, decide, execute, notify."""
 
 import asyncio
+import inspect
 import logging
 from typing import List, Optional, Dict
+from dataclasses import replace
 from datetime import datetime
 from time import time
 
 from agent.core.wallet import WalletManager
-from agent.trading.scanner import Scanner, Opportunity
+from agent.core.multi_api_manager import APIKeyManager
+from agent.trading.scanner import Scanner, Opportunity, Strategy, ExecutionContext
 from agent.core.provider import Provider, Decision
 from agent.services.notifier import Notifier, ExecutionResult
 from agent.monitoring.user_control import UserControl
+from agent.services.user_manager import UserManager
 from agent.trading.risk_manager import RiskManager
 from agent.trading.performance import PerformanceTracker
 from agent.trading.trade_queue import TradeQueue
@@ -20,6 +24,41 @@ logger = logging.getLogger(__name__)
 activity_logger = get_activity_logger()
 
 
+class _RatePacer:
+    """
+    Spaces out acquisitions so they never exceed a fixed rate.
+
+    Each acquire() reserves the next free slot and sleeps until it arrives,
+    so callers are released evenly instead of in bursts.
+    """
+
+    def __init__(self, rate: float):
+        """
+        Initialize pacer.
+
+        Args:
+            rate: Maximum acquisitions per second
+        """
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+
+    async def acquire(self):
+        """Wait for the next free slot."""
+        now = time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def _accepts_context(strategy: Strategy) -> bool:
+    """True if the strategy's execute() takes an ExecutionContext."""
+    try:
+        return "context" in inspect.signature(strategy.execute).parameters
+    except (TypeError, ValueError):
+        return False
+
+
 class AgentLoop:
     """
     Main control loop that orchestrates all Harvest components.
@@ -46,6 +85,7 @@ class AgentLoop:
     RATE_LIMIT_INCREASE_FACTOR = 1.5  # Increase interval by 50% on rate limits
     EMPTY_SCAN_THRESHOLD = 10  # Number of empty scans before increasing interval
     EMPTY_SCAN_INTERVAL = 30  # Interval after empty scans (seconds)
+    STAGGER_THRESHOLD = 100  # User count above which scan starts are spread over stagger_window
     
     def __init__(
         self,
@@ -60,6 +100,12 @@ class AgentLoop:
         scan_interval: int = DEFAULT_SCAN_INTERVAL,
         min_trading_balance: float = 0.01,  # New parameter for minimum trading balance
         stagger_window: int = 60,  # New parameter for staggered scanning window in seconds
+        max_concurrent_scans: int = 50,
+        user_scan_timeout: float = 30.0,
+        scan_rate_per_key: float = 10.0,
+        api_key_manager: Optional[APIKeyManager] = None,
+        max_concurrent_trades: int = 8,
+        user_manager: Optional[UserManager] = None,
     ):
         """
         Initialize agent loop with all required components.
@@ -76,6 +122,12 @@ class AgentLoop:
             scan_interval: Interval between scans in seconds (default 300)
             min_trading_balance: Minimum balance required to trade in SOL (default 0.01)
             stagger_window: Time window for staggering large user base scans in seconds (default 60)
+            max_concurrent_scans: Maximum number of user scans in flight at once (default 50)
+            user_scan_timeout: Seconds before a single user's scan is abandoned (default 30)
+            scan_rate_per_key: Maximum user scans started per second on each RPC key (default 10)
+            api_key_manager: APIKeyManager used to group users by RPC key (optional)
+            max_concurrent_trades: Maximum wallets executing trades at once (default 8)
+            user_manager: UserManager whose profiles filter shared opportunities (optional)
         """
         self.wallet = wallet
         self.scanner = scanner
@@ -88,6 +140,11 @@ class AgentLoop:
         self.scan_interval = scan_interval
         self.min_trading_balance = min_trading_balance  # New attribute
         self.stagger_window = stagger_window  # New attribute for staggered scanning
+        self.max_concurrent_scans = max(1, max_concurrent_scans)
+        self.user_scan_timeout = user_scan_timeout
+        self.scan_rate_per_key = scan_rate_per_key
+        self.api_key_manager = api_key_manager
+        self.user_manager = user_manager
 
         self._running = False
         self._last_scan_time: Optional[datetime] = None
@@ -100,8 +157,8 @@ class AgentLoop:
         # New: Track user balances for activation/deactivation detection
         self.user_balance_cache: Dict[str, float] = {}
         
-        # New: Trade execution queue for serializing trades
-        self.trade_queue = TradeQueue()
+        # Trade execution queue, serialized per wallet and parallel across wallets
+        self.trade_queue = TradeQueue(max_concurrency=max_concurrent_trades)
 
         logger.info(f"AgentLoop initialized with scan interval: {scan_interval}s, min_trading_balance: {min_trading_balance} SOL, stagger_window: {stagger_window}s")
 
@@ -211,12 +268,17 @@ Use /decline_fee to decline
         """
         Execute one scan cycle across all users.
 
-        Iterates through all registered users, checking balances and scanning
-        for opportunities independently for each user. Implements error isolation
-        so that failures for one user don't affect others.
+        Balances for all users are prefetched in bulk first. The cycle then
+        runs in two phases. The market phase scans every strategy
+        once and produces market-level opportunities. The user phase then
+        checks each user's balance and sizes/filters those shared
+        opportunities for that user, so strategy scan cost stays flat as the
+        user base grows. Implements error isolation so that failures for one
+        user don't affect others.
         
-        For large user bases (>100 users), implements staggered scanning to
-        distribute load over time and avoid overwhelming RPC providers.
+        User scans run concurrently with bounded parallelism and are paced
+        per RPC key. For large user bases (>100 users), scan starts are also
+        spread across the stagger window to avoid overwhelming RPC providers.
 
         Returns:
             Dict mapping user_id to list of opportunities found
@@ -226,6 +288,7 @@ Use /decline_fee to decline
         logger.info("Starting multi-user scan cycle...")
         self._last_scan_time = datetime.now()
         scan_start_time = time()
+        phase_durations: Dict[str, float] = {}
 
         # Get all user IDs with registered wallets
         user_ids = self.wallet.get_all_user_ids()
@@ -237,139 +300,250 @@ Use /decline_fee to decline
 
         logger.info(f"Scanning for {len(user_ids)} registered users")
 
-        # Collect opportunities per user
-        opportunities_by_user: Dict[str, List[Opportunity]] = {}
-        total_opportunities = 0
+        # Warm the wallet balance cache so per-user scans don't each hit RPC
+        phase_start = time()
+        await self.prefetch_balances(user_ids)
+        phase_durations["balance_prefetch"] = time() - phase_start
 
-        # Check if we need staggered scanning (>100 users)
-        if len(user_ids) > 100:
-            logger.info(f"Large user base detected ({len(user_ids)} users) - using staggered scanning")
-            
-            # Calculate batch size and delay between batches
-            num_batches = max(1, len(user_ids) // 20)  # Aim for ~20 users per batch
-            batch_size = (len(user_ids) + num_batches - 1) // num_batches  # Ceiling division
-            delay_between_batches = self.stagger_window / num_batches if num_batches > 1 else 0
-            
-            logger.info(f"Staggered scanning: {num_batches} batches of ~{batch_size} users, {delay_between_batches:.2f}s delay between batches")
-            
-            # Process users in batches with delays
-            for batch_idx in range(num_batches):
-                start_idx = batch_idx * batch_size
-                end_idx = min(start_idx + batch_size, len(user_ids))
-                batch_user_ids = user_ids[start_idx:end_idx]
-                
-                logger.debug(f"Processing batch {batch_idx + 1}/{num_batches}: users {start_idx} to {end_idx}")
-                
-                # Scan users in this batch
-                for user_id in batch_user_ids:
-                    try:
-                        # Scan for opportunities for this user
-                        user_opportunities = await self.scan_user(user_id)
-
-                        if user_opportunities:
-                            opportunities_by_user[user_id] = user_opportunities
-                            total_opportunities += len(user_opportunities)
-                            logger.info(f"Found {len(user_opportunities)} opportunities for user {user_id}")
-
-                    except Exception as e:
-                        # Error isolation: log error but continue with other users
-                        logger.error(
-                            f"Error scanning for user {user_id}: {e}",
-                            exc_info=True
-                        )
-                        activity_logger.log_error(
-                            component="AgentLoop",
-                            error_type=type(e).__name__,
-                            error_message=f"User scan failed: {str(e)}",
-                            user_id=user_id,
-                        )
-                        # Continue with next user
-                        continue
-                
-                # Add delay before next batch (except for last batch)
-                if batch_idx < num_batches - 1 and delay_between_batches > 0:
-                    logger.debug(f"Stagger delay: waiting {delay_between_batches:.2f}s before next batch")
-                    await asyncio.sleep(delay_between_batches)
-        else:
-            # Standard scanning for smaller user bases
-            # Iterate through each user
-            for user_id in user_ids:
-                try:
-                    # Scan for opportunities for this user
-                    user_opportunities = await self.scan_user(user_id)
+        # Phase 1: one shared market scan for the whole cycle
+        phase_start = time()
+        market_opportunities = await self.scan_market()
+        phase_durations["market_scan"] = time() - phase_start
 
-                    if user_opportunities:
-                        opportunities_by_user[user_id] = user_opportunities
-                        total_opportunities += len(user_opportunities)
-                        logger.info(f"Found {len(user_opportunities)} opportunities for user {user_id}")
+        # Phase 2: cheap per-user sizing and filtering
+        phase_start = time()
+        opportunities_by_user = await self._scan_users(user_ids, market_opportunities)
+        total_opportunities = sum(len(opps) for opps in opportunities_by_user.values())
+        phase_durations["user_scan"] = time() - phase_start
 
+        # Process opportunities for each user
+        phase_start = time()
+        for user_id, opportunities in opportunities_by_user.items():
+            for opportunity in opportunities:
+                try:
+                    await self._process_opportunity(opportunity, user_id)
                 except Exception as e:
-                    # Error isolation: log error but continue with other users
+                    if self._is_rate_limit_error(e):
+                        logger.warning(f"Rate limit detected: {e}")
+                        self._rate_limit_detected = True
+
                     logger.error(
-                        f"Error scanning for user {user_id}: {e}",
+                        f"Error processing opportunity for user {user_id} from {opportunity.strategy_name}: {e}",
                         exc_info=True
                     )
                     activity_logger.log_error(
                         component="AgentLoop",
                         error_type=type(e).__name__,
-                        error_message=f"User scan failed: {str(e)}",
+                        error_message=str(e),
+                        strategy=opportunity.strategy_name,
+                        action=opportunity.action,
                         user_id=user_id,
                     )
-                    # Continue with next user
+                    # Continue with next opportunity despite error
                     continue
+        phase_durations["processing"] = time() - phase_start
 
         scan_duration = time() - scan_start_time
 
         if total_opportunities == 0:
             logger.info("No opportunities found across all users in this cycle")
-            activity_logger.log_scan_cycle(0, scan_duration)
 
             # Track empty scans for adaptive interval management
             self._empty_scan_count += 1
             logger.debug(f"Empty scan count: {self._empty_scan_count}")
         else:
             logger.info(f"Found {total_opportunities} total opportunities across {len(opportunities_by_user)} users")
-            activity_logger.log_scan_cycle(total_opportunities, scan_duration)
             self._empty_scan_count = 0
 
-        # Process opportunities for each user
-        for user_id, opportunities in opportunities_by_user.items():
-            for opportunity in opportunities:
+        activity_logger.log_scan_cycle(total_opportunities, scan_duration, phase_durations)
+
+        return opportunities_by_user
+
+    async def _scan_users(
+        self,
+        user_ids: List[str],
+        market_opportunities: List[Opportunity],
+    ) -> Dict[str, List[Opportunity]]:
+        """
+        Scan users concurrently with bounded parallelism and per-key pacing.
+
+        At most max_concurrent_scans user scans are in flight at once, and each
+        scan is abandoned after user_scan_timeout seconds. Scan starts are paced
+        per RPC key so no key exceeds scan_rate_per_key. For large user bases
+        the pace is further reduced so starts spread evenly over the stagger
+        window instead of arriving in bursts. A failure or timeout for one user
+        never affects the others.
+
+        Args:
+            user_ids: Users to scan
+            market_opportunities: Opportunities from this cycle's market scan
+
+        Returns:
+            Dict mapping user_id to its non-empty list of opportunities
+        """
+        key_by_user = {user_id: self._get_rpc_key_index(user_id) for user_id in user_ids}
+        users_by_key: Dict[int, List[str]] = {}
+        for user_id, key_index in key_by_user.items():
+            users_by_key.setdefault(key_index, []).append(user_id)
+
+        staggered = len(user_ids) > self.STAGGER_THRESHOLD and self.stagger_window > 0
+        pacers: Dict[int, _RatePacer] = {}
+        for key_index, key_user_ids in users_by_key.items():
+            rate = self.scan_rate_per_key
+            if staggered:
+                rate = min(rate, len(key_user_ids) / self.stagger_window)
+            pacers[key_index] = _RatePacer(rate)
+
+        if staggered:
+            logger.info(
+                f"Large user base detected ({len(user_ids)} users) - pacing scans over "
+                f"{self.stagger_window}s across {len(users_by_key)} RPC key(s)"
+            )
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_scans)
+        timeouts = 0
+
+        async def scan_one(user_id: str, pacer: _RatePacer) -> List[Opportunity]:
+            nonlocal timeouts
+            await pacer.acquire()
+            async with semaphore:
                 try:
-                    await self._process_opportunity(opportunity, user_id)
+                    return await asyncio.wait_for(
+                        self.scan_user(user_id, market_opportunities),
+                        timeout=self.user_scan_timeout,
+                    )
+                except asyncio.TimeoutError:
+                    timeouts += 1
+                    logger.error(f"Scan for user {user_id} timed out after {self.user_scan_timeout}s")
+                    activity_logger.log_error(
+                        component="AgentLoop",
+                        error_type="TimeoutError",
+                        error_message=f"User scan timed out after {self.user_scan_timeout}s",
+                        user_id=user_id,
+                    )
                 except Exception as e:
-                    if self._is_rate_limit_error(e):
-                        logger.warning(f"Rate limit detected: {e}")
-                        self._rate_limit_detected = True
-
+                    # Error isolation: log error but continue with other users
                     logger.error(
-                        f"Error processing opportunity for user {user_id} from {opportunity.strategy_name}: {e}",
+                        f"Error scanning for user {user_id}: {e}",
                         exc_info=True
                     )
                     activity_logger.log_error(
                         component="AgentLoop",
                         error_type=type(e).__name__,
-                        error_message=str(e),
-                        strategy=opportunity.strategy_name,
-                        action=opportunity.action,
+                        error_message=f"User scan failed: {str(e)}",
                         user_id=user_id,
                     )
-                    # Continue with next opportunity despite error
-                    continue
+                return []
+
+        results = await asyncio.gather(*(
+            scan_one(user_id, pacers[key_by_user[user_id]]) for user_id in user_ids
+        ))
+
+        opportunities_by_user: Dict[str, List[Opportunity]] = {}
+        for user_id, user_opportunities in zip(user_ids, results):
+            if user_opportunities:
+                opportunities_by_user[user_id] = user_opportunities
+                logger.info(f"Found {len(user_opportunities)} opportunities for user {user_id}")
+
+        if timeouts:
+            logger.warning(f"{timeouts}/{len(user_ids)} user scans timed out this cycle")
 
         return opportunities_by_user
-    async def scan_user(self, user_id: str) -> List[Opportunity]:
+
+    def _get_rpc_key_index(self, user_id: str) -> int:
+        """
+        Get the RPC key index a user's requests are routed through.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Key index from the APIKeyManager, or -1 when no key manager is set
+        """
+        if not self.api_key_manager:
+            return -1
+
+        assignment = self.api_key_manager.user_assignments.get(user_id)
+        if assignment is None:
+            return self.api_key_manager.assign_user(user_id)
+        return assignment.key_index
+
+    def _risk_limits(self, strategy_name: str) -> Dict[str, float]:
+        """
+        Risk limits passed to a strategy execution.
+
+        Args:
+            strategy_name: Strategy being executed
+
+        Returns:
+            Dictionary with max_position_pct, min_balance_sol and strategy_allocation
+        """
+        return {
+            "max_position_pct": self.risk_manager.max_position_pct,
+            "min_balance_sol": self.risk_manager.min_balance_sol,
+            "strategy_allocation": self.risk_manager.get_strategy_allocation(strategy_name),
+        }
+
+    async def prefetch_balances(self, user_ids: List[str]):
+        """
+        Load all users' balances into the wallet balance cache in bulk.
+
+        Balances are fetched with getMultipleAccounts, up to 100 wallets per
+        RPC call, so the get_balance() call in scan_user is served from cache.
+        Failures are logged and the cycle continues; scan_user then falls
+        back to fetching balances individually.
+
+        Args:
+            user_ids: Users whose balances should be loaded
+        """
+        try:
+            await self.wallet.batch_get_balances(user_ids)
+        except Exception as e:
+            logger.warning(f"Balance prefetch failed, falling back to per-user fetches: {e}")
+
+    async def scan_market(self) -> List[Opportunity]:
+        """
+        Scan all strategies once for market-level opportunities.
+
+        Strategy scans don't depend on the user, so the result is shared by
+        every user in the cycle. A scanner failure yields an empty list so
+        the cycle can still refresh balances and send notifications.
+
+        Returns:
+            List of market-level opportunities (empty list on error)
+        """
+        try:
+            opportunities = await self.scanner.scan_all()
+        except Exception as e:
+            logger.error(f"Market scan failed: {e}", exc_info=True)
+            activity_logger.log_error(
+                component="AgentLoop",
+                error_type=type(e).__name__,
+                error_message=f"Market scan failed: {str(e)}",
+            )
+            return []
+
+        logger.info(f"Market scan found {len(opportunities)} opportunities")
+        return opportunities
+
+    async def scan_user(
+        self,
+        user_id: str,
+        market_opportunities: Optional[List[Opportunity]] = None,
+    ) -> List[Opportunity]:
         """
         Scan for opportunities for a specific user.
 
-        Checks the user's wallet balance and scans all enabled strategies
-        if the balance meets the minimum trading threshold. Sends notifications
-        when trading is activated or deactivated.
+        Checks the user's wallet balance and, if the balance meets the minimum
+        trading threshold, sizes the market opportunities for this user. Sends
+        notifications when trading is activated or deactivated.
         
         Handles balance check failures gracefully - logs error but doesn't crash.
 
         Args:
             user_id: User to scan for
+            market_opportunities: Opportunities from this cycle's market scan
+                (scans all strategies if None)
 
         Returns:
             List of opportunities found for this user (empty list on error)
@@ -412,13 +586,13 @@ Use /decline_fee to decline
                 )
                 return []
 
-            # Balance >= min_trading_balance, scan all enabled strategies
-            logger.debug(f"User {user_id} has sufficient balance - scanning strategies")
+            # Balance >= min_trading_balance, size market opportunities for this user
+            logger.debug(f"User {user_id} has sufficient balance - sizing opportunities")
 
-            # Scan for opportunities (using existing scanner)
-            opportunities = await self.scanner.scan_all()
+            if market_opportunities is None:
+                market_opportunities = await self.scanner.scan_all()
 
-            return opportunities
+            return self._size_opportunities_for_user(user_id, current_balance, market_opportunities)
 
         except Exception as e:
             # Catch-all for any unexpected errors
@@ -431,6 +605,64 @@ Use /decline_fee to decline
             )
             # Return empty list - don't let one user's error stop the whole scan
             return []
+
+    RISK_LEVELS = {"low": 0, "medium": 1, "high": 2}
+
+    def _size_opportunities_for_user(
+        self,
+        user_id: str,
+        current_balance: float,
+        market_opportunities: List[Opportunity],
+    ) -> List[Opportunity]:
+        """
+        Derive a user's opportunities from the shared market opportunities.
+
+        Each opportunity is copied so per-user position sizing never leaks
+        into another user's copy. Opportunities for strategies the user has
+        disabled, or riskier than the user's risk tolerance, are dropped.
+        Amounts are capped at the user's balance, and opportunities the user
+        can't afford are dropped.
+
+        Args:
+            user_id: User ID
+            current_balance: User's current SOL balance
+            market_opportunities: Opportunities from the market scan
+
+        Returns:
+            List of per-user opportunities, in market order
+        """
+        user_opportunities = []
+        profile = self.user_manager.users.get(user_id) if self.user_manager else None
+        max_risk = self.RISK_LEVELS.get(profile.risk_tolerance, 1) if profile else None
+
+        for opportunity in market_opportunities:
+            if profile is not None:
+                if not profile.strategies_enabled.get(opportunity.strategy_name, True):
+                    logger.debug(f"Skipping {opportunity.strategy_name} for user {user_id}: strategy disabled")
+                    continue
+                if self.RISK_LEVELS.get(opportunity.risk_level, 1) > max_risk:
+                    logger.debug(
+                        f"Skipping {opportunity.strategy_name} for user {user_id}: "
+                        f"{opportunity.risk_level} risk exceeds {profile.risk_tolerance} tolerance"
+                    )
+                    continue
+
+            estimated_gas_fee = opportunity.details.get('estimated_gas_fee', 0.0)
+            amount = min(opportunity.amount, current_balance - estimated_gas_fee)
+
+            if amount <= 0 < opportunity.amount:
+                logger.debug(
+                    f"Skipping {opportunity.strategy_name} for user {user_id}: "
+                    f"balance ({current_balance:.4f} SOL) can't cover it"
+                )
+                continue
+
+            user_opportunities.append(
+                replace(opportunity, amount=max(amount, 0.0), details=dict(opportunity.details))
+            )
+
+        return user_opportunities
+
     async def check_balance_and_notify(self, user_id: str, current_balance: float):
         """
         Check if balance crossed trading threshold and notify user.
@@ -754,6 +986,7 @@ Use /decline_fee to decline
         )
 
         execution_start_time = time()
+        leased_wallet = None
 
         try:
             # Get user's wallet
@@ -767,38 +1000,44 @@ Use /decline_fee to decline
                 logger.error(f"Failed to load wallet for user {user_id}: {e}", exc_info=True)
                 raise Exception(f"Failed to load wallet: {str(e)}")
 
+            # Keep the wallet's RPC client open for the whole trade, even if
+            # the wallet cache evicts it meanwhile
+            self.wallet.acquire_wallet(user_wallet)
+            leased_wallet = user_wallet
+
             # Find the strategy that generated this opportunity
-            strategy = None
-            for s in self.scanner.strategies:
-                if s.get_name() == opportunity.strategy_name:
-                    strategy = s
-                    break
+            strategy = self.scanner.get_strategy(opportunity.strategy_name)
 
             if not strategy:
                 error_msg = f"Strategy not found: {opportunity.strategy_name}"
                 logger.error(error_msg)
                 raise Exception(error_msg)
 
-            # Temporarily set the strategy's wallet to the user's wallet
-            # (This assumes strategies have a wallet attribute that can be swapped)
-            original_wallet = getattr(strategy, 'wallet', None)
-            if hasattr(strategy, 'wallet'):
-                strategy.wallet = user_wallet
+            # A strategy without a context would sign with its own shared
+            # wallet, not the user's
+            if not _accepts_context(strategy):
+                error_msg = f"Strategy {opportunity.strategy_name} does not accept an ExecutionContext"
+                logger.error(error_msg)
+                raise Exception(error_msg)
 
+            # The user's wallet travels with the call, so the shared strategy
+            # instance can execute for several users at once
+            context = ExecutionContext(
+                user_id=user_id,
+                wallet=user_wallet,
+                rpc_client=getattr(strategy, 'rpc_client', None),
+                risk_limits=self._risk_limits(opportunity.strategy_name)
+            )
+
+            # Call the strategy's execute method
+            logger.info(f"Calling {strategy.get_name()}.execute() for user {user_id}")
             try:
-                # Call the strategy's execute method
-                logger.info(f"Calling {strategy.get_name()}.execute() for user {user_id}")
-                try:
-                    execution_result = await strategy.execute(opportunity)
-                    # execution_result is already an ExecutionResult object
-                    result = execution_result
-                except Exception as e:
-                    logger.error(f"Strategy execution failed for user {user_id}: {e}", exc_info=True)
-                    raise Exception(f"Strategy execution failed: {str(e)}")
-            finally:
-                # Restore original wallet
-                if original_wallet is not None and hasattr(strategy, 'wallet'):
-                    strategy.wallet = original_wallet
+                execution_result = await strategy.execute(opportunity, context)
+                # execution_result is already an ExecutionResult object
+                result = execution_result
+            except Exception as e:
+                logger.error(f"Strategy execution failed for user {user_id}: {e}", exc_info=True)
+                raise Exception(f"Strategy execution failed: {str(e)}")
 
             execution_time_ms = int((time() - execution_start_time) * 1000)
 
@@ -850,9 +1089,7 @@ Use /decline_fee to decline
                 execution_time_ms=execution_time_ms,
             )
 
-            # TODO: Update PerformanceTracker.record_trade to accept user_id
-            # For now, just record without user_id
-            self.performance_tracker.record_trade(trade_record)
+            self.performance_tracker.record_trade(trade_record, user_id=user_id)
 
             self.risk_manager.record_trade_result(
                 strategy_name=opportunity.strategy_name,
@@ -934,8 +1171,7 @@ Use /decline_fee to decline
                 execution_time_ms=execution_time_ms,
             )
 
-            # TODO: Update PerformanceTracker.record_trade to accept user_id
-            self.performance_tracker.record_trade(trade_record)
+            self.performance_tracker.record_trade(trade_record, user_id=user_id)
 
             self.risk_manager.record_trade_result(
                 strategy_name=opportunity.strategy_name,
@@ -961,6 +1197,10 @@ Use /decline_fee to decline
 
             return result
 
+        finally:
+            if leased_wallet is not None:
+                self.wallet.release_wallet(leased_wallet)
+
     
     def handle_error(self, error: Exception):
         """
@@ -1150,11 +1390,7 @@ Use /decline_fee to decline
         )
         
         try:
-            strategy = None
-            for s in self.scanner.strategies:
-                if s.get_name() == position.strategy_name:
-                    strategy = s
-                    break
+            strategy = self.scanner.get_strategy(position.strategy_name)
             
             if strategy and hasattr(strategy, 'exit_position'):
                 logger.info(f"Calling {strategy.get_name()}.exit_position()")
@@ -0,0 +1,290 @@
+"""
+Process-wide blockhash and priority-fee oracle.
+
+Every execution attempt used to fetch the latest blockhash and the full
+recent prioritization fee list, and the congestion check fetched the fee
+list again. NetworkOracle keeps both in memory: while trades are being
+executed a background task refreshes them every few hundred ms, so
+executors read them without waiting on the network. Fee percentiles
+(p50/p75/p90) and a rolling history of them drive congestion detection
+and fee bumping on retries.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+from agent.core.shared_cache import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BlockhashInfo:
+    """A recent blockhash and when it was fetched."""
+    blockhash: Any
+    last_valid_block_height: Optional[int]
+    fetched_at: float  # time.monotonic()
+
+
+@dataclass
+class FeeSnapshot:
+    """Priority fee percentiles over the recent slots, in microlamports per CU."""
+    p50: int
+    p75: int
+    p90: int
+    max_fee: int
+    samples: int
+    fetched_at: float  # time.monotonic()
+
+
+class NetworkOracle:
+    """
+    Shared view of the latest blockhash and priority fees.
+    
+    Reads return cached values while they are fresh enough and fetch
+    otherwise; concurrent fetches are collapsed into one request. After
+    start(), a background task keeps the values fresh for as long as they
+    are being read, and pauses once nobody has read them for idle_timeout.
+    """
+    
+    def __init__(
+        self,
+        rpc_client: Any,
+        base_priority_fee: int = 5000,
+        refresh_interval: float = 0.4,
+        blockhash_max_age: float = 10.0,
+        fee_max_age: float = 5.0,
+        idle_timeout: float = 60.0,
+        congestion_threshold: int = 1_000_000_000,
+        history_size: int = 150
+    ):
+        """
+        Initialize network oracle.
+        
+        Args:
+            rpc_client: Client with get_latest_blockhash and
+                get_recent_prioritization_fees (solana AsyncClient or RPCFallbackManager)
+            base_priority_fee: Minimum recommended priority fee in microlamports (default 5000)
+            refresh_interval: Seconds between background refreshes (default 0.4)
+            blockhash_max_age: Oldest blockhash a read will accept (default 10s)
+            fee_max_age: Oldest fee snapshot a read will accept (default 5s)
+            idle_timeout: Seconds without reads before background refresh pauses (default 60)
+            congestion_threshold: Median fee in microlamports above which the
+                network counts as congested (default 1e9, i.e. 0.001 SOL)
+            history_size: Fee snapshots kept for history (default 150)
+        """
+        self.rpc_client = rpc_client
+        self.base_priority_fee = base_priority_fee
+        self.refresh_interval = refresh_interval
+        self.blockhash_max_age = blockhash_max_age
+        self.fee_max_age = fee_max_age
+        self.idle_timeout = idle_timeout
+        self.congestion_threshold = congestion_threshold
+        self.blockhash: Optional[BlockhashInfo] = None
+        self.fees: Optional[FeeSnapshot] = None
+        self.fee_history: Deque[FeeSnapshot] = deque(maxlen=history_size)
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self._last_read = float("-inf")  # Never read yet
+        self._fetches = SingleFlight()
+        self._task: Optional[asyncio.Task] = None
+        
+        logger.info(f"NetworkOracle initialized (refresh every {refresh_interval:g}s while active)")
+    
+    def start(self):
+        """Start background refreshing."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop(self):
+        """Stop background refreshing."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _refresh_loop(self):
+        """Refresh blockhash and fees while they are being read."""
+        while True:
+            if time.monotonic() - self._last_read < self.idle_timeout:
+                results = await asyncio.gather(
+                    self._refresh_blockhash(),
+                    self._refresh_fees(),
+                    return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        self.refresh_errors += 1
+                        logger.debug(f"Network oracle refresh failed: {result}")
+            await asyncio.sleep(self.refresh_interval)
+    
+    async def _refresh_blockhash(self) -> BlockhashInfo:
+        result, _ = await self._fetches.do("blockhash", self._fetch_blockhash)
+        return result
+    
+    async def _refresh_fees(self) -> FeeSnapshot:
+        result, _ = await self._fetches.do("fees", self._fetch_fees)
+        return result
+    
+    async def _fetch_blockhash(self) -> BlockhashInfo:
+        """Fetch the latest blockhash (solana-py response or JSON-RPC value)."""
+        response = await self.rpc_client.get_latest_blockhash()
+        
+        if isinstance(response, dict):
+            info = BlockhashInfo(
+                blockhash=response.get("blockhash"),
+                last_valid_block_height=response.get("lastValidBlockHeight"),
+                fetched_at=time.monotonic()
+            )
+        else:
+            value = response.value
+            info = BlockhashInfo(
+                blockhash=value.blockhash,
+                last_valid_block_height=getattr(value, "last_valid_block_height", None),
+                fetched_at=time.monotonic()
+            )
+        
+        self.blockhash = info
+        self.refreshes += 1
+        return info
+    
+    async def _fetch_fees(self) -> FeeSnapshot:
+        """Fetch recent prioritization fees and compute percentiles."""
+        response = await self.rpc_client.get_recent_prioritization_fees()
+        
+        entries = response if isinstance(response, list) else getattr(response, "value", None) or []
+        fees = sorted(
+            entry.get("prioritizationFee", 0) if isinstance(entry, dict) else entry.prioritization_fee
+            for entry in entries
+        )
+        
+        def percentile(p: float) -> int:
+            if not fees:
+                return 0
+            return fees[min(len(fees) - 1, int(len(fees) * p))]
+        
+        snapshot = FeeSnapshot(
+            p50=percentile(0.50),
+            p75=percentile(0.75),
+            p90=percentile(0.90),
+            max_fee=fees[-1] if fees else 0,
+            samples=len(fees),
+            fetched_at=time.monotonic()
+        )
+        
+        self.fees = snapshot
+        self.fee_history.append(snapshot)
+        self.refreshes += 1
+        return snapshot
+    
+    async def get_blockhash(self, force: bool = False) -> BlockhashInfo:
+        """
+        Get a recent blockhash.
+        
+        Args:
+            force: Fetch a new blockhash even if the cached one is fresh
+                (e.g. after a blockhash-expired error)
+        
+        Returns:
+            BlockhashInfo
+        """
+        self._last_read = time.monotonic()
+        info = self.blockhash
+        if force or info is None or time.monotonic() - info.fetched_at > self.blockhash_max_age:
+            info = await self._refresh_blockhash()
+        return info
+    
+    async def get_fees(self) -> FeeSnapshot:
+        """
+        Get the current priority fee percentiles.
+        
+        Returns:
+            FeeSnapshot
+        """
+        self._last_read = time.monotonic()
+        snapshot = self.fees
+        if snapshot is None or time.monotonic() - snapshot.fetched_at > self.fee_max_age:
+            snapshot = await self._refresh_fees()
+        return snapshot
+    
+    async def recommend_priority_fee(self, retry_attempt: int = 0) -> int:
+        """
+        Recommend a priority fee, bumped for retries.
+        
+        The first attempt pays the median fee. Retries move up the
+        distribution (p75, then p90) and pay at least 50% more per retry
+        than the median, so a transaction that keeps missing gets priced
+        above the recent competition.
+        
+        Args:
+            retry_attempt: Retry number (0 for the first attempt)
+        
+        Returns:
+            Priority fee in microlamports, at least base_priority_fee
+        """
+        fees = await self.get_fees()
+        
+        if retry_attempt <= 0:
+            fee = fees.p50
+        else:
+            target = fees.p75 if retry_attempt == 1 else fees.p90
+            fee = max(target, int(max(fees.p50, self.base_priority_fee) * (1.5 ** retry_attempt)))
+        
+        return max(fee, self.base_priority_fee)
+    
+    async def is_congested(self) -> bool:
+        """
+        Check if the network is congested based on the median priority fee.
+        
+        Returns:
+            True if the median fee is above congestion_threshold
+        """
+        fees = await self.get_fees()
+        return fees.p50 > self.congestion_threshold
+    
+    def get_fee_history(self) -> List[Dict[str, Any]]:
+        """
+        Get the rolling priority fee history, oldest first.
+        
+        Returns:
+            List of dictionaries with p50, p75, p90 and age in seconds
+        """
+        now = time.monotonic()
+        return [
+            {
+                "p50": snapshot.p50,
+                "p75": snapshot.p75,
+                "p90": snapshot.p90,
+                "age_seconds": now - snapshot.fetched_at,
+            }
+            for snapshot in self.fee_history
+        ]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get oracle statistics.
+        
+        Returns:
+            Dictionary with refresh counts and current values
+        """
+        now = time.monotonic()
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "active": now - self._last_read < self.idle_timeout,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "blockhash_age_seconds": now - self.blockhash.fetched_at if self.blockhash else None,
+            "fees": {
+                "p50": self.fees.p50,
+                "p75": self.fees.p75,
+                "p90": self.fees.p90,
+                "congested": self.fees.p50 > self.congestion_threshold,
+            } if self.fees else None,
+        }
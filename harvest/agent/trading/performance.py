@@ -1,12 +1,14 @@
 """Performance tracking for Harvest - records trades and calculates metrics."""
 
-import json
+import bisect
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
 
+from agent.trading.trade_journal import TradeJournal, read_json, write_json_atomic
+
 logger = logging.getLogger(__name__)
 
 
@@ -97,6 +99,39 @@ class StrategyMetrics:
     last_updated: datetime
 
 
+@dataclass
+class TradeAggregate:
+    """
+    Running totals over a set of trades.
+    
+    Attributes:
+        total_trades: Number of trades
+        successful_trades: Number of successful trades
+        total_profit: Sum of actual profit (in SOL)
+        total_gas_fees: Sum of gas fees (in SOL)
+    
+    """
+    total_trades: int = 0
+    successful_trades: int = 0
+    total_profit: float = 0.0
+    total_gas_fees: float = 0.0
+    
+    def add(self, trade: TradeRecord):
+        """Add one trade to the totals."""
+        self.total_trades += 1
+        if trade.was_successful:
+            self.successful_trades += 1
+        self.total_profit += trade.actual_profit
+        self.total_gas_fees += trade.gas_fees
+    
+    @property
+    def win_rate(self) -> float:
+        """Percentage of successful trades (0-100)."""
+        if self.total_trades == 0:
+            return 0.0
+        return (self.successful_trades / self.total_trades) * 100
+
+
 class PerformanceTracker:
     """
     Tracks and persists trading performance.
@@ -107,18 +142,41 @@ class PerformanceTracker:
     - Persists data to disk for historical tracking
     - Provides performance reports and analytics
     
+    Each trade is appended to a journal next to the snapshot file
+    (trading_history.journal.jsonl for trading_history.json), so recording
+    costs the same at any history size. Once the journal holds as many
+    trades as the snapshot, both are compacted into a new snapshot, which
+    keeps the rewrite cost amortized O(1) per trade.
+    
+    Totals per user, per strategy and per (user, strategy), per-user trade
+    lists and the leaderboard order are updated as trades are recorded, so
+    metric queries do not rescan the history.
+    
     """
     
-    def __init__(self, storage_path: str = ".kiro/trading_history.json"):
+    def __init__(
+        self,
+        storage_path: str = ".kiro/trading_history.json",
+        fsync_interval: float = 1.0,
+        compact_min_records: int = 1000
+    ):
         """
         Initialize performance tracker.
         
         Args:
-            storage_path: Path to JSON file for persisting performance data
+            storage_path: Path to JSON snapshot file for persisting performance data
+            fsync_interval: Longest time recorded trades may go without an fsync (default 1s)
+            compact_min_records: Journal size below which it is never compacted (default 1000)
         
         """
         self.storage_path = Path(storage_path)
         self.trades: List[TradeRecord] = []
+        self._reset_indexes()
+        self.compact_min_records = compact_min_records
+        self.journal = TradeJournal(
+            self.storage_path.with_suffix(".journal.jsonl"),
+            fsync_interval=fsync_interval
+        )
         
         # Track trade count for periodic metrics logging
         self._last_metrics_log_count = 0
@@ -138,13 +196,24 @@ class PerformanceTracker:
         
         Args:
             trade: TradeRecord to add to history
-            user_id: User ID who executed the trade (optional for backward compatibility)
+            user_id: User ID who executed the trade (optional for backward compatibility);
+                fills trade.user_id when the record doesn't carry one
         
         """
+        if trade.user_id is None and user_id is not None:
+            trade.user_id = user_id
+        
         self.trades.append(trade)
+        self._index_trade(trade)
         
-        # Persist to storage after each trade
-        self.persist_to_disk()
+        # Append to the journal; compact once it is as large as the snapshot
+        try:
+            self.journal.append(trade.to_dict())
+        except Exception as e:
+            logger.error(f"Error journaling trade: {e}", exc_info=True)
+        
+        if self.journal.records >= max(self.compact_min_records, len(self.trades) - self.journal.records):
+            self.persist_to_disk()
         
         logger.info(
             f"Recorded trade: {trade.strategy_name} - "
@@ -157,6 +226,56 @@ class PerformanceTracker:
             self._log_performance_metrics()
             self._last_metrics_log_count = len(self.trades)
     
+    def _reset_indexes(self):
+        """Clear running aggregates and indexes."""
+        self._totals = TradeAggregate()
+        self._by_strategy: Dict[str, TradeAggregate] = {}
+        self._by_user: Dict[str, TradeAggregate] = {}
+        self._by_user_strategy: Dict[str, Dict[str, TradeAggregate]] = {}
+        self._user_trades: Dict[str, List[TradeRecord]] = {}
+        # (-total_profit, user_id), ascending, i.e. most profitable user first
+        self._leaderboard: List[Tuple[float, str]] = []
+        self._first_timestamp: Optional[datetime] = None
+        self._last_timestamp: Optional[datetime] = None
+        # True while trades have been recorded in timestamp order
+        self._chronological = True
+    
+    def _rebuild_indexes(self):
+        """Recompute aggregates and indexes from self.trades."""
+        self._reset_indexes()
+        for trade in self.trades:
+            self._index_trade(trade)
+    
+    def _index_trade(self, trade: TradeRecord):
+        """Add a trade to the running aggregates and indexes."""
+        self._totals.add(trade)
+        self._by_strategy.setdefault(trade.strategy_name, TradeAggregate()).add(trade)
+        
+        if self._last_timestamp is not None and trade.timestamp < self._last_timestamp:
+            self._chronological = False
+        if self._first_timestamp is None or trade.timestamp < self._first_timestamp:
+            self._first_timestamp = trade.timestamp
+        if self._last_timestamp is None or trade.timestamp > self._last_timestamp:
+            self._last_timestamp = trade.timestamp
+        
+        user_id = trade.user_id
+        if user_id is None:
+            return
+        
+        user_totals = self._by_user.get(user_id)
+        if user_totals is None:
+            user_totals = self._by_user[user_id] = TradeAggregate()
+        else:
+            old_key = (-user_totals.total_profit, user_id)
+            del self._leaderboard[bisect.bisect_left(self._leaderboard, old_key)]
+        user_totals.add(trade)
+        bisect.insort(self._leaderboard, (-user_totals.total_profit, user_id))
+        
+        self._by_user_strategy.setdefault(user_id, {}).setdefault(
+            trade.strategy_name, TradeAggregate()
+        ).add(trade)
+        self._user_trades.setdefault(user_id, []).append(trade)
+    
     def _log_performance_metrics(self):
         """
         Log comprehensive performance metrics.
@@ -171,11 +290,11 @@ class PerformanceTracker:
             return
         
         # Calculate overall metrics
-        total_trades = len(self.trades)
-        successful_trades = sum(1 for t in self.trades if t.was_successful)
-        win_rate = (successful_trades / total_trades) * 100 if total_trades > 0 else 0.0
-        total_profit = sum(t.actual_profit for t in self.trades)
-        total_gas_fees = sum(t.gas_fees for t in self.trades)
+        total_trades = self._totals.total_trades
+        successful_trades = self._totals.successful_trades
+        win_rate = self._totals.win_rate
+        total_profit = self._totals.total_profit
+        total_gas_fees = self._totals.total_gas_fees
         
         # Get profit by strategy
         all_metrics = self.get_all_metrics()
@@ -232,12 +351,13 @@ class PerformanceTracker:
             List of recent TradeRecords
         
         """
-        # Filter trades by user_id if provided
-        filtered_trades = self.trades
-        if user_id is not None:
-            filtered_trades = [t for t in self.trades if t.user_id == user_id]
+        trades = self.trades if user_id is None else self._user_trades.get(user_id, [])
+        
+        if self._chronological:
+            # Newest trades are at the end
+            return trades[:-count - 1:-1] if count > 0 else []
         
-        return sorted(filtered_trades, key=lambda t: t.timestamp, reverse=True)[:count]
+        return sorted(trades, key=lambda t: t.timestamp, reverse=True)[:count]
     
     def get_strategy_metrics(self, strategy_name: str, user_id: Optional[str] = None) -> StrategyMetrics:
         """
@@ -251,38 +371,22 @@ class PerformanceTracker:
             StrategyMetrics with computed metrics
         
         """
-        # Filter trades by strategy and optionally by user_id
-        strategy_trades = [t for t in self.trades if t.strategy_name == strategy_name]
-        if user_id is not None:
-            strategy_trades = [t for t in strategy_trades if t.user_id == user_id]
-        
-        if not strategy_trades:
-            return StrategyMetrics(
-                strategy_name=strategy_name,
-                total_trades=0,
-                successful_trades=0,
-                total_profit=0.0,
-                average_profit=0.0,
-                win_rate=0.0,
-                total_gas_fees=0.0,
-                last_updated=datetime.now(),
-            )
+        if user_id is None:
+            totals = self._by_strategy.get(strategy_name)
+        else:
+            totals = self._by_user_strategy.get(user_id, {}).get(strategy_name)
         
-        total_trades = len(strategy_trades)
-        successful_trades = sum(1 for t in strategy_trades if t.was_successful)
-        total_profit = sum(t.actual_profit for t in strategy_trades)
-        average_profit = total_profit / total_trades
-        win_rate = (successful_trades / total_trades) * 100
-        total_gas_fees = sum(t.gas_fees for t in strategy_trades)
+        if totals is None:
+            totals = TradeAggregate()
         
         return StrategyMetrics(
             strategy_name=strategy_name,
-            total_trades=total_trades,
-            successful_trades=successful_trades,
-            total_profit=total_profit,
-            average_profit=average_profit,
-            win_rate=win_rate,
-            total_gas_fees=total_gas_fees,
+            total_trades=totals.total_trades,
+            successful_trades=totals.successful_trades,
+            total_profit=totals.total_profit,
+            average_profit=totals.total_profit / totals.total_trades if totals.total_trades else 0.0,
+            win_rate=totals.win_rate,
+            total_gas_fees=totals.total_gas_fees,
             last_updated=datetime.now(),
         )
     
@@ -297,12 +401,11 @@ class PerformanceTracker:
             Dictionary mapping strategy name to StrategyMetrics
         
         """
-        # Filter trades by user_id if provided
-        filtered_trades = self.trades
-        if user_id is not None:
-            filtered_trades = [t for t in self.trades if t.user_id == user_id]
+        if user_id is None:
+            strategy_names = self._by_strategy
+        else:
+            strategy_names = self._by_user_strategy.get(user_id, {})
         
-        strategy_names = set(t.strategy_name for t in filtered_trades)
         return {
             name: self.get_strategy_metrics(name, user_id=user_id)
             for name in strategy_names
@@ -332,12 +435,14 @@ class PerformanceTracker:
             profit_by_strategy: Dict[str, float]
             performance_fee_collected: float = 0.0
         
-        # Filter trades by user_id if provided
-        filtered_trades = self.trades
-        if user_id is not None:
-            filtered_trades = [t for t in self.trades if t.user_id == user_id]
+        if user_id is None:
+            totals = self._totals
+            by_strategy = self._by_strategy
+        else:
+            totals = self._by_user.get(user_id, TradeAggregate())
+            by_strategy = self._by_user_strategy.get(user_id, {})
         
-        if not filtered_trades:
+        if totals.total_trades == 0:
             return OverallMetrics(
                 total_trades=0,
                 successful_trades=0,
@@ -348,28 +453,17 @@ class PerformanceTracker:
                 profit_by_strategy={},
             )
         
-        total_trades = len(filtered_trades)
-        successful_trades = sum(1 for t in filtered_trades if t.was_successful)
-        win_rate = (successful_trades / total_trades) * 100
-        total_profit = sum(t.actual_profit for t in filtered_trades)
-        total_gas_fees = sum(t.gas_fees for t in filtered_trades)
-        net_profit = total_profit - total_gas_fees
-        
-        # Calculate profit by strategy for filtered trades
-        strategy_profits = {}
-        for trade in filtered_trades:
-            if trade.strategy_name not in strategy_profits:
-                strategy_profits[trade.strategy_name] = 0.0
-            strategy_profits[trade.strategy_name] += trade.actual_profit
-        
         return OverallMetrics(
-            total_trades=total_trades,
-            successful_trades=successful_trades,
-            win_rate=win_rate,
-            total_profit=total_profit,
-            total_gas_fees=total_gas_fees,
-            net_profit=net_profit,
-            profit_by_strategy=strategy_profits,
+            total_trades=totals.total_trades,
+            successful_trades=totals.successful_trades,
+            win_rate=totals.win_rate,
+            total_profit=totals.total_profit,
+            total_gas_fees=totals.total_gas_fees,
+            net_profit=totals.total_profit - totals.total_gas_fees,
+            profit_by_strategy={
+                name: strategy_totals.total_profit
+                for name, strategy_totals in by_strategy.items()
+            },
         )
     
     def get_leaderboard(self, limit: int = 10) -> List[Dict]:
@@ -383,43 +477,13 @@ class PerformanceTracker:
             List of {rank, profit, win_rate} without user IDs
         
         """
-        # Group trades by user_id and calculate metrics
-        user_metrics = {}
-        for trade in self.trades:
-            if trade.user_id is None:
-                continue  # Skip trades without user_id
-            
-            if trade.user_id not in user_metrics:
-                user_metrics[trade.user_id] = {
-                    'total_profit': 0.0,
-                    'total_trades': 0,
-                    'successful_trades': 0,
-                }
-            
-            user_metrics[trade.user_id]['total_profit'] += trade.actual_profit
-            user_metrics[trade.user_id]['total_trades'] += 1
-            if trade.was_successful:
-                user_metrics[trade.user_id]['successful_trades'] += 1
-        
-        # Calculate win rate for each user
-        leaderboard_data = []
-        for user_id, metrics in user_metrics.items():
-            win_rate = (metrics['successful_trades'] / metrics['total_trades'] * 100) if metrics['total_trades'] > 0 else 0.0
-            leaderboard_data.append({
-                'profit': metrics['total_profit'],
-                'win_rate': win_rate,
-            })
-        
-        # Sort by profit descending
-        leaderboard_data.sort(key=lambda x: x['profit'], reverse=True)
-        
-        # Add rank and limit results
         leaderboard = []
-        for rank, entry in enumerate(leaderboard_data[:limit], start=1):
+        for rank, (_, user_id) in enumerate(self._leaderboard[:limit], start=1):
+            totals = self._by_user[user_id]
             leaderboard.append({
                 'rank': rank,
-                'profit': entry['profit'],
-                'win_rate': entry['win_rate'],
+                'profit': totals.total_profit,
+                'win_rate': totals.win_rate,
             })
         
         return leaderboard
@@ -438,7 +502,7 @@ class PerformanceTracker:
         if initial_balance <= 0:
             return 0.0
         
-        total_profit = sum(t.actual_profit for t in self.trades)
+        total_profit = self._totals.total_profit
         current_balance = initial_balance + total_profit
         
         roi = ((current_balance - initial_balance) / initial_balance) * 100
@@ -446,17 +510,21 @@ class PerformanceTracker:
     
     def persist_to_disk(self):
         """
-        Save trade history to disk.
+        Save a full snapshot of trade history to disk and empty the journal.
+        
+        The snapshot is written to a temporary file and renamed into place,
+        so a crash mid-write leaves the previous snapshot intact.
         
         """
         try:
             data = {
                 "trades": [trade.to_dict() for trade in self.trades],
+                "last_seq": self.journal.last_seq,
                 "last_updated": datetime.now().isoformat(),
             }
             
-            with open(self.storage_path, "w") as f:
-                json.dump(data, f, indent=2)
+            write_json_atomic(self.storage_path, data)
+            self.journal.truncate()
             
             logger.debug(f"Saved {len(self.trades)} trades to {self.storage_path}")
             
@@ -465,27 +533,58 @@ class PerformanceTracker:
     
     def load_from_disk(self):
         """
-        Load trade history from disk.
+        Load trade history from the snapshot and replay the journal.
+        
+        A trade history written before the journal existed (no last_seq) is
+        rewritten once in the snapshot format.
         
         """
-        if not self.storage_path.exists():
-            logger.info("No existing performance data found")
-            return
+        try:
+            data = read_json(self.storage_path)
+        except Exception as e:
+            logger.error(f"Error loading performance data: {e}", exc_info=True)
+            data = None
         
         try:
-            with open(self.storage_path, "r") as f:
-                data = json.load(f)
+            if data:
+                self.trades = [
+                    TradeRecord.from_dict(trade_data)
+                    for trade_data in data.get("trades", [])
+                ]
+            snapshot_seq = data.get("last_seq", 0) if data else 0
             
-            self.trades = [
+            journaled = [
                 TradeRecord.from_dict(trade_data)
-                for trade_data in data.get("trades", [])
+                for trade_data in self.journal.replay(after_seq=snapshot_seq)
             ]
-            
-            logger.info(f"Loaded {len(self.trades)} trades from {self.storage_path}")
+            self.trades.extend(journaled)
+            self._rebuild_indexes()
             
         except Exception as e:
             logger.error(f"Error loading performance data: {e}", exc_info=True)
             self.trades = []
+            self._reset_indexes()
+            return
+        
+        if not data and not journaled:
+            logger.info("No existing performance data found")
+            return
+        
+        logger.info(
+            f"Loaded {len(self.trades)} trades from {self.storage_path} "
+            f"({len(journaled)} from journal)"
+        )
+        
+        if data and "last_seq" not in data:
+            logger.info(f"Migrating trade history in {self.storage_path} to journaled format")
+            self.persist_to_disk()
+    
+    def close(self):
+        """Flush and close the trade journal."""
+        try:
+            self.journal.close()
+        except Exception as e:
+            logger.error(f"Error closing trade journal: {e}", exc_info=True)
     
     def generate_report(
         self,
@@ -518,11 +617,11 @@ class PerformanceTracker:
             }
         
         # Calculate overall metrics
-        total_trades = len(self.trades)
-        successful_trades = sum(1 for t in self.trades if t.was_successful)
-        win_rate = (successful_trades / total_trades) * 100
-        realized_profit = sum(t.actual_profit for t in self.trades)
-        total_gas_fees = sum(t.gas_fees for t in self.trades)
+        total_trades = self._totals.total_trades
+        successful_trades = self._totals.successful_trades
+        win_rate = self._totals.win_rate
+        realized_profit = self._totals.total_profit
+        total_gas_fees = self._totals.total_gas_fees
         total_profit = realized_profit + unrealized_profit
         roi = self.calculate_roi(initial_balance)
         
@@ -535,9 +634,7 @@ class PerformanceTracker:
         
         # Calculate time periods
         if self.trades:
-            first_trade = min(self.trades, key=lambda t: t.timestamp)
-            last_trade = max(self.trades, key=lambda t: t.timestamp)
-            trading_period_days = (last_trade.timestamp - first_trade.timestamp).days
+            trading_period_days = (self._last_timestamp - self._first_timestamp).days
         else:
             trading_period_days = 0
         
@@ -558,6 +655,7 @@ class PerformanceTracker:
     def clear_history(self):
         """Clear all performance history (use with caution)."""
         self.trades = []
+        self._reset_indexes()
         self.persist_to_disk()
         logger.warning("Performance history cleared")
     
@@ -1,8 +1,8 @@
 """Opportunity scanner - finds money-making opportunities on Solana."""
 
 import logging
-from typing import Any, List
-from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
 from agent.security.security import SecurityValidator
 
@@ -32,12 +32,35 @@ class Opportunity:
     timestamp: Any  # datetime
 
 
+@dataclass
+class ExecutionContext:
+    """
+    Per-call state for executing an opportunity on behalf of one user.
+    
+    Strategy instances are shared by every user, so anything user-specific
+    reaches execute() through this object instead of strategy attributes.
+    Executions for different users can then run concurrently.
+    
+    Attributes:
+        user_id: User the trade is executed for (None for the strategy's own wallet)
+        wallet: Wallet manager that signs and reports balances for the user
+        rpc_client: RPC client for the user's reads
+        risk_limits: Limits that apply to this execution (e.g. max_position_pct)
+    """
+    user_id: Optional[str]
+    wallet: Any
+    rpc_client: Any = None
+    risk_limits: Dict[str, float] = field(default_factory=dict)
+
+
 class Strategy(ABC):
     """
     Abstract base class for all trading strategies.
     
     Each strategy implements scan() to find opportunities
-    and execute() to execute them.
+    and execute(opportunity, context) to execute them. Strategies hold no
+    per-user state; the wallet and limits for an execution come from the
+    ExecutionContext.
     """
     
     @abstractmethod
@@ -60,6 +83,19 @@ class Strategy(ABC):
         """
         pass
 
+    def default_context(self) -> ExecutionContext:
+        """
+        Context for executing with the strategy's own wallet and RPC client.
+        
+        Returns:
+            ExecutionContext used when execute() is called without one
+        """
+        return ExecutionContext(
+            user_id=None,
+            wallet=getattr(self, "wallet_manager", None),
+            rpc_client=getattr(self, "rpc_client", None)
+        )
+
 
 class Scanner:
     """
@@ -80,6 +116,30 @@ class Scanner:
         self.strategies = strategies
         logger.info(f"Scanner initialized with {len(strategies)} strategies")
     
+    @property
+    def strategies(self) -> List[Strategy]:
+        """Registered strategies, in scan order."""
+        return self._strategies
+    
+    @strategies.setter
+    def strategies(self, strategies: List[Strategy]):
+        self._strategies = list(strategies)
+        self._by_name: Dict[str, Strategy] = {
+            strategy.get_name(): strategy for strategy in self._strategies
+        }
+    
+    def get_strategy(self, name: str) -> Optional[Strategy]:
+        """
+        Look up a registered strategy by name.
+        
+        Args:
+            name: Strategy name as returned by get_name()
+        
+        Returns:
+            Strategy instance, or None if no strategy has that name
+        """
+        return self._by_name.get(name)
+    
     async def scan_all(self) -> List[Opportunity]:
         """
         Scan all strategies in parallel and return sorted opportunities.
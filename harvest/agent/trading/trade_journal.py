@@ -0,0 +1,171 @@
+"""
+Append-only journal for trade records.
+
+Each record is one compact JSON line tagged with a sequence number. Appends
+are flushed to the OS immediately, so a crashed process loses nothing, and
+fsynced at most once per fsync_interval, so a power loss loses at most that
+much. A torn final line from a crash mid-write is skipped on replay and cut
+from the file, so the next append starts on a fresh line.
+"""
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TradeJournal:
+    """
+    JSON Lines journal with batched fsync.
+    
+    Records are written as {"seq": n, "trade": {...}}. The owner snapshots
+    the full state now and then, records the last sequence number the
+    snapshot covers, and calls truncate(); replay skips anything at or
+    below that number, so a crash between snapshot and truncate does not
+    duplicate records.
+    """
+    
+    def __init__(self, path: Path, fsync_interval: float = 1.0):
+        """
+        Initialize trade journal.
+        
+        Args:
+            path: Journal file path
+            fsync_interval: Longest time appended records may go without an
+                fsync, in seconds (0 fsyncs every append)
+        """
+        self.path = Path(path)
+        self.fsync_interval = fsync_interval
+        self.last_seq = 0
+        self.records = 0  # Records in the file
+        self._file = None
+        self._unsynced = False
+        self._last_sync = time.monotonic()
+    
+    def replay(self, after_seq: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        Yield journaled trades newer than after_seq, oldest first.
+        
+        Args:
+            after_seq: Last sequence number already covered by the snapshot
+        
+        Yields:
+            Trade dictionaries
+        """
+        self.last_seq = after_seq
+        self.records = 0
+        if not self.path.exists():
+            return
+        
+        complete_end = 0  # Byte offset just past the last whole line
+        torn = False
+        with open(self.path, "rb") as f:
+            for line_number, line in enumerate(f, start=1):
+                try:
+                    entry = json.loads(line)
+                    seq = entry["seq"]
+                    trade = entry["trade"]
+                except (ValueError, KeyError, TypeError):
+                    logger.warning(f"Skipping unreadable journal line {line_number} in {self.path}")
+                    torn = not line.endswith(b"\n")
+                    if not torn:
+                        complete_end += len(line)
+                    continue
+                
+                complete_end += len(line)
+                self.records += 1
+                if seq <= self.last_seq:
+                    continue
+                self.last_seq = seq
+                yield trade
+        
+        # Leave the file ending in a newline so the next append is not glued
+        # onto a torn fragment (dropped) or a record that lost its newline
+        if torn:
+            logger.warning(f"Truncating torn final record in {self.path}")
+            os.truncate(self.path, complete_end)
+        elif complete_end and not line.endswith(b"\n"):
+            with open(self.path, "ab") as f:
+                f.write(b"\n")
+    
+    def append(self, trade: Dict[str, Any]) -> int:
+        """
+        Append one trade.
+        
+        Args:
+            trade: Trade dictionary (TradeRecord.to_dict())
+        
+        Returns:
+            Sequence number assigned to the trade
+        """
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        
+        self.last_seq += 1
+        self._file.write(json.dumps({"seq": self.last_seq, "trade": trade}, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self.records += 1
+        self._unsynced = True
+        
+        if time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+        
+        return self.last_seq
+    
+    def sync(self):
+        """fsync appended records to disk."""
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = False
+        self._last_sync = time.monotonic()
+    
+    def truncate(self):
+        """Drop every record; called after a snapshot has been written."""
+        self.close()
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self.records = 0
+    
+    def close(self):
+        """Sync and close the journal file."""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+
+def write_json_atomic(path: Path, data: Any):
+    """
+    Write JSON to path via a synced temporary file and rename.
+    
+    Args:
+        path: Destination file
+        data: JSON-serializable data
+    """
+    temp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def read_json(path: Path) -> Optional[Any]:
+    """
+    Read a JSON file.
+    
+    Args:
+        path: File to read
+    
+    Returns:
+        Parsed data, or None if the file is missing or empty
+    """
+    if not path.exists() or path.stat().st_size == 0:
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -1,15 +1,24 @@
 """
-Trade execution queue for serializing trade execution across multiple users.
+Trade execution queue for multiple users.
 
-This module provides a queue system to serialize trade execution, avoiding
-nonce conflicts when multiple users have approved trades simultaneously.
+Trades are sharded by user: each user's wallet executes its trades one at
+a time in FIFO order, avoiding nonce and blockhash conflicts, while
+different wallets execute in parallel up to a global limit. Users with
+waiting trades take turns, so one busy user cannot starve the rest.
+
+Each trade carries a completion future that resolves the moment its
+execution ends. Finished trades are kept for status lookups for a limited
+time and number, and queue-wait and execution times are recorded in
+histograms.
 """
 
 import asyncio
+import bisect
 import logging
-from typing import Optional, Callable, Any, Dict
-from dataclasses import dataclass
-from datetime import datetime
+from collections import deque
+from typing import Optional, Callable, Any, Deque, Dict, List, Set, Tuple
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from enum import Enum
 
 logger = logging.getLogger(__name__)
@@ -35,27 +44,110 @@ class QueuedTrade:
     result: Optional[Any] = None
     error: Optional[Exception] = None
     executed_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # Resolves to the final TradeStatus when execution ends
+    completion: Optional[asyncio.Future] = field(default=None, repr=False, compare=False)
+
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS: Tuple[float, ...] = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of durations in seconds."""
+    
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        """
+        Initialize histogram.
+        
+        Args:
+            buckets: Ascending bucket upper bounds in seconds; larger values
+                fall into an overflow bucket
+        """
+        self.buckets = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def observe(self, seconds: float):
+        """Record one duration."""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+    
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th fraction of observations."""
+        if self.count == 0:
+            return 0.0
+        rank = p * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary with bucket counts keyed by upper bound ("+Inf" for overflow)."""
+        labels = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "buckets": dict(zip(labels, self.counts)),
+        }
 
 
 class TradeQueue:
     """
-    Queue system for serializing trade execution.
+    Queue system for per-wallet serialized trade execution.
     
-    Ensures trades are executed sequentially to avoid nonce conflicts
-    when multiple users have approved trades. Maintains FIFO ordering
-    and provides status tracking for queued trades.
+    Each user has their own FIFO shard. At most one trade per user runs at
+    a time, and at most max_concurrency trades run in total. Users with
+    pending trades are served round-robin: after a trade finishes, its user
+    goes to the back of the line. Provides status tracking for queued trades;
+    finished trades are dropped after history_ttl seconds or once more than
+    max_history have finished, whichever comes first.
     """
     
-    def __init__(self):
-        """Initialize trade execution queue."""
-        self._queue: asyncio.Queue = asyncio.Queue()
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        history_ttl: float = 3600.0,
+        max_history: int = 1000
+    ):
+        """
+        Initialize trade execution queue.
+        
+        Args:
+            max_concurrency: Maximum trades executing at once, across wallets (default 8)
+            history_ttl: Seconds finished trades stay queryable (default 1 hour)
+            max_history: Maximum finished trades kept (default 1000)
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self._shards: Dict[str, Deque[QueuedTrade]] = {}  # user_id -> pending trades
+        self._ready: Deque[str] = deque()  # Users with pending trades and none executing
+        self._active: Set[str] = set()  # Users with a trade executing
+        self._tasks: Set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
         self._trades: Dict[str, QueuedTrade] = {}  # trade_id -> QueuedTrade
         self._processing = False
         self._processor_task: Optional[asyncio.Task] = None
         self._trade_counter = 0
         self._lock = asyncio.Lock()
+        self.history_ttl = history_ttl
+        self.max_history = max_history
+        self._finished: Deque[str] = deque()  # Finished trade_ids, oldest first
+        self.completed_total = 0
+        self.failed_total = 0
+        self.queue_wait_histogram = LatencyHistogram()
+        self.execution_histogram = LatencyHistogram()
         
-        logger.info("TradeQueue initialized")
+        logger.info(f"TradeQueue initialized (max {self.max_concurrency} concurrent wallets)")
     
     def _generate_trade_id(self, user_id: str) -> str:
         """
@@ -63,7 +155,7 @@ class TradeQueue:
         
         Args:
             user_id: User ID for the trade
-            
+        
         Returns:
             Unique trade ID
         """
@@ -78,13 +170,13 @@ class TradeQueue:
         execute_func: Callable
     ) -> str:
         """
-        Add a trade to the execution queue.
+        Add a trade to its user's execution queue.
         
         Args:
             user_id: User ID for the trade
             opportunity: Opportunity object
             execute_func: Async function to execute the trade
-            
+        
         Returns:
             Trade ID for tracking
         """
@@ -97,11 +189,16 @@ class TradeQueue:
                 opportunity=opportunity,
                 execute_func=execute_func,
                 queued_at=datetime.now(),
-                status=TradeStatus.PENDING
+                status=TradeStatus.PENDING,
+                completion=asyncio.get_running_loop().create_future()
             )
             
             self._trades[trade_id] = queued_trade
-            await self._queue.put(queued_trade)
+            shard = self._shards.setdefault(user_id, deque())
+            shard.append(queued_trade)
+            if len(shard) == 1 and user_id not in self._active:
+                self._ready.append(user_id)
+            self._wakeup.set()
             
             logger.info(
                 f"Trade queued: {trade_id} for user {user_id} "
@@ -114,7 +211,7 @@ class TradeQueue:
         """
         Start processing trades from the queue.
         
-        Launches a background task that processes trades sequentially.
+        Launches a background task that dispatches trades to workers.
         """
         if self._processing:
             logger.warning("Trade queue processor already running")
@@ -128,95 +225,161 @@ class TradeQueue:
         """
         Stop processing trades from the queue.
         
-        Waits for current trade to complete before stopping.
+        Waits for executing trades to complete before stopping. Trades still
+        pending stay queued.
         """
         if not self._processing:
             return
         
         self._processing = False
+        self._wakeup.set()
         
         if self._processor_task:
-            # Wait for current trade to complete
-            try:
-                await asyncio.wait_for(self._processor_task, timeout=30.0)
-            except asyncio.TimeoutError:
-                logger.warning("Trade queue processor did not stop within timeout")
-                self._processor_task.cancel()
+            await self._processor_task
+        
+        if self._tasks:
+            # Wait for executing trades to complete
+            done, pending = await asyncio.wait(self._tasks, timeout=30.0)
+            if pending:
+                logger.warning(f"{len(pending)} trades did not finish within timeout")
+                for task in pending:
+                    task.cancel()
         
         logger.info("Trade queue processor stopped")
     
     async def _process_queue(self):
         """
-        Process trades from the queue sequentially.
+        Dispatch trades to workers.
         
-        Runs continuously while processing is enabled, executing trades
-        one at a time in FIFO order.
+        Runs continuously while processing is enabled, starting the next
+        trade of each ready user while there is free capacity.
         """
         logger.info("Trade queue processor running")
         
         while self._processing:
+            self._wakeup.clear()
             try:
-                # Get next trade from queue (with timeout to allow checking _processing flag)
-                try:
-                    queued_trade = await asyncio.wait_for(
-                        self._queue.get(),
-                        timeout=1.0
-                    )
-                except asyncio.TimeoutError:
-                    # No trade available, continue loop
-                    continue
-                
-                # Update status to executing
-                queued_trade.status = TradeStatus.EXECUTING
-                queued_trade.executed_at = datetime.now()
-                
-                logger.info(
-                    f"Executing trade {queued_trade.trade_id} for user {queued_trade.user_id}"
-                )
-                
-                try:
-                    # Execute the trade
-                    result = await queued_trade.execute_func()
-                    
-                    # Mark as completed
-                    queued_trade.status = TradeStatus.COMPLETED
-                    queued_trade.result = result
-                    
-                    logger.info(
-                        f"Trade {queued_trade.trade_id} completed successfully"
-                    )
-                    
-                except Exception as e:
-                    # Mark as failed
-                    queued_trade.status = TradeStatus.FAILED
-                    queued_trade.error = e
-                    
-                    logger.error(
-                        f"Trade {queued_trade.trade_id} failed: {e}",
-                        exc_info=True
-                    )
-                
-                finally:
-                    # Mark task as done
-                    self._queue.task_done()
-                
+                self._dispatch()
             except Exception as e:
                 logger.error(f"Error in trade queue processor: {e}", exc_info=True)
-                # Continue processing despite error
-                continue
+            await self._wakeup.wait()
         
         logger.info("Trade queue processor stopped")
     
+    def _dispatch(self):
+        """Start trades for ready users, round-robin, up to max_concurrency."""
+        while self._ready and len(self._active) < self.max_concurrency:
+            user_id = self._ready.popleft()
+            shard = self._shards.get(user_id)
+            if not shard:
+                self._shards.pop(user_id, None)
+                continue
+            
+            queued_trade = shard.popleft()
+            if not shard:
+                del self._shards[user_id]
+            
+            self._active.add(user_id)
+            task = asyncio.create_task(self._execute_trade(queued_trade))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _execute_trade(self, queued_trade: QueuedTrade):
+        """
+        Execute one trade and free its wallet for the next one.
+        
+        Args:
+            queued_trade: Trade to execute
+        """
+        # Update status to executing
+        queued_trade.status = TradeStatus.EXECUTING
+        queued_trade.executed_at = datetime.now()
+        self.queue_wait_histogram.observe(
+            (queued_trade.executed_at - queued_trade.queued_at).total_seconds()
+        )
+        
+        logger.info(
+            f"Executing trade {queued_trade.trade_id} for user {queued_trade.user_id}"
+        )
+        
+        try:
+            # Execute the trade
+            result = await queued_trade.execute_func()
+            
+            # Mark as completed
+            queued_trade.status = TradeStatus.COMPLETED
+            queued_trade.result = result
+            
+            logger.info(
+                f"Trade {queued_trade.trade_id} completed successfully"
+            )
+        
+        except Exception as e:
+            # Mark as failed
+            queued_trade.status = TradeStatus.FAILED
+            queued_trade.error = e
+            
+            logger.error(
+                f"Trade {queued_trade.trade_id} failed: {e}",
+                exc_info=True
+            )
+        
+        finally:
+            self._finish(queued_trade)
+            
+            # The user's next trade waits behind every other ready user
+            user_id = queued_trade.user_id
+            self._active.discard(user_id)
+            if self._shards.get(user_id):
+                self._ready.append(user_id)
+            self._wakeup.set()
+    
+    def _finish(self, queued_trade: QueuedTrade):
+        """Record a finished trade, resolve its completion and trim history."""
+        queued_trade.finished_at = datetime.now()
+        self.execution_histogram.observe(
+            (queued_trade.finished_at - queued_trade.executed_at).total_seconds()
+        )
+        if queued_trade.status == TradeStatus.COMPLETED:
+            self.completed_total += 1
+        else:
+            # Cancelled mid-execution counts as failed
+            queued_trade.status = TradeStatus.FAILED
+            self.failed_total += 1
+        
+        if queued_trade.completion is not None and not queued_trade.completion.done():
+            queued_trade.completion.set_result(queued_trade.status)
+        
+        self._finished.append(queued_trade.trade_id)
+        self._prune_history()
+    
+    def _prune_history(self):
+        """
+        Drop finished trades beyond max_history or older than history_ttl.
+        
+        Runs when a trade finishes and on every lookup, so an idle queue
+        still forgets expired trades.
+        """
+        cutoff = datetime.now() - timedelta(seconds=self.history_ttl)
+        while self._finished:
+            trade = self._trades.get(self._finished[0])
+            if trade is not None and len(self._finished) <= self.max_history and trade.finished_at >= cutoff:
+                break
+            self._finished.popleft()
+            if trade is not None:
+                del self._trades[trade.trade_id]
+    
     def get_trade_status(self, trade_id: str) -> Optional[TradeStatus]:
         """
         Get status of a queued trade.
         
         Args:
             trade_id: Trade ID to check
-            
+        
         Returns:
             TradeStatus if trade exists, None otherwise
         """
+        self._prune_history()
         if trade_id in self._trades:
             return self._trades[trade_id].status
         return None
@@ -227,10 +390,11 @@ class TradeQueue:
         
         Args:
             trade_id: Trade ID to check
-            
+        
         Returns:
             Trade result if completed, None otherwise
         """
+        self._prune_history()
         if trade_id in self._trades:
             trade = self._trades[trade_id]
             if trade.status == TradeStatus.COMPLETED:
@@ -243,10 +407,11 @@ class TradeQueue:
         
         Args:
             trade_id: Trade ID to check
-            
+        
         Returns:
             Exception if trade failed, None otherwise
         """
+        self._prune_history()
         if trade_id in self._trades:
             trade = self._trades[trade_id]
             if trade.status == TradeStatus.FAILED:
@@ -260,6 +425,7 @@ class TradeQueue:
         Returns:
             Dictionary with queue metrics
         """
+        self._prune_history()
         pending_count = sum(
             1 for t in self._trades.values()
             if t.status == TradeStatus.PENDING
@@ -278,44 +444,49 @@ class TradeQueue:
         )
         
         return {
-            "queue_size": self._queue.qsize(),
+            "queue_size": sum(len(shard) for shard in self._shards.values()),
             "total_trades": len(self._trades),
             "pending": pending_count,
             "executing": executing_count,
             "completed": completed_count,
             "failed": failed_count,
-            "processing": self._processing
+            "processing": self._processing,
+            "active_wallets": len(self._active),
+            "waiting_wallets": len(self._shards),
+            "max_concurrency": self.max_concurrency,
+            "completed_total": self.completed_total,
+            "failed_total": self.failed_total,
+            "queue_wait_seconds": self.queue_wait_histogram.to_dict(),
+            "execution_seconds": self.execution_histogram.to_dict()
         }
     
     async def wait_for_trade(self, trade_id: str, timeout: float = 60.0) -> bool:
         """
         Wait for a trade to complete.
         
+        Returns as soon as the trade's execution ends.
+        
         Args:
             trade_id: Trade ID to wait for
             timeout: Maximum time to wait in seconds
-            
+        
         Returns:
             True if trade completed, False if timeout or failed
         """
-        start_time = datetime.now()
+        self._prune_history()
+        trade = self._trades.get(trade_id)
+        if trade is None:
+            return False
         
-        while (datetime.now() - start_time).total_seconds() < timeout:
-            if trade_id not in self._trades:
-                return False
-            
-            trade = self._trades[trade_id]
-            
-            if trade.status == TradeStatus.COMPLETED:
-                return True
-            elif trade.status == TradeStatus.FAILED:
-                return False
-            
-            # Wait a bit before checking again
-            await asyncio.sleep(0.5)
+        if trade.status in (TradeStatus.COMPLETED, TradeStatus.FAILED) or trade.completion is None:
+            return trade.status == TradeStatus.COMPLETED
+        
+        try:
+            status = await asyncio.wait_for(asyncio.shield(trade.completion), timeout)
+        except asyncio.TimeoutError:
+            return False
         
-        # Timeout
-        return False
+        return status == TradeStatus.COMPLETED
     
     def clear_completed_trades(self, max_age_seconds: int = 3600):
         """
@@ -337,4 +508,5 @@ class TradeQueue:
             del self._trades[trade_id]
         
         if trades_to_remove:
+            self._finished = deque(trade_id for trade_id in self._finished if trade_id in self._trades)
             logger.info(f"Cleared {len(trades_to_remove)} old trades from queue")
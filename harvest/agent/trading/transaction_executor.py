@@ -20,6 +20,9 @@ from solana.rpc.async_api import AsyncClient
 from solana.rpc.commitment import Confirmed
 from solana.rpc.types import TxOpts
 
+from agent.trading.confirmation_tracker import ConfirmationTracker
+from agent.trading.network_oracle import NetworkOracle
+
 logger = logging.getLogger(__name__)
 
 
@@ -152,6 +155,8 @@ class TransactionExecutor:
         max_retries: int = 3,
         confirmation_timeout: int = 60,
         base_priority_fee: int = 5000,  # microlamports
+        confirmation_tracker: Optional[ConfirmationTracker] = None,
+        network_oracle: Optional[NetworkOracle] = None,
     ):
         """
         Initialize transaction executor.
@@ -163,6 +168,8 @@ class TransactionExecutor:
             max_retries: Maximum retry attempts (default 3)
             confirmation_timeout: Seconds to wait for confirmation (default 60)
             base_priority_fee: Base priority fee in microlamports (default 5000)
+            confirmation_tracker: Shared ConfirmationTracker (a private one if omitted)
+            network_oracle: Shared blockhash and priority-fee oracle (a private one if omitted)
         """
         self.rpc_client = rpc_client
         self.wallet_manager = wallet_manager
@@ -171,6 +178,11 @@ class TransactionExecutor:
         self.confirmation_timeout = confirmation_timeout
         self.base_priority_fee = base_priority_fee
         self.current_priority_fee = base_priority_fee
+        self.confirmation_tracker = confirmation_tracker or ConfirmationTracker(rpc_client)
+        self.network_oracle = network_oracle or NetworkOracle(
+            rpc_client,
+            base_priority_fee=base_priority_fee
+        )
         
         logger.info(
             f"TransactionExecutor initialized: "
@@ -184,7 +196,8 @@ class TransactionExecutor:
         transaction: Transaction,
         strategy_name: str,
         expected_profit: float = 0.0,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        wallet_manager=None
     ) -> ExecutionResult:
         """
         Execute a transaction with retry logic.
@@ -194,6 +207,8 @@ class TransactionExecutor:
             strategy_name: Name of strategy executing the transaction
             expected_profit: Expected profit from the transaction
             user_id: Optional user ID for user-specific RPC routing
+            wallet_manager: Wallet that signs the transaction (the executor's
+                own wallet if omitted)
             
         Returns:
             ExecutionResult with transaction hash and status
@@ -201,9 +216,10 @@ class TransactionExecutor:
         start_time = time.time()
         retry_count = 0
         last_error = None
+        wallet_manager = wallet_manager or self.wallet_manager
         
         # Get initial balance
-        initial_balance = await self.wallet_manager.get_balance()
+        initial_balance = await wallet_manager.get_balance()
         
         for attempt in range(self.max_retries):
             try:
@@ -216,7 +232,7 @@ class TransactionExecutor:
                     await asyncio.sleep(5)
                 
                 # Sign transaction
-                signed_tx = await self._sign_transaction(transaction)
+                signed_tx = await self._sign_transaction(transaction, wallet_manager)
                 
                 # Submit transaction
                 signature = await self._submit_transaction(signed_tx, user_id)
@@ -233,7 +249,7 @@ class TransactionExecutor:
                     raise Exception("Transaction confirmation timeout")
                 
                 # Get final balance and calculate actual profit
-                final_balance = await self.wallet_manager.get_balance()
+                final_balance = await wallet_manager.get_balance()
                 actual_profit = final_balance - initial_balance
                 
                 # Calculate gas fee (approximate)
@@ -298,7 +314,7 @@ class TransactionExecutor:
         
         # All retries failed
         execution_time_ms = int((time.time() - start_time) * 1000)
-        final_balance = await self.wallet_manager.get_balance()
+        final_balance = await wallet_manager.get_balance()
         
         logger.error(
             f"Transaction failed after {retry_count} retries: {last_error} "
@@ -320,12 +336,13 @@ class TransactionExecutor:
             final_balance=final_balance
         )
     
-    async def _sign_transaction(self, transaction: Transaction) -> Transaction:
+    async def _sign_transaction(self, transaction: Transaction, wallet_manager=None) -> Transaction:
         """
         Sign transaction using wallet manager.
         
         Args:
             transaction: Unsigned transaction
+            wallet_manager: Wallet to sign with (the executor's own wallet if omitted)
             
         Returns:
             Signed transaction
@@ -333,12 +350,11 @@ class TransactionExecutor:
         try:
             # Get recent blockhash if not set
             if not hasattr(transaction, 'recent_blockhash') or not transaction.recent_blockhash:
-                blockhash_resp = await self.rpc_client.get_latest_blockhash()
-                recent_blockhash = blockhash_resp.value.blockhash
-                transaction.recent_blockhash = recent_blockhash
+                blockhash_info = await self.network_oracle.get_blockhash()
+                transaction.recent_blockhash = blockhash_info.blockhash
             
             # Sign with wallet
-            signed_tx = self.wallet_manager.sign_transaction(transaction)
+            signed_tx = (wallet_manager or self.wallet_manager).sign_transaction(transaction)
             
             logger.debug("Transaction signed successfully")
             return signed_tx
@@ -397,47 +413,20 @@ class TransactionExecutor:
         """
         Wait for transaction confirmation.
         
+        The signature is polled together with every other in-flight
+        signature by the shared confirmation tracker.
+        
         Args:
             signature: Transaction signature
             timeout: Timeout in seconds
             
         Returns:
             True if confirmed, False if timeout
-        """
-        try:
-            start_time = time.time()
-            
-            while time.time() - start_time < timeout:
-                try:
-                    # Check transaction status
-                    response = await self.rpc_client.get_signature_statuses([signature])
-                    
-                    if response.value and response.value[0]:
-                        status = response.value[0]
-                        
-                        # Check if confirmed
-                        if status.confirmation_status in ["confirmed", "finalized"]:
-                            logger.debug(f"Transaction confirmed: {signature}")
-                            return True
-                        
-                        # Check for errors
-                        if status.err:
-                            raise Exception(f"Transaction failed: {status.err}")
-                    
-                    # Wait before next check
-                    await asyncio.sleep(2)
-                
-                except Exception as e:
-                    # Log but continue waiting
-                    logger.debug(f"Error checking confirmation: {e}")
-                    await asyncio.sleep(2)
             
-            logger.warning(f"Transaction confirmation timeout: {signature}")
-            return False
-        
-        except Exception as e:
-            logger.error(f"Error waiting for confirmation: {e}")
-            return False
+        Raises:
+            TransactionFailedError: If the transaction landed with an error
+        """
+        return await self.confirmation_tracker.wait(signature, timeout)
     
     async def _handle_blockhash_expiration(
         self,
@@ -453,12 +442,11 @@ class TransactionExecutor:
             Transaction with fresh blockhash
         """
         try:
-            # Get fresh blockhash
-            blockhash_resp = await self.rpc_client.get_latest_blockhash()
-            recent_blockhash = blockhash_resp.value.blockhash
+            # Get fresh blockhash, bypassing the oracle's cached one
+            blockhash_info = await self.network_oracle.get_blockhash(force=True)
             
             # Update transaction
-            transaction.recent_blockhash = recent_blockhash
+            transaction.recent_blockhash = blockhash_info.blockhash
             
             logger.debug("Blockhash refreshed")
             return transaction
@@ -469,18 +457,15 @@ class TransactionExecutor:
     
     async def _set_priority_fee(self, retry_attempt: int = 0):
         """
-        Query and set priority fee for transaction.
+        Set priority fee for transaction from the network oracle.
         
         Args:
-            retry_attempt: Current retry attempt (increases fee on retries)
+            retry_attempt: Current retry attempt (moves up the fee distribution on retries)
         """
         try:
-            # Query priority fee recommendations
-            priority_fee = await self._get_priority_fee_recommendation()
+            priority_fee = await self.network_oracle.recommend_priority_fee(retry_attempt)
             
-            # Increase fee on retries (50% higher per retry)
             if retry_attempt > 0:
-                priority_fee = int(priority_fee * (1.5 ** retry_attempt))
                 logger.info(f"Increased priority fee to {priority_fee} (retry {retry_attempt})")
             
             self.current_priority_fee = priority_fee
@@ -491,25 +476,13 @@ class TransactionExecutor:
     
     async def _get_priority_fee_recommendation(self) -> int:
         """
-        Get priority fee recommendation from RPC.
+        Get priority fee recommendation from the network oracle.
         
         Returns:
             Recommended priority fee in microlamports
         """
         try:
-            # Query recent prioritization fees
-            response = await self.rpc_client.get_recent_prioritization_fees()
-            
-            if response and len(response) > 0:
-                # Use median of recent fees
-                fees = [fee.prioritization_fee for fee in response]
-                fees.sort()
-                median_fee = fees[len(fees) // 2]
-                
-                # Use at least base fee
-                return max(median_fee, self.base_priority_fee)
-            
-            return self.base_priority_fee
+            return await self.network_oracle.recommend_priority_fee()
         
         except Exception as e:
             logger.debug(f"Failed to get priority fee recommendation: {e}")
@@ -520,19 +493,13 @@ class TransactionExecutor:
         Check if network is congested based on priority fees.
         
         Returns:
-            True if congested (priority fee > 0.001 SOL)
+            True if congested (median priority fee > 0.001 SOL)
         """
         try:
-            priority_fee = await self._get_priority_fee_recommendation()
-            
-            # Convert microlamports to SOL
-            priority_fee_sol = priority_fee / 1_000_000_000_000
-            
-            # Consider congested if fee > 0.001 SOL
-            is_congested = priority_fee_sol > 0.001
+            is_congested = await self.network_oracle.is_congested()
             
             if is_congested:
-                logger.info(f"Network congested: priority fee = {priority_fee_sol:.6f} SOL")
+                logger.info(f"Network congested: median priority fee = {self.network_oracle.fees.p50} microlamports")
             
             return is_congested
         
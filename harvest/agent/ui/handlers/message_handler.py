@@ -40,11 +40,11 @@ class MessageHandler(BaseHandler):
             return
         
         # Get or create user profile
-        profile = self.bot.user_manager.get_or_create_user(user_id, username, first_name)
+        profile = await self.bot.user_manager.get_or_create_user_async(user_id, username, first_name)
         user_message = message_text.lower()
         
         # Add user message to history
-        self.bot.user_manager.add_conversation(user_id, "user", message_text)
+        await self.bot.user_manager.add_conversation_async(user_id, "user", message_text)
         
         # Handle natural language commands - check for common intents
         # Status check
@@ -64,7 +64,7 @@ class MessageHandler(BaseHandler):
                 response += f"Profit: {metrics.total_profit:.4f} SOL | Trades: {metrics.total_trades} | Win Rate: {metrics.win_rate:.1f}%"
                 
                 await update.message.reply_text(response)
-                self.bot.user_manager.add_conversation(user_id, "assistant", response)
+                await self.bot.user_manager.add_conversation_async(user_id, "assistant", response)
                 return
             except Exception as e:
                 logger.error(f"Error getting status: {e}")
@@ -75,7 +75,7 @@ class MessageHandler(BaseHandler):
                 self.bot.agent_loop.pause()
                 response = "⏸️ Trading paused. Say 'resume' when you want to start again."
                 await update.message.reply_text(response)
-                self.bot.user_manager.add_conversation(user_id, "assistant", response)
+                await self.bot.user_manager.add_conversation_async(user_id, "assistant", response)
                 return
             except Exception as e:
                 logger.error(f"Error pausing: {e}")
@@ -86,7 +86,7 @@ class MessageHandler(BaseHandler):
                 self.bot.agent_loop.resume()
                 response = "▶️ Trading resumed. Back to hunting!"
                 await update.message.reply_text(response)
-                self.bot.user_manager.add_conversation(user_id, "assistant", response)
+                await self.bot.user_manager.add_conversation_async(user_id, "assistant", response)
                 return
             except Exception as e:
                 logger.error(f"Error resuming: {e}")
@@ -104,7 +104,7 @@ class MessageHandler(BaseHandler):
 
 Just chat naturally - I'll understand!"""
             await update.message.reply_text(response)
-            self.bot.user_manager.add_conversation(user_id, "assistant", response)
+            await self.bot.user_manager.add_conversation_async(user_id, "assistant", response)
             return
         
         # Balance check
@@ -114,7 +114,7 @@ Just chat naturally - I'll understand!"""
                 address = str(self.bot.wallet.public_key)
                 response = f"💰 Balance: {balance:.4f} SOL\n\n📍 Wallet: `{address}`"
                 await update.message.reply_text(response, parse_mode="Markdown")
-                self.bot.user_manager.add_conversation(user_id, "assistant", response)
+                await self.bot.user_manager.add_conversation_async(user_id, "assistant", response)
                 return
             except Exception as e:
                 logger.error(f"Error getting balance: {e}")
@@ -155,7 +155,7 @@ Just chat naturally - I'll understand!"""
                         parse_mode="Markdown",
                         disable_web_page_preview=True
                     )
-                    self.bot.user_manager.add_conversation(user_id, "assistant", message)
+                    await self.bot.user_manager.add_conversation_async(user_id, "assistant", message)
                     return
         
         # Check if user is asking for portfolio analysis - handle it naturally
@@ -189,7 +189,7 @@ Just chat naturally - I'll understand!"""
                             parse_mode="Markdown",
                             disable_web_page_preview=True
                         )
-                        self.bot.user_manager.add_conversation(user_id, "assistant", message)
+                        await self.bot.user_manager.add_conversation_async(user_id, "assistant", message)
                         return
                     else:
                         await status_msg.edit_text(
@@ -222,7 +222,7 @@ Just chat naturally - I'll understand!"""
                 "Stay safe."
             )
             await update.message.reply_text(response)
-            self.bot.user_manager.add_conversation(user_id, "assistant", response)
+            await self.bot.user_manager.add_conversation_async(user_id, "assistant", response)
             return
         
         # Show typing indicator
@@ -234,7 +234,7 @@ Just chat naturally - I'll understand!"""
             address = str(self.bot.wallet.public_key)
             
             # Get user's conversation history
-            conversation_context = self.bot.user_manager.get_user_context(user_id, limit=5)
+            conversation_context = await self.bot.user_manager.get_user_context_async(user_id, limit=5)
             
             # Build context for AI - keep it minimal and chill
             system_prompt = f"""You are Harvest Bot - an autonomous trading agent on Solana. Keep it chill and natural.
@@ -298,10 +298,10 @@ Examples:
             await update.message.reply_text(response_text)
             
             # Add assistant response to history
-            self.bot.user_manager.add_conversation(user_id, "assistant", response_text)
+            await self.bot.user_manager.add_conversation_async(user_id, "assistant", response_text)
             
         except Exception as e:
             logger.error(f"Error in AI chat: {e}")
             error_msg = "Sorry, I had trouble understanding that. Try using /help to see what I can do."
             await update.message.reply_text(error_msg)
-            self.bot.user_manager.add_conversation(user_id, "assistant", error_msg)
+            await self.bot.user_manager.add_conversation_async(user_id, "assistant", error_msg)
@@ -175,6 +175,9 @@ class TelegramBot:
                 logger.error(f"Error during Telegram bot shutdown: {e}", exc_info=True)
                 self._initialized = False
     
+        # Commit buffered chat writes
+        await self.user_manager.close()
+    
     async def send_message(self, text: str, **kwargs):
         """
         Send a message to the user.
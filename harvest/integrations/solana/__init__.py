@@ -2,7 +2,7 @@
 Solana Protocol Integrations
 
 This module provides integration wrappers for various Solana protocols:
-- Helius: Enhanced RPC client with authentication
+- Helius: Enhanced RPC client with authentication (async, with a sync shim)
 - Marinade: Liquid staking protocol
 - Kamino: Yield farming vaults
 - Jupiter: Token swap aggregator
@@ -11,7 +11,7 @@ This module provides integration wrappers for various Solana protocols:
 - MarginFi: Lending and borrowing protocol
 """
 
-from .helius import HeliusClient
+from .helius import AsyncHeliusClient, HeliusClient
 from .marinade import MarinadeIntegration
 from .kamino import KaminoIntegration, VaultInfo
 from .jupiter import JupiterIntegration, SwapRoute
@@ -21,6 +21,7 @@ from .marginfi import MarginFiIntegration, MarginfiPool
 
 
 __all__ = [
+    "AsyncHeliusClient",
     "HeliusClient",
     "MarinadeIntegration",
     "KaminoIntegration",
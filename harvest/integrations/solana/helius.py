@@ -2,38 +2,64 @@
 Helius RPC Client Integration
 
 Provides a wrapper for the Helius RPC API with authentication handling.
+
+AsyncHeliusClient is the asyncio-native client: one pooled keep-alive
+session, JSON-RPC batches, the Helius enhanced transaction and priority fee
+APIs, and a token bucket so requests wait for capacity instead of drawing
+HTTP 429s. HeliusClient keeps the original blocking interface for legacy
+callers by running the async client on a private event loop thread.
 """
 
 import os
+import asyncio
 import logging
-from typing import Optional, Dict, Any
-import requests
-from solders.rpc.requests import GetBalance, GetAccountInfo
-from solders.rpc.responses import GetBalanceResp, GetAccountInfoResp
-from solders.pubkey import Pubkey
+import threading
+from typing import Optional, Dict, Any, List, Tuple
+import aiohttp
+
+from agent.core.rate_limiter import KeyRateLimiter
+from agent.core.rpc_fallback import RPCError
 
 
 logger = logging.getLogger(__name__)
 
 
-class HeliusClient:
+class AsyncHeliusClient:
     """
-    Helius RPC client wrapper with authentication handling.
+    Asyncio-native Helius RPC client.
     
     Provides enhanced RPC functionality through Helius API including:
-    - Standard Solana RPC methods
+    - Standard Solana RPC methods, singly or batched
     - Enhanced transaction history
-    - Webhook support
-    - NFT metadata
+    - Priority fee estimates
+    
+    Every request, batch or REST call takes one token from the client's
+    rate limiter. Pass the application's shared KeyRateLimiter with this
+    key's index so the client draws from the same per-key budget as the
+    RPC fallback manager.
     """
     
-    def __init__(self, api_key: Optional[str] = None, network: str = "devnet"):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        network: str = "devnet",
+        rate_limiter: Optional[KeyRateLimiter] = None,
+        key_index: int = 0,
+        requests_per_second: float = 10.0,
+        timeout: float = 30.0,
+        max_connections: int = 20
+    ):
         """
         Initialize Helius RPC client.
         
         Args:
             api_key: Helius API key (defaults to HELIUS_API_KEY env var)
             network: Network to connect to ("devnet" or "mainnet-beta")
+            rate_limiter: Shared KeyRateLimiter (a private one if omitted)
+            key_index: Index of this API key in the rate limiter
+            requests_per_second: Rate of the private limiter (default 10)
+            timeout: Total request timeout in seconds (default 30)
+            max_connections: Pooled keep-alive connections (default 20)
         
         Raises:
             ValueError: If API key is not provided
@@ -44,12 +70,17 @@ class HeliusClient:
         
         self.network = network
         self.base_url = f"https://rpc.helius.xyz/?api-key={self.api_key}"
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Content-Type": "application/json"
-        })
+        self.api_base = (
+            "https://api.helius.xyz" if network == "mainnet-beta" else "https://api-devnet.helius.xyz"
+        )
+        self.rate_limiter = rate_limiter or KeyRateLimiter(requests_per_second=requests_per_second)
+        self.key_index = key_index
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._request_id = 0
         
-        logger.info(f"Initialized Helius client for {network}")
+        logger.info(f"Initialized async Helius client for {network}")
     
     def get_rpc_url(self) -> str:
         """
@@ -60,7 +91,90 @@ class HeliusClient:
         """
         return self.base_url
     
-    def rpc_call(self, method: str, params: list = None) -> Dict[str, Any]:
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the pooled session, creating it if needed."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=60,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"Content-Type": "application/json"}
+            )
+        return self._session
+    
+    async def start(self):
+        """Open the pooled session."""
+        self._get_session()
+    
+    async def close(self):
+        """Close the pooled session."""
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+    
+    async def __aenter__(self) -> "AsyncHeliusClient":
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def _request(
+        self,
+        http_method: str,
+        url: str,
+        label: str,
+        json_body: Any = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """
+        Send one rate-limited HTTP request and decode the JSON body.
+        
+        Args:
+            http_method: "GET" or "POST"
+            url: Request URL
+            label: Description for error messages
+            json_body: JSON body for POST requests
+            params: Query string parameters
+        
+        Returns:
+            Decoded JSON body
+        
+        Raises:
+            RPCError: On timeouts, network errors or non-200 responses
+        """
+        await self.rate_limiter.acquire(self.key_index)
+        
+        try:
+            async with self._get_session().request(
+                http_method,
+                url,
+                json=json_body,
+                params=params,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            ) as response:
+                if response.status != 200:
+                    logger.error(f"HTTP {response.status} from Helius for {label}")
+                    raise RPCError(f"HTTP {response.status} from Helius", code=response.status, method=label)
+                return await response.json()
+        
+        except asyncio.TimeoutError:
+            logger.error(f"RPC call timeout for {label}")
+            raise RPCError(f"RPC call timeout for {label}", method=label)
+        
+        except aiohttp.ClientError as e:
+            logger.error(f"RPC call failed for {label}: {str(e)}")
+            raise RPCError(f"RPC call failed: {str(e)}", method=label)
+    
+    def _next_id(self) -> int:
+        self._request_id += 1
+        return self._request_id
+    
+    async def rpc_call(self, method: str, params: list = None) -> Dict[str, Any]:
         """
         Make a JSON-RPC call to Helius.
         
@@ -69,43 +183,69 @@ class HeliusClient:
             params: Method parameters
         
         Returns:
-            RPC response as dictionary
+            RPC result
         
         Raises:
-            Exception: If RPC call fails
+            RPCError: If RPC call fails
         """
-        if params is None:
-            params = []
-        
         payload = {
             "jsonrpc": "2.0",
-            "id": 1,
+            "id": self._next_id(),
             "method": method,
-            "params": params
+            "params": params or []
         }
         
-        try:
-            response = self.session.post(self.base_url, json=payload, timeout=30)
-            response.raise_for_status()
-            
-            result = response.json()
-            
-            if "error" in result:
-                error_msg = result["error"].get("message", "Unknown error")
-                logger.error(f"RPC error for {method}: {error_msg}")
-                raise Exception(f"RPC call failed: {error_msg}")
-            
-            return result.get("result", {})
-        
-        except requests.exceptions.Timeout:
-            logger.error(f"RPC call timeout for {method}")
-            raise Exception(f"RPC call timeout for {method}")
-        
-        except requests.exceptions.RequestException as e:
-            logger.error(f"RPC call failed for {method}: {str(e)}")
-            raise Exception(f"RPC call failed: {str(e)}")
+        result = await self._request("POST", self.base_url, method, json_body=payload)
+        
+        if "error" in result:
+            error = result["error"] or {}
+            error_msg = error.get("message", "Unknown error")
+            logger.error(f"RPC error for {method}: {error_msg}")
+            raise RPCError(f"RPC call failed: {error_msg}", code=error.get("code"), method=method)
+        
+        return result.get("result", {})
     
-    def get_balance(self, pubkey: str) -> float:
+    async def rpc_batch(self, calls: List[Tuple[str, Optional[List[Any]]]]) -> List[Any]:
+        """
+        Send several RPC requests in one HTTP round trip (JSON-RPC batch).
+        
+        Args:
+            calls: List of (method, params) tuples
+        
+        Returns:
+            Results in the same order as calls; failed entries hold an
+            RPCError instead of a result
+        
+        Raises:
+            RPCError: If the batch as a whole fails
+        """
+        if not calls:
+            return []
+        
+        payload = [
+            {"jsonrpc": "2.0", "id": index, "method": method, "params": params or []}
+            for index, (method, params) in enumerate(calls)
+        ]
+        data = await self._request("POST", self.base_url, f"batch of {len(calls)}", json_body=payload)
+        
+        if not isinstance(data, list):
+            error = data.get("error", {}) if isinstance(data, dict) else {}
+            raise RPCError(f"Batch rejected by Helius: {error.get('message', 'Unexpected response')}")
+        
+        by_id = {entry.get("id"): entry for entry in data if isinstance(entry, dict)}
+        results = []
+        for index, (method, _) in enumerate(calls):
+            entry = by_id.get(index)
+            if entry is None:
+                results.append(RPCError(f"No response for {method}", method=method))
+            elif "error" in entry:
+                error = entry["error"] or {}
+                results.append(RPCError(error.get("message", "Unknown error"), code=error.get("code"), method=method))
+            else:
+                results.append(entry.get("result", {}))
+        return results
+    
+    async def get_balance(self, pubkey: str) -> float:
         """
         Get SOL balance for a public key.
         
@@ -116,14 +256,30 @@ class HeliusClient:
             Balance in SOL
         """
         try:
-            result = self.rpc_call("getBalance", [pubkey])
+            result = await self.rpc_call("getBalance", [pubkey])
             lamports = result.get("value", 0)
             return lamports / 1e9  # Convert lamports to SOL
         except Exception as e:
             logger.error(f"Failed to get balance for {pubkey}: {str(e)}")
             raise
     
-    def get_token_balance(self, token_account: str) -> float:
+    async def get_balances(self, pubkeys: List[str]) -> Dict[str, Optional[float]]:
+        """
+        Get SOL balances for several public keys in one batch.
+        
+        Args:
+            pubkeys: Public keys as strings
+        
+        Returns:
+            Dictionary mapping public key to balance in SOL (None if its entry failed)
+        """
+        results = await self.rpc_batch([("getBalance", [pubkey]) for pubkey in pubkeys])
+        return {
+            pubkey: None if isinstance(result, RPCError) else result.get("value", 0) / 1e9
+            for pubkey, result in zip(pubkeys, results)
+        }
+    
+    async def get_token_balance(self, token_account: str) -> float:
         """
         Get SPL token balance for a token account.
         
@@ -134,14 +290,14 @@ class HeliusClient:
             Token balance
         """
         try:
-            result = self.rpc_call("getTokenAccountBalance", [token_account])
+            result = await self.rpc_call("getTokenAccountBalance", [token_account])
             amount = result.get("value", {}).get("uiAmount", 0)
             return float(amount)
         except Exception as e:
             logger.error(f"Failed to get token balance for {token_account}: {str(e)}")
             raise
     
-    def get_account_info(self, pubkey: str) -> Optional[Dict[str, Any]]:
+    async def get_account_info(self, pubkey: str) -> Optional[Dict[str, Any]]:
         """
         Get account information.
         
@@ -152,13 +308,13 @@ class HeliusClient:
             Account info dictionary or None if account doesn't exist
         """
         try:
-            result = self.rpc_call("getAccountInfo", [pubkey, {"encoding": "jsonParsed"}])
+            result = await self.rpc_call("getAccountInfo", [pubkey, {"encoding": "jsonParsed"}])
             return result.get("value")
         except Exception as e:
             logger.error(f"Failed to get account info for {pubkey}: {str(e)}")
             raise
     
-    def get_transaction(self, signature: str) -> Optional[Dict[str, Any]]:
+    async def get_transaction(self, signature: str) -> Optional[Dict[str, Any]]:
         """
         Get transaction details by signature.
         
@@ -169,13 +325,12 @@ class HeliusClient:
             Transaction details or None if not found
         """
         try:
-            result = self.rpc_call("getTransaction", [signature, {"encoding": "jsonParsed"}])
-            return result
+            return await self.rpc_call("getTransaction", [signature, {"encoding": "jsonParsed"}])
         except Exception as e:
             logger.error(f"Failed to get transaction {signature}: {str(e)}")
             raise
     
-    def send_transaction(self, signed_transaction: str) -> str:
+    async def send_transaction(self, signed_transaction: str) -> str:
         """
         Send a signed transaction.
         
@@ -186,13 +341,12 @@ class HeliusClient:
             Transaction signature
         """
         try:
-            result = self.rpc_call("sendTransaction", [signed_transaction])
-            return result
+            return await self.rpc_call("sendTransaction", [signed_transaction])
         except Exception as e:
             logger.error(f"Failed to send transaction: {str(e)}")
             raise
     
-    def get_latest_blockhash(self) -> Dict[str, Any]:
+    async def get_latest_blockhash(self) -> Dict[str, Any]:
         """
         Get the latest blockhash.
         
@@ -200,13 +354,13 @@ class HeliusClient:
             Blockhash information
         """
         try:
-            result = self.rpc_call("getLatestBlockhash")
+            result = await self.rpc_call("getLatestBlockhash")
             return result.get("value", {})
         except Exception as e:
             logger.error(f"Failed to get latest blockhash: {str(e)}")
             raise
     
-    def simulate_transaction(self, transaction: str) -> Dict[str, Any]:
+    async def simulate_transaction(self, transaction: str) -> Dict[str, Any]:
         """
         Simulate a transaction without sending it.
         
@@ -217,8 +371,213 @@ class HeliusClient:
             Simulation result
         """
         try:
-            result = self.rpc_call("simulateTransaction", [transaction])
+            result = await self.rpc_call("simulateTransaction", [transaction])
             return result.get("value", {})
         except Exception as e:
             logger.error(f"Failed to simulate transaction: {str(e)}")
             raise
+    
+    async def get_priority_fee_estimate(
+        self,
+        account_keys: Optional[List[str]] = None,
+        transaction: Optional[str] = None,
+        priority_level: str = "Medium",
+        include_all_levels: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Estimate a priority fee with the Helius priority fee API.
+        
+        Args:
+            account_keys: Accounts the transaction writes to
+            transaction: Serialized transaction, instead of account_keys
+            priority_level: "Min", "Low", "Medium", "High", "VeryHigh" or "UnsafeMax"
+            include_all_levels: Also return the estimate for every level
+        
+        Returns:
+            Dictionary with priorityFeeEstimate (micro-lamports per compute
+            unit) and, if requested, priorityFeeLevels
+        """
+        request: Dict[str, Any] = {"options": {"priorityLevel": priority_level}}
+        if include_all_levels:
+            request["options"]["includeAllPriorityFeeLevels"] = True
+        if transaction is not None:
+            request["transaction"] = transaction
+        else:
+            request["accountKeys"] = account_keys or []
+        
+        try:
+            return await self.rpc_call("getPriorityFeeEstimate", [request])
+        except Exception as e:
+            logger.error(f"Failed to get priority fee estimate: {str(e)}")
+            raise
+    
+    async def get_enhanced_transactions(self, signatures: List[str]) -> List[Dict[str, Any]]:
+        """
+        Parse transactions with the Helius enhanced transactions API.
+        
+        Args:
+            signatures: Transaction signatures (up to 100)
+        
+        Returns:
+            Human-readable transactions with type, source and transfers
+        """
+        try:
+            return await self._request(
+                "POST",
+                f"{self.api_base}/v0/transactions",
+                "enhanced transactions",
+                json_body={"transactions": signatures},
+                params={"api-key": self.api_key}
+            )
+        except Exception as e:
+            logger.error(f"Failed to get enhanced transactions: {str(e)}")
+            raise
+    
+    async def get_address_transactions(
+        self,
+        address: str,
+        limit: int = 100,
+        before: Optional[str] = None,
+        tx_type: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get an address's parsed transaction history from the enhanced API.
+        
+        Args:
+            address: Account address
+            limit: Maximum transactions to return (1-100)
+            before: Only return transactions before this signature
+            tx_type: Only return this transaction type (e.g. "SWAP")
+        
+        Returns:
+            Human-readable transactions, newest first
+        """
+        params: Dict[str, Any] = {"api-key": self.api_key, "limit": limit}
+        if before:
+            params["before"] = before
+        if tx_type:
+            params["type"] = tx_type
+        
+        try:
+            return await self._request(
+                "GET",
+                f"{self.api_base}/v0/addresses/{address}/transactions",
+                "address transactions",
+                params=params
+            )
+        except Exception as e:
+            logger.error(f"Failed to get transactions for {address}: {str(e)}")
+            raise
+
+
+class HeliusClient:
+    """
+    Blocking Helius RPC client for legacy callers.
+    
+    Same methods as AsyncHeliusClient, run on a private event loop in a
+    background thread. Calls block the calling thread only, so this stays
+    safe to use from synchronous code running alongside the bot's event
+    loop. New async code should use AsyncHeliusClient directly.
+    """
+    
+    def __init__(self, api_key: Optional[str] = None, network: str = "devnet", **kwargs):
+        """
+        Initialize Helius RPC client.
+        
+        Args:
+            api_key: Helius API key (defaults to HELIUS_API_KEY env var)
+            network: Network to connect to ("devnet" or "mainnet-beta")
+            **kwargs: Further AsyncHeliusClient options
+        
+        Raises:
+            ValueError: If API key is not provided
+        """
+        self.client = AsyncHeliusClient(api_key=api_key, network=network, **kwargs)
+        self.api_key = self.client.api_key
+        self.network = network
+        self.base_url = self.client.base_url
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        
+        logger.info(f"Initialized Helius client for {network}")
+    
+    def _run(self, coro) -> Any:
+        """Run a coroutine on the client's loop thread and wait for its result."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="helius-client", daemon=True
+                )
+                self._thread.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
+    def close(self):
+        """Close the pooled session and stop the loop thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.client.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+    
+    def get_rpc_url(self) -> str:
+        """
+        Get the full RPC URL with authentication.
+        
+        Returns:
+            Full RPC URL including API key
+        """
+        return self.base_url
+    
+    def rpc_call(self, method: str, params: list = None) -> Dict[str, Any]:
+        """Make a JSON-RPC call to Helius."""
+        return self._run(self.client.rpc_call(method, params))
+    
+    def rpc_batch(self, calls: List[Tuple[str, Optional[List[Any]]]]) -> List[Any]:
+        """Send several RPC requests in one HTTP round trip."""
+        return self._run(self.client.rpc_batch(calls))
+    
+    def get_balance(self, pubkey: str) -> float:
+        """Get SOL balance for a public key."""
+        return self._run(self.client.get_balance(pubkey))
+    
+    def get_token_balance(self, token_account: str) -> float:
+        """Get SPL token balance for a token account."""
+        return self._run(self.client.get_token_balance(token_account))
+    
+    def get_account_info(self, pubkey: str) -> Optional[Dict[str, Any]]:
+        """Get account information."""
+        return self._run(self.client.get_account_info(pubkey))
+    
+    def get_transaction(self, signature: str) -> Optional[Dict[str, Any]]:
+        """Get transaction details by signature."""
+        return self._run(self.client.get_transaction(signature))
+    
+    def send_transaction(self, signed_transaction: str) -> str:
+        """Send a signed transaction."""
+        return self._run(self.client.send_transaction(signed_transaction))
+    
+    def get_latest_blockhash(self) -> Dict[str, Any]:
+        """Get the latest blockhash."""
+        return self._run(self.client.get_latest_blockhash())
+    
+    def simulate_transaction(self, transaction: str) -> Dict[str, Any]:
+        """Simulate a transaction without sending it."""
+        return self._run(self.client.simulate_transaction(transaction))
+    
+    def get_priority_fee_estimate(self, *args, **kwargs) -> Dict[str, Any]:
+        """Estimate a priority fee with the Helius priority fee API."""
+        return self._run(self.client.get_priority_fee_estimate(*args, **kwargs))
+    
+    def get_enhanced_transactions(self, signatures: List[str]) -> List[Dict[str, Any]]:
+        """Parse transactions with the Helius enhanced transactions API."""
+        return self._run(self.client.get_enhanced_transactions(signatures))
+    
+    def get_address_transactions(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        """Get an address's parsed transaction history."""
+        return self._run(self.client.get_address_transactions(*args, **kwargs))
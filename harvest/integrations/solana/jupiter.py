@@ -50,7 +50,13 @@ class JupiterIntegration:
     - Query supported tokens
     """
     
-    def __init__(self, rpc_client, wallet_pubkey: Pubkey, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        rpc_client,
+        wallet_pubkey: Pubkey,
+        api_key: Optional[str] = None,
+        session: Optional[requests.Session] = None
+    ):
         """
         Initialize Jupiter integration.
         
@@ -59,12 +65,14 @@ class JupiterIntegration:
             wallet_pubkey: User's wallet public key
             api_key: Jupiter API key (optional, get free key at https://portal.jup.ag)
                     If not provided, will use JUPITER_API_KEY environment variable
+            session: HTTP session to share with other integrations (optional,
+                    a new one is created if not provided)
         """
         self.rpc_client = rpc_client
         self.wallet_pubkey = wallet_pubkey
         self.api_base = JUPITER_API_BASE
         self.api_key = api_key or os.getenv("JUPITER_API_KEY")
-        self.session = requests.Session()
+        self.session = session or requests.Session()
         
         # Add API key header if provided
         if self.api_key:
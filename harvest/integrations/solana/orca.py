@@ -43,18 +43,20 @@ class OrcaIntegration:
     - Query pool information
     """
     
-    def __init__(self, rpc_client, wallet_pubkey: Pubkey):
+    def __init__(self, rpc_client, wallet_pubkey: Pubkey, session: Optional[requests.Session] = None):
         """
         Initialize Orca integration.
         
         Args:
             rpc_client: Helius RPC client instance
             wallet_pubkey: User's wallet public key
+            session: HTTP session to share with other integrations (optional,
+                    a new one is created if not provided)
         """
         self.rpc_client = rpc_client
         self.wallet_pubkey = wallet_pubkey
         self.api_base = ORCA_API_BASE
-        self.session = requests.Session()
+        self.session = session or requests.Session()
         
         logger.info(f"Initialized Orca integration for wallet {wallet_pubkey}")
     
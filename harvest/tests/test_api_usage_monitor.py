@@ -135,6 +135,21 @@ class TestAPIUsageMonitor:
         assert len(monitor.usage[1].alerts_sent) == 0
         assert len(monitor.usage[2].alerts_sent) == 0
     
+    def test_remaining_today_resets_on_new_utc_day(self):
+        """Test that budgets free up once the UTC date changes (Requirement 2.5)."""
+        monitor = APIUsageMonitor(daily_limit=10)
+        for _ in range(4):
+            monitor.record_request(0)
+        
+        assert monitor.remaining_today(0) == 6
+        assert monitor.remaining_today(99) == 0
+        
+        # Pretend the last reset happened yesterday
+        monitor.usage[0].last_reset = datetime(2000, 1, 1, tzinfo=timezone.utc)
+        
+        assert monitor.remaining_today(0) == 10
+        assert monitor.usage[0].requests_today == 0
+    
     def test_utilization_percent_calculation(self):
         """Test that utilization percentage is calculated correctly."""
         usage = KeyUsage(key_index=0, requests_today=1650, daily_limit=3300)
@@ -0,0 +1,251 @@
+"""
+Tests for the WebSocket balance feed, run against a local fake Solana
+WebSocket server.
+"""
+
+import asyncio
+import json
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from aiohttp import web
+
+from agent.core.balance_feed import BalanceSubscriptionManager
+
+
+class FakeSolanaWebSocket:
+    """Minimal accountSubscribe server for tests."""
+
+    def __init__(self):
+        self.connections = []
+        self.subscriptions = {}  # subscription id -> (ws, public key)
+        self.subscribe_requests = []
+        self.url = None
+        self._next_subscription = 100
+        self._runner = None
+
+    async def _handler(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections.append(ws)
+
+        async for msg in ws:
+            data = json.loads(msg.data)
+            if data["method"] == "accountSubscribe":
+                self.subscribe_requests.append(data["params"][0])
+                subscription = self._next_subscription
+                self._next_subscription += 1
+                self.subscriptions[subscription] = (ws, data["params"][0])
+                await ws.send_json({"jsonrpc": "2.0", "result": subscription, "id": data["id"]})
+            elif data["method"] == "accountUnsubscribe":
+                self.subscriptions.pop(data["params"][0], None)
+                await ws.send_json({"jsonrpc": "2.0", "result": True, "id": data["id"]})
+
+        return ws
+
+    async def push(self, public_key, lamports):
+        """Send an accountNotification to every live subscriber of public_key."""
+        for subscription, (ws, key) in list(self.subscriptions.items()):
+            if key == public_key and not ws.closed:
+                await ws.send_json({
+                    "jsonrpc": "2.0",
+                    "method": "accountNotification",
+                    "params": {
+                        "result": {"context": {"slot": 1}, "value": {"lamports": lamports}},
+                        "subscription": subscription,
+                    },
+                })
+
+    async def drop_connections(self):
+        """Close every client connection, as a server restart would."""
+        self.subscriptions.clear()
+        for ws in self.connections:
+            await ws.close()
+        self.connections.clear()
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get("/", self._handler)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}/"
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._runner.cleanup()
+
+
+def _make_wallet_manager(balances):
+    wallet_manager = MagicMock()
+    wallet_manager.batch_get_balances = AsyncMock(return_value=dict(balances))
+    wallet_manager.live = set()
+    wallet_manager.set_balances_live = MagicMock(
+        side_effect=lambda user_ids, live: (
+            wallet_manager.live.update(user_ids) if live else wallet_manager.live.difference_update(user_ids)
+        )
+    )
+    return wallet_manager
+
+
+async def _wait_for(condition, timeout=2.0):
+    deadline = asyncio.get_event_loop().time() + timeout
+    while not condition():
+        if asyncio.get_event_loop().time() > deadline:
+            raise AssertionError("Condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+class TestBalanceSubscriptionManager:
+    """Tests for BalanceSubscriptionManager against a fake server."""
+
+    @pytest.mark.asyncio
+    async def test_pushed_balance_updates_cache_and_notifies(self):
+        """A notification lands in the balance cache and fires on_change."""
+        async with FakeSolanaWebSocket() as server:
+            wallet_manager = _make_wallet_manager({"user1": 0.0})
+            on_change = AsyncMock()
+            feed = BalanceSubscriptionManager(server.url, wallet_manager, on_change=on_change)
+            feed.subscribe("user1", "Pubkey1")
+
+            feed.start()
+            await _wait_for(lambda: feed.is_live("user1"))
+            assert "user1" in wallet_manager.live
+
+            await server.push("Pubkey1", 2_500_000_000)
+            await _wait_for(lambda: on_change.await_count == 1)
+
+            on_change.assert_awaited_once_with("user1", 2.5)
+            wallet_manager.apply_balance_update.assert_called_with("user1", 2.5)
+            await feed.stop()
+
+    @pytest.mark.asyncio
+    async def test_unchanged_balance_does_not_notify(self):
+        """Notifications that don't move the balance do not fire on_change."""
+        async with FakeSolanaWebSocket() as server:
+            wallet_manager = _make_wallet_manager({"user1": 1.0})
+            on_change = AsyncMock()
+            feed = BalanceSubscriptionManager(server.url, wallet_manager, on_change=on_change)
+            feed.subscribe("user1", "Pubkey1")
+
+            feed.start()
+            await _wait_for(lambda: feed.is_live("user1"))
+            await server.push("Pubkey1", 1_000_000_000)
+            await _wait_for(lambda: feed.stats.notifications == 1)
+            await asyncio.sleep(0.02)
+
+            # Neither the resync's first sighting nor the repeat is a change
+            on_change.assert_not_awaited()
+            await feed.stop()
+
+    @pytest.mark.asyncio
+    async def test_wallets_multiplexed_over_few_connections(self):
+        """Subscriptions are spread over at most max_connections sockets."""
+        async with FakeSolanaWebSocket() as server:
+            balances = {f"user{i}": 0.0 for i in range(10)}
+            wallet_manager = _make_wallet_manager(balances)
+            feed = BalanceSubscriptionManager(server.url, wallet_manager, max_connections=2)
+            feed.subscribe_many({user_id: f"Pubkey{user_id}" for user_id in balances})
+
+            feed.start()
+            await _wait_for(lambda: all(feed.is_live(user_id) for user_id in balances))
+
+            assert len(server.connections) == 2
+            assert len(server.subscriptions) == 10
+            await feed.stop()
+
+    @pytest.mark.asyncio
+    async def test_capacity_limit_leaves_users_on_polling(self):
+        """Wallets beyond the subscription capacity are not subscribed."""
+        feed = BalanceSubscriptionManager(
+            "ws://unused", _make_wallet_manager({}),
+            max_connections=1, max_subscriptions_per_connection=1
+        )
+
+        assert feed.subscribe("user1", "Pubkey1") is True
+        assert feed.subscribe("user2", "Pubkey2") is False
+
+    @pytest.mark.asyncio
+    async def test_reconnects_and_resubscribes(self):
+        """After the server drops the connection, subscriptions are restored."""
+        async with FakeSolanaWebSocket() as server:
+            wallet_manager = _make_wallet_manager({"user1": 0.0})
+            on_change = AsyncMock()
+            feed = BalanceSubscriptionManager(
+                server.url, wallet_manager, on_change=on_change, reconnect_delay=0.01
+            )
+            feed.subscribe("user1", "Pubkey1")
+
+            feed.start()
+            await _wait_for(lambda: feed.is_live("user1"))
+
+            # The balance changes while the feed is disconnected
+            wallet_manager.batch_get_balances.return_value = {"user1": 4.0}
+            await server.drop_connections()
+            await _wait_for(lambda: feed.stats.reconnects == 1)
+            await _wait_for(lambda: feed.is_live("user1"))
+
+            assert server.subscribe_requests == ["Pubkey1", "Pubkey1"]
+            # Resynced after each connect, catching the missed change
+            assert wallet_manager.batch_get_balances.await_count == 2
+            wallet_manager.batch_get_balances.assert_awaited_with(["user1"], force=True)
+            await _wait_for(lambda: on_change.await_count == 1)
+            on_change.assert_awaited_once_with("user1", 4.0)
+
+            await server.push("Pubkey1", 3_000_000_000)
+            await _wait_for(lambda: feed.balances["user1"] == 3.0)
+            await feed.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_falls_back_to_polling(self):
+        """Stopping the feed marks every balance as no longer live."""
+        async with FakeSolanaWebSocket() as server:
+            wallet_manager = _make_wallet_manager({"user1": 0.0})
+            feed = BalanceSubscriptionManager(server.url, wallet_manager)
+            feed.subscribe("user1", "Pubkey1")
+
+            feed.start()
+            await _wait_for(lambda: feed.is_live("user1"))
+            await feed.stop()
+
+            assert wallet_manager.live == set()
+            assert feed.get_stats()["open_connections"] == 0
+
+    @pytest.mark.asyncio
+    async def test_subscribe_while_running(self):
+        """Wallets added after start are subscribed on the open connection."""
+        async with FakeSolanaWebSocket() as server:
+            wallet_manager = _make_wallet_manager({"user1": 0.0})
+            feed = BalanceSubscriptionManager(server.url, wallet_manager, max_connections=1)
+            feed.subscribe("user1", "Pubkey1")
+            feed.start()
+            await _wait_for(lambda: feed.is_live("user1"))
+
+            wallet_manager.batch_get_balances.return_value = {"user2": 0.5}
+            feed.subscribe("user2", "Pubkey2")
+            await _wait_for(lambda: feed.is_live("user2") and "user2" in wallet_manager.live)
+
+            assert len(server.connections) == 1
+            await feed.stop()
+
+
+class TestWalletManagerLiveBalances:
+    """Tests for how live balances are served from the wallet manager's cache."""
+
+    def test_live_balance_is_fresh_regardless_of_age(self):
+        """A streamed balance never expires while the feed is live."""
+        from agent.core.multi_user_wallet import MultiUserWalletManager
+
+        manager = MultiUserWalletManager.__new__(MultiUserWalletManager)
+        manager._balance_cache_ttl = 30
+        manager._live_balances = set()
+        old = datetime.now() - timedelta(minutes=10)
+
+        assert manager._is_balance_fresh("user1", old) is False
+        manager.set_balances_live(["user1"], True)
+        assert manager._is_balance_fresh("user1", old) is True
+        manager.set_balances_live(["user1"], False)
+        assert manager._is_balance_fresh("user1", old) is False
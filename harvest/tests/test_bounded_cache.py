@@ -0,0 +1,141 @@
+"""
+Tests for the memory-bounded cache primitive.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+
+from agent.core.bounded_cache import BoundedCache, CacheSweeper
+
+
+class TestBoundedCache:
+    """Tests for BoundedCache eviction, expiry and stats."""
+
+    def test_behaves_like_a_dict(self):
+        """Basic mapping operations work as with a plain dict."""
+        cache = BoundedCache()
+        cache["a"] = 1
+        cache["b"] = 2
+
+        assert cache["a"] == 1
+        assert "b" in cache
+        assert cache.get("missing") is None
+        assert sorted(cache) == ["a", "b"]
+        del cache["a"]
+        assert "a" not in cache
+        assert len(cache) == 1
+
+    def test_lru_eviction_at_max_entries(self):
+        """The least recently used entry is evicted when full."""
+        cache = BoundedCache(max_entries=2)
+        cache["a"] = 1
+        cache["b"] = 2
+        cache["a"]  # a is now most recently used
+        cache["c"] = 3
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.stats.evictions == 1
+
+    def test_byte_budget(self):
+        """Entries are evicted to keep total size within max_bytes."""
+        cache = BoundedCache(max_entries=None, max_bytes=100, sizeof=len)
+        cache["a"] = "x" * 60
+        cache["b"] = "y" * 60
+
+        assert list(cache) == ["b"]
+        assert cache.total_bytes == 60
+
+    def test_overwrite_updates_size(self):
+        """Replacing a value does not double-count its size."""
+        cache = BoundedCache(sizeof=len)
+        cache["a"] = "x" * 10
+        cache["a"] = "x" * 20
+
+        assert cache.total_bytes == 20
+
+    def test_ttl_expiry(self):
+        """Expired entries read as missing."""
+        cache = BoundedCache(ttl=60)
+        cache["a"] = 1
+        cache.set("b", 2, ttl=0)
+
+        assert cache["a"] == 1
+        assert "b" not in cache
+        with pytest.raises(KeyError):
+            cache["b"]
+        assert cache.stats.expirations == 1
+
+    def test_evict_expired_sweeps_and_notifies(self):
+        """Sweeping removes expired entries and calls on_evict."""
+        on_evict = MagicMock()
+        cache = BoundedCache(on_evict=on_evict)
+        cache.set("a", 1, ttl=0)
+        cache.set("b", 2, ttl=60)
+
+        assert cache.evict_expired() == 1
+        on_evict.assert_called_once_with("a", 1)
+        assert len(cache) == 1
+
+    def test_explicit_delete_does_not_notify(self):
+        """on_evict is only for evictions, not deliberate deletes."""
+        on_evict = MagicMock()
+        cache = BoundedCache(on_evict=on_evict)
+        cache["a"] = 1
+        del cache["a"]
+
+        on_evict.assert_not_called()
+
+    def test_stats(self):
+        """Hits and misses are counted."""
+        cache = BoundedCache(name="test")
+        cache["a"] = 1
+        cache.get("a")
+        cache.get("b")
+
+        stats = cache.get_stats()
+        assert stats["name"] == "test"
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate_percent"] == 50.0
+
+    def test_memory_stays_flat_under_churn(self):
+        """Unbounded key churn keeps the cache at its limit."""
+        cache = BoundedCache(max_entries=100)
+        for i in range(10000):
+            cache[f"balance_{i}"] = float(i)
+
+        assert len(cache) == 100
+        assert cache.stats.evictions == 9900
+
+
+class TestCacheSweeper:
+    """Tests for periodic cache sweeping."""
+
+    def test_sweep_calls_every_cache(self):
+        """Each registered cache is swept; one failure does not stop the rest."""
+        sweeper = CacheSweeper()
+        failing = MagicMock()
+        failing.evict_expired.side_effect = Exception("boom")
+        cache = BoundedCache()
+        cache.set("a", 1, ttl=0)
+        sweeper.register(failing)
+        sweeper.register(cache)
+
+        assert sweeper.sweep() == 1
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_sweeper_runs_periodically(self):
+        """A started sweeper evicts without being called."""
+        sweeper = CacheSweeper(interval=0.01)
+        cache = BoundedCache()
+        cache.set("a", 1, ttl=0)
+        sweeper.register(cache)
+
+        sweeper.start()
+        await asyncio.sleep(0.05)
+        await sweeper.stop()
+
+        assert len(cache) == 0
@@ -171,6 +171,64 @@ class TestConfigurationLoading:
         with patch.dict(os.environ, {'SCAN_STAGGER_WINDOW': '500'}):
             config = EnvironmentConfig()
             assert config.get_scan_stagger_window() == 300
+    
+    def test_scan_concurrency_defaults(self):
+        """Test scan concurrency settings use their defaults."""
+        with patch.dict(os.environ, {}, clear=True):
+            config = EnvironmentConfig()
+            
+            assert config.get_scan_concurrency() == 50
+            assert config.get_user_scan_timeout() == 30.0
+            assert config.get_scan_rate_per_key() == 10.0
+            assert config.get_helius_requests_per_second() == 10.0
+            assert config.get_trade_concurrency() == 8
+    
+    def test_scan_concurrency_bounds(self):
+        """Test SCAN_CONCURRENCY enforces bounds."""
+        with patch.dict(os.environ, {'SCAN_CONCURRENCY': '0'}):
+            config = EnvironmentConfig()
+            assert config.get_scan_concurrency() == 1
+        
+        with patch.dict(os.environ, {'SCAN_CONCURRENCY': '5000'}):
+            config = EnvironmentConfig()
+            assert config.get_scan_concurrency() == 500
+        
+        with patch.dict(os.environ, {'TRADE_CONCURRENCY': '0'}):
+            config = EnvironmentConfig()
+            assert config.get_trade_concurrency() == 1
+    
+    def test_solana_ws_url(self):
+        """Test SOLANA_WS_URL override, Helius endpoint and public fallback."""
+        with patch.dict(os.environ, {'SOLANA_WS_URL': 'wss://example.com'}):
+            config = EnvironmentConfig()
+            assert config.get_solana_ws_url() == 'wss://example.com'
+        
+        with patch.dict(os.environ, {'SOLANA_NETWORK': 'mainnet', 'HELIUS_API_KEY_1': 'abc123'}, clear=True):
+            config = EnvironmentConfig()
+            assert config.get_solana_ws_url() == 'wss://mainnet.helius-rpc.com/?api-key=abc123'
+        
+        with patch.dict(os.environ, {'SOLANA_NETWORK': 'devnet'}, clear=True):
+            config = EnvironmentConfig()
+            assert config.get_solana_ws_url() == 'wss://api.devnet.solana.com'
+            assert config.get_balance_feed_enabled() is True
+    
+    def test_price_cache_soft_ttl(self):
+        """Test PRICE_CACHE_SOFT_TTL defaults, overrides and disabling."""
+        with patch.dict(os.environ, {'PRICE_CACHE_TTL': '60', 'PRICE_CACHE_SOFT_TTL': ''}):
+            config = EnvironmentConfig()
+            assert config.get_price_cache_soft_ttl() == 45
+        
+        with patch.dict(os.environ, {'PRICE_CACHE_TTL': '60', 'PRICE_CACHE_SOFT_TTL': '30'}):
+            config = EnvironmentConfig()
+            assert config.get_price_cache_soft_ttl() == 30
+        
+        with patch.dict(os.environ, {'PRICE_CACHE_TTL': '60', 'PRICE_CACHE_SOFT_TTL': '90'}):
+            config = EnvironmentConfig()
+            assert config.get_price_cache_soft_ttl() == 45
+        
+        with patch.dict(os.environ, {'PRICE_CACHE_TTL': '60', 'PRICE_CACHE_SOFT_TTL': '0'}):
+            config = EnvironmentConfig()
+            assert config.get_price_cache_soft_ttl() is None
 
 
 class TestConfigurationPropertyTests:
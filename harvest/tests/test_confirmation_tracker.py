@@ -0,0 +1,126 @@
+"""
+Tests for batched transaction confirmation tracking.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from agent.trading.confirmation_tracker import (
+    ConfirmationTracker,
+    TransactionFailedError,
+    MAX_SIGNATURES_PER_REQUEST
+)
+
+
+class FakeStatusClient:
+    """RPC client answering getSignatureStatuses from a dict of statuses."""
+    
+    def __init__(self):
+        self.statuses = {}  # signature -> raw status dict
+        self.calls = []
+    
+    async def get_signature_statuses(self, signatures):
+        self.calls.append(list(signatures))
+        return {"context": {"slot": 1}, "value": [self.statuses.get(sig) for sig in signatures]}
+
+
+def _tracker(client, **kwargs):
+    kwargs.setdefault("min_poll_interval", 0.01)
+    kwargs.setdefault("max_poll_interval", 0.05)
+    return ConfirmationTracker(client, **kwargs)
+
+
+class TestConfirmationTracker:
+    """Tests for ConfirmationTracker polling and resolution."""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_signatures_share_one_poll(self):
+        """Every in-flight signature goes into the same status request."""
+        client = FakeStatusClient()
+        tracker = _tracker(client)
+        signatures = [f"sig{i}" for i in range(20)]
+        
+        waiters = [asyncio.create_task(tracker.wait(sig, timeout=2.0)) for sig in signatures]
+        await asyncio.sleep(0.03)
+        for sig in signatures:
+            client.statuses[sig] = {"confirmationStatus": "confirmed", "err": None}
+        
+        assert await asyncio.gather(*waiters) == [True] * 20
+        assert all(len(call) == 20 for call in client.calls)
+        assert tracker.get_stats()["in_flight"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_requests_are_chunked(self):
+        """More than 256 signatures are split across requests."""
+        client = FakeStatusClient()
+        tracker = _tracker(client)
+        signatures = [f"sig{i}" for i in range(MAX_SIGNATURES_PER_REQUEST + 10)]
+        for sig in signatures:
+            client.statuses[sig] = {"confirmationStatus": "finalized", "err": None}
+        
+        results = await asyncio.gather(*(tracker.wait(sig, timeout=2.0) for sig in signatures))
+        
+        assert all(results)
+        assert sorted(len(call) for call in client.calls) == [10, MAX_SIGNATURES_PER_REQUEST]
+    
+    @pytest.mark.asyncio
+    async def test_failed_transaction_raises(self):
+        """A status with an error fails the waiter immediately."""
+        client = FakeStatusClient()
+        client.statuses["sig"] = {"confirmationStatus": "confirmed", "err": {"InstructionError": [0, "Custom"]}}
+        tracker = _tracker(client)
+        
+        with pytest.raises(TransactionFailedError) as exc_info:
+            await tracker.wait("sig", timeout=2.0)
+        
+        assert exc_info.value.signature == "sig"
+        assert tracker.stats.failed == 1
+    
+    @pytest.mark.asyncio
+    async def test_timeout_stops_tracking(self):
+        """A waiter that times out stops the signature being polled."""
+        client = FakeStatusClient()
+        tracker = _tracker(client)
+        
+        assert await tracker.wait("sig", timeout=0.05) is False
+        await asyncio.sleep(0.06)
+        
+        assert tracker.get_stats()["in_flight"] == 0
+        assert tracker.stats.timed_out == 1
+        assert tracker._task.done()
+    
+    @pytest.mark.asyncio
+    async def test_finalized_commitment(self):
+        """With commitment=finalized, confirmed is not enough."""
+        client = FakeStatusClient()
+        client.statuses["sig"] = {"confirmationStatus": "confirmed", "err": None}
+        tracker = _tracker(client, commitment="finalized")
+        
+        assert await tracker.wait("sig", timeout=0.05) is False
+        
+        client.statuses["sig"]["confirmationStatus"] = "finalized"
+        assert await tracker.wait("sig", timeout=1.0) is True
+    
+    @pytest.mark.asyncio
+    async def test_backoff_while_idle(self):
+        """The poll interval grows while nothing changes, up to the maximum."""
+        client = FakeStatusClient()
+        tracker = _tracker(client, min_poll_interval=0.01, max_poll_interval=0.02, backoff=2.0)
+        
+        await tracker.wait("sig", timeout=0.1)
+        
+        assert tracker._interval == 0.02
+        # Polling at the minimum throughout would have taken about 10 polls
+        assert len(client.calls) < 8
+    
+    @pytest.mark.asyncio
+    async def test_rpc_errors_are_retried(self):
+        """A failed poll is counted and the next poll still resolves waiters."""
+        status = Mock(confirmation_status="confirmed", err=None)
+        client = Mock()
+        client.get_signature_statuses = AsyncMock(side_effect=[Exception("Network error"), Mock(value=[status])])
+        tracker = _tracker(client)
+        
+        assert await tracker.wait("sig", timeout=1.0) is True
+        assert tracker.stats.rpc_errors == 1
@@ -2,12 +2,16 @@
 Tests for SQLite Database
 """
 
+import asyncio
 import pytest
+import sqlite3
 import tempfile
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
 
-from agent.core.database import Database
+from agent.core.database import AsyncDatabase, Database
 
 
 @pytest.fixture
@@ -20,7 +24,9 @@ def temp_db():
     yield db
     
     # Cleanup
-    Path(db_path).unlink(missing_ok=True)
+    db.close()
+    for suffix in ("", "-wal", "-shm"):
+        Path(db_path + suffix).unlink(missing_ok=True)
 
 
 def test_database_initialization(temp_db):
@@ -293,6 +299,116 @@ def test_database_persistence(temp_db):
     user = db2.get_user("test_123")
     assert user is not None
     assert user['user_id'] == "test_123"
+    db2.close()
+
+
+def test_connections_are_pooled(temp_db):
+    """Writes share one connection; each thread gets its own reader."""
+    with temp_db.get_connection() as first, temp_db.get_connection() as second:
+        assert first is second
+    
+    with temp_db.get_connection(readonly=True) as reader:
+        assert reader is not first
+        with temp_db.get_connection(readonly=True) as again:
+            assert again is reader
+    
+    other = []
+    
+    def read_in_thread():
+        with temp_db.get_connection(readonly=True) as conn:
+            other.append(conn)
+    
+    thread = threading.Thread(target=read_in_thread)
+    thread.start()
+    thread.join()
+    assert other[0] is not reader
+
+
+def test_connection_pragmas(temp_db):
+    """Connections use WAL with synchronous=NORMAL; readers are query-only."""
+    with temp_db.get_connection(readonly=True) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO users (user_id) VALUES ('x')")
+
+
+def test_reads_do_not_wait_for_writer(temp_db):
+    """A reader sees the last committed state while a write is in progress."""
+    temp_db.create_user("test_123")
+    result = []
+    
+    with temp_db.get_connection() as conn:
+        conn.execute("INSERT INTO users (user_id) VALUES ('test_456')")
+        
+        thread = threading.Thread(target=lambda: result.append(len(temp_db.get_all_users())))
+        thread.start()
+        thread.join(timeout=2.0)
+    
+    assert result == [1]
+    assert len(temp_db.get_all_users()) == 2
+
+
+def test_nested_write_joins_outer_transaction(temp_db):
+    """An error in the outer block rolls back writes made by nested calls."""
+    with pytest.raises(RuntimeError):
+        with temp_db.get_connection():
+            temp_db.create_user("test_123")
+            raise RuntimeError("abort")
+    
+    assert temp_db.get_user("test_123") is None
+
+
+def test_close_and_reopen(temp_db):
+    """Closed connections are reopened on next use."""
+    temp_db.create_user("test_123")
+    temp_db.close()
+    
+    assert temp_db.get_user("test_123") is not None
+    assert temp_db.create_user("test_456") is True
+
+
+
+@pytest.mark.asyncio
+async def test_async_database_same_methods(temp_db):
+    """AsyncDatabase exposes Database methods as awaitables."""
+    adb = AsyncDatabase(temp_db)
+    
+    assert await adb.create_user("test_123") is True
+    await adb.add_conversation("test_123", "user", "Hello")
+    history = await adb.get_conversation_history("test_123")
+    
+    assert history[0]['message'] == "Hello"
+    with pytest.raises(AttributeError):
+        adb.get_connection
+    await adb.close()
+
+
+@pytest.mark.asyncio
+async def test_async_database_keeps_event_loop_free(temp_db):
+    """Slow writes run off the loop and in submission order."""
+    adb = AsyncDatabase(temp_db)
+    order = []
+    
+    def slow_write(n):
+        time.sleep(0.05)
+        order.append(n)
+    
+    ticks = 0
+    
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+    
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.gather(*(adb.run(slow_write, n) for n in range(3)))
+    ticker_task.cancel()
+    
+    assert order == [0, 1, 2]
+    assert ticks > 10
+    await adb.close()
 
 
 if __name__ == "__main__":
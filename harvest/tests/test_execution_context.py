@@ -0,0 +1,134 @@
+"""
+Tests for per-user strategy execution contexts.
+"""
+
+import asyncio
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+from agent.trading.loop import AgentLoop
+from agent.trading.risk_manager import RiskManager
+from agent.trading.scanner import Scanner, Strategy, Opportunity, ExecutionContext
+from agent.services.notifier import ExecutionResult
+
+
+class RecordingStrategy(Strategy):
+    """Strategy that records the wallet each execution ran with."""
+    
+    def __init__(self, name="recording", delay=0.0):
+        self.name = name
+        self.delay = delay
+        self.executions = []  # (user_id, wallet) per call
+        self.contexts = []
+    
+    def get_name(self):
+        return self.name
+    
+    def scan(self):
+        return []
+    
+    async def execute(self, opportunity, context=None):
+        context = context or self.default_context()
+        await asyncio.sleep(self.delay)
+        self.contexts.append(context)
+        self.executions.append((context.user_id, context.wallet))
+        return ExecutionResult(
+            success=True,
+            transaction_hash=f"tx-{context.user_id}",
+            profit=0.01,
+            error=None,
+            timestamp=datetime.now()
+        )
+
+
+class LegacyStrategy(RecordingStrategy):
+    """Strategy whose execute() predates execution contexts."""
+    
+    async def execute(self, opportunity):
+        return await super().execute(opportunity)
+
+
+def _opportunity(strategy_name):
+    return Opportunity(
+        strategy_name=strategy_name,
+        action="swap",
+        amount=0.1,
+        expected_profit=0.01,
+        risk_level="low",
+        details={},
+        timestamp=datetime.now()
+    )
+
+
+def _agent_loop(strategies, wallets):
+    wallet = MagicMock()
+    wallet.get_wallet = AsyncMock(side_effect=lambda user_id: wallets[user_id])
+    return AgentLoop(
+        wallet=wallet,
+        scanner=Scanner(strategies),
+        provider=MagicMock(),
+        notifier=AsyncMock(),
+        user_control=MagicMock(),
+        risk_manager=RiskManager(wallet_manager=None, max_position_pct=0.1),
+        performance_tracker=MagicMock()
+    )
+
+
+class TestExecutionContext:
+    """Tests for strategy lookup and per-call execution contexts."""
+    
+    def test_strategy_index(self):
+        """Strategies are looked up by name, and the index follows reassignment."""
+        first, second = RecordingStrategy("first"), RecordingStrategy("second")
+        scanner = Scanner([first])
+        
+        assert scanner.get_strategy("first") is first
+        assert scanner.get_strategy("second") is None
+        
+        scanner.strategies = [first, second]
+        assert scanner.get_strategy("second") is second
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_users_keep_their_own_wallets(self):
+        """Overlapping executions of one strategy each see their own user's wallet."""
+        strategy = RecordingStrategy(delay=0.02)
+        wallets = {"user1": MagicMock(), "user2": MagicMock()}
+        agent_loop = _agent_loop([strategy], wallets)
+        
+        results = await asyncio.gather(
+            agent_loop.execute_opportunity(_opportunity("recording"), "user1"),
+            agent_loop.execute_opportunity(_opportunity("recording"), "user2")
+        )
+        
+        assert [result.transaction_hash for result in results] == ["tx-user1", "tx-user2"]
+        assert sorted(strategy.executions, key=lambda entry: entry[0]) == [
+            ("user1", wallets["user1"]),
+            ("user2", wallets["user2"]),
+        ]
+        assert not hasattr(strategy, "wallet")
+    
+    @pytest.mark.asyncio
+    async def test_context_carries_risk_limits(self):
+        """The context passed to execute() includes the risk manager's limits."""
+        strategy = RecordingStrategy()
+        agent_loop = _agent_loop([strategy], {"user1": MagicMock()})
+        
+        await agent_loop.execute_opportunity(_opportunity("recording"), "user1")
+        
+        context = strategy.contexts[0]
+        assert isinstance(context, ExecutionContext)
+        assert context.risk_limits["max_position_pct"] == 0.1
+        assert context.risk_limits["strategy_allocation"] == 1.0
+    
+    @pytest.mark.asyncio
+    async def test_legacy_strategy_without_context(self):
+        """Strategies whose execute() takes no context are refused, not run with a shared wallet."""
+        strategy = LegacyStrategy("legacy")
+        agent_loop = _agent_loop([strategy], {"user1": MagicMock()})
+        
+        result = await agent_loop.execute_opportunity(_opportunity("legacy"), "user1")
+        
+        assert result.success is False
+        assert "ExecutionContext" in result.error
+        assert strategy.executions == []
@@ -0,0 +1,219 @@
+"""
+Tests for the async Helius client and its sync shim, run against a local
+fake Helius server.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+from aiohttp import web
+
+from agent.core.rpc_fallback import RPCError
+from integrations.solana.helius import AsyncHeliusClient, HeliusClient
+
+
+class FakeHeliusServer:
+    """Serves JSON-RPC (single and batch) and the enhanced transaction API."""
+    
+    def __init__(self):
+        self.rpc_requests = []
+        self.rest_requests = []
+        self.delay = 0.0
+        self.status = 200
+        self.url = None
+        self._runner = None
+    
+    def _answer(self, request):
+        method = request["method"]
+        if method == "getBalance":
+            result = {"context": {"slot": 1}, "value": 2_000_000_000}
+        elif method == "getPriorityFeeEstimate":
+            result = {"priorityFeeEstimate": 1200.0}
+        elif method == "getLatestBlockhash":
+            result = {"context": {"slot": 1}, "value": {"blockhash": "hash", "lastValidBlockHeight": 100}}
+        else:
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32601, "message": "Method not found"}}
+        return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+    
+    async def _rpc(self, request):
+        body = await request.json()
+        self.rpc_requests.append(body)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.status != 200:
+            return web.Response(status=self.status)
+        if isinstance(body, list):
+            return web.json_response([self._answer(entry) for entry in reversed(body)])
+        return web.json_response(self._answer(body))
+    
+    async def _transactions(self, request):
+        self.rest_requests.append((request.path, dict(request.query), await request.json()))
+        return web.json_response([{"signature": "sig1", "type": "SWAP"}])
+    
+    async def _address_transactions(self, request):
+        self.rest_requests.append((request.path, dict(request.query), None))
+        return web.json_response([{"signature": "sig2", "type": "TRANSFER"}])
+    
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post("/", self._rpc)
+        app.router.add_post("/v0/transactions", self._transactions)
+        app.router.add_get("/v0/addresses/{address}/transactions", self._address_transactions)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self._runner.cleanup()
+
+
+def _client_for(server, **kwargs):
+    client = AsyncHeliusClient(api_key="test_key", **kwargs)
+    client.base_url = f"{server.url}/"
+    client.api_base = server.url
+    return client
+
+
+class TestAsyncHeliusClient:
+    """Tests for AsyncHeliusClient."""
+    
+    def test_requires_api_key(self, monkeypatch):
+        """A missing API key is rejected up front."""
+        monkeypatch.delenv("HELIUS_API_KEY", raising=False)
+        
+        with pytest.raises(ValueError):
+            AsyncHeliusClient()
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_pooled_session(self):
+        """Concurrent calls run in parallel over one session."""
+        async with FakeHeliusServer() as server:
+            server.delay = 0.1
+            async with _client_for(server) as client:
+                session = client._get_session()
+                loop = asyncio.get_event_loop()
+                start = loop.time()
+                
+                balances = await asyncio.gather(*(client.get_balance("pubkey") for _ in range(5)))
+                
+                assert balances == [2.0] * 5
+                # Five 100ms calls finishing well under 500ms did not serialize
+                assert loop.time() - start < 0.4
+                assert client._get_session() is session
+    
+    @pytest.mark.asyncio
+    async def test_rpc_error_raises(self):
+        """JSON-RPC errors surface as RPCError with the server's code."""
+        async with FakeHeliusServer() as server:
+            async with _client_for(server) as client:
+                with pytest.raises(RPCError) as exc_info:
+                    await client.rpc_call("unknownMethod")
+        
+        assert exc_info.value.code == -32601
+    
+    @pytest.mark.asyncio
+    async def test_http_error_raises(self):
+        """Non-200 responses surface as RPCError carrying the status."""
+        async with FakeHeliusServer() as server:
+            server.status = 429
+            async with _client_for(server) as client:
+                with pytest.raises(RPCError) as exc_info:
+                    await client.get_latest_blockhash()
+        
+        assert exc_info.value.code == 429
+    
+    @pytest.mark.asyncio
+    async def test_batch(self):
+        """A batch is one HTTP request; results come back in call order."""
+        async with FakeHeliusServer() as server:
+            async with _client_for(server) as client:
+                results = await client.rpc_batch([
+                    ("getLatestBlockhash", None),
+                    ("unknownMethod", []),
+                    ("getBalance", ["pubkey"]),
+                ])
+                balances = await client.get_balances(["a", "b"])
+        
+        assert len(server.rpc_requests) == 2
+        assert results[0]["value"]["blockhash"] == "hash"
+        assert isinstance(results[1], RPCError)
+        assert results[2]["value"] == 2_000_000_000
+        assert balances == {"a": 2.0, "b": 2.0}
+    
+    @pytest.mark.asyncio
+    async def test_priority_fee_estimate(self):
+        """Priority fee estimates use the Helius getPriorityFeeEstimate method."""
+        async with FakeHeliusServer() as server:
+            async with _client_for(server) as client:
+                result = await client.get_priority_fee_estimate(account_keys=["acct"], priority_level="High")
+        
+        assert result == {"priorityFeeEstimate": 1200.0}
+        assert server.rpc_requests[0]["params"] == [
+            {"options": {"priorityLevel": "High"}, "accountKeys": ["acct"]}
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_priority_fee_estimate_all_levels_keeps_priority_level(self):
+        """Asking for every level still sends the requested priority level."""
+        async with FakeHeliusServer() as server:
+            async with _client_for(server) as client:
+                await client.get_priority_fee_estimate(
+                    account_keys=["acct"],
+                    priority_level="High",
+                    include_all_levels=True
+                )
+        
+        assert server.rpc_requests[0]["params"][0]["options"] == {
+            "priorityLevel": "High",
+            "includeAllPriorityFeeLevels": True,
+        }
+    
+    @pytest.mark.asyncio
+    async def test_enhanced_transaction_endpoints(self):
+        """Enhanced API calls are authenticated with the API key."""
+        async with FakeHeliusServer() as server:
+            async with _client_for(server) as client:
+                parsed = await client.get_enhanced_transactions(["sig1"])
+                history = await client.get_address_transactions("addr", limit=10, tx_type="TRANSFER")
+        
+        assert parsed[0]["type"] == "SWAP"
+        assert history[0]["type"] == "TRANSFER"
+        assert server.rest_requests[0] == ("/v0/transactions", {"api-key": "test_key"}, {"transactions": ["sig1"]})
+        assert server.rest_requests[1][0] == "/v0/addresses/addr/transactions"
+        assert server.rest_requests[1][1] == {"api-key": "test_key", "limit": "10", "type": "TRANSFER"}
+    
+    @pytest.mark.asyncio
+    async def test_requests_take_rate_limiter_tokens(self):
+        """Every request acquires a token for the client's key."""
+        rate_limiter = AsyncMock()
+        async with FakeHeliusServer() as server:
+            async with _client_for(server, rate_limiter=rate_limiter, key_index=2) as client:
+                await client.get_balance("pubkey")
+                await client.get_balances(["a", "b"])
+        
+        assert rate_limiter.acquire.await_count == 2
+        rate_limiter.acquire.assert_awaited_with(2)
+
+
+class TestHeliusClientSyncShim:
+    """Tests for the blocking HeliusClient shim."""
+    
+    @pytest.mark.asyncio
+    async def test_blocking_calls_do_not_need_callers_loop(self):
+        """The shim works from a worker thread while the caller's loop runs."""
+        async with FakeHeliusServer() as server:
+            client = HeliusClient(api_key="test_key")
+            client.client.base_url = f"{server.url}/"
+            
+            balance = await asyncio.to_thread(client.get_balance, "pubkey")
+            blockhash = await asyncio.to_thread(client.get_latest_blockhash)
+            await asyncio.to_thread(client.close)
+        
+        assert balance == 2.0
+        assert blockhash["blockhash"] == "hash"
+        assert client._loop is None
@@ -251,6 +251,30 @@ class TestAPIKeyManager:
         usage = monitor.get_usage(0)
         assert usage['requests_today'] == 2
     
+    @pytest.mark.asyncio
+    async def test_acquire_rpc_url_waits_for_capacity(self):
+        """Acquired URLs are rate limited and recorded once per request."""
+        keys = ['key1_abcdefghij', 'key2_abcdefghij', 'key3_abcdefghij']
+        monitor = APIUsageMonitor()
+        manager = APIKeyManager(keys, monitor)
+        
+        url = await manager.acquire_rpc_url_for_user('user_100')
+        
+        assert url == manager.keys[0].url
+        assert monitor.get_usage(0)['requests_today'] == 1
+        assert manager.get_status()['rate_limiter']['acquired'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_acquire_rpc_url_spills_over_from_unavailable_key(self):
+        """A user whose key is down is served by another available key."""
+        keys = ['key1_abcdefghij', 'key2_abcdefghij', 'key3_abcdefghij']
+        manager = APIKeyManager(keys)
+        manager.mark_key_unavailable(0)
+        
+        url = await manager.acquire_rpc_url_for_user('user_100')
+        
+        assert manager.get_key_index_for_url(url) in (1, 2)
+    
     def test_multiple_users_same_key(self):
         """Test that multiple users can be assigned to the same key."""
         keys = ['key1_abcdefghij', 'key2_abcdefghij', 'key3_abcdefghij']
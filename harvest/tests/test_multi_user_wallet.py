@@ -16,7 +16,9 @@ def test_database():
     db = Database(db_path)
     yield db
     # Cleanup
-    Path(db_path).unlink(missing_ok=True)
+    db.close()
+    for suffix in ("", "-wal", "-shm"):
+        Path(db_path + suffix).unlink(missing_ok=True)
 
 
 @pytest.fixture
@@ -188,5 +190,140 @@ async def test_key_export_round_trip(test_wallet_manager):
     assert public_key_1 == public_key_2
 
 
+
+@pytest.mark.asyncio
+async def test_batch_get_balances_uses_100_key_chunks(tmp_path):
+    """Test that balances are fetched with one getMultipleAccounts call per 100 wallets."""
+    from unittest.mock import AsyncMock, MagicMock
+    from solders.pubkey import Pubkey
+    
+    wallets = [
+        {"user_id": f"user_{i}", "public_key": str(Pubkey.new_unique())}
+        for i in range(250)
+    ]
+    database = MagicMock()
+    database.get_all_wallets = MagicMock(return_value=[])
+    manager = MultiUserWalletManager(
+        database=database,
+        network="devnet",
+        storage_dir=str(tmp_path / "wallets")
+    )
+    database.get_all_wallets = MagicMock(return_value=wallets)
+    
+    async def get_multiple_accounts(pubkeys):
+        return MagicMock(value=[MagicMock(lamports=2_000_000_000) for _ in pubkeys])
+    
+    client = MagicMock()
+    client.get_multiple_accounts = AsyncMock(side_effect=get_multiple_accounts)
+    manager.wallets["loaded"] = MagicMock(client=client)
+    
+    user_ids = [wallet["user_id"] for wallet in wallets]
+    balances = await manager.batch_get_balances(user_ids)
+    
+    assert client.get_multiple_accounts.await_count == 3
+    assert [len(call.args[0]) for call in client.get_multiple_accounts.await_args_list] == [100, 100, 50]
+    assert balances == {user_id: 2.0 for user_id in user_ids}
+    
+    # Balances are cached, so get_balance doesn't hit RPC again
+    assert await manager.get_balance("user_7") == 2.0
+    assert client.get_multiple_accounts.await_count == 3
+
+
+
+@pytest.mark.asyncio
+async def test_wallet_cache_is_bounded(tmp_path):
+    """Least recently used wallets are evicted and their clients closed."""
+    from unittest.mock import AsyncMock, MagicMock
+    
+    database = MagicMock()
+    database.get_all_wallets = MagicMock(return_value=[])
+    manager = MultiUserWalletManager(
+        database=database,
+        network="devnet",
+        storage_dir=str(tmp_path / "wallets"),
+        max_cached_wallets=2
+    )
+    
+    evicted = MagicMock(close=AsyncMock())
+    manager.wallets["user_1"] = evicted
+    manager.wallets["user_2"] = MagicMock(close=AsyncMock())
+    manager.wallets["user_3"] = MagicMock(close=AsyncMock())
+    await asyncio.sleep(0)
+    
+    assert len(manager.wallets) == 2
+    assert "user_1" not in manager.wallets
+    evicted.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_leased_wallet_closed_after_lease_ends(tmp_path):
+    """A wallet evicted while leased stays open until the lease is released."""
+    from unittest.mock import AsyncMock, MagicMock
+    
+    database = MagicMock()
+    database.get_all_wallets = MagicMock(return_value=[])
+    manager = MultiUserWalletManager(
+        database=database,
+        network="devnet",
+        storage_dir=str(tmp_path / "wallets"),
+        max_cached_wallets=1
+    )
+    
+    leased = MagicMock(close=AsyncMock())
+    manager.wallets["user_1"] = leased
+    manager.acquire_wallet(leased)
+    manager.wallets["user_2"] = MagicMock(close=AsyncMock())
+    await asyncio.sleep(0)
+    
+    assert "user_1" not in manager.wallets
+    leased.close.assert_not_awaited()
+    
+    manager.release_wallet(leased)
+    await asyncio.sleep(0)
+    
+    leased.close.assert_awaited_once()
+
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_stats_count_recent_requests(tmp_path):
+    """Stats report request counts alongside the token bucket levels."""
+    from unittest.mock import MagicMock
+    
+    database = MagicMock()
+    database.get_all_wallets = MagicMock(return_value=[])
+    manager = MultiUserWalletManager(
+        database=database,
+        network="devnet",
+        storage_dir=str(tmp_path / "wallets")
+    )
+    
+    await manager._check_rate_limit()
+    await manager._check_rate_limit()
+    stats = manager.get_rate_limit_stats()
+    
+    assert stats["requests_last_second"] == 2
+    assert stats["requests_last_minute"] == 2
+    assert stats["tokens_available_second"] == pytest.approx(8.0, abs=0.1)
+
+
+@pytest.mark.asyncio
+async def test_close_all_stops_async_database(tmp_path):
+    """close_all shuts down the AsyncDatabase worker threads."""
+    from unittest.mock import MagicMock
+    
+    database = MagicMock()
+    database.get_all_wallets = MagicMock(return_value=[])
+    manager = MultiUserWalletManager(
+        database=database,
+        network="devnet",
+        storage_dir=str(tmp_path / "wallets")
+    )
+    
+    await manager.close_all()
+    
+    assert manager.async_database._write_executor._shutdown
+    assert manager.async_database._read_executor._shutdown
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,133 @@
+"""
+Tests for the shared blockhash and priority-fee oracle.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from agent.trading.network_oracle import NetworkOracle
+
+
+def _fee_client(fees, blockhash="hash1"):
+    """RPC client in the RPCFallbackManager shape (raw JSON-RPC values)."""
+    client = Mock()
+    client.get_latest_blockhash = AsyncMock(
+        return_value={"blockhash": blockhash, "lastValidBlockHeight": 100}
+    )
+    client.get_recent_prioritization_fees = AsyncMock(
+        return_value=[{"slot": i, "prioritizationFee": fee} for i, fee in enumerate(fees)]
+    )
+    return client
+
+
+class TestNetworkOracle:
+    """Tests for NetworkOracle caching, percentiles and background refresh."""
+    
+    @pytest.mark.asyncio
+    async def test_percentiles(self):
+        """Fee percentiles are computed over the recent slots."""
+        oracle = NetworkOracle(_fee_client(range(0, 100_000, 1000)))
+        
+        fees = await oracle.get_fees()
+        
+        assert (fees.p50, fees.p75, fees.p90) == (50_000, 75_000, 90_000)
+        assert fees.samples == 100
+    
+    @pytest.mark.asyncio
+    async def test_reads_are_cached(self):
+        """Repeated reads within max age do not refetch."""
+        client = _fee_client([6000])
+        oracle = NetworkOracle(client)
+        
+        await oracle.recommend_priority_fee()
+        await oracle.is_congested()
+        await oracle.get_blockhash()
+        await oracle.get_blockhash()
+        
+        assert client.get_recent_prioritization_fees.await_count == 1
+        assert client.get_latest_blockhash.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_share_fetch(self):
+        """Readers arriving together share one request."""
+        client = _fee_client([6000])
+        oracle = NetworkOracle(client)
+        
+        await asyncio.gather(*(oracle.get_blockhash() for _ in range(10)))
+        
+        assert client.get_latest_blockhash.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_force_refreshes_blockhash(self):
+        """force=True fetches a new blockhash even when fresh."""
+        client = _fee_client([6000])
+        oracle = NetworkOracle(client)
+        await oracle.get_blockhash()
+        
+        client.get_latest_blockhash.return_value = {"blockhash": "hash2", "lastValidBlockHeight": 200}
+        info = await oracle.get_blockhash(force=True)
+        
+        assert info.blockhash == "hash2"
+        assert info.last_valid_block_height == 200
+    
+    @pytest.mark.asyncio
+    async def test_solana_py_responses(self):
+        """Responses from solana-py's AsyncClient are understood too."""
+        client = Mock()
+        blockhash_response = Mock()
+        blockhash_response.value.blockhash = "hash"
+        blockhash_response.value.last_valid_block_height = 7
+        client.get_latest_blockhash = AsyncMock(return_value=blockhash_response)
+        client.get_recent_prioritization_fees = AsyncMock(
+            return_value=Mock(value=[Mock(prioritization_fee=8000)])
+        )
+        oracle = NetworkOracle(client)
+        
+        assert (await oracle.get_blockhash()).blockhash == "hash"
+        assert (await oracle.get_fees()).p50 == 8000
+    
+    @pytest.mark.asyncio
+    async def test_retry_fee_bumping(self):
+        """Retries move up the fee distribution and never pay less than +50%."""
+        oracle = NetworkOracle(_fee_client(range(0, 100_000, 1000)), base_priority_fee=5000)
+        
+        assert await oracle.recommend_priority_fee(0) == 50_000
+        assert await oracle.recommend_priority_fee(1) == 75_000
+        assert await oracle.recommend_priority_fee(2) == 112_500
+    
+    @pytest.mark.asyncio
+    async def test_fee_floor_and_congestion(self):
+        """Quiet networks pay the base fee; high median fees mean congestion."""
+        client = _fee_client([0, 0, 0])
+        oracle = NetworkOracle(client, base_priority_fee=5000, fee_max_age=0)
+        
+        assert await oracle.recommend_priority_fee() == 5000
+        assert await oracle.is_congested() is False
+        
+        client.get_recent_prioritization_fees.return_value = [{"prioritizationFee": 2_000_000_000}]
+        assert await oracle.is_congested() is True
+        assert len(oracle.get_fee_history()) == 3
+    
+    @pytest.mark.asyncio
+    async def test_background_refresh_only_while_read(self):
+        """The refresh loop keeps values fresh while active and pauses when idle."""
+        client = _fee_client([6000])
+        oracle = NetworkOracle(client, refresh_interval=0.01, idle_timeout=0.05)
+        oracle.start()
+        
+        await asyncio.sleep(0.03)
+        assert client.get_latest_blockhash.await_count == 0
+        
+        await oracle.get_blockhash()
+        await asyncio.sleep(0.04)
+        active_count = client.get_latest_blockhash.await_count
+        assert active_count > 2
+        
+        await asyncio.sleep(0.1)
+        idle_count = client.get_latest_blockhash.await_count
+        await asyncio.sleep(0.05)
+        await oracle.stop()
+        
+        assert client.get_latest_blockhash.await_count == idle_count
+        assert oracle.get_stats()["running"] is False
@@ -14,7 +14,9 @@ from unittest.mock import AsyncMock, MagicMock, patch
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from agent.core.optimized_scanner import OptimizedScanner, UserScanState, ScanStats
+from agent.core.optimized_scanner import (
+    OptimizedScanner, UserScanState, ScanStats, ScanScheduler, BatchRPCManager
+)
 
 
 class MockRPCManager:
@@ -425,3 +427,226 @@ class TestOptimizedScannerIntegration:
         assert scanner.users['user_5'].last_scan > base_time
         assert scanner.users['user_15'].last_scan > base_time
         assert scanner.users['user_25'].last_scan > base_time
+
+
+    @pytest.mark.asyncio
+    async def test_balance_reads_take_rate_limit_tokens(self):
+        """Balance reads for keyed users wait on the key's token bucket."""
+        api_key_manager = MagicMock()
+        api_key_manager.should_use_fallback.return_value = False
+        api_key_manager.acquire_rpc_url_for_user = AsyncMock(return_value="https://rpc.example")
+        scanner = OptimizedScanner(MockRPCManager(), api_key_manager=api_key_manager)
+        
+        assert await scanner._get_user_balance("user_1") == 1.0
+        api_key_manager.acquire_rpc_url_for_user.assert_awaited_once_with("user_1")
+        api_key_manager.get_rpc_url_for_user.assert_not_called()
+
+
+class TestBatchRPCCoalescing:
+    """Test suite for BatchRPCManager request coalescing."""
+    
+    @staticmethod
+    def _make_rpc_manager():
+        rpc_manager = MagicMock()
+        
+        async def rpc_call(method, params=None, user_id=None):
+            return {"value": [{"lamports": int(1e9)} for _ in params[0]]}
+        
+        rpc_manager.rpc_call = AsyncMock(side_effect=rpc_call)
+        rpc_manager.get_balance = AsyncMock(return_value=2.0)
+        return rpc_manager
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self):
+        """Concurrent requests are resolved from a single getMultipleAccounts call."""
+        rpc_manager = self._make_rpc_manager()
+        batcher = BatchRPCManager(rpc_manager, batch_delay=0.05)
+        
+        results = await asyncio.gather(
+            *(batcher.get_balance_batched(f"pubkey{i}") for i in range(10))
+        )
+        
+        assert results == [1.0] * 10
+        rpc_manager.rpc_call.assert_awaited_once()
+        assert batcher.stats.total_api_calls == 1
+        assert batcher.stats.api_calls_saved() == 9
+        assert batcher.stats.deadline_flushes == 1
+    
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_without_waiting(self):
+        """A batch that reaches batch_size is sent before the deadline."""
+        rpc_manager = self._make_rpc_manager()
+        batcher = BatchRPCManager(rpc_manager, batch_size=5, batch_delay=10.0)
+        
+        start = time.time()
+        await asyncio.gather(*(batcher.get_balance_batched(f"pubkey{i}") for i in range(5)))
+        
+        assert time.time() - start < 1.0
+        assert batcher.stats.size_flushes == 1
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_pubkeys_share_a_slot(self):
+        """The same pubkey requested twice is only sent once."""
+        rpc_manager = self._make_rpc_manager()
+        batcher = BatchRPCManager(rpc_manager, batch_delay=0.01)
+        
+        results = await asyncio.gather(
+            batcher.get_balance_batched("a"),
+            batcher.get_balance_batched("a"),
+            batcher.get_balance_batched("b"),
+        )
+        
+        assert results == [1.0, 1.0, 1.0]
+        assert rpc_manager.rpc_call.call_args[0][1] == [["a", "b"]]
+        assert batcher.stats.duplicate_requests == 1
+    
+    @pytest.mark.asyncio
+    async def test_batches_are_separated_per_key(self):
+        """Users on different API keys are never mixed into one batch."""
+        rpc_manager = self._make_rpc_manager()
+        api_key_manager = MagicMock()
+        api_key_manager.user_assignments = {
+            "user1": MagicMock(key_index=0),
+            "user2": MagicMock(key_index=1),
+        }
+        batcher = BatchRPCManager(rpc_manager, api_key_manager=api_key_manager, batch_delay=0.01)
+        
+        await asyncio.gather(
+            batcher.get_balance_batched("a", user_id="user1"),
+            batcher.get_balance_batched("b", user_id="user1"),
+            batcher.get_balance_batched("c", user_id="user2"),
+            batcher.get_balance_batched("d", user_id="user2"),
+        )
+        
+        assert rpc_manager.rpc_call.await_count == 2
+        routed = {call.kwargs["user_id"]: call.args[1][0] for call in rpc_manager.rpc_call.call_args_list}
+        assert routed == {"user1": ["a", "b"], "user2": ["c", "d"]}
+    
+    @pytest.mark.asyncio
+    async def test_failed_batch_retries_individually(self):
+        """Every waiter is still answered when the batched call fails."""
+        rpc_manager = self._make_rpc_manager()
+        rpc_manager.rpc_call = AsyncMock(side_effect=Exception("RPC down"))
+        batcher = BatchRPCManager(rpc_manager, batch_delay=0.01)
+        
+        results = await asyncio.gather(
+            *(batcher.get_balance_batched(f"pubkey{i}") for i in range(3))
+        )
+        
+        assert results == [2.0, 2.0, 2.0]
+        assert batcher.stats.failed_batches == 1
+        assert batcher.stats.individual_retries == 3
+    
+    @pytest.mark.asyncio
+    async def test_retry_errors_reach_the_caller(self):
+        """A pubkey that fails both batched and individually raises for its caller."""
+        rpc_manager = self._make_rpc_manager()
+        rpc_manager.rpc_call = AsyncMock(side_effect=Exception("RPC down"))
+        rpc_manager.get_balance = AsyncMock(side_effect=Exception("still down"))
+        batcher = BatchRPCManager(rpc_manager, batch_delay=0.01)
+        
+        results = await asyncio.gather(
+            batcher.get_balance_batched("a"),
+            batcher.get_balance_batched("b"),
+            return_exceptions=True,
+        )
+        
+        assert all(isinstance(r, Exception) for r in results)
+
+
+class TestScanScheduler:
+    """Test suite for heap-based scan scheduling."""
+    
+    def test_pop_due_returns_only_due_users_in_order(self):
+        """Only users past their due time are popped, earliest first."""
+        scheduler = ScanScheduler()
+        scheduler.schedule('late', 100.0)
+        scheduler.schedule('early', 50.0)
+        scheduler.schedule('future', 500.0)
+        
+        due = scheduler.pop_due(200.0)
+        
+        assert [user_id for user_id, _ in due] == ['early', 'late']
+        assert len(scheduler) == 1
+        assert scheduler.next_due_time() == 500.0
+    
+    def test_reschedule_replaces_previous_entry(self):
+        """Moving a user's due time drops the old heap entry."""
+        scheduler = ScanScheduler()
+        scheduler.schedule('user_1', 100.0)
+        scheduler.schedule('user_1', 300.0)
+        
+        assert scheduler.pop_due(200.0) == []
+        assert scheduler.pop_due(300.0) == [('user_1', 300.0)]
+    
+    def test_unschedule_removes_user(self):
+        """Unscheduled users are never popped."""
+        scheduler = ScanScheduler()
+        scheduler.schedule('user_1', 100.0)
+        scheduler.unschedule('user_1')
+        
+        assert scheduler.pop_due(200.0) == []
+        assert scheduler.next_due_time() is None
+    
+    def test_heap_compacts_after_many_reschedules(self):
+        """Stale entries do not grow the heap without bound."""
+        scheduler = ScanScheduler()
+        for i in range(1000):
+            scheduler.schedule('user_1', float(i))
+        
+        assert len(scheduler._heap) < 100
+        assert scheduler.pop_due(1000.0) == [('user_1', 999.0)]
+    
+    @pytest.mark.asyncio
+    async def test_scanned_user_is_rescheduled_by_interval(self):
+        """After a scan the user is due again one interval later."""
+        scanner = OptimizedScanner(MockRPCManager())
+        scanner.add_user('user_1', scan_interval=60)
+        scanner.users['user_1'].last_scan = time.time() - 61
+        scanner._refresh_shared_caches = AsyncMock()
+        scanner._scan_user = AsyncMock(return_value=[])
+        
+        await scanner.scan_all_users()
+        
+        assert abs(scanner.scheduler.next_due_time() - (time.time() + 60)) < 1.0
+        assert await scanner.scan_all_users() == {}
+    
+    @pytest.mark.asyncio
+    async def test_scan_lag_is_recorded(self):
+        """Lag is how far past the due time a user's scan started."""
+        scanner = OptimizedScanner(MockRPCManager())
+        scanner.add_user('user_1', scan_interval=60)
+        scanner.users['user_1'].last_scan = time.time() - 65
+        scanner._refresh_shared_caches = AsyncMock()
+        scanner._scan_user = AsyncMock(return_value=[])
+        
+        await scanner.scan_all_users()
+        
+        stats = scanner.get_stats()
+        assert 4.5 < stats['max_scan_lag'] < 6.0
+        assert stats['average_scan_lag'] == pytest.approx(stats['max_scan_lag'])
+    
+    @pytest.mark.asyncio
+    async def test_failed_user_scan_is_rescheduled(self):
+        """A user whose scan raises stays on the schedule."""
+        scanner = OptimizedScanner(MockRPCManager())
+        scanner.add_user('user_1', scan_interval=60)
+        scanner.add_user('user_2', scan_interval=60)
+        for user in scanner.users.values():
+            user.last_scan = time.time() - 61
+        scanner._refresh_shared_caches = AsyncMock()
+        scanner._scan_user = AsyncMock(side_effect=[Exception("boom"), []])
+        
+        results = await scanner.scan_all_users()
+        
+        assert len(results) == 1
+        assert len(scanner.scheduler) == 2
+    
+    def test_remove_user_unschedules(self):
+        """Removed users no longer appear in the schedule."""
+        scanner = OptimizedScanner(MockRPCManager())
+        scanner.add_user('user_1')
+        scanner.remove_user('user_1')
+        
+        assert 'user_1' not in scanner.users
+        assert len(scanner.scheduler) == 0
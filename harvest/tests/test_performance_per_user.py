@@ -46,6 +46,26 @@ class TestPerUserPerformanceTracking:
         assert tracker.trades[0].user_id == "user123"
         assert tracker.trades[0].actual_profit == 0.048
     
+    def test_record_trade_fills_missing_user_id(self, tracker):
+        """The user_id argument is stored on records that lack one."""
+        trade = TradeRecord(
+            strategy_name="test_strategy",
+            timestamp=datetime.now(),
+            expected_profit=0.05,
+            actual_profit=0.048,
+            transaction_hash="test_tx_hash",
+            was_successful=True,
+            error_message=None,
+            gas_fees=0.002,
+            execution_time_ms=1500,
+        )
+        
+        tracker.record_trade(trade, user_id="user123")
+        
+        assert tracker.trades[0].user_id == "user123"
+        assert tracker.get_metrics(user_id="user123").total_trades == 1
+        assert tracker.get_leaderboard()[0]["profit"] == pytest.approx(0.048)
+    
     def test_get_metrics_filtered_by_user(self, tracker):
         """Test getting metrics filtered by user_id (Subtask 5.3)."""
         # Record trades for user1
@@ -302,6 +322,80 @@ class TestPerUserPerformanceTracking:
         assert user2_metrics.total_profit == pytest.approx(0.02, rel=0.01)
         assert user2_metrics.total_trades == 1
 
+    
+    def test_aggregates_match_history_after_reload(self, tracker, temp_storage):
+        """Running aggregates agree with a full rescan, before and after a restart."""
+        trades = [
+            TradeRecord(
+                strategy_name=f"strategy{i % 3}",
+                timestamp=datetime(2026, 1, 1 + i % 20),
+                expected_profit=0.05,
+                actual_profit=0.01 * (i % 7) - 0.02,
+                transaction_hash=f"tx{i}",
+                was_successful=i % 4 != 0,
+                error_message=None,
+                gas_fees=0.001,
+                execution_time_ms=1000,
+                user_id=f"user{i % 5}",
+            )
+            for i in range(60)
+        ]
+        for trade in trades:
+            tracker.record_trade(trade)
+        tracker.close()
+        reloaded = PerformanceTracker(storage_path=temp_storage)
+        
+        for current in (tracker, reloaded):
+            for user_id in ("user0", "user3"):
+                user_trades = [t for t in trades if t.user_id == user_id]
+                metrics = current.get_metrics(user_id=user_id)
+                assert metrics.total_trades == len(user_trades)
+                assert metrics.successful_trades == sum(t.was_successful for t in user_trades)
+                assert metrics.total_profit == pytest.approx(sum(t.actual_profit for t in user_trades))
+                
+                strategy_trades = [t for t in user_trades if t.strategy_name == "strategy1"]
+                strategy_metrics = current.get_strategy_metrics("strategy1", user_id=user_id)
+                assert strategy_metrics.total_trades == len(strategy_trades)
+                assert strategy_metrics.total_gas_fees == pytest.approx(0.001 * len(strategy_trades))
+            
+            assert set(current.get_all_metrics()) == {"strategy0", "strategy1", "strategy2"}
+            assert current.calculate_roi(1.0) == pytest.approx(sum(t.actual_profit for t in trades) * 100)
+            assert [t.transaction_hash for t in current.get_recent_trades(count=3, user_id="user4")] == [
+                t.transaction_hash
+                for t in sorted(
+                    (t for t in trades if t.user_id == "user4"), key=lambda t: t.timestamp, reverse=True
+                )[:3]
+            ]
+    
+    def test_leaderboard_reorders_as_profits_change(self, tracker):
+        """A user's leaderboard position follows their running profit."""
+        def record(user_id, profit):
+            tracker.record_trade(TradeRecord(
+                strategy_name="strategy1",
+                timestamp=datetime.now(),
+                expected_profit=0.05,
+                actual_profit=profit,
+                transaction_hash=f"tx_{user_id}",
+                was_successful=profit > 0,
+                error_message=None,
+                gas_fees=0.0,
+                execution_time_ms=1000,
+                user_id=user_id,
+            ))
+        
+        record("user1", 0.05)
+        record("user2", 0.03)
+        assert [entry["profit"] for entry in tracker.get_leaderboard()] == pytest.approx([0.05, 0.03])
+        
+        record("user2", 0.04)
+        record("user1", -0.01)
+        leaderboard = tracker.get_leaderboard()
+        assert [entry["profit"] for entry in leaderboard] == pytest.approx([0.07, 0.04])
+        assert leaderboard[1]["win_rate"] == pytest.approx(50.0)
+        
+        tracker.clear_history()
+        assert tracker.get_leaderboard() == []
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -313,6 +313,7 @@ class TestPerformanceTracker:
             execution_time_ms=1500,
         )
         tracker.record_trade(trade)
+        tracker.persist_to_disk()
         
         # Read and parse JSON file
         with open(temp_storage, 'r') as f:
@@ -0,0 +1,174 @@
+"""
+Tests for per-key token-bucket rate limiting.
+"""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock
+
+from agent.core.api_usage_monitor import APIUsageMonitor
+from agent.core.rate_limiter import KeyRateLimiter, RateLimitExceeded, TokenBucket
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket refill and reservations."""
+
+    def test_burst_up_to_capacity(self):
+        """A full bucket serves its capacity without waiting."""
+        bucket = TokenBucket(rate=10)
+        now = bucket.updated
+
+        waits = [bucket.reserve(now=now)[1] for _ in range(10)]
+
+        assert waits == [0.0] * 10
+        assert bucket.wait_time(now=now) == pytest.approx(0.1)
+
+    def test_reservations_queue_in_order(self):
+        """Each reservation past capacity waits one interval longer."""
+        bucket = TokenBucket(rate=10, capacity=1)
+        now = bucket.updated
+
+        waits = [bucket.reserve(now=now)[1] for _ in range(4)]
+
+        assert waits == pytest.approx([0.0, 0.1, 0.2, 0.3])
+
+    def test_refill_is_capped(self):
+        """Idle time never banks more than capacity."""
+        bucket = TokenBucket(rate=10, capacity=5)
+        bucket.wait_time(now=bucket.updated + 60)
+
+        assert bucket.tokens == 5
+
+    def test_max_wait_declines_without_taking(self):
+        """A declined reservation leaves the bucket untouched."""
+        bucket = TokenBucket(rate=10, capacity=1)
+        now = bucket.updated
+        bucket.reserve(now=now)
+
+        reserved, wait = bucket.reserve(max_wait=0.0, now=now)
+
+        assert reserved is False
+        assert wait == pytest.approx(0.1)
+        assert bucket.tokens == pytest.approx(0.0)
+
+    @pytest.mark.asyncio
+    async def test_acquire_paces_callers(self):
+        """Concurrent acquirers are released at the bucket's rate."""
+        bucket = TokenBucket(rate=50, capacity=1)
+
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+
+        # 5 tokens at 50/s with a burst of 1 need at least 4 intervals of 20ms
+        assert time.monotonic() - start >= 0.075
+
+
+class TestKeyRateLimiter:
+    """Tests for KeyRateLimiter budgets and spillover."""
+
+    @pytest.mark.asyncio
+    async def test_acquire_records_usage(self):
+        """Acquired requests count against the monitor's daily budget."""
+        monitor = APIUsageMonitor(daily_limit=100)
+        limiter = KeyRateLimiter(usage_monitor=monitor, requests_per_second=100)
+
+        key_index = await limiter.acquire(1)
+
+        assert key_index == 1
+        assert monitor.usage[1].requests_today == 1
+        assert limiter.stats.acquired == 1
+
+    @pytest.mark.asyncio
+    async def test_spills_over_when_preferred_key_saturated(self):
+        """A saturated key hands the request to another key with capacity."""
+        limiter = KeyRateLimiter(requests_per_second=1, burst=1)
+
+        first = await limiter.acquire(0, candidates=[0, 1, 2])
+        second = await limiter.acquire(0, candidates=[0, 1, 2])
+
+        assert first == 0
+        assert second in (1, 2)
+        assert limiter.stats.spillovers == 1
+        assert limiter.stats.waits == 0
+
+    @pytest.mark.asyncio
+    async def test_spills_over_to_least_used_key(self):
+        """Among ready keys, the one with most daily budget left is used."""
+        monitor = APIUsageMonitor(daily_limit=100)
+        monitor.usage[1].requests_today = 50
+        limiter = KeyRateLimiter(usage_monitor=monitor, requests_per_second=1, burst=1)
+        await limiter.acquire(0)
+
+        assert await limiter.acquire(0, candidates=[0, 1, 2]) == 2
+
+    @pytest.mark.asyncio
+    async def test_waits_when_no_key_has_capacity(self):
+        """Without spillover candidates the caller waits for a token."""
+        limiter = KeyRateLimiter(requests_per_second=20, burst=1)
+
+        await limiter.acquire(0)
+        start = time.monotonic()
+        await limiter.acquire(0)
+
+        assert time.monotonic() - start >= 0.04
+        assert limiter.stats.waits == 1
+
+    @pytest.mark.asyncio
+    async def test_daily_budget_exhaustion(self):
+        """Exhausted keys are skipped, and a request with none left is refused."""
+        monitor = APIUsageMonitor(daily_limit=1)
+        limiter = KeyRateLimiter(usage_monitor=monitor, requests_per_second=100)
+
+        await limiter.acquire(0)
+        assert await limiter.acquire(0, candidates=[0, 1]) == 1
+
+        with pytest.raises(RateLimitExceeded):
+            await limiter.acquire(0, candidates=[0, 1])
+        assert limiter.stats.rejections == 1
+
+    @pytest.mark.asyncio
+    async def test_unavailable_preferred_key_is_skipped(self):
+        """A preferred key outside the candidates is never used."""
+        limiter = KeyRateLimiter(requests_per_second=100)
+
+        assert await limiter.acquire(0, candidates=[2]) == 2
+
+    @pytest.mark.asyncio
+    async def test_shared_state_in_redis(self):
+        """With Redis configured, tokens and daily counts are taken from Redis."""
+        redis_cache = AsyncMock()
+        redis_cache.reserve_token = AsyncMock(return_value=(True, 0.0))
+        redis_cache.increment_api_usage = AsyncMock(return_value=1)
+        limiter = KeyRateLimiter(requests_per_second=10, redis_cache=redis_cache)
+
+        await limiter.acquire(0)
+
+        redis_cache.reserve_token.assert_awaited_once_with(
+            "helius_key_0", rate=10, capacity=10, max_wait=0.0
+        )
+        redis_cache.increment_api_usage.assert_awaited_once_with("helius_key_0")
+
+    @pytest.mark.asyncio
+    async def test_shared_daily_budget_exhaustion(self):
+        """Usage by other workers exhausts the key here too."""
+        redis_cache = AsyncMock()
+        redis_cache.reserve_token = AsyncMock(return_value=(True, 0.0))
+        redis_cache.increment_api_usage = AsyncMock(return_value=3300)
+        limiter = KeyRateLimiter(requests_per_second=10, redis_cache=redis_cache)
+
+        await limiter.acquire(0)
+
+        assert limiter.has_daily_budget(0) is False
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_falls_back_to_local_bucket(self):
+        """An unreachable Redis does not block requests."""
+        redis_cache = AsyncMock()
+        redis_cache.reserve_token = AsyncMock(return_value=None)
+        redis_cache.increment_api_usage = AsyncMock(return_value=0)
+        limiter = KeyRateLimiter(requests_per_second=10, redis_cache=redis_cache)
+
+        assert await limiter.acquire(0) == 0
+        assert limiter.stats.shared_state_errors == 1
+        assert limiter.buckets[0].tokens == pytest.approx(9, abs=0.1)
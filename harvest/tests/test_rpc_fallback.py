@@ -15,7 +15,7 @@ from unittest.mock import Mock, patch, AsyncMock
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 # Import directly from modules to avoid __init__.py dependencies
-from agent.core.rpc_fallback import RPCFallbackManager
+from agent.core.rpc_fallback import RPCFallbackManager, RPCError
 from agent.core.multi_api_manager import APIKeyManager
 
 
@@ -184,5 +184,394 @@ class TestRPCFallbackUserSpecificRouting:
             assert api_key_manager.keys[0].failure_count > 0
 
 
+
+def _mock_aiohttp(responses):
+    """Patch aiohttp in rpc_fallback with sessions returning queued JSON bodies."""
+    from unittest.mock import MagicMock
+    
+    mock_aiohttp = MagicMock()
+    mock_aiohttp.ClientError = Exception
+    
+    def make_session(*args, **kwargs):
+        session = MagicMock()
+        session.closed = False
+        session.close = AsyncMock()
+        
+        def post(url, json=None, timeout=None):
+            response = MagicMock(status=200)
+            response.json = AsyncMock(return_value=responses(json))
+            context = MagicMock()
+            context.__aenter__ = AsyncMock(return_value=response)
+            context.__aexit__ = AsyncMock(return_value=False)
+            return context
+        
+        session.post = Mock(side_effect=post)
+        return session
+    
+    mock_aiohttp.ClientSession = Mock(side_effect=make_session)
+    return patch("agent.core.rpc_fallback.aiohttp", mock_aiohttp)
+
+
+class TestRPCFallbackPooledSessions:
+    """Test persistent pooled HTTP sessions."""
+    
+    @pytest.mark.asyncio
+    async def test_session_reused_across_calls(self):
+        """Repeated calls to one provider share a single session."""
+        with _mock_aiohttp(lambda payload: {"result": {"value": 1_000_000_000}}) as mock_aiohttp:
+            manager = RPCFallbackManager()
+            
+            for _ in range(5):
+                assert await manager.get_balance("pubkey") == 1.0
+            
+            assert mock_aiohttp.ClientSession.call_count == 1
+            connector_kwargs = mock_aiohttp.TCPConnector.call_args.kwargs
+            assert connector_kwargs["limit_per_host"] == manager.connections_per_host
+            assert connector_kwargs["ttl_dns_cache"] == manager.dns_cache_ttl
+    
+    @pytest.mark.asyncio
+    async def test_separate_session_per_api_key(self):
+        """Each API key gets its own pooled session."""
+        keys = ['test_key_1_abcdefghij', 'test_key_2_abcdefghij', 'test_key_3_abcdefghij']
+        api_key_manager = APIKeyManager(keys)
+        
+        with _mock_aiohttp(lambda payload: {"result": {"value": 0}}):
+            manager = RPCFallbackManager(api_key_manager=api_key_manager)
+            await manager.start()
+            
+            assert len(manager._sessions) == len(manager.providers) + 3
+    
+    @pytest.mark.asyncio
+    async def test_close_closes_all_sessions(self):
+        """close() closes every session, and later calls reopen lazily."""
+        with _mock_aiohttp(lambda payload: {"result": {"value": 0}}):
+            manager = RPCFallbackManager()
+            await manager.start()
+            sessions = list(manager._sessions.values())
+            
+            await manager.close()
+            
+            assert manager._sessions == {}
+            for session in sessions:
+                session.close.assert_awaited_once()
+            
+            await manager.get_balance("pubkey")
+            assert len(manager._sessions) == 1
+
+
+
+class TestRPCFallbackBatch:
+    """Test JSON-RPC batch requests."""
+    
+    @pytest.mark.asyncio
+    async def test_batch_sent_in_one_post_and_mapped_by_id(self):
+        """Heterogeneous calls share one POST and results come back in call order."""
+        def respond(payload):
+            # Answer out of order to check mapping by id
+            return [
+                {"jsonrpc": "2.0", "id": entry["id"], "result": entry["method"]}
+                for entry in reversed(payload)
+            ]
+        
+        with _mock_aiohttp(respond):
+            manager = RPCFallbackManager()
+            results = await manager.rpc_batch([
+                ("getBalance", ["pubkey"]),
+                ("getLatestBlockhash", None),
+                ("getSignatureStatuses", [["sig"]]),
+            ])
+            
+            session = next(iter(manager._sessions.values()))
+            assert session.post.call_count == 1
+            assert results == ["getBalance", "getLatestBlockhash", "getSignatureStatuses"]
+    
+    @pytest.mark.asyncio
+    async def test_partial_errors_returned_per_entry(self):
+        """An error on one entry does not fail the others."""
+        def respond(payload):
+            return [
+                {"jsonrpc": "2.0", "id": 0, "result": {"value": 5}},
+                {"jsonrpc": "2.0", "id": 1, "error": {"code": -32602, "message": "Invalid param"}},
+            ]
+        
+        with _mock_aiohttp(respond):
+            manager = RPCFallbackManager()
+            results = await manager.rpc_batch([
+                ("getBalance", ["good"]),
+                ("getBalance", ["bad"]),
+                ("getBalance", ["missing"]),
+            ])
+        
+        assert results[0] == {"value": 5}
+        assert isinstance(results[1], RPCError)
+        assert results[1].code == -32602
+        assert results[1].method == "getBalance"
+        assert isinstance(results[2], RPCError)
+    
+    @pytest.mark.asyncio
+    async def test_batch_retried_after_transport_failure(self):
+        """A transport failure retries the whole batch on the next provider."""
+        with patch.dict('os.environ', {'QUICKNODE_RPC_URL': 'https://quicknode.example'}):
+            manager = RPCFallbackManager(explore_rate=0.0)
+        ok = [{"jsonrpc": "2.0", "id": 0, "result": 1}]
+        manager._post_batch = AsyncMock(side_effect=[Exception("HTTP 503"), ok])
+        
+        assert await manager.rpc_batch([("getSlot", [])]) == [1]
+        assert manager._post_batch.await_count == 2
+        failed_url = manager._post_batch.await_args_list[0].args[0]
+        retried_url = manager._post_batch.await_args_list[1].args[0]
+        assert failed_url == manager.providers[0].url
+        assert retried_url != failed_url
+        assert manager.providers[0].failure_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_batch_uses_user_key_first(self):
+        """With a user id the batch goes to the user's assigned key."""
+        keys = ['test_key_1_abcdefghij', 'test_key_2_abcdefghij', 'test_key_3_abcdefghij']
+        api_key_manager = APIKeyManager(keys)
+        manager = RPCFallbackManager(api_key_manager=api_key_manager)
+        manager._post_batch = AsyncMock(return_value=[{"jsonrpc": "2.0", "id": 0, "result": 7}])
+        
+        assert await manager.rpc_batch([("getSlot", [])], user_id="user_50") == [7]
+        assert manager._post_batch.call_args.args[0] == api_key_manager.get_rpc_url_for_user("user_50")
+    
+    @pytest.mark.asyncio
+    async def test_empty_batch(self):
+        """An empty batch makes no request."""
+        manager = RPCFallbackManager()
+        manager._post_batch = AsyncMock()
+        
+        assert await manager.rpc_batch([]) == []
+        manager._post_batch.assert_not_called()
+
+
+
+def _manager_with_two_providers(**kwargs):
+    """RPCFallbackManager with Solana Public plus a QuickNode provider."""
+    env = {'QUICKNODE_RPC_URL': 'https://quicknode.example', 'HELIUS_API_KEY': '', 'ALCHEMY_API_KEY': ''}
+    with patch.dict('os.environ', env):
+        kwargs.setdefault("explore_rate", 0.0)
+        manager = RPCFallbackManager(**kwargs)
+    assert len(manager.providers) == 2
+    return manager
+
+
+class TestRPCFallbackLatencyAwareSelection:
+    """Test EWMA-based provider selection and hedged requests."""
+    
+    def test_ewma_tracking(self):
+        """Latency and error rate move towards recent observations."""
+        manager = _manager_with_two_providers()
+        provider = manager.providers[0]
+        
+        provider.record_success(0.1)
+        assert provider.ewma_latency == pytest.approx(0.1)
+        provider.record_success(0.2)
+        assert provider.ewma_latency == pytest.approx(0.12)
+        
+        provider.record_failure()
+        assert provider.ewma_error_rate == pytest.approx(0.2)
+        assert provider.p95_latency() == pytest.approx(0.2)
+    
+    def test_fastest_healthy_provider_selected(self):
+        """A slow provider loses traffic to a faster healthy one."""
+        manager = _manager_with_two_providers()
+        slow, fast = manager.providers[0], manager.providers[1]
+        slow.record_success(2.0)
+        fast.record_success(0.05)
+        
+        assert manager.get_current_provider() is fast
+    
+    def test_error_rate_penalizes_provider(self):
+        """A fast but failing provider scores worse than a reliable one."""
+        manager = _manager_with_two_providers()
+        flaky, reliable = manager.providers[0], manager.providers[1]
+        flaky.record_success(0.05)
+        for _ in range(10):
+            flaky.record_failure()
+        reliable.record_success(0.2)
+        
+        assert manager.get_current_provider() is reliable
+    
+    def test_unmeasured_failing_provider_not_preferred(self):
+        """A provider that has only failed does not keep a score of 0."""
+        manager = _manager_with_two_providers()
+        failing, healthy = manager.providers[0], manager.providers[1]
+        failing.record_failure()
+        healthy.record_success(0.2)
+        
+        assert failing.ewma_latency == failing.timeout
+        assert manager.get_current_provider() is healthy
+    
+    def test_exploration_uses_injected_rng(self):
+        """Exploration draws from the injected RNG; status reports the best provider."""
+        import random
+        
+        manager = _manager_with_two_providers(explore_rate=1.0, rng=random.Random(7))
+        slow, fast = manager.providers[0], manager.providers[1]
+        slow.record_success(2.0)
+        fast.record_success(0.05)
+        
+        assert manager.get_current_provider() is slow
+        assert manager.get_provider_status()["current"] == fast.name
+    
+    @pytest.mark.asyncio
+    async def test_rpc_call_records_latency(self):
+        """Successful calls update the provider's latency samples."""
+        manager = _manager_with_two_providers()
+        manager._call_provider = AsyncMock(return_value={"value": 0})
+        
+        await manager.rpc_call("getBalance", ["pubkey"])
+        
+        assert sum(len(p.latency_samples) for p in manager.providers) == 1
+    
+    @pytest.mark.asyncio
+    async def test_slow_read_is_hedged(self):
+        """A read-only call slower than p95 is answered by the second provider."""
+        manager = _manager_with_two_providers(hedge_requests=True)
+        primary, secondary = manager.providers[0], manager.providers[1]
+        for _ in range(manager.min_samples_for_hedge):
+            primary.record_success(0.01)
+        secondary.record_success(0.02)
+        
+        async def call_provider(provider, method, params):
+            await asyncio.sleep(1.0 if provider is primary else 0.01)
+            return {"value": provider.name}
+        
+        manager._call_provider = AsyncMock(side_effect=call_provider)
+        
+        result = await manager.rpc_call("getBalance", ["pubkey"])
+        
+        assert result == {"value": secondary.name}
+        assert manager.hedges_sent == 1
+        assert manager.hedges_won == 1
+    
+    @pytest.mark.asyncio
+    async def test_writes_are_never_hedged(self):
+        """sendTransaction goes to a single provider even when slow."""
+        manager = _manager_with_two_providers(hedge_requests=True)
+        primary = manager.providers[0]
+        for _ in range(manager.min_samples_for_hedge):
+            primary.record_success(0.001)
+        
+        async def call_provider(provider, method, params):
+            await asyncio.sleep(0.02)
+            return "signature"
+        
+        manager._call_provider = AsyncMock(side_effect=call_provider)
+        
+        assert await manager.send_transaction("tx") == "signature"
+        assert manager._call_provider.await_count == 1
+        assert manager.hedges_sent == 0
+
+
+class TestRPCFallbackResponseCache:
+    """Test the slot-aware cache for read-only responses."""
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_reads_hit_cache(self):
+        """Repeated reads within the freshness window make one network call."""
+        manager = RPCFallbackManager()
+        manager._call_provider = AsyncMock(return_value={"context": {"slot": 10}, "value": 5})
+        
+        for _ in range(3):
+            result = await manager.rpc_call("getAccountInfo", ["pubkey", {"encoding": "base64"}])
+        
+        assert result == {"context": {"slot": 10}, "value": 5}
+        assert manager._call_provider.await_count == 1
+        assert manager.get_provider_status()["response_cache"]["hits"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_coalesce(self):
+        """Identical in-flight reads share one request."""
+        manager = RPCFallbackManager()
+        
+        async def call_provider(provider, method, params):
+            await asyncio.sleep(0.02)
+            return {"context": {"slot": 10}, "value": []}
+        
+        manager._call_provider = AsyncMock(side_effect=call_provider)
+        
+        await asyncio.gather(*(
+            manager.rpc_call("getTokenAccountsByOwner", ["owner", {"mint": "m"}])
+            for _ in range(5)
+        ))
+        
+        assert manager._call_provider.await_count == 1
+        assert manager.response_cache_stats.coalesced == 4
+    
+    @pytest.mark.asyncio
+    async def test_commitment_is_part_of_key(self):
+        """Reads at different commitments are cached separately."""
+        manager = RPCFallbackManager()
+        manager._call_provider = AsyncMock(return_value={"context": {"slot": 10}, "value": 5})
+        
+        await manager.rpc_call("getBalance", ["pubkey", {"commitment": "confirmed"}])
+        await manager.rpc_call("getBalance", ["pubkey", {"commitment": "finalized"}])
+        await manager.rpc_call("getBalance", ["pubkey"])
+        
+        # No commitment means the server default, finalized
+        assert manager._call_provider.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_min_context_slot_refetches_older_entry(self):
+        """A cached entry below the requested slot is refetched with minContextSlot."""
+        manager = RPCFallbackManager()
+        manager._call_provider = AsyncMock(return_value={"context": {"slot": 10}, "value": 5})
+        await manager.rpc_call("getBalance", ["pubkey"])
+        
+        await manager.rpc_call("getBalance", ["pubkey"], min_context_slot=10)
+        assert manager._call_provider.await_count == 1
+        
+        manager._call_provider.return_value = {"context": {"slot": 12}, "value": 6}
+        result = await manager.rpc_call("getBalance", ["pubkey"], min_context_slot=12)
+        
+        assert result["value"] == 6
+        assert manager._call_provider.await_args.args[2] == ["pubkey", {"minContextSlot": 12}]
+        # The newer result replaced the cached one
+        assert (await manager.rpc_call("getBalance", ["pubkey"]))["value"] == 6
+    
+    @pytest.mark.asyncio
+    async def test_max_age(self):
+        """max_age=0 forces a fetch; stale entries are refetched."""
+        manager = RPCFallbackManager(cache_policies={"getBalance": 0.05})
+        manager._call_provider = AsyncMock(return_value={"context": {"slot": 10}, "value": 5})
+        
+        await manager.rpc_call("getBalance", ["pubkey"])
+        await manager.rpc_call("getBalance", ["pubkey"], max_age=0)
+        assert manager._call_provider.await_count == 2
+        
+        await asyncio.sleep(0.06)
+        await manager.rpc_call("getBalance", ["pubkey"])
+        assert manager._call_provider.await_count == 3
+        await manager.rpc_call("getBalance", ["pubkey"], max_age=10)
+        assert manager._call_provider.await_count == 3
+    
+    @pytest.mark.asyncio
+    async def test_uncached_methods_and_invalidation(self):
+        """Writes are never cached and empty the cache on success."""
+        manager = RPCFallbackManager()
+        manager._call_provider = AsyncMock(return_value={"context": {"slot": 10}, "value": 5})
+        await manager.rpc_call("getBalance", ["pubkey"])
+        
+        manager._call_provider.return_value = "signature"
+        await manager.send_transaction("tx")
+        await manager.send_transaction("tx")
+        
+        assert manager._call_provider.await_count == 3
+        assert len(manager.response_cache) == 0
+    
+    @pytest.mark.asyncio
+    async def test_cache_can_be_disabled(self):
+        """response_cache_size=0 sends every read to the network."""
+        manager = RPCFallbackManager(response_cache_size=0)
+        manager._call_provider = AsyncMock(return_value={"context": {"slot": 10}, "value": 5})
+        
+        await manager.rpc_call("getBalance", ["pubkey"])
+        await manager.rpc_call("getBalance", ["pubkey"])
+        
+        assert manager._call_provider.await_count == 2
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
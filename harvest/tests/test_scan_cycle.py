@@ -0,0 +1,245 @@
+"""Tests for the multi-user AgentLoop scan cycle."""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from dataclasses import replace
+from datetime import datetime
+
+from agent.trading.loop import AgentLoop
+from agent.trading.scanner import Opportunity
+from agent.services.user_manager import UserProfile
+
+
+def _make_opportunity(amount: float = 1.0, **details) -> Opportunity:
+    return Opportunity(
+        strategy_name="test_strategy",
+        action="stake",
+        amount=amount,
+        expected_profit=0.01,
+        risk_level="low",
+        details=dict(details),
+        timestamp=datetime.now(),
+    )
+
+
+def _make_agent_loop(balances: dict, opportunities: list) -> AgentLoop:
+    mock_wallet = MagicMock()
+    mock_wallet.get_all_user_ids = MagicMock(return_value=list(balances))
+    mock_wallet.get_balance = AsyncMock(side_effect=lambda user_id: balances[user_id])
+    mock_wallet.batch_get_balances = AsyncMock(return_value=dict(balances))
+
+    mock_scanner = MagicMock()
+    mock_scanner.strategies = []
+    mock_scanner.scan_all = AsyncMock(return_value=opportunities)
+
+    agent_loop = AgentLoop(
+        wallet=mock_wallet,
+        scanner=mock_scanner,
+        provider=MagicMock(),
+        notifier=AsyncMock(),
+        user_control=MagicMock(),
+        risk_manager=MagicMock(),
+        performance_tracker=MagicMock(),
+    )
+    agent_loop._process_opportunity = AsyncMock()
+    return agent_loop
+
+
+class TestTwoPhaseScanCycle:
+    """Test that the market is scanned once and fanned out to users."""
+
+    @pytest.mark.asyncio
+    async def test_market_scanned_once_per_cycle(self):
+        """Strategy scans run once regardless of the number of users."""
+        balances = {f"user{i}": 1.0 for i in range(25)}
+        agent_loop = _make_agent_loop(balances, [_make_opportunity()])
+
+        opportunities_by_user = await agent_loop.scan_cycle()
+
+        agent_loop.scanner.scan_all.assert_awaited_once()
+        assert len(opportunities_by_user) == 25
+
+    @pytest.mark.asyncio
+    async def test_user_opportunities_are_independent_copies(self):
+        """Per-user sizing must not leak into other users' opportunities."""
+        market_opportunity = _make_opportunity(amount=1.0)
+        agent_loop = _make_agent_loop({"a": 5.0, "b": 5.0}, [market_opportunity])
+
+        opportunities_by_user = await agent_loop.scan_cycle()
+
+        opp_a = opportunities_by_user["a"][0]
+        opp_b = opportunities_by_user["b"][0]
+        assert opp_a is not opp_b
+        assert opp_a.details is not opp_b.details
+
+        opp_a.amount = 0.1
+        assert opp_b.amount == 1.0
+        assert market_opportunity.amount == 1.0
+
+    @pytest.mark.asyncio
+    async def test_amount_capped_at_user_balance(self):
+        """Opportunities are sized down to what the user can afford."""
+        agent_loop = _make_agent_loop(
+            {"user1": 0.5},
+            [_make_opportunity(amount=2.0, estimated_gas_fee=0.01)],
+        )
+
+        opportunities = await agent_loop.scan_user("user1", agent_loop.scanner.scan_all.return_value)
+
+        assert len(opportunities) == 1
+        assert opportunities[0].amount == pytest.approx(0.49)
+
+    @pytest.mark.asyncio
+    async def test_opportunities_filtered_by_user_preferences(self):
+        """Disabled strategies and risk above the user's tolerance are dropped."""
+        disabled = replace(_make_opportunity(), strategy_name="nft_flipper")
+        risky = replace(_make_opportunity(), risk_level="medium")
+        allowed = _make_opportunity()
+        agent_loop = _make_agent_loop({"user1": 5.0}, [disabled, risky, allowed])
+        profile = UserProfile("user1")
+        profile.risk_tolerance = "low"
+        profile.strategies_enabled["nft_flipper"] = False
+        agent_loop.user_manager = MagicMock(users={"user1": profile})
+
+        opportunities = await agent_loop.scan_user("user1", [disabled, risky, allowed])
+
+        assert [opp.strategy_name for opp in opportunities] == ["test_strategy"]
+        assert opportunities[0].risk_level == "low"
+
+    @pytest.mark.asyncio
+    async def test_unfunded_user_gets_no_opportunities(self):
+        """Users below the minimum trading balance are skipped."""
+        agent_loop = _make_agent_loop({"rich": 1.0, "poor": 0.001}, [_make_opportunity()])
+
+        opportunities_by_user = await agent_loop.scan_cycle()
+
+        assert "rich" in opportunities_by_user
+        assert "poor" not in opportunities_by_user
+
+    @pytest.mark.asyncio
+    async def test_market_scan_failure_still_checks_balances(self):
+        """A failing market scan yields no opportunities but keeps the cycle alive."""
+        agent_loop = _make_agent_loop({"user1": 1.0}, [])
+        agent_loop.scanner.scan_all = AsyncMock(side_effect=Exception("strategy down"))
+
+        opportunities_by_user = await agent_loop.scan_cycle()
+
+        assert opportunities_by_user == {}
+        assert agent_loop.user_balance_cache["user1"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_phase_timings_logged(self):
+        """Per-phase durations are passed to the activity logger."""
+        agent_loop = _make_agent_loop({"user1": 1.0}, [_make_opportunity()])
+
+        with patch("agent.trading.loop.activity_logger") as mock_activity_logger:
+            await agent_loop.scan_cycle()
+
+        args = mock_activity_logger.log_scan_cycle.call_args[0]
+        assert args[0] == 1
+        assert set(args[2]) == {"balance_prefetch", "market_scan", "user_scan", "processing"}
+
+
+class TestBalancePrefetch:
+    """Test the cycle-level bulk balance prefetch."""
+
+    @pytest.mark.asyncio
+    async def test_balances_prefetched_once_per_cycle(self):
+        """All users' balances are requested in a single bulk call."""
+        balances = {f"user{i}": 1.0 for i in range(10)}
+        agent_loop = _make_agent_loop(balances, [])
+
+        await agent_loop.scan_cycle()
+
+        agent_loop.wallet.batch_get_balances.assert_awaited_once_with(list(balances))
+
+    @pytest.mark.asyncio
+    async def test_prefetch_failure_does_not_stop_cycle(self):
+        """Users are still scanned individually if the prefetch fails."""
+        agent_loop = _make_agent_loop({"user1": 1.0}, [_make_opportunity()])
+        agent_loop.wallet.batch_get_balances = AsyncMock(side_effect=Exception("RPC down"))
+
+        opportunities_by_user = await agent_loop.scan_cycle()
+
+        assert "user1" in opportunities_by_user
+
+
+class TestConcurrentUserScanning:
+    """Test bounded-concurrency user scanning."""
+
+    @pytest.mark.asyncio
+    async def test_user_scans_overlap(self):
+        """Slow balance checks run in parallel rather than back to back."""
+        balances = {f"user{i}": 1.0 for i in range(20)}
+        agent_loop = _make_agent_loop(balances, [])
+
+        async def slow_balance(user_id):
+            await asyncio.sleep(0.05)
+            return balances[user_id]
+
+        agent_loop.wallet.get_balance = AsyncMock(side_effect=slow_balance)
+        agent_loop.scan_rate_per_key = 1000.0
+
+        start = time.time()
+        await agent_loop.scan_cycle()
+
+        # Sequential scanning would take 20 * 0.05 = 1s
+        assert time.time() - start < 0.5
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """No more than max_concurrent_scans user scans are in flight."""
+        balances = {f"user{i}": 1.0 for i in range(30)}
+        agent_loop = _make_agent_loop(balances, [])
+        agent_loop.max_concurrent_scans = 5
+        agent_loop.scan_rate_per_key = 1000.0
+
+        in_flight = 0
+        peak = 0
+
+        async def tracked_balance(user_id):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return balances[user_id]
+
+        agent_loop.wallet.get_balance = AsyncMock(side_effect=tracked_balance)
+
+        await agent_loop.scan_cycle()
+
+        assert peak == 5
+
+    @pytest.mark.asyncio
+    async def test_slow_user_times_out_without_affecting_others(self):
+        """A hung user scan is abandoned and other users still get results."""
+        balances = {"fast": 1.0, "hung": 1.0}
+        agent_loop = _make_agent_loop(balances, [_make_opportunity()])
+        agent_loop.user_scan_timeout = 0.05
+
+        async def balance(user_id):
+            if user_id == "hung":
+                await asyncio.sleep(10)
+            return balances[user_id]
+
+        agent_loop.wallet.get_balance = AsyncMock(side_effect=balance)
+
+        opportunities_by_user = await agent_loop.scan_cycle()
+
+        assert list(opportunities_by_user) == ["fast"]
+
+    @pytest.mark.asyncio
+    async def test_scan_starts_paced_per_key(self):
+        """Scan starts on one key never exceed scan_rate_per_key."""
+        balances = {f"user{i}": 1.0 for i in range(5)}
+        agent_loop = _make_agent_loop(balances, [])
+        agent_loop.scan_rate_per_key = 50.0
+
+        start = time.time()
+        await agent_loop.scan_cycle()
+
+        # 5 starts at 50/s need at least 4 intervals of 20ms
+        assert time.time() - start >= 0.08
@@ -11,7 +11,8 @@ from unittest.mock import AsyncMock, patch
 from agent.core.shared_cache import (
     SharedPriceCache,
     CachedData,
-    CacheStats
+    CacheStats,
+    SingleFlight
 )
 
 
@@ -631,3 +632,199 @@ class TestStrategyCache:
         ah_stats = cache.get_stats("airdrop_hunter")
         assert ah_stats["total_requests"] == 1
         assert ah_stats["cache_hits"] == 1
+
+
+class TestSingleFlight:
+    """Tests for stampede protection on cache misses."""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_computation(self):
+        """Only the first caller runs the function; the rest join it."""
+        flights = SingleFlight()
+        calls = 0
+        
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+        
+        results = await asyncio.gather(*(flights.do("key", compute) for _ in range(5)))
+        
+        assert calls == 1
+        assert [value for value, _ in results] == ["value"] * 5
+        assert [shared for _, shared in results].count(False) == 1
+        assert not flights.in_flight("key")
+    
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter(self):
+        """A failing computation raises in all waiting callers."""
+        flights = SingleFlight()
+        
+        async def compute():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream down")
+        
+        results = await asyncio.gather(
+            *(flights.do("key", compute) for _ in range(3)),
+            return_exceptions=True
+        )
+        
+        assert all(isinstance(r, ValueError) for r in results)
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_computation(self):
+        """Other waiters still get the result when one is cancelled."""
+        flights = SingleFlight()
+        
+        async def compute():
+            await asyncio.sleep(0.02)
+            return 42
+        
+        first = asyncio.ensure_future(flights.do("key", compute))
+        second = asyncio.ensure_future(flights.do("key", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        
+        assert await second == (42, True)
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_price_refreshes_coalesce(self):
+        """Concurrent refreshes of the same tokens make one fetch."""
+        cache = SharedPriceCache()
+        fetch = AsyncMock(return_value={"SOL": 150.5})
+        
+        async def slow_fetch(tokens):
+            await asyncio.sleep(0.01)
+            return await fetch(tokens)
+        
+        results = await asyncio.gather(
+            *(cache.refresh_prices(["SOL"], slow_fetch) for _ in range(4))
+        )
+        
+        assert results == [{"SOL": 150.5}] * 4
+        assert fetch.await_count == 1
+        assert cache.get_stats()["coalesced"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_strategy_misses_coalesce(self):
+        """Concurrent misses for one strategy key run the strategy once."""
+        from agent.core.shared_cache import StrategyCache
+        
+        cache = StrategyCache()
+        context = {"market_conditions": {"volatility": "high"}}
+        calls = 0
+        
+        async def strategy(ctx):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"opportunities": []}
+        
+        await asyncio.gather(
+            *(cache.execute_and_cache("yield_farmer", strategy, context) for _ in range(10))
+        )
+        
+        assert calls == 1
+        stats = cache.get_stats("yield_farmer")
+        assert stats["cache_misses"] == 10
+        assert stats["coalesced"] == 9
+    
+    @pytest.mark.asyncio
+    async def test_strategy_error_propagates_to_coalesced_callers(self):
+        """Every coalesced caller sees the strategy's exception."""
+        from agent.core.shared_cache import StrategyCache
+        
+        cache = StrategyCache()
+        context = {"market_conditions": {"volatility": "high"}}
+        
+        async def strategy(ctx):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("strategy failed")
+        
+        results = await asyncio.gather(
+            *(cache.execute_and_cache("yield_farmer", strategy, context) for _ in range(3)),
+            return_exceptions=True
+        )
+        
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert len(cache.cache) == 0
+
+
+class TestStaleWhileRevalidate:
+    """Tests for soft-TTL background refresh in SharedPriceCache."""
+    
+    @pytest.mark.asyncio
+    async def test_stale_price_served_and_refreshed_in_background(self):
+        """A price past the soft TTL is returned at once and refreshed once."""
+        fetch = AsyncMock(return_value={"SOL": 200.0})
+        cache = SharedPriceCache(ttl=60, soft_ttl=10, fetch_func=fetch)
+        await cache.set_price("SOL", 150.0)
+        cache.cache["SOL"].timestamp = time.time() - 20
+        
+        assert await cache.get_price("SOL") == 150.0
+        assert await cache.get_price("SOL") == 150.0
+        await asyncio.sleep(0.01)
+        
+        fetch.assert_awaited_once_with(["SOL"])
+        assert await cache.get_price("SOL") == 200.0
+        stats = cache.get_stats()
+        assert stats["stale_hits"] == 2
+        assert stats["background_refreshes"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_hard_ttl_still_misses(self):
+        """Past the hard TTL a read misses as before."""
+        fetch = AsyncMock(return_value={"SOL": 200.0})
+        cache = SharedPriceCache(ttl=60, soft_ttl=10, fetch_func=fetch)
+        await cache.set_price("SOL", 150.0)
+        cache.cache["SOL"].timestamp = time.time() - 61
+        
+        assert await cache.get_price("SOL") is None
+        fetch.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_failed_background_refresh_keeps_stale_price(self):
+        """A failing refresh leaves the cached price in place."""
+        fetch = AsyncMock(side_effect=Exception("price API down"))
+        cache = SharedPriceCache(ttl=60, soft_ttl=10, fetch_func=fetch)
+        await cache.set_price("SOL", 150.0)
+        cache.cache["SOL"].timestamp = time.time() - 20
+        
+        await cache.get_price("SOL")
+        await asyncio.sleep(0.01)
+        
+        assert await cache.get_price("SOL") == 150.0
+        assert cache.get_stats()["background_refreshes"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_refresh_prices_registers_fetcher(self):
+        """The fetcher passed to refresh_prices is reused for revalidation."""
+        cache = SharedPriceCache(ttl=60, soft_ttl=10)
+        fetch = AsyncMock(return_value={"SOL": 150.0})
+        
+        await cache.refresh_prices(["SOL"], fetch)
+        
+        assert cache.fetch_func is fetch
+    
+    @pytest.mark.asyncio
+    async def test_refresher_refreshes_recently_read_tokens(self):
+        """Tokens read recently are refreshed before they go stale."""
+        fetch = AsyncMock(return_value={"SOL": 200.0})
+        cache = SharedPriceCache(ttl=60, soft_ttl=0.1, fetch_func=fetch, refresh_interval=0.05)
+        await cache.set_price("SOL", 150.0)
+        await cache.set_price("BONK", 0.00001)
+        await cache.get_price("SOL")
+        
+        cache.start_refresher()
+        await asyncio.sleep(0.12)
+        await cache.stop_refresher()
+        
+        assert fetch.await_count >= 1
+        assert all(call.args[0] == ["SOL"] for call in fetch.await_args_list)
+        assert cache.cache["SOL"].data == 200.0
+    
+    def test_soft_ttl_must_be_below_ttl(self):
+        """A soft TTL at or above the hard TTL disables revalidation."""
+        cache = SharedPriceCache(ttl=60, soft_ttl=60)
+        assert cache.soft_ttl is None
@@ -0,0 +1,146 @@
+"""
+Tests for the append-only trade journal behind PerformanceTracker.
+"""
+
+import json
+from datetime import datetime
+
+from agent.trading.performance import PerformanceTracker, TradeRecord
+
+
+def _trade(tx, profit=0.01, user_id="user1"):
+    return TradeRecord(
+        strategy_name="jupiter_swap",
+        timestamp=datetime(2026, 1, 1, 12, 0, 0),
+        expected_profit=profit,
+        actual_profit=profit,
+        transaction_hash=tx,
+        was_successful=True,
+        error_message=None,
+        gas_fees=0.0001,
+        execution_time_ms=100,
+        user_id=user_id,
+    )
+
+
+def _journal_lines(tracker):
+    path = tracker.journal.path
+    return path.read_text().splitlines() if path.exists() else []
+
+
+class TestTradeJournal:
+    """Tests for journaling, replay, compaction and migration."""
+    
+    def test_record_trade_appends_without_rewriting_snapshot(self, tmp_path):
+        """Recording a trade appends one journal line and leaves the snapshot alone."""
+        storage = tmp_path / "history.json"
+        tracker = PerformanceTracker(storage_path=str(storage))
+        
+        tracker.record_trade(_trade("tx1"))
+        tracker.record_trade(_trade("tx2"))
+        
+        assert not storage.exists()
+        lines = [json.loads(line) for line in _journal_lines(tracker)]
+        assert [entry["seq"] for entry in lines] == [1, 2]
+        assert lines[1]["trade"]["transaction_hash"] == "tx2"
+    
+    def test_restart_replays_journal(self, tmp_path):
+        """A new tracker sees snapshot and journaled trades in order."""
+        storage = str(tmp_path / "history.json")
+        tracker = PerformanceTracker(storage_path=storage)
+        tracker.record_trade(_trade("tx1"))
+        tracker.persist_to_disk()
+        tracker.record_trade(_trade("tx2"))
+        tracker.close()
+        
+        reloaded = PerformanceTracker(storage_path=storage)
+        
+        assert [t.transaction_hash for t in reloaded.trades] == ["tx1", "tx2"]
+        reloaded.record_trade(_trade("tx3"))
+        assert json.loads(_journal_lines(reloaded)[-1])["seq"] == 3
+    
+    def test_compaction_when_journal_matches_snapshot(self, tmp_path):
+        """The journal is folded into the snapshot once it is as large as the snapshot."""
+        storage = tmp_path / "history.json"
+        tracker = PerformanceTracker(storage_path=str(storage), compact_min_records=2)
+        
+        tracker.record_trade(_trade("tx1"))
+        assert not storage.exists()
+        tracker.record_trade(_trade("tx2"))
+        
+        data = json.loads(storage.read_text())
+        assert len(data["trades"]) == 2
+        assert data["last_seq"] == 2
+        assert _journal_lines(tracker) == []
+        
+        # Next compaction waits until the journal holds two more trades
+        tracker.record_trade(_trade("tx3"))
+        assert len(_journal_lines(tracker)) == 1
+    
+    def test_snapshot_and_journal_overlap_is_not_duplicated(self, tmp_path):
+        """Journal entries already covered by the snapshot are skipped on replay."""
+        storage = tmp_path / "history.json"
+        tracker = PerformanceTracker(storage_path=str(storage))
+        tracker.record_trade(_trade("tx1"))
+        tracker.record_trade(_trade("tx2"))
+        tracker.close()
+        # Simulate a crash after the snapshot was written but before the journal was emptied
+        storage.write_text(json.dumps({
+            "trades": [t.to_dict() for t in tracker.trades],
+            "last_seq": 2,
+        }))
+        
+        reloaded = PerformanceTracker(storage_path=str(storage))
+        
+        assert [t.transaction_hash for t in reloaded.trades] == ["tx1", "tx2"]
+    
+    def test_torn_final_line_is_skipped(self, tmp_path):
+        """A partially written last record does not stop the rest from loading."""
+        storage = str(tmp_path / "history.json")
+        tracker = PerformanceTracker(storage_path=storage)
+        tracker.record_trade(_trade("tx1"))
+        tracker.close()
+        with open(tracker.journal.path, "a") as f:
+            f.write('{"seq": 2, "trade": {"strat')
+        
+        reloaded = PerformanceTracker(storage_path=storage)
+        
+        assert [t.transaction_hash for t in reloaded.trades] == ["tx1"]
+    
+    def test_legacy_history_is_migrated(self, tmp_path):
+        """A pre-journal trading_history.json is loaded and rewritten once."""
+        storage = tmp_path / "trading_history.json"
+        storage.write_text(json.dumps({
+            "trades": [_trade("old1").to_dict(), _trade("old2").to_dict()],
+            "last_updated": "2026-01-01T00:00:00",
+        }, indent=2))
+        
+        tracker = PerformanceTracker(storage_path=str(storage))
+        tracker.record_trade(_trade("new1"))
+        tracker.close()
+        
+        data = json.loads(storage.read_text())
+        assert data["last_seq"] == 0
+        assert [t["transaction_hash"] for t in data["trades"]] == ["old1", "old2"]
+        assert [t.transaction_hash for t in PerformanceTracker(storage_path=str(storage)).trades] == [
+            "old1", "old2", "new1"
+        ]
+    
+    def test_append_after_torn_line_survives_replay(self, tmp_path):
+        """Trades recorded after a torn line are not glued onto it and lost."""
+        storage = str(tmp_path / "history.json")
+        tracker = PerformanceTracker(storage_path=storage)
+        tracker.record_trade(_trade("tx1"))
+        tracker.record_trade(_trade("tx2"))
+        tracker.close()
+        with open(tracker.journal.path, "a") as f:
+            f.write('{"seq":3,"tra')
+        
+        reloaded = PerformanceTracker(storage_path=storage)
+        reloaded.record_trade(_trade("tx3"))
+        reloaded.record_trade(_trade("tx4"))
+        reloaded.close()
+        
+        assert [t.transaction_hash for t in PerformanceTracker(storage_path=storage).trades] == [
+            "tx1", "tx2", "tx3", "tx4"
+        ]
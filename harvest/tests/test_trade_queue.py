@@ -0,0 +1,229 @@
+"""
+Tests for the per-wallet sharded trade queue.
+"""
+
+import asyncio
+import pytest
+
+from agent.trading.trade_queue import TradeQueue, TradeStatus
+
+
+def _recording_trade(log, name, delay=0.0, error=None):
+    """Trade function that records when it starts and finishes."""
+    async def execute():
+        log.append(("start", name))
+        await asyncio.sleep(delay)
+        log.append(("end", name))
+        if error:
+            raise error
+        return name
+    return execute
+
+
+class TestTradeQueue:
+    """Tests for TradeQueue ordering, parallelism and status tracking."""
+    
+    @pytest.mark.asyncio
+    async def test_trades_for_one_user_run_in_order(self):
+        """A user's trades never overlap and run in FIFO order."""
+        queue = TradeQueue(max_concurrency=4)
+        log = []
+        await queue.start_processing()
+        
+        trade_ids = [
+            await queue.enqueue("user1", None, _recording_trade(log, name, delay=0.01))
+            for name in ("a", "b", "c")
+        ]
+        for trade_id in trade_ids:
+            assert await queue.wait_for_trade(trade_id, timeout=2.0)
+        await queue.stop_processing()
+        
+        assert log == [
+            ("start", "a"), ("end", "a"),
+            ("start", "b"), ("end", "b"),
+            ("start", "c"), ("end", "c"),
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_different_wallets_run_in_parallel(self):
+        """A slow trade for one user does not hold up other users."""
+        queue = TradeQueue(max_concurrency=4)
+        log = []
+        await queue.start_processing()
+        
+        slow_id = await queue.enqueue("user1", None, _recording_trade(log, "slow", delay=0.5))
+        fast_id = await queue.enqueue("user2", None, _recording_trade(log, "fast"))
+        
+        assert await queue.wait_for_trade(fast_id, timeout=2.0)
+        assert queue.get_trade_status(slow_id) == TradeStatus.EXECUTING
+        assert queue.get_queue_stats()["active_wallets"] == 1
+        await queue.stop_processing()
+        
+        assert queue.get_trade_status(slow_id) == TradeStatus.COMPLETED
+    
+    @pytest.mark.asyncio
+    async def test_global_concurrency_limit(self):
+        """No more than max_concurrency trades execute at once."""
+        queue = TradeQueue(max_concurrency=2)
+        running = 0
+        peak = 0
+        
+        async def execute():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+        
+        await queue.start_processing()
+        trade_ids = [await queue.enqueue(f"user{i}", None, execute) for i in range(6)]
+        for trade_id in trade_ids:
+            assert await queue.wait_for_trade(trade_id, timeout=2.0)
+        await queue.stop_processing()
+        
+        assert peak == 2
+    
+    @pytest.mark.asyncio
+    async def test_users_take_turns(self):
+        """A user with many trades does not starve a user with one."""
+        queue = TradeQueue(max_concurrency=1)
+        log = []
+        
+        for name in ("a1", "a2", "a3"):
+            await queue.enqueue("userA", None, _recording_trade(log, name))
+        b_id = await queue.enqueue("userB", None, _recording_trade(log, "b1"))
+        
+        await queue.start_processing()
+        assert await queue.wait_for_trade(b_id, timeout=2.0)
+        await asyncio.sleep(0.05)
+        await queue.stop_processing()
+        
+        starts = [name for event, name in log if event == "start"]
+        assert starts == ["a1", "b1", "a2", "a3"]
+    
+    @pytest.mark.asyncio
+    async def test_failed_trade_does_not_block_wallet(self):
+        """After a failure the user's next trade still runs."""
+        queue = TradeQueue()
+        log = []
+        await queue.start_processing()
+        
+        failed_id = await queue.enqueue("user1", None, _recording_trade(log, "bad", error=ValueError("boom")))
+        next_id = await queue.enqueue("user1", None, _recording_trade(log, "good"))
+        
+        assert await queue.wait_for_trade(next_id, timeout=2.0)
+        await queue.stop_processing()
+        
+        assert queue.get_trade_status(failed_id) == TradeStatus.FAILED
+        assert isinstance(queue.get_trade_error(failed_id), ValueError)
+        assert queue.get_trade_result(next_id) == "good"
+    
+    @pytest.mark.asyncio
+    async def test_queue_stats(self):
+        """Stats count pending trades across every user's shard."""
+        queue = TradeQueue(max_concurrency=3)
+        
+        await queue.enqueue("user1", None, _recording_trade([], "a"))
+        await queue.enqueue("user1", None, _recording_trade([], "b"))
+        await queue.enqueue("user2", None, _recording_trade([], "c"))
+        
+        stats = queue.get_queue_stats()
+        assert stats["queue_size"] == 3
+        assert stats["pending"] == 3
+        assert stats["waiting_wallets"] == 2
+        assert stats["max_concurrency"] == 3
+        assert stats["processing"] is False
+    
+    @pytest.mark.asyncio
+    async def test_wait_returns_when_trade_finishes(self):
+        """Waiters wake as soon as the trade ends, not on a polling tick."""
+        queue = TradeQueue()
+        await queue.start_processing()
+        trade_id = await queue.enqueue("user1", None, _recording_trade([], "a", delay=0.01))
+        
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        assert await queue.wait_for_trade(trade_id, timeout=2.0)
+        elapsed = loop.time() - started
+        
+        failed_id = await queue.enqueue("user1", None, _recording_trade([], "bad", error=ValueError("boom")))
+        assert await queue.wait_for_trade(failed_id, timeout=2.0) is False
+        assert await queue.wait_for_trade("unknown", timeout=2.0) is False
+        await queue.stop_processing()
+        
+        assert elapsed < 0.3
+    
+    @pytest.mark.asyncio
+    async def test_wait_timeout(self):
+        """A trade still running at the timeout reports False."""
+        queue = TradeQueue()
+        await queue.start_processing()
+        trade_id = await queue.enqueue("user1", None, _recording_trade([], "slow", delay=0.2))
+        
+        assert await queue.wait_for_trade(trade_id, timeout=0.02) is False
+        assert await queue.wait_for_trade(trade_id, timeout=2.0) is True
+        await queue.stop_processing()
+    
+    @pytest.mark.asyncio
+    async def test_history_is_bounded_by_count(self):
+        """Only the newest max_history finished trades are kept."""
+        queue = TradeQueue(max_history=2)
+        await queue.start_processing()
+        
+        trade_ids = [await queue.enqueue("user1", None, _recording_trade([], name)) for name in "abcd"]
+        assert await queue.wait_for_trade(trade_ids[-1], timeout=2.0)
+        await queue.stop_processing()
+        
+        assert [queue.get_trade_status(trade_id) for trade_id in trade_ids] == [
+            None, None, TradeStatus.COMPLETED, TradeStatus.COMPLETED
+        ]
+        assert queue.get_queue_stats()["completed_total"] == 4
+    
+    @pytest.mark.asyncio
+    async def test_history_expires_by_age(self):
+        """Finished trades older than history_ttl are dropped."""
+        queue = TradeQueue(history_ttl=0.05)
+        await queue.start_processing()
+        
+        old_id = await queue.enqueue("user1", None, _recording_trade([], "old"))
+        assert await queue.wait_for_trade(old_id, timeout=2.0)
+        await asyncio.sleep(0.06)
+        new_id = await queue.enqueue("user1", None, _recording_trade([], "new"))
+        assert await queue.wait_for_trade(new_id, timeout=2.0)
+        await queue.stop_processing()
+        
+        assert queue.get_trade_status(old_id) is None
+        assert queue.get_trade_status(new_id) == TradeStatus.COMPLETED
+    
+    @pytest.mark.asyncio
+    async def test_history_expires_while_idle(self):
+        """Expired trades are dropped on lookup even if no other trade finishes."""
+        queue = TradeQueue(history_ttl=0.05)
+        await queue.start_processing()
+        
+        trade_id = await queue.enqueue("user1", None, _recording_trade([], "a"))
+        assert await queue.wait_for_trade(trade_id, timeout=2.0)
+        await queue.stop_processing()
+        await asyncio.sleep(0.06)
+        
+        assert queue.get_queue_stats()["total_trades"] == 0
+        assert queue.get_trade_status(trade_id) is None
+    
+    @pytest.mark.asyncio
+    async def test_latency_histograms(self):
+        """Queue-wait and execution times are recorded per finished trade."""
+        queue = TradeQueue(max_concurrency=1)
+        
+        first_id = await queue.enqueue("user1", None, _recording_trade([], "a", delay=0.02))
+        await queue.enqueue("user2", None, _recording_trade([], "b", error=ValueError("boom")))
+        await queue.start_processing()
+        await asyncio.sleep(0.1)
+        await queue.stop_processing()
+        
+        stats = queue.get_queue_stats()
+        assert queue.get_trade_status(first_id) == TradeStatus.COMPLETED
+        assert stats["queue_wait_seconds"]["count"] == 2
+        assert stats["execution_seconds"]["count"] == 2
+        assert stats["execution_seconds"]["max"] >= 0.02
+        assert sum(stats["execution_seconds"]["buckets"].values()) == 2
+        assert (stats["completed_total"], stats["failed_total"]) == (1, 1)
@@ -265,6 +265,28 @@ class TestJupiterSwapStrategy:
         assert abs(result.profit - expected_profit) == pytest.approx(0.002, abs=0.001)
 
 
+    async def test_user_integrations_are_reused_and_share_sessions(self, test_harness):
+        """Per-user Jupiter/Orca integrations are built once per wallet and reuse the strategy's sessions."""
+        from agent.trading.scanner import ExecutionContext
+        
+        mock_rpc = MagicMock()
+        strategy = JupiterSwapStrategy(
+            rpc_client=mock_rpc,
+            wallet_manager=test_harness.create_mock_wallet(balance=2.0),
+            executor=MagicMock()
+        )
+        user_wallet = MagicMock()
+        user_wallet.get_public_key.return_value = "user-pubkey"
+        context = ExecutionContext(user_id="user1", wallet=user_wallet, rpc_client=mock_rpc)
+        
+        jupiter, orca = strategy._dexes_for(context)
+        
+        assert strategy._dexes_for(context) == (jupiter, orca)
+        assert jupiter.wallet_pubkey == "user-pubkey"
+        assert jupiter.session is strategy.jupiter.session
+        assert orca.session is strategy.orca.session
+
+
 @pytest.mark.asyncio
 class TestJupiterSwapProfitCalculation:
     """Tests for Jupiter swap profit calculation accuracy."""
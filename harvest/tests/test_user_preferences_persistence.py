@@ -199,6 +199,24 @@ class TestUserPreferencesPersistence:
         profile3 = manager3.get_or_create_user(user_id)
         
         assert profile3.auto_execute is False
+    
+    @pytest.mark.asyncio
+    async def test_async_conversation_round_trip(self, db_path, storage_dir):
+        """The async API persists users, messages and preferences like the sync one."""
+        manager = UserManager(storage_dir=storage_dir, db_path=db_path)
+        user_id = "async_user"
+        
+        profile = await manager.get_or_create_user_async(user_id, first_name="Async")
+        profile.risk_tolerance = "low"
+        await manager.add_conversation_async(user_id, "user", "hello")
+        
+        context = await manager.get_user_context_async(user_id)
+        assert "user: hello" in context
+        
+        manager2 = UserManager(storage_dir=storage_dir, db_path=db_path)
+        assert manager2.get_or_create_user(user_id).risk_tolerance == "low"
+        await manager.close()
+        await manager2.close()
 
 
 if __name__ == "__main__":
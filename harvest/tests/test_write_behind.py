@@ -0,0 +1,130 @@
+"""
+Tests for write-behind group commit of high-volume database writes.
+"""
+
+import time
+import pytest
+import tempfile
+from pathlib import Path
+
+from agent.core.database import Database
+from agent.core.write_behind import WriteBehindBuffer
+
+
+@pytest.fixture
+def db_path():
+    """Temporary database path."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield str(Path(temp_dir) / "harvest.db")
+
+
+def _database(db_path, **kwargs):
+    kwargs.setdefault("write_behind_ms", 10_000)  # Only flush when told to
+    db = Database(db_path, **kwargs)
+    db.create_user("test_123")
+    return db
+
+
+class TestWriteBehind:
+    """Tests for buffered writes through Database."""
+
+    def test_writes_are_batched(self, db_path):
+        """Buffered rows are committed together and visible to the next read."""
+        db = _database(db_path)
+
+        for i in range(100):
+            db.add_conversation("test_123", "user", f"message {i}")
+        assert db.write_behind.pending == 100
+
+        history = db.get_conversation_history("test_123", limit=100)
+
+        assert [row['message'] for row in history] == [f"message {i}" for i in range(100)]
+        assert db.write_behind.stats.flushes == 1
+        db.close()
+
+    def test_last_active_is_coalesced(self, db_path):
+        """Repeated last_active updates for a user become one row."""
+        db = _database(db_path)
+
+        for _ in range(50):
+            db.update_last_active("test_123")
+
+        assert db.write_behind.pending == 1
+        assert db.write_behind.stats.rows_coalesced == 49
+        assert db.get_user("test_123")['last_active'] is not None
+        db.close()
+
+    def test_record_trade_is_buffered(self, db_path):
+        """Buffered trades return no id but are recorded on flush."""
+        db = _database(db_path)
+
+        assert db.record_trade("test_123", "jupiter_swap", "swap", 1.0, 0.01) is None
+
+        trades = db.get_user_trades("test_123")
+        assert len(trades) == 1
+        assert trades[0]['timestamp'] is not None
+        db.close()
+
+    def test_max_latency_bound(self, db_path):
+        """Rows are committed within the latency bound without any read."""
+        db = _database(db_path, write_behind_ms=20)
+        other = Database(db_path)
+
+        db.add_conversation("test_123", "user", "hello")
+        time.sleep(0.3)
+
+        assert len(other.get_conversation_history("test_123")) == 1
+        db.close()
+        other.close()
+
+    def test_full_batch_flushes_early(self, db_path):
+        """Reaching the batch size flushes without waiting for the latency bound."""
+        db = _database(db_path, write_batch_size=10)
+
+        for i in range(10):
+            db.add_conversation("test_123", "user", f"message {i}")
+        time.sleep(0.3)
+
+        assert db.write_behind.pending == 0
+        assert db.write_behind.stats.rows_written == 10
+        db.close()
+
+    def test_close_flushes(self, db_path):
+        """Closing the database commits queued rows."""
+        db = _database(db_path)
+        db.add_conversation("test_123", "user", "hello")
+
+        db.close()
+
+        other = Database(db_path)
+        assert len(other.get_conversation_history("test_123")) == 1
+        other.close()
+
+    def test_close_stops_flush_thread(self, db_path):
+        """Closing the database stops the flush thread; later writes commit directly."""
+        db = _database(db_path)
+        db.add_conversation("test_123", "user", "hello")
+        assert db.write_behind._thread is not None
+
+        db.close()
+
+        assert db.write_behind._thread is None
+        db.add_conversation("test_123", "user", "after close")
+        assert db.write_behind.pending == 0
+        assert len(db.get_conversation_history("test_123")) == 2
+        db.close()
+
+    def test_failed_batch_retried_row_by_row(self, db_path):
+        """A bad row only drops itself."""
+        db = Database(db_path)
+        buffer = WriteBehindBuffer(db.get_connection, max_latency=10.0, flush_on_exit=False)
+        sql = "INSERT INTO conversations (user_id, role, message) VALUES (?, ?, ?)"
+
+        buffer.add(sql, ("test_123", "user", "ok"))
+        buffer.add(sql, ("test_123", "user", None))  # message is NOT NULL
+
+        assert buffer.flush() == 1
+        assert buffer.stats.rows_failed == 1
+        assert len(db.get_conversation_history("test_123")) == 1
+        buffer.close()
+        db.close()